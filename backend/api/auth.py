@@ -1,12 +1,11 @@
 import logging
 from api.utils.rest import (
-    get_org_member_from_user_token,
-    get_service_account_from_token,
-    get_service_token,
+    auth_token_is_live,
     get_token_type,
-    token_is_expired_or_deleted,
+    resolve_auth_token,
+    touch_service_account_token,
 )
-from api.models import DynamicSecret, Environment, Secret, ServiceAccountToken
+from api.models import DynamicSecret, Environment, Secret
 from api.utils.access.permissions import (
     service_account_can_access_environment,
     user_can_access_app,
@@ -30,30 +29,6 @@ class ServiceAccountUser:
         self.service_account = service_account
 
 
-def _resolve_caller_org(token_type, auth_token):
-    """Best-effort lookup of the calling principal's organisation. Used
-    to scope subsequent Secret/Environment/App lookups so an unrelated
-    UUID from another org can't act as an existence oracle. Failures
-    here are deferred — the principal-loading branches below raise the
-    canonical errors."""
-    try:
-        if token_type == "User":
-            om = get_org_member_from_user_token(auth_token)
-            if om and getattr(om, "deleted_at", None) is None:
-                return om.organisation
-        elif token_type == "ServiceAccount":
-            sa = get_service_account_from_token(auth_token)
-            if sa and getattr(sa, "deleted_at", None) is None:
-                return sa.organisation
-        elif token_type == "Service":
-            st = get_service_token(auth_token)
-            if st is not None:
-                return st.app.organisation
-    except Exception:
-        pass
-    return None
-
-
 class PhaseTokenAuthentication(authentication.BaseAuthentication):
     def authenticate_header(self, request):
         # DRF needs this to return a value for AuthenticationFailed to map
@@ -85,14 +60,18 @@ class PhaseTokenAuthentication(authentication.BaseAuthentication):
             "service_account_token": None,
         }
 
-        if token_is_expired_or_deleted(auth_token):
+        # One (cached) lookup resolves the token together with its principal
+        # and organisation; everything below reads from it.
+        resolved = resolve_auth_token(auth_token)
+        if not auth_token_is_live(resolved):
             raise exceptions.AuthenticationFailed("Token expired or deleted")
 
-        # Resolve the caller's org early so subsequent lookups can be
-        # scoped to it — without this an unrelated UUID from another org
-        # acts as a cross-tenant existence oracle (404 = doesn't exist,
-        # 401/403 = exists in another org).
-        caller_org = _resolve_caller_org(token_type, auth_token)
+        # The caller's org scopes the subsequent lookups — without this an
+        # unrelated UUID from another org acts as a cross-tenant existence
+        # oracle (404 = doesn't exist, 401/403 = exists in another org).
+        # None when the principal is deleted; the principal branches below
+        # raise the canonical errors for that.
+        caller_org = resolved["organisation"]
 
         url_kwargs = (
             request.resolver_match.kwargs
@@ -230,23 +209,14 @@ class PhaseTokenAuthentication(authentication.BaseAuthentication):
             auth["app"] = env.app
 
         if token_type == "User":
-            try:
-                org_member = get_org_member_from_user_token(auth_token)
-                if org_member.deleted_at is not None:
-                    raise exceptions.NotFound("User not found")
-            except Exception:
+            org_member = resolved["org_member"]
+            if org_member is None or org_member.deleted_at is not None:
                 raise exceptions.NotFound("User not found")
 
             # Capture the UserToken row for audit attribution. Without this,
             # audit events from PAT-driven REST calls can't distinguish the
             # specific token used (vs. a console UI session, which has none).
-            from api.models import UserToken as _UserToken
-            from api.utils.rest import _parse_auth_token as _parse
-            _, _tok_value = _parse(auth_token)
-            try:
-                auth["user_token"] = _UserToken.objects.get(token=_tok_value)
-            except _UserToken.DoesNotExist:
-                auth["user_token"] = None
+            auth["user_token"] = resolved["token"]
 
             auth["org_member"] = org_member
             user = org_member.user
@@ -271,7 +241,7 @@ class PhaseTokenAuthentication(authentication.BaseAuthentication):
                 raise exceptions.AuthenticationFailed(
                     "Service tokens require an environment context"
                 )
-            service_token = get_service_token(auth_token)
+            service_token = resolved["token"]
             if (
                 env.app_id != service_token.app_id
                 or not service_token.keys.filter(
@@ -287,8 +257,8 @@ class PhaseTokenAuthentication(authentication.BaseAuthentication):
         if token_type == "ServiceAccount":
 
             try:
-                service_token = get_service_token(auth_token)
-                service_account = get_service_account_from_token(auth_token)
+                service_token = resolved["token"]
+                service_account = resolved["service_account"]
 
                 creator = getattr(service_token, "created_by", None)
                 if creator:
@@ -303,11 +273,9 @@ class PhaseTokenAuthentication(authentication.BaseAuthentication):
                 # REST/management API. Without this the GraphQL resolver
                 # falls back to SecretEvent history which only records
                 # E2EE secret operations, so tokens actively hitting
-                # management endpoints showed "never used".
-                from django.utils import timezone as _tz
-                ServiceAccountToken.objects.filter(id=service_token.id).update(
-                    last_used_at=_tz.now()
-                )
+                # management endpoints showed "never used". Throttled, so a
+                # busy token doesn't write its row on every request.
+                touch_service_account_token(service_token)
 
                 if auth.get("org_only"):
                     # Org-only mode: resolve organisation from the SA
@@ -338,28 +306,15 @@ class PhaseTokenAuthentication(authentication.BaseAuthentication):
             except (exceptions.AuthenticationFailed, exceptions.NotFound):
                 raise  # Let DRF exceptions propagate with their specific messages
             except Exception as ex:
+                # The token and account were resolved above, so anything
+                # unexpected here came from the access check.
                 logger.debug(f"ServiceAccount authentication error: {ex}")
-                # Distinguish between ServiceAccount not found and other errors
-                ServiceAccount = apps.get_model("api", "ServiceAccount")
-                try:
-                    get_service_account_from_token(auth_token)
-                    # If it exists, the error was likely the access check
-                    if env:
-                        raise exceptions.AuthenticationFailed(
-                            "Service account cannot access this environment"
-                        )
-                    else:
-                        raise exceptions.AuthenticationFailed(
-                            "Service account cannot access this app"
-                        )
-                except ServiceAccount.DoesNotExist:
-                    raise exceptions.NotFound("Service account not found")
-                except (
-                    Exception
-                ) as ex:  # Catch any other unexpected error during the re-check
-                    logger.debug(f"Authentication error: {ex}")
+                if env:
                     raise exceptions.AuthenticationFailed(
-                        "Authentication error. Please check your authentication token or App / Environment access."
+                        "Service account cannot access this environment"
                     )
+                raise exceptions.AuthenticationFailed(
+                    "Service account cannot access this app"
+                )
 
         return (user, auth)
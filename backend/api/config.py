@@ -13,6 +13,11 @@ class APIConfig(AppConfig):
         # Connect the post_migrate signal to a custom handler
         post_migrate.connect(self.validate_licenses_post_migrate, sender=self)
         post_migrate.connect(self.init_log_streams_post_migrate, sender=self)
+        post_migrate.connect(self.init_event_partitions_post_migrate, sender=self)
+        post_migrate.connect(self.init_recurring_jobs_post_migrate, sender=self)
+        post_migrate.connect(
+            self.backfill_secret_references_post_migrate, sender=self
+        )
 
     def validate_licenses_post_migrate(self, **kwargs):
 
@@ -37,3 +42,27 @@ class APIConfig(AppConfig):
             init_log_stream_sweeper()
         except Exception:
             logging.exception("Failed to initialise log stream sweeper")
+
+    def init_event_partitions_post_migrate(self, **kwargs):
+        try:
+            from api.utils.partitions import ensure_partitions
+
+            ensure_partitions()
+        except Exception:
+            logging.exception("Failed to create event partitions")
+
+    def init_recurring_jobs_post_migrate(self, **kwargs):
+        try:
+            from api.tasks.scheduling import init_recurring_jobs
+
+            init_recurring_jobs()
+        except Exception:
+            logging.exception("Failed to initialise recurring jobs")
+
+    def backfill_secret_references_post_migrate(self, **kwargs):
+        try:
+            from api.tasks.syncing import schedule_secret_reference_backfill
+
+            schedule_secret_reference_backfill()
+        except Exception:
+            logging.exception("Failed to schedule the secret reference backfill")
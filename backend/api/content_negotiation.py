@@ -16,3 +16,12 @@ class CamelCaseContentNegotiation(DefaultContentNegotiation):
 
         # Otherwise, fall back to default DRF behavior
         return super().select_renderer(request, renderers, format_suffix)
+
+
+class CamelCaseNDJSONRenderer(CamelCaseJSONRenderer):
+    """Lets streaming clients negotiate `Accept: application/x-ndjson`.
+    Streamed bodies are encoded by the view; anything rendered through here
+    (errors) is a single JSON object, which is itself valid NDJSON."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
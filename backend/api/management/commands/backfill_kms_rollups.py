@@ -0,0 +1,61 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import App
+from logs.models import KMSDBLog
+from logs.rollups import HOUR_MS, bucket_start, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the KMS activity rollups behind the app activity chart from "
+        "the stored KMS logs. Safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--app-id",
+            type=str,
+            help="ID of a specific app to rebuild rollups for (optional)",
+        )
+
+    def handle(self, *args, **options):
+        app_id = options.get("app_id")
+
+        if app_id:
+            try:
+                app = App.objects.get(id=app_id)
+            except App.DoesNotExist:
+                raise CommandError(f"App with id '{app_id}' not found.")
+            log_app_ids = [f"phApp:v{app.app_version}:{app.identity_key}"]
+        else:
+            log_app_ids = list(
+                KMSDBLog.objects.order_by()
+                .values_list("app_id", flat=True)
+                .distinct()
+            )
+
+        # The current hour is left to the live counters, which are already
+        # being incremented by incoming logs.
+        before = bucket_start(datetime.now().timestamp() * 1000, HOUR_MS)
+
+        grand_total = 0
+        grand_start = time.monotonic()
+        for log_app_id in log_app_ids:
+            app_start = time.monotonic()
+            counted = rebuild_rollups(log_app_id, before)
+            grand_total += counted
+            self.stdout.write(
+                f"Rebuilt rollups for '{log_app_id}' from {counted} logs "
+                f"in {time.monotonic() - app_start:.1f}s"
+            )
+
+        elapsed = time.monotonic() - grand_start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rollup backfill completed: {len(log_app_ids)} apps, "
+                f"{grand_total} logs in {elapsed:.1f}s."
+            )
+        )
@@ -0,0 +1,296 @@
+import re
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.utils.partitions import (
+    PARTITION_MONTHS_AHEAD,
+    add_months,
+    create_default_partition,
+    create_partition,
+    event_tables,
+    is_partitioned,
+    month_start,
+)
+
+_INDEX_DEF_RE = re.compile(r"^CREATE (UNIQUE )?INDEX (\S+) ON (\S+) (.*)$")
+
+
+def _quote(name):
+    return connection.ops.quote_name(name)
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert the SecretEvent and AuditEvent tables to monthly range "
+        "partitions online. Run once to create the partitioned copy, mirror "
+        "writes to it and copy existing rows (resumable), then again with "
+        "--swap to put it in place."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--table",
+            choices=event_tables(),
+            help="Convert only this table (default: both)",
+        )
+        parser.add_argument(
+            "--swap",
+            action="store_true",
+            help="Replace the original table with the copied, partitioned one. "
+            "Takes a brief exclusive lock.",
+        )
+        parser.add_argument(
+            "--resume-after",
+            type=str,
+            default="",
+            help="Continue a copy after this row id (printed as progress)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="Rows copied per statement (default: 10000)",
+        )
+        parser.add_argument(
+            "--sleep-ms",
+            type=int,
+            default=200,
+            help="Pause between batches in ms (default: 200)",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning requires PostgreSQL.")
+
+        tables = [options["table"]] if options["table"] else event_tables()
+        for table in tables:
+            if is_partitioned(table):
+                self.stdout.write(f"{table} is already partitioned; skipping.")
+                continue
+            if options["swap"]:
+                self._swap(table)
+            else:
+                self._prepare(table)
+                self._copy(
+                    table,
+                    options["resume_after"],
+                    options["batch_size"],
+                    options["sleep_ms"],
+                )
+
+    def _shadow(self, table):
+        return f"{table}_partitioned"
+
+    def _prepare(self, table):
+        """Create the partitioned copy with the same indexes and foreign keys,
+        and mirror writes on the original to it."""
+        shadow = self._shadow(table)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [shadow])
+            if cursor.fetchone()[0] is not None:
+                self.stdout.write(f"{shadow} exists; resuming.")
+                return
+
+            cursor.execute(
+                f"CREATE TABLE {_quote(shadow)} "
+                f"(LIKE {_quote(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+                f'PARTITION BY RANGE ("timestamp")'
+            )
+            cursor.execute(
+                f"ALTER TABLE {_quote(shadow)} ADD CONSTRAINT "
+                f'{_quote(f"{shadow}_pkey")} PRIMARY KEY (id, "timestamp")'
+            )
+
+            cursor.execute(
+                "SELECT indexname, indexdef FROM pg_indexes "
+                "WHERE schemaname = current_schema() AND tablename = %s",
+                [table],
+            )
+            for name, definition in cursor.fetchall():
+                match = _INDEX_DEF_RE.match(definition)
+                if name == f"{table}_pkey" or not match:
+                    continue
+                if match.group(1):
+                    self.stderr.write(
+                        f"  Skipping unique index {name}: a partitioned table "
+                        "can only enforce uniqueness across the partition key."
+                    )
+                    continue
+                cursor.execute(
+                    f"CREATE INDEX {_quote(f'{name}_p')} ON {_quote(shadow)} "
+                    f"{match.group(4)}"
+                )
+
+            cursor.execute(
+                "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+                [table],
+            )
+            for name, definition in cursor.fetchall():
+                cursor.execute(
+                    f"ALTER TABLE {_quote(shadow)} ADD CONSTRAINT "
+                    f"{_quote(f'{name}_p')} {definition}"
+                )
+
+            # Mirrored updates of rows from months _copy hasn't reached yet
+            # land in the default; _copy moves them out as it goes.
+            create_default_partition(table, cursor, parent=shadow)
+            current = month_start(datetime.now(dt_timezone.utc))
+            for offset in range(PARTITION_MONTHS_AHEAD + 1):
+                create_partition(
+                    table, add_months(current, offset), cursor, parent=shadow
+                )
+
+            # Rows written from here on reach the copy through the trigger;
+            # older rows are copied by _copy.
+            cursor.execute(
+                f"""
+                CREATE FUNCTION {_quote(f"{table}_mirror")}() RETURNS trigger AS $$
+                BEGIN
+                    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                        DELETE FROM {_quote(shadow)}
+                        WHERE id = OLD.id AND "timestamp" = OLD."timestamp";
+                    END IF;
+                    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                        INSERT INTO {_quote(shadow)} SELECT (NEW).*
+                        ON CONFLICT DO NOTHING;
+                    END IF;
+                    RETURN NULL;
+                END
+                $$ LANGUAGE plpgsql
+                """
+            )
+            cursor.execute(
+                f"CREATE TRIGGER {_quote(f'{table}_mirror')} "
+                f"AFTER INSERT OR UPDATE OR DELETE ON {_quote(table)} "
+                f"FOR EACH ROW EXECUTE FUNCTION {_quote(f'{table}_mirror')}()"
+            )
+
+        self.stdout.write(f"Created {shadow} and started mirroring writes.")
+
+    def _copy(self, table, after_id, batch_size, sleep_ms):
+        """Copy existing rows in primary key order, creating the partitions
+        they need. Idempotent, so an interrupted copy can be resumed."""
+        shadow = self._shadow(table)
+        months = set()
+        copied = 0
+        start = time.monotonic()
+
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(
+                    f'SELECT id, "timestamp" FROM {_quote(table)} '
+                    f"WHERE id > %s ORDER BY id LIMIT %s",
+                    [after_id, batch_size],
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+
+                for month in {month_start(ts) for _, ts in rows} - months:
+                    create_partition(table, month, cursor, parent=shadow)
+                    months.add(month)
+
+                last_id = rows[-1][0]
+                cursor.execute(
+                    f"INSERT INTO {_quote(shadow)} SELECT * FROM {_quote(table)} "
+                    f"WHERE id > %s AND id <= %s ON CONFLICT DO NOTHING",
+                    [after_id, last_id],
+                )
+                copied += cursor.rowcount
+
+            after_id = last_id
+            self.stdout.write(f"  {table}: copied {copied} rows (after id {after_id})")
+            if sleep_ms:
+                time.sleep(sleep_ms / 1000.0)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Copied {copied} rows of {table} in "
+                f"{time.monotonic() - start:.1f}s. Run again with --swap to "
+                "switch over."
+            )
+        )
+
+    def _swap(self, table):
+        """Put the partitioned copy in place of the original, keeping the
+        original as <table>_unpartitioned."""
+        shadow = self._shadow(table)
+        legacy = f"{table}_unpartitioned"
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [shadow])
+            if cursor.fetchone()[0] is None:
+                raise CommandError(f"{shadow} does not exist; run without --swap first.")
+
+            cursor.execute(f"LOCK TABLE {_quote(table)} IN ACCESS EXCLUSIVE MODE")
+            cursor.execute(
+                f"DROP TRIGGER {_quote(f'{table}_mirror')} ON {_quote(table)}"
+            )
+            cursor.execute(f"DROP FUNCTION {_quote(f'{table}_mirror')}()")
+
+            # Foreign keys into the table can't reference the partitioned one,
+            # which is only unique on (id, timestamp). The models declare them
+            # with db_constraint=False (migration 0142), so none should remain.
+            cursor.execute(
+                "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+                "WHERE confrelid = to_regclass(%s) AND contype = 'f'",
+                [table],
+            )
+            remaining = [
+                f"{name} on {referencing}" for referencing, name in cursor.fetchall()
+            ]
+            if remaining:
+                raise CommandError(
+                    f"Foreign keys still reference {table} "
+                    f"({', '.join(remaining)}); run migrations first."
+                )
+
+            cursor.execute(
+                "SELECT indexname FROM pg_indexes "
+                "WHERE schemaname = current_schema() AND tablename = %s",
+                [table],
+            )
+            indexes = [row[0] for row in cursor.fetchall()]
+            cursor.execute(
+                "SELECT conname FROM pg_constraint "
+                "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+                [table],
+            )
+            foreign_keys = [row[0] for row in cursor.fetchall()]
+
+            cursor.execute(f"ALTER TABLE {_quote(table)} RENAME TO {_quote(legacy)}")
+            for name in indexes:
+                cursor.execute(
+                    f"ALTER INDEX {_quote(name)} RENAME TO {_quote(f'{name}_u')}"
+                )
+
+            cursor.execute(f"ALTER TABLE {_quote(shadow)} RENAME TO {_quote(table)}")
+            cursor.execute(
+                f"ALTER INDEX {_quote(f'{shadow}_pkey')} "
+                f"RENAME TO {_quote(f'{table}_pkey')}"
+            )
+            for name in indexes:
+                if name == f"{table}_pkey":
+                    continue
+                cursor.execute("SELECT to_regclass(%s)", [f"{name}_p"])
+                if cursor.fetchone()[0] is not None:
+                    cursor.execute(
+                        f"ALTER INDEX {_quote(f'{name}_p')} RENAME TO {_quote(name)}"
+                    )
+            for name in foreign_keys:
+                cursor.execute(
+                    f"ALTER TABLE {_quote(table)} RENAME CONSTRAINT "
+                    f"{_quote(f'{name}_p')} TO {_quote(name)}"
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{table} is now partitioned by month. The original table is "
+                f"kept as {legacy}; drop it once the switch is verified."
+            )
+        )
@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Environment, Organisation, SecretReference
+from api.utils.secrets import index_environment_references
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the secret reference index used to detect which syncs depend "
+        "on a changed environment."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--org",
+            type=str,
+            help="Name of a single organisation to rebuild (default: all)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Secrets decrypted and indexed per batch (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        org_name = options.get("org")
+        batch_size = options["batch_size"]
+
+        if batch_size <= 0:
+            raise CommandError("The --batch-size argument must be a positive integer.")
+
+        env_filter = {"deleted_at": None, "app__deleted_at": None}
+        if org_name:
+            try:
+                org = Organisation.objects.get(name=org_name)
+            except Organisation.DoesNotExist:
+                raise CommandError(f"Organisation '{org_name}' does not exist.")
+            env_filter["app__organisation"] = org
+
+        environments = list(
+            Environment.objects.filter(**env_filter).select_related("app")
+        )
+
+        # From scratch: drop every existing edge in scope (including those of
+        # deleted environments) before re-indexing the live secrets. Until an
+        # environment is re-indexed, readers of the index fall back to
+        # decrypting it.
+        Environment.objects.filter(**env_filter).update(
+            secret_references_indexed=False
+        )
+        stale = SecretReference.objects.all()
+        if org_name:
+            stale = stale.filter(environment__app__organisation=org)
+        deleted, _ = stale.delete()
+        self.stdout.write(f"Cleared {deleted} existing reference edges.")
+
+        grand_total = 0
+        start = time.monotonic()
+        for env in environments:
+            n = index_environment_references(env.id, batch_size)
+            grand_total += n
+            if n:
+                self.stdout.write(
+                    f"  {env.app.name} / {env.name} ({env.id}): {n} edges"
+                )
+
+        elapsed = time.monotonic() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reference index rebuilt: {grand_total} edges across "
+                f"{len(environments)} environments in {elapsed:.1f}s."
+            )
+        )
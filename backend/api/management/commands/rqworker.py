@@ -109,11 +109,22 @@ class Command(BaseCommand):
         except Exception:
             logger.exception("Failed to register log stream sweeper at worker startup")
 
+    def bootstrap_recurring_jobs(self):
+        """(Re-)register the recurring backend jobs at worker startup, for the
+        same reason as bootstrap_log_stream_schedule."""
+        try:
+            from api.tasks.scheduling import init_recurring_jobs
+
+            init_recurring_jobs()
+        except Exception:
+            logger.exception("Failed to register recurring jobs at worker startup")
+
     def handle(self, *args, **options):
         queue = options["queue"]
         num_workers = options["num_workers"]
 
         self.bootstrap_log_stream_schedule()
+        self.bootstrap_recurring_jobs()
 
         processes = [
             multiprocessing.Process(
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.17 on 2026-10-18 05:36
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0136_logstream_unresolved_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SecretReference',
+            fields=[
+                ('id', models.TextField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('app_name', models.CharField(blank=True, default='', max_length=256)),
+                ('environment_name', models.CharField(max_length=256)),
+                ('environment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='secret_references', to='api.environment')),
+                ('secret', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='references', to='api.secret')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('secret', 'app_name', 'environment_name'), name='unique_secret_reference')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.17 on 2026-10-18 05:50
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0137_secretreference'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='secretevent',
+            name='compact',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name='secretevent',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.17 on 2026-10-18 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0138_secretevent_compact'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='environmentsync',
+            name='last_synced_digest',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
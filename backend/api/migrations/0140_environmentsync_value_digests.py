@@ -0,0 +1,18 @@
+# Generated by Django 5.2.17 on 2026-10-18 06:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0139_environmentsync_last_synced_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='environmentsync',
+            name='value_digests',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
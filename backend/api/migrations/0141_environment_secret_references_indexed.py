@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0140_environmentsync_value_digests"),
+    ]
+
+    operations = [
+        # Existing environments start out unindexed; the post-migrate backfill
+        # (api.tasks.syncing.backfill_secret_references) indexes them. New
+        # environments have no secrets yet, so they are indexed from the start.
+        migrations.AddField(
+            model_name="environment",
+            name="secret_references_indexed",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterField(
+            model_name="environment",
+            name="secret_references_indexed",
+            field=models.BooleanField(default=True),
+        ),
+    ]
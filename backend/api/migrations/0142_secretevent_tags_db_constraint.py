@@ -0,0 +1,52 @@
+from django.db import migrations, models
+
+
+def drop_tag_foreign_keys(apps, schema_editor):
+    """Drop the foreign keys of the SecretEvent.tags through table, whose
+    names Django derives from a hash and which differ per database."""
+    SecretEvent = apps.get_model("api", "SecretEvent")
+    through = SecretEvent._meta.get_field("tags").remote_field.through._meta.db_table
+    quote = schema_editor.quote_name
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [through],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    for name in names:
+        schema_editor.execute(
+            f"ALTER TABLE {quote(through)} DROP CONSTRAINT {quote(name)}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0141_environment_secret_references_indexed"),
+    ]
+
+    operations = [
+        # Once partitioned by month (partition_event_tables), api_secretevent
+        # is only unique on (id, timestamp), so rows can't be referenced by id
+        # alone. The constraints are not restored on reverse: partition
+        # retention may already have removed events that tags point to.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(
+                    drop_tag_foreign_keys, migrations.RunPython.noop
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="secretevent",
+                    name="tags",
+                    field=models.ManyToManyField(
+                        db_constraint=False, to="api.secrettag"
+                    ),
+                ),
+            ],
+        ),
+    ]
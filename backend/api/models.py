@@ -11,7 +11,8 @@ import json
 from django.utils import timezone
 from django.conf import settings
 from api.services import Providers, ServiceConfig
-from api.tasks.syncing import trigger_sync_tasks, detect_and_trigger_referencing_syncs
+from api.tasks.syncing import schedule_sync_tasks, schedule_referencing_sync_scan
+from api.utils.secrets import update_secret_references
 from backend.quotas import (
     can_add_account,
     can_add_app,
@@ -463,15 +464,20 @@ class Environment(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(blank=True, null=True)
     is_deleted = models.BooleanField(default=False)
+    # Whether this environment's secrets are in the SecretReference index.
+    # False for environments that predate the index until the backfill
+    # (api.tasks.syncing.backfill_secret_references) reaches them.
+    secret_references_indexed = models.BooleanField(default=True)
 
     objects = EnvironmentManager()
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
 
-        # Own syncs: synchronous, so queued status shows immediately.
+        # Own syncs: marked queued immediately, run once per debounce window
+        # so bursts of writes (bulk edits, CLI imports) coalesce.
         [
-            trigger_sync_tasks(env_sync)
+            schedule_sync_tasks(env_sync)
             for env_sync in EnvironmentSync.objects.filter(
                 environment=self, deleted_at=None
             )
@@ -479,11 +485,9 @@ class Environment(models.Model):
         ]
 
         # Referencing envs: dispatched after commit (on_commit) so the worker
-        # can't race an open transaction; runs off the request path.
+        # can't race an open transaction; scanned once per org per window.
         env_id = str(self.id)
-        transaction.on_commit(
-            lambda: detect_and_trigger_referencing_syncs.delay(env_id)
-        )
+        transaction.on_commit(lambda: schedule_referencing_sync_scan(env_id))
 
 
 class EnvironmentKey(models.Model):
@@ -588,6 +592,12 @@ class EnvironmentSync(models.Model):
         choices=STATUS_OPTIONS,
         default=QUEUED,
     )
+    # Digest of the secrets and target of the last successful push; a run
+    # with an identical digest skips the provider entirely.
+    last_synced_digest = models.CharField(max_length=64, blank=True, null=True)
+    # Per-secret digests of values pushed to providers that can't be read
+    # back (e.g. GitHub), so unchanged secrets are not re-uploaded.
+    value_digests = models.JSONField(blank=True, null=True)
 
 
 class EnvironmentSyncEvent(models.Model):
@@ -798,8 +808,11 @@ class Secret(models.Model):
 
         # Notify the environment (bumps updated_at and triggers syncs). Bulk
         # callers pass trigger_sync=False and trigger once after the loop so the
-        # per-env sync jobs and org-wide reference scan run a single time.
+        # per-env sync jobs and org-wide reference scan run a single time; they
+        # also refresh the reference index for the whole batch themselves.
         if self.environment and trigger_sync:
+            # Before env.save(), which dispatches the referencing-sync scan.
+            update_secret_references([self])
             self.environment.updated_at = timezone.now()
             self.environment.save()
 
@@ -812,6 +825,39 @@ class Secret(models.Model):
             env.save()
 
 
+class SecretReference(models.Model):
+    """
+    A cross-environment reference (${ENV.KEY} or ${APP::ENV.KEY}) found in an
+    SSE secret's value. Together these rows form the org's environment-to-
+    environment reference graph, which referencing-sync detection walks
+    without decrypting anything.
+
+    Targets are stored by (lowercased) name, exactly as they are written in the
+    reference, so renames and new environments are picked up at query time.
+    An empty app_name means the source secret's own app. Rows are kept in step
+    by the secret write paths (see api.utils.secrets.update_secret_references)
+    and can be rebuilt with the rebuild_secret_references command.
+    """
+
+    id = models.TextField(default=uuid4, primary_key=True, editable=False)
+    secret = models.ForeignKey(
+        Secret, on_delete=models.CASCADE, related_name="references"
+    )
+    environment = models.ForeignKey(
+        Environment, on_delete=models.CASCADE, related_name="secret_references"
+    )
+    app_name = models.CharField(max_length=256, blank=True, default="")
+    environment_name = models.CharField(max_length=256)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["secret", "app_name", "environment_name"],
+                name="unique_secret_reference",
+            ),
+        ]
+
+
 class DynamicSecret(models.Model):
 
     PROVIDER_CHOICES = [("aws", "AWS")]
@@ -1250,7 +1296,9 @@ class SecretEvent(models.Model):
     key_digest = models.TextField()
     value = models.TextField()
     version = models.IntegerField(default=1)
-    tags = models.ManyToManyField(SecretTag)
+    # No database constraints: a partitioned api_secretevent (see
+    # api.utils.partitions) is only unique on (id, timestamp).
+    tags = models.ManyToManyField(SecretTag, db_constraint=False)
     comment = models.TextField()
     type = models.CharField(
         max_length=10,
@@ -1262,7 +1310,13 @@ class SecretEvent(models.Model):
         choices=EVENT_TYPES,
         default=CREATE,
     )
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Compact events (READs) store no key/value/comment ciphertext or tags;
+    # those are resolved from the CREATE/UPDATE event of the same secret
+    # version when displayed. See api.utils.audit_logging.
+    compact = models.BooleanField(default=False)
+    # Set explicitly (not auto_now_add) so buffered READ events keep the time
+    # of the read rather than the time they were flushed.
+    timestamp = models.DateTimeField(default=timezone.now)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(null=True, blank=True)
 
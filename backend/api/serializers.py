@@ -166,6 +166,7 @@ class PersonalSecretSerializer(serializers.ModelSerializer):
             account = self.context.get("account")
             crypto_context = self.context.get("crypto_context")
             context_cache = self.context.get("context_cache")
+            reference_index = self.context.get("reference_index")
 
             # Pass account so references inside a personal override enforce the
             # caller's access to the referenced environment (same as the parent
@@ -175,6 +176,7 @@ class PersonalSecretSerializer(serializers.ModelSerializer):
                 account=account,
                 crypto_context=crypto_context,
                 context_cache=context_cache,
+                reference_index=reference_index,
             )
             return value
         return obj.value
@@ -210,6 +212,7 @@ class SecretSerializer(serializers.ModelSerializer):
             account = self.context.get("account")
             crypto_context = self.context.get("crypto_context")
             context_cache = self.context.get("context_cache")
+            reference_index = self.context.get("reference_index")
 
             try:
                 value = decrypt_secret_value(
@@ -218,6 +221,7 @@ class SecretSerializer(serializers.ModelSerializer):
                     account=account,
                     crypto_context=crypto_context,
                     context_cache=context_cache,
+                    reference_index=reference_index,
                 )
                 return value
             except SecretReferenceException as e:
@@ -255,6 +259,7 @@ class SecretSerializer(serializers.ModelSerializer):
                         "account": self.context.get("account"),
                         "crypto_context": self.context.get("crypto_context"),
                         "context_cache": self.context.get("context_cache"),
+                        "reference_index": self.context.get("reference_index"),
                     },
                 ).data
             except PersonalSecret.DoesNotExist:
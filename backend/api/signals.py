@@ -1,9 +1,35 @@
 from allauth.account.signals import user_signed_up
-from django.db.models.signals import pre_delete
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.conf import settings
 from backend.api.notifier import notify_slack
-from api.models import RotatingSecret, RotatingSecretCredential
+from api.models import (
+    App,
+    EnvironmentKey,
+    EnvironmentKeyGrant,
+    NetworkAccessPolicy,
+    OrganisationMember,
+    Role,
+    RotatingSecret,
+    RotatingSecretCredential,
+    ServerEnvironmentKey,
+    ServiceAccount,
+    ServiceAccountToken,
+    ServiceToken,
+    Team,
+    TeamAppEnvironment,
+    TeamMembership,
+    UserToken,
+)
+from api.utils.access.access_map import (
+    invalidate_org_access_on_commit,
+    invalidate_user_access_on_commit,
+)
+from api.utils.access.org_resolution import resolve_via_model
+from api.utils.kms import invalidate_app_key_share
+from api.utils.rest import invalidate_auth_token
+from api.utils.secrets import invalidate_environment_crypto_context
+from ee.access.utils.network import invalidate_network_policies
 
 CLOUD_HOSTED = settings.APP_HOST == "cloud"
 
@@ -50,3 +76,149 @@ def _rotating_secret_pre_delete(sender, instance, **kwargs):
             revoke_credential(cred.id, immediate=True)
         except Exception:
             pass
+
+
+@receiver(post_save, sender=ServerEnvironmentKey)
+@receiver(post_delete, sender=ServerEnvironmentKey)
+def _server_environment_key_changed(sender, instance, **kwargs):
+    # Drop this worker's cached unwrapped key material; other workers pick up
+    # the change when their cache entry's TTL lapses.
+    invalidate_environment_crypto_context(instance.environment_id)
+
+
+@receiver(post_save, sender=App)
+@receiver(post_delete, sender=App)
+def _app_changed(sender, instance, **kwargs):
+    # Deleted apps and replaced key shares must stop being served by the KMS
+    # endpoint immediately. A rotated token is dropped by the rotation itself,
+    # as the saved instance only carries the new one.
+    invalidate_app_key_share(instance.app_token)
+
+
+_TOKEN_TYPES = {
+    UserToken: "User",
+    ServiceToken: "Service",
+    ServiceAccountToken: "ServiceAccount",
+}
+
+
+@receiver(post_save, sender=UserToken)
+@receiver(post_delete, sender=UserToken)
+@receiver(post_save, sender=ServiceToken)
+@receiver(post_delete, sender=ServiceToken)
+@receiver(post_save, sender=ServiceAccountToken)
+@receiver(post_delete, sender=ServiceAccountToken)
+def _auth_token_changed(sender, instance, **kwargs):
+    # Revoked or deleted tokens must stop authenticating immediately, not
+    # when the cached resolution expires.
+    invalidate_auth_token(_TOKEN_TYPES[sender], instance.token)
+
+
+@receiver(post_save, sender=OrganisationMember)
+def _org_member_changed(sender, instance, created=False, **kwargs):
+    # Resolved user tokens carry the member (deletion, role); refresh them.
+    if created:
+        return
+    for token in UserToken.objects.filter(user=instance).values_list(
+        "token", flat=True
+    ):
+        invalidate_auth_token("User", token)
+
+
+@receiver(post_save, sender=ServiceAccount)
+def _service_account_changed(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    for token in ServiceAccountToken.objects.filter(
+        service_account=instance
+    ).values_list("token", flat=True):
+        invalidate_auth_token("ServiceAccount", token)
+
+
+# --- Access map invalidation ---
+# Anything that changes who can reach what bumps the organisation's access
+# version, discarding the cached access maps built against it. The bump waits
+# for the write to commit, so no map can be rebuilt from the old state under
+# the new version.
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=ServiceAccount)
+@receiver(post_delete, sender=ServiceAccount)
+def _org_access_changed(sender, instance, **kwargs):
+    invalidate_org_access_on_commit(instance.organisation_id)
+
+
+@receiver(post_save, sender=OrganisationMember)
+@receiver(post_delete, sender=OrganisationMember)
+def _member_access_changed(sender, instance, **kwargs):
+    invalidate_org_access_on_commit(instance.organisation_id)
+    # A new membership adds an org the user's cached map doesn't cover yet.
+    invalidate_user_access_on_commit(instance.user_id)
+
+
+@receiver(post_save, sender=TeamMembership)
+@receiver(post_delete, sender=TeamMembership)
+def _team_membership_changed(sender, instance, **kwargs):
+    invalidate_org_access_on_commit(
+        resolve_via_model("Team", instance.team_id, {})
+    )
+
+
+@receiver(post_save, sender=TeamAppEnvironment)
+@receiver(post_delete, sender=TeamAppEnvironment)
+def _team_app_environment_changed(sender, instance, **kwargs):
+    invalidate_org_access_on_commit(
+        resolve_via_model("App", instance.app_id, {})
+    )
+
+
+@receiver(post_save, sender=EnvironmentKey)
+@receiver(post_delete, sender=EnvironmentKey)
+def _environment_key_changed(sender, instance, **kwargs):
+    invalidate_org_access_on_commit(
+        resolve_via_model("Environment", instance.environment_id, {})
+    )
+
+
+@receiver(post_delete, sender=EnvironmentKeyGrant)
+def _environment_key_grant_deleted(sender, instance, **kwargs):
+    # Revocations delete grants, then soft-delete orphaned keys with a
+    # queryset update that sends no signals of its own.
+    environment_id = (
+        EnvironmentKey.objects.filter(id=instance.environment_key_id)
+        .values_list("environment_id", flat=True)
+        .first()
+    )
+    invalidate_org_access_on_commit(
+        resolve_via_model("Environment", environment_id, {})
+    )
+
+
+@receiver(m2m_changed, sender=OrganisationMember.apps.through)
+@receiver(m2m_changed, sender=ServiceAccount.apps.through)
+def _app_membership_changed(sender, instance, action, **kwargs):
+    # `instance` is the member / service account, or the App when the
+    # relation is changed from the app side; all carry organisation_id.
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_org_access_on_commit(instance.organisation_id)
+
+
+# --- Network policy invalidation ---
+
+
+@receiver(post_save, sender=NetworkAccessPolicy)
+@receiver(post_delete, sender=NetworkAccessPolicy)
+def _network_policy_changed(sender, instance, **kwargs):
+    invalidate_network_policies(instance.organisation_id)
+
+
+@receiver(m2m_changed, sender=OrganisationMember.network_policies.through)
+@receiver(m2m_changed, sender=ServiceAccount.network_policies.through)
+def _network_policy_attachments_changed(sender, instance, action, **kwargs):
+    # `instance` is the account or, from the reverse side, the policy.
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_network_policies(instance.organisation_id)
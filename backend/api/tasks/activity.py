@@ -0,0 +1,39 @@
+"""Bootstrap for the recurring KMS activity jobs.
+
+The flush of buffered KMS logs (see api.utils.kms), registered when
+KMS_LOGS_ASYNC is enabled, and the compaction of hourly activity rollups
+past their retention into daily ones, and the fold of rollup increments
+buffered by direct KMS log writes (see logs.rollups). Registered by
+api.tasks.scheduling.init_recurring_jobs.
+"""
+
+from django.conf import settings
+
+from api.tasks.scheduling import cancel_recurring, schedule_recurring
+from api.utils.kms import flush_kms_logs
+from logs.rollups import compact_rollups, fold_rollup_increments
+
+FLUSH_JOB_ID = "kms-logs-flush"
+COMPACTION_JOB_ID = "kms-rollup-compaction"
+COMPACTION_INTERVAL_SECONDS = 60 * 60
+FOLD_JOB_ID = "kms-rollup-fold"
+FOLD_INTERVAL_SECONDS = 60
+
+
+def init_kms_rollup_compactor():
+    schedule_recurring(
+        COMPACTION_JOB_ID, compact_rollups, COMPACTION_INTERVAL_SECONDS, delay=60
+    )
+
+
+def init_kms_rollup_folder():
+    # Registered even with KMS_LOGS_ASYNC on, to fold increments buffered
+    # before it was enabled.
+    schedule_recurring(FOLD_JOB_ID, fold_rollup_increments, FOLD_INTERVAL_SECONDS)
+
+
+def init_kms_log_flusher():
+    if not settings.KMS_LOGS_ASYNC:
+        cancel_recurring(FLUSH_JOB_ID)
+        return
+    schedule_recurring(FLUSH_JOB_ID, flush_kms_logs, settings.KMS_LOGS_FLUSH_INTERVAL)
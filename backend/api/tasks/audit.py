@@ -0,0 +1,34 @@
+"""Bootstrap for the recurring event log jobs.
+
+The flush of buffered secret READ events, only registered when
+SECRET_READ_EVENTS_ASYNC is enabled, and the creation of upcoming monthly
+partitions of the event tables (see api.utils.partitions). Registered by
+api.tasks.scheduling.init_recurring_jobs.
+"""
+
+from django.conf import settings
+
+from api.tasks.scheduling import cancel_recurring, schedule_recurring
+from api.utils.audit_logging import flush_secret_read_events
+from api.utils.partitions import ensure_partitions
+
+FLUSH_JOB_ID = "secret-read-events-flush"
+PARTITIONS_JOB_ID = "event-partitions-maintenance"
+PARTITIONS_INTERVAL_SECONDS = 24 * 60 * 60
+
+
+def init_secret_read_event_flusher():
+    if not settings.SECRET_READ_EVENTS_ASYNC:
+        cancel_recurring(FLUSH_JOB_ID)
+        return
+    schedule_recurring(
+        FLUSH_JOB_ID,
+        flush_secret_read_events,
+        settings.SECRET_READ_EVENTS_FLUSH_INTERVAL,
+    )
+
+
+def init_event_partition_maintenance():
+    schedule_recurring(
+        PARTITIONS_JOB_ID, ensure_partitions, PARTITIONS_INTERVAL_SECONDS
+    )
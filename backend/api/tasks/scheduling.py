@@ -0,0 +1,69 @@
+"""Registration of the recurring backend jobs.
+
+The jobs are registered from a post_migrate hook (api/config.py) and again at
+worker startup (rqworker), since the schedule lives only in Redis and is
+lost with it. Each job carries a stable id and is cancelled before
+re-registration, so repeated registrations replace the schedule instead of
+accumulating duplicates.
+"""
+
+import logging
+from datetime import timedelta
+
+import django_rq
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def cancel_recurring(job_id):
+    scheduler = django_rq.get_scheduler("scheduled-jobs")
+    try:
+        scheduler.cancel(job_id)
+    except Exception:
+        logger.debug("No existing job %s to cancel", job_id, exc_info=True)
+    return scheduler
+
+
+def schedule_recurring(job_id, func, interval, delay=15):
+    """
+    (Re-)register `func` to run every `interval` seconds as job `job_id`.
+
+    Note: rq 2.x forbids ":" in job ids.
+    """
+    scheduler = cancel_recurring(job_id)
+    scheduler.schedule(
+        scheduled_time=timezone.now() + timedelta(seconds=delay),
+        func=func,
+        interval=interval,
+        repeat=None,
+        # Never expire the job hash; see init_log_stream_sweeper.
+        result_ttl=-1,
+        id=job_id,
+    )
+    logger.info("Scheduled %s every %ss", job_id, interval)
+
+
+def init_recurring_jobs():
+    """Register every recurring backend job. Failures are logged per job."""
+    from api.tasks.activity import (
+        init_kms_log_flusher,
+        init_kms_rollup_compactor,
+        init_kms_rollup_folder,
+    )
+    from api.tasks.audit import (
+        init_event_partition_maintenance,
+        init_secret_read_event_flusher,
+    )
+
+    for init in (
+        init_secret_read_event_flusher,
+        init_event_partition_maintenance,
+        init_kms_rollup_compactor,
+        init_kms_rollup_folder,
+        init_kms_log_flusher,
+    ):
+        try:
+            init()
+        except Exception:
+            logger.exception("Failed to register recurring job (%s)", init.__name__)
@@ -37,11 +37,23 @@ from ..utils.syncing.cloudflare.workers import (
     get_cf_workers_credentials,
     sync_cloudflare_worker_secrets,
 )
+from datetime import timedelta
+from uuid import uuid4
 from django.apps import apps
-from ..utils.syncing.secrets import get_environment_secrets
+from django.conf import settings
+from ..utils.syncing.planner import dry_run_scope, is_dry_run
+from ..utils.syncing.secrets import compute_sync_digest, get_environment_secrets
+from ..utils.syncing.rate_limits import (
+    DEFAULT_RATE_LIMIT_PAUSE,
+    acquire_credential_slot,
+    credential_scope,
+    is_rate_limited_result,
+    pause_credential,
+    release_credential_slot,
+)
 from django_rq import job
 from rq.timeouts import JobTimeoutException
-from rq.job import Job
+from rq.job import Job, get_current_job
 from rq import Retry
 from django_rq import get_queue
 import django_rq
@@ -52,13 +64,33 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_TIMEOUT = 3600
 
+# Debounce markers. A marker's TTL outlives the window so a lost scheduled
+# job only delays the next trigger rather than suppressing it for good.
+SYNC_DEBOUNCE_KEY = "sync-debounce:{}"
+REFERENCE_SCAN_PENDING_KEY = "sync-reference-scan-pending:{}"
+REFERENCE_SCAN_ENVS_KEY = "sync-reference-scan-envs:{}"
+DEBOUNCE_MARKER_GRACE = 60
 
-def trigger_sync_tasks(env_sync):
-    EnvironmentSync = apps.get_model("api", "EnvironmentSync")
-    EnvironmentSyncEvent = apps.get_model("api", "EnvironmentSyncEvent")
+# Syncs held back for provider capacity are re-scheduled, at most this many
+# times in a row before the run is recorded as failed.
+MAX_SYNC_DEFERRALS = 10
+SYNC_DEFERRALS_KEY = "sync-deferrals:{}"
+SYNC_DEFERRED_JOB_KEY = "sync-deferred-job:{}"
+
+# Dry-run events (and their jobs) use ids with this prefix.
+DRY_RUN_EVENT_PREFIX = "dry-run-"
 
-    cancel_sync_tasks(env_sync)  # cancel any running or queued jobs for this sync
 
+class SyncDeferred(Exception):
+    """Put a sync back on the queue until its provider has capacity."""
+
+    def __init__(self, delay, reason):
+        super().__init__(reason)
+        self.delay = delay
+        self.reason = reason
+
+
+def _sync_job_for(service):
     SERVICE_DISPATCH = {
         ServiceConfig.CLOUDFLARE_PAGES["id"]: perform_cloudflare_pages_sync,
         ServiceConfig.CLOUDFLARE_WORKERS["id"]: perform_cloudflare_workers_sync,
@@ -73,12 +105,48 @@ def trigger_sync_tasks(env_sync):
         ServiceConfig.RENDER["id"]: perform_render_service_sync,
         ServiceConfig.AZURE_KEY_VAULT["id"]: perform_azure_kv_sync,
     }
+    return SERVICE_DISPATCH.get(service)
+
+
+def trigger_sync_tasks(env_sync, force=False, dry_run=False):
+    """
+    Queue a sync job. Runs whose secrets and target are unchanged since the
+    last successful push are skipped by the worker unless `force` is set
+    (e.g. a manual trigger, which should also repair drift on the provider).
+
+    With `dry_run`, the job only records the sync's create/update/delete
+    plan on a new EnvironmentSyncEvent. The provider and the sync's own
+    status are left untouched, and queued or running syncs aren't cancelled.
+    """
+    EnvironmentSync = apps.get_model("api", "EnvironmentSync")
+    EnvironmentSyncEvent = apps.get_model("api", "EnvironmentSyncEvent")
+
+    if dry_run:
+        if _sync_job_for(env_sync.service) is None:
+            return None
+        # Created before the job is queued, as the job looks it up by id.
+        sync_event = EnvironmentSyncEvent.objects.create(
+            id=f"{DRY_RUN_EVENT_PREFIX}{uuid4()}", env_sync=env_sync
+        )
+        try:
+            perform_sync_dry_run.delay(env_sync, job_id=sync_event.id)
+        except Exception as e:
+            logger.error(f"Failed to dispatch sync dry run for {env_sync.id}: {e}")
+            sync_event.status = EnvironmentSync.FAILED
+            sync_event.meta = {"message": "Failed to queue the dry run", "dry_run": True}
+            sync_event.save()
+        return sync_event
+
+    cancel_sync_tasks(env_sync)  # cancel any running or queued jobs for this sync
 
-    sync_func = SERVICE_DISPATCH.get(env_sync.service)
+    sync_func = _sync_job_for(env_sync.service)
     if sync_func is None:
         return
 
     env_sync.status = EnvironmentSync.QUEUED
+    if force:
+        env_sync.last_synced_digest = None
+        env_sync.value_digests = None
     env_sync.save()
 
     try:
@@ -91,10 +159,184 @@ def trigger_sync_tasks(env_sync):
         env_sync.save()
 
 
+@job("default", timeout=DEFAULT_TIMEOUT)
+def perform_sync_dry_run(environment_sync):
+    """Run the sync's job inline in planning mode; see handle_sync_event."""
+    sync_job = _sync_job_for(environment_sync.service)
+    with dry_run_scope():
+        sync_job(environment_sync)
+
+
+def _debounce_scheduler():
+    return django_rq.get_scheduler("scheduled-jobs")
+
+
+def schedule_sync_tasks(env_sync):
+    """
+    Debounced trigger_sync_tasks for writes that arrive in bursts.
+
+    The first call in a window marks the sync queued and schedules a single
+    run SYNC_DEBOUNCE_SECONDS later; calls within the window coalesce into
+    it. The run reads the environment when it executes, so it pushes the
+    latest state.
+    """
+    delay = settings.SYNC_DEBOUNCE_SECONDS
+    if delay <= 0:
+        return trigger_sync_tasks(env_sync)
+
+    EnvironmentSync = apps.get_model("api", "EnvironmentSync")
+
+    try:
+        connection = django_rq.get_connection("default")
+        if not connection.set(
+            SYNC_DEBOUNCE_KEY.format(env_sync.id),
+            1,
+            nx=True,
+            ex=delay + DEBOUNCE_MARKER_GRACE,
+        ):
+            return  # a run is already pending for this window
+
+        EnvironmentSync.objects.filter(id=env_sync.id).update(
+            status=EnvironmentSync.QUEUED
+        )
+        _debounce_scheduler().enqueue_in(
+            timedelta(seconds=delay), run_debounced_sync, str(env_sync.id)
+        )
+    except Exception as e:
+        logger.warning(f"Failed to debounce sync {env_sync.id}, triggering now: {e}")
+        trigger_sync_tasks(env_sync)
+
+
+def run_debounced_sync(sync_id):
+    EnvironmentSync = apps.get_model("api", "EnvironmentSync")
+
+    # Clear the marker before reading state: a write landing after this
+    # point schedules a fresh run instead of being absorbed by this one.
+    django_rq.get_connection("default").delete(SYNC_DEBOUNCE_KEY.format(sync_id))
+
+    env_sync = EnvironmentSync.objects.filter(
+        id=sync_id, deleted_at=None, is_active=True
+    ).first()
+    if env_sync is not None:
+        trigger_sync_tasks(env_sync)
+
+
+def schedule_referencing_sync_scan(changed_env_id):
+    """
+    Debounced detect_and_trigger_referencing_syncs: changed environments
+    are collected per organisation and scanned together once per window.
+    """
+    from api.utils.access.org_resolution import resolve_via_model
+
+    delay = settings.SYNC_DEBOUNCE_SECONDS
+    org_id = resolve_via_model("Environment", changed_env_id, {}) if delay > 0 else None
+    if not org_id:
+        detect_and_trigger_referencing_syncs.delay(changed_env_id)
+        return
+
+    ttl = delay + DEBOUNCE_MARKER_GRACE
+    try:
+        connection = django_rq.get_connection("default")
+        envs_key = REFERENCE_SCAN_ENVS_KEY.format(org_id)
+        pipeline = connection.pipeline()
+        pipeline.sadd(envs_key, changed_env_id)
+        pipeline.expire(envs_key, ttl)
+        pipeline.execute()
+
+        if connection.set(
+            REFERENCE_SCAN_PENDING_KEY.format(org_id), 1, nx=True, ex=ttl
+        ):
+            _debounce_scheduler().enqueue_in(
+                timedelta(seconds=delay), run_debounced_reference_scan, org_id
+            )
+    except Exception as e:
+        logger.warning(
+            f"Failed to debounce reference scan for {changed_env_id}, "
+            f"dispatching now: {e}"
+        )
+        detect_and_trigger_referencing_syncs.delay(changed_env_id)
+
+
+def run_debounced_reference_scan(org_id):
+    Environment = apps.get_model("api", "Environment")
+
+    connection = django_rq.get_connection("default")
+    connection.delete(REFERENCE_SCAN_PENDING_KEY.format(org_id))
+
+    envs_key = REFERENCE_SCAN_ENVS_KEY.format(org_id)
+    pipeline = connection.pipeline()
+    pipeline.smembers(envs_key)
+    pipeline.delete(envs_key)
+    env_ids, _ = pipeline.execute()
+
+    triggered = set()
+    for changed_env in Environment.objects.filter(
+        id__in=[
+            env_id.decode() if isinstance(env_id, bytes) else env_id
+            for env_id in env_ids
+        ]
+    ).select_related("app", "app__organisation"):
+        trigger_syncs_for_referencing_envs(changed_env, triggered=triggered)
+
+
+def _defer_sync_job(environment_sync, delay):
+    """
+    Re-schedule the current sync job `delay` seconds from now. Returns False
+    if there is no job to re-schedule or it has been deferred too often.
+    """
+    current_job = get_current_job()
+    if current_job is None:
+        return False
+
+    try:
+        connection = django_rq.get_connection("default")
+        deferrals_key = SYNC_DEFERRALS_KEY.format(environment_sync.id)
+        attempts = connection.incr(deferrals_key)
+        connection.expire(deferrals_key, DEFAULT_TIMEOUT)
+        if attempts > MAX_SYNC_DEFERRALS:
+            connection.delete(deferrals_key)
+            return False
+
+        deferred_job = django_rq.get_scheduler("default").enqueue_in(
+            timedelta(seconds=delay),
+            current_job.func,
+            *current_job.args,
+            timeout=DEFAULT_TIMEOUT,
+        )
+        connection.set(
+            SYNC_DEFERRED_JOB_KEY.format(environment_sync.id),
+            deferred_job.id,
+            ex=int(delay) + DEFAULT_TIMEOUT,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to defer sync {environment_sync.id}: {e}")
+        return False
+
+    return True
+
+
+def _clear_sync_deferrals(environment_sync):
+    try:
+        django_rq.get_connection("default").delete(
+            SYNC_DEFERRALS_KEY.format(environment_sync.id),
+            SYNC_DEFERRED_JOB_KEY.format(environment_sync.id),
+        )
+    except Exception:
+        pass
+
+
 # try and cancel running or queued jobs for this sync
 def cancel_sync_tasks(env_sync):
     queue = django_rq.get_queue("default")
 
+    # A run deferred for provider capacity is superseded by the new trigger.
+    try:
+        deferred_job_id = queue.connection.get(SYNC_DEFERRED_JOB_KEY.format(env_sync.id))
+        if deferred_job_id:
+            django_rq.get_scheduler("default").cancel(deferred_job_id.decode())
+    except Exception:
+        pass
+
     EnvironmentSync = apps.get_model("api", "EnvironmentSync")
     EnvironmentSyncEvent = apps.get_model("api", "EnvironmentSyncEvent")
 
@@ -116,16 +358,69 @@ def cancel_sync_tasks(env_sync):
             pass
 
 
-def handle_sync_event(environment_sync, sync_function, *args, **kwargs):
-
+def _record_sync_plan(environment_sync, sync_function, *args, **kwargs):
+    """
+    Dry run of handle_sync_event: store the sync function's plan on the dry
+    run's event. Nothing is written to the provider or the EnvironmentSync.
+    """
     EnvironmentSync = apps.get_model("api", "EnvironmentSync")
     EnvironmentSyncEvent = apps.get_model("api", "EnvironmentSyncEvent")
 
+    current_job = get_current_job()
     sync_event = (
-        EnvironmentSyncEvent.objects.filter(env_sync=environment_sync)
-        .order_by("-created_at")
-        .first()
+        EnvironmentSyncEvent.objects.filter(id=current_job.id).first()
+        if current_job is not None
+        else None
+    )
+    if sync_event is None:
+        return
+
+    try:
+        if not getattr(sync_function, "supports_dry_run", False):
+            success, sync_data = False, {
+                "message": "Dry runs are not supported for this integration",
+                "dry_run": True,
+            }
+        else:
+            secrets = get_environment_secrets(
+                environment_sync.environment, environment_sync.path
+            )
+            success, sync_data = sync_function(secrets, *args, **kwargs)
+    except Exception as ex:
+        logger.info(f"Sync dry run failed with exception: {ex}")
+        success, sync_data = False, {"message": str(ex), "dry_run": True}
+
+    sync_event.meta = sync_data
+    sync_event.status = (
+        EnvironmentSync.COMPLETED if success else EnvironmentSync.FAILED
     )
+    sync_event.completed_at = timezone.now()
+    sync_event.save()
+
+
+def handle_sync_event(environment_sync, sync_function, *args, **kwargs):
+
+    if is_dry_run():
+        return _record_sync_plan(environment_sync, sync_function, *args, **kwargs)
+
+    EnvironmentSync = apps.get_model("api", "EnvironmentSync")
+    EnvironmentSyncEvent = apps.get_model("api", "EnvironmentSyncEvent")
+
+    # The job's own event, falling back to the latest non-dry-run one (e.g.
+    # for a deferred run, which is re-queued under a new job id).
+    current_job = get_current_job()
+    sync_event = None
+    if current_job is not None:
+        sync_event = EnvironmentSyncEvent.objects.filter(
+            id=current_job.id, env_sync=environment_sync
+        ).first()
+    if sync_event is None:
+        sync_event = (
+            EnvironmentSyncEvent.objects.filter(env_sync=environment_sync)
+            .exclude(id__startswith=DRY_RUN_EVENT_PREFIX)
+            .order_by("-created_at")
+            .first()
+        )
 
     # Mark as in-progress now that the worker has picked up the job
     environment_sync.status = EnvironmentSync.IN_PROGRESS
@@ -134,6 +429,8 @@ def handle_sync_event(environment_sync, sync_function, *args, **kwargs):
         sync_event.status = EnvironmentSync.IN_PROGRESS
         sync_event.save()
 
+    admitted_job_id = None
+
     try:
         secrets = get_environment_secrets(
             environment_sync.environment, environment_sync.path
@@ -146,7 +443,34 @@ def handle_sync_event(environment_sync, sync_function, *args, **kwargs):
             )
             raise Exception("No authentication credentials for this sync")
 
-        success, sync_data = sync_function(secrets, *args, **kwargs)
+        digest = compute_sync_digest(environment_sync, secrets)
+        if digest == environment_sync.last_synced_digest:
+            success, sync_data = True, {
+                "message": "No changes since the last successful sync",
+                "skipped": True,
+            }
+        else:
+            # Admission against the credential's shared provider budget.
+            credential = environment_sync.authentication
+            if current_job is not None:
+                wait = acquire_credential_slot(
+                    credential, current_job.id, DEFAULT_TIMEOUT
+                )
+                if wait:
+                    raise SyncDeferred(wait, "Waiting for provider capacity")
+                admitted_job_id = current_job.id
+
+            # Until this push succeeds the provider's state is unknown.
+            environment_sync.last_synced_digest = None
+            with credential_scope(credential.id):
+                success, sync_data = sync_function(secrets, *args, **kwargs)
+            if success:
+                environment_sync.last_synced_digest = digest
+            elif is_rate_limited_result(sync_data):
+                pause_credential(credential.id, DEFAULT_RATE_LIMIT_PAUSE)
+                raise SyncDeferred(
+                    DEFAULT_RATE_LIMIT_PAUSE, "Provider rate limit reached"
+                )
 
         if success:
             sync_event.status = EnvironmentSync.COMPLETED
@@ -157,6 +481,24 @@ def handle_sync_event(environment_sync, sync_function, *args, **kwargs):
 
         sync_event.meta = sync_data
 
+    except SyncDeferred as deferral:
+        if _defer_sync_job(environment_sync, deferral.delay):
+            logger.info(
+                f"Sync {environment_sync.id} deferred {deferral.delay:.0f}s: {deferral.reason}"
+            )
+            sync_event.meta = {
+                "message": f"{deferral.reason}, retrying in {deferral.delay:.0f}s",
+                "deferred": True,
+            }
+            sync_event.status = EnvironmentSync.QUEUED
+            environment_sync.status = EnvironmentSync.QUEUED
+        else:
+            sync_event.meta = {
+                "message": f"{deferral.reason}, giving up after {MAX_SYNC_DEFERRALS} retries"
+            }
+            sync_event.status = EnvironmentSync.FAILED
+            environment_sync.status = EnvironmentSync.FAILED
+
     except JobTimeoutException:
         # Handle timeout exception
 
@@ -186,12 +528,24 @@ def handle_sync_event(environment_sync, sync_function, *args, **kwargs):
         environment_sync.status = EnvironmentSync.FAILED
 
     finally:
+        if admitted_job_id:
+            release_credential_slot(environment_sync.authentication_id, admitted_job_id)
         environment_sync.last_sync = timezone.now()
         environment_sync.save()
-        sync_event.completed_at = timezone.now()
+        if sync_event.status != EnvironmentSync.QUEUED:
+            _clear_sync_deferrals(environment_sync)
+            sync_event.completed_at = timezone.now()
         sync_event.save()
 
 
+def _value_digests(environment_sync):
+    """Per-key digests of the sync's last writes; updated in place by the
+    sync function and saved with the sync's status."""
+    if environment_sync.value_digests is None:
+        environment_sync.value_digests = {}
+    return environment_sync.value_digests
+
+
 @job("default", timeout=DEFAULT_TIMEOUT)
 def perform_cloudflare_pages_sync(environment_sync):
 
@@ -210,6 +564,7 @@ def perform_cloudflare_pages_sync(environment_sync):
         access_token,
         project_info["project_name"],
         project_info["environment"],
+        value_digests=_value_digests(environment_sync),
     )
 
 
@@ -234,6 +589,7 @@ def perform_github_actions_sync(environment_sync):
             org,
             api_host,
             visibility,
+            value_digests=_value_digests(environment_sync),
         )
     else:
         repo_name = environment_sync.options.get("repo_name")
@@ -248,6 +604,7 @@ def perform_github_actions_sync(environment_sync):
             repo_owner,
             api_host,
             environment_name,
+            value_digests=_value_digests(environment_sync),
         )
 
 
@@ -272,6 +629,7 @@ def perform_github_dependabot_sync(environment_sync):
             org,
             api_host,
             visibility,
+            value_digests=_value_digests(environment_sync),
         )
     else:
         repo_name = environment_sync.options.get("repo_name")
@@ -284,6 +642,7 @@ def perform_github_dependabot_sync(environment_sync):
             repo_name,
             repo_owner,
             api_host,
+            value_digests=_value_digests(environment_sync),
         )
 
 
@@ -331,6 +690,7 @@ def perform_vault_sync(environment_sync):
         auth_id,
         project_info.get("engine"),
         project_info.get("path"),
+        value_digests=_value_digests(environment_sync),
     )
 
 
@@ -419,6 +779,7 @@ def perform_vercel_sync(environment_sync):
         vercel_team["id"] if vercel_team is not None else None,
         vercel_environment,
         vercel_secret_type,
+        value_digests=_value_digests(environment_sync),
     )
 
 
@@ -438,6 +799,7 @@ def perform_cloudflare_workers_sync(environment_sync):
         account_id,
         access_token,
         worker_info["worker_name"],
+        value_digests=_value_digests(environment_sync),
     )
 
 
@@ -500,10 +862,11 @@ def perform_azure_kv_sync(environment_sync):
             credentials.get("client_id"),
             credentials.get("client_secret"),
             vault_uri,
+            value_digests=_value_digests(environment_sync),
         )
 
 
-def trigger_syncs_for_referencing_envs(changed_env):
+def trigger_syncs_for_referencing_envs(changed_env, triggered=None):
     """
     Finds environments with active syncs whose secrets reference the changed
     environment — directly or transitively through a chain of references — and
@@ -513,16 +876,25 @@ def trigger_syncs_for_referencing_envs(changed_env):
     resolved output can depend on the changed environment through intermediate
     environments. For example env B has ${A.SHARED}, and A's SHARED is
     ${C.BASE}: a change in C must re-trigger B's syncs, not just A's. To handle
-    this we build the org's reference graph and follow it from each candidate
+    this we load the org's reference graph and follow it from each candidate
     environment until we reach the changed environment (cycle-safe).
 
-    Runs off the request path, dispatched from Environment.save() via the
-    detect_and_trigger_referencing_syncs RQ job — so referencing envs' syncs are
-    queued shortly after the write, not within it. (The changed environment's own
-    syncs are still triggered synchronously in Environment.save for immediate
-    status.) The actual provider sync work is dispatched async by trigger_sync_tasks.
+    The graph comes from the SecretReference index that the secret write paths
+    maintain, so detection is a single indexed query plus an in-memory walk —
+    no secrets are decrypted here. Environments the index doesn't cover yet
+    (see backfill_secret_references) are scanned by decrypting their secrets,
+    as before the index existed.
+
+    Runs off the request path, dispatched from Environment.save() via
+    schedule_referencing_sync_scan — so referencing envs' syncs are queued
+    shortly after the write, not within it. The actual provider sync work is
+    dispatched async by trigger_sync_tasks. `triggered` (sync ids) is shared
+    across the environments of one batched scan so each sync runs once.
     """
-    from api.utils.secrets import get_referenced_environment_ids
+    from api.utils.secrets import (
+        get_environment_reference_graph,
+        get_referenced_environment_ids,
+    )
 
     EnvironmentSync = apps.get_model("api", "EnvironmentSync")
     Environment = apps.get_model("api", "Environment")
@@ -559,8 +931,13 @@ def trigger_syncs_for_referencing_envs(changed_env):
         apps_by_name[key] = app.id
 
     envs_by_app_name = {}
+    env_app_ids = {}
+    unindexed = set()
     for env in Environment.objects.filter(app__organisation=org, deleted_at=None):
         envs_by_app_name[(str(env.app_id), env.name.lower())] = str(env.id)
+        env_app_ids[str(env.id)] = env.app_id
+        if not env.secret_references_indexed:
+            unindexed.add(str(env.id))
 
     name_ctx = {
         "apps_by_name": apps_by_name,
@@ -568,14 +945,18 @@ def trigger_syncs_for_referencing_envs(changed_env):
         "envs_by_app_name": envs_by_app_name,
     }
 
-    # Memoize each environment's direct references so every environment is
-    # decrypted at most once across all candidate traversals.
-    ref_cache = {}
+    reference_graph = get_environment_reference_graph(org, name_ctx)
+    # Decrypted references of unindexed environments, each scanned at most once
+    scanned_refs = {}
 
     def direct_refs(env_id):
-        if env_id not in ref_cache:
-            ref_cache[env_id] = get_referenced_environment_ids(env_id, name_ctx)
-        return ref_cache[env_id]
+        if env_id in unindexed:
+            if env_id not in scanned_refs:
+                scanned_refs[env_id] = get_referenced_environment_ids(
+                    env_id, env_app_ids[env_id], name_ctx
+                )
+            return scanned_refs[env_id]
+        return reference_graph.get(env_id, set())
 
     def references_changed_env(start_env_id):
         # Depth-first walk of the reference graph from start_env_id, following
@@ -601,6 +982,10 @@ def trigger_syncs_for_referencing_envs(changed_env):
                     f"{changed_env.id} (directly or transitively), triggering syncs"
                 )
                 for sync in syncs:
+                    if triggered is not None:
+                        if sync.id in triggered:
+                            continue
+                        triggered.add(sync.id)
                     trigger_sync_tasks(sync)
         except Exception as e:
             logger.warning(
@@ -615,11 +1000,10 @@ def detect_and_trigger_referencing_syncs(changed_env_id):
     """
     Async entrypoint for trigger_syncs_for_referencing_envs.
 
-    Dispatched from Environment.save() so the reference-graph detection — which
-    decrypts and scans every synced/intermediate environment in the org — runs
-    off the request path instead of blocking the secret write. The changed
-    environment's own syncs are still triggered synchronously by Environment.save
-    for immediate status feedback; only the cross-reference fan-out is deferred.
+    Used by Environment.save() (via schedule_referencing_sync_scan) when
+    debouncing is off or unavailable, so the reference-graph detection — an
+    org-wide graph load plus sync fan-out — runs off the request path instead
+    of blocking the secret write.
     """
     Environment = apps.get_model("api", "Environment")
     try:
@@ -629,3 +1013,56 @@ def detect_and_trigger_referencing_syncs(changed_env_id):
     except Environment.DoesNotExist:
         return
     trigger_syncs_for_referencing_envs(changed_env)
+
+
+SECRET_REFERENCE_BACKFILL_JOB_ID = "secret-references-backfill"
+# Environments indexed per backfill job; the job re-enqueues itself until
+# none are left, so no single job runs into the timeout.
+SECRET_REFERENCE_BACKFILL_BATCH = 100
+
+
+def schedule_secret_reference_backfill():
+    """Queue backfill_secret_references if any environment is unindexed.
+    Called after migrations (see APIConfig)."""
+    Environment = apps.get_model("api", "Environment")
+
+    if not Environment.objects.filter(
+        secret_references_indexed=False, deleted_at=None
+    ).exists():
+        return
+    backfill_secret_references.delay(job_id=SECRET_REFERENCE_BACKFILL_JOB_ID)
+
+
+@job("default", timeout=DEFAULT_TIMEOUT)
+def backfill_secret_references(batch_size=SECRET_REFERENCE_BACKFILL_BATCH):
+    """
+    Indexes the references of environments that predate the SecretReference
+    index, a batch at a time. Until an environment is indexed, referencing-
+    sync detection decrypts its secrets instead and its secrets API responses
+    carry no ETag.
+    """
+    from api.utils.secrets import index_environment_references
+
+    Environment = apps.get_model("api", "Environment")
+
+    env_ids = list(
+        Environment.objects.filter(secret_references_indexed=False, deleted_at=None)
+        .order_by("id")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    failed = 0
+    for env_id in env_ids:
+        try:
+            index_environment_references(env_id)
+        except Exception:
+            failed += 1
+            logger.exception(f"Failed to index secret references of {env_id}")
+
+    logger.info(
+        f"Indexed secret references of {len(env_ids) - failed} environments"
+    )
+
+    # Stop when a whole batch fails rather than retrying it forever; the
+    # next migration (or rebuild_secret_references) picks it up again.
+    if len(env_ids) == batch_size and failed < len(env_ids):
+        backfill_secret_references.delay(batch_size)
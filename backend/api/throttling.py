@@ -1,8 +1,46 @@
+import logging
+
 from rest_framework.throttling import SimpleRateThrottle
 from django.conf import settings
+from django.core.cache.backends.redis import RedisCache
+
+logger = logging.getLogger(__name__)
 
 CLOUD_HOSTED = settings.APP_HOST == "cloud"
 
+# Sliding-window counter: two fixed-window counters, the previous one
+# weighted by how much of it still overlaps the sliding window. Check and
+# increment happen atomically in a single round trip, with O(1) state per
+# ident regardless of the rate.
+#
+# KEYS: current window counter, previous window counter
+# ARGV: limit, window duration (s), now (s), current window start (s)
+# Returns {allowed (0|1), seconds until a request would be allowed}
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local duration = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local window_start = tonumber(ARGV[4])
+
+local current = tonumber(redis.call("GET", KEYS[1]) or "0")
+local previous = tonumber(redis.call("GET", KEYS[2]) or "0")
+local elapsed = (now - window_start) / duration
+
+if previous * (1 - elapsed) + current < limit then
+    redis.call("INCR", KEYS[1])
+    redis.call("EXPIRE", KEYS[1], duration * 2)
+    return {1, "0"}
+end
+
+local wait
+if current >= limit then
+    wait = window_start + duration - now
+else
+    wait = (1 - (limit - current) / previous - elapsed) * duration
+end
+return {0, tostring(wait)}
+"""
+
 
 class PlanBasedRateThrottle(SimpleRateThrottle):
     """
@@ -66,7 +104,53 @@ class PlanBasedRateThrottle(SimpleRateThrottle):
         self.rate = new_rate
         self.num_requests, self.duration = self.parse_rate(self.rate)
 
-        return super().allow_request(request, view)
+        if self.rate is None or not isinstance(self.cache, RedisCache):
+            return super().allow_request(request, view)
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        return self.allow_request_atomic()
+
+    def allow_request_atomic(self):
+        """
+        Check and count this request against the sliding window in one
+        atomic Redis call. Fails open if Redis is unavailable.
+        """
+        self.now = self.timer()
+        window_start = self.now - (self.now % self.duration)
+        window = int(window_start // self.duration)
+        # Hash tag keeps both windows on the same slot under Redis Cluster.
+        base_key = self.cache.make_and_validate_key(f"{{{self.key}}}")
+
+        try:
+            client = self.cache._cache.get_client(base_key, write=True)
+            allowed, wait = self._sliding_window_script(client)(
+                keys=[f"{base_key}:{window}", f"{base_key}:{window - 1}"],
+                args=[self.num_requests, self.duration, self.now, window_start],
+                client=client,
+            )
+        except Exception as ex:
+            logger.warning(f"Rate limiter unavailable, allowing request: {ex}")
+            return True
+
+        self._wait = max(float(wait), 0.0)
+        return bool(allowed)
+
+    @classmethod
+    def _sliding_window_script(cls, client):
+        # Registered once per process; redis-py runs it via EVALSHA and
+        # reloads it transparently after a script cache flush.
+        script = getattr(cls, "_script", None)
+        if script is None:
+            script = cls._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+        return script
+
+    def wait(self):
+        if hasattr(self, "_wait"):
+            return self._wait
+        return super().wait()
 
     @staticmethod
     def get_rate_for_plan(plan):
@@ -0,0 +1,349 @@
+"""Precomputed effective-access maps for permission checks.
+
+A principal's access map holds everything the permission helpers in
+api.utils.access.permissions need: the org role of each membership, the
+apps reachable directly or through teams (with each team's role override)
+and the environments the principal holds a live EnvironmentKey for. It is
+built in a handful of queries instead of several per check.
+
+Three cache layers: per-request dict (L1, only inside `access_map_scope`),
+Django cache / Redis (L2), and the DB. L2 entries record the access
+versions they were built against — one per organisation plus one per user
+— and are discarded as soon as any of those versions is bumped. Role, team,
+membership and key changes bump the organisation's version once the
+writing transaction commits; see api.signals.
+
+Outside a scope (RQ jobs, management commands, direct calls in tests) the
+permission helpers keep querying the DB directly.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+
+from api.utils.access.roles import default_roles
+
+ACCESS_MAP_CACHE_TTL = 300
+
+# L1: {(principal kind, principal id): access map} for the current request.
+_request_maps = ContextVar("access_maps", default=None)
+
+
+@contextmanager
+def access_map_scope():
+    """Memoize access maps for the duration of the block (one request)."""
+    token = _request_maps.set({})
+    try:
+        yield
+    finally:
+        _request_maps.reset(token)
+
+
+def role_permissions(role):
+    """The permission document of a role, resolving default roles by name."""
+    if role is None:
+        return None
+    if role.is_default:
+        return default_roles.get(role.name.capitalize(), {})
+    return role.permissions
+
+
+def permissions_allow(permissions, action, resource, is_app_resource=False):
+    if not permissions:
+        return False
+    permission_key = "app_permissions" if is_app_resource else "permissions"
+    return action in permissions.get(permission_key, {}).get(resource, [])
+
+
+def _org_version_key(org_id):
+    return f"access-version:org:{org_id}"
+
+
+def _user_version_key(user_id):
+    return f"access-version:user:{user_id}"
+
+
+def _map_key(kind, principal_id):
+    return f"access-map:{kind}:{principal_id}"
+
+
+def _bump(version_key):
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, 1, timeout=None)
+
+
+def invalidate_org_access(org_id):
+    """Discard every cached access map that covers this organisation."""
+    if not org_id:
+        return
+    try:
+        _bump(_org_version_key(org_id))
+    except Exception:
+        pass
+
+
+def invalidate_user_access(user_id):
+    """Discard the cached access map of one user (e.g. a new membership)."""
+    if not user_id:
+        return
+    try:
+        _bump(_user_version_key(user_id))
+    except Exception:
+        pass
+
+
+def invalidate_org_access_on_commit(org_id):
+    """
+    invalidate_org_access once the current transaction commits, or at once
+    outside one. Bumped before the commit, a concurrent request could
+    rebuild the map from pre-commit state and cache it under the new
+    version, serving revoked access until the map expires.
+    """
+    if org_id:
+        transaction.on_commit(lambda: invalidate_org_access(org_id))
+
+
+def invalidate_user_access_on_commit(user_id):
+    """invalidate_user_access once the current transaction commits."""
+    if user_id:
+        transaction.on_commit(lambda: invalidate_user_access(user_id))
+
+
+def _current_versions(version_keys):
+    try:
+        return cache.get_many(version_keys)
+    except Exception:
+        return None
+
+
+def _empty_map():
+    # apps: {app_id: {"direct": bool, "teams": [(team role permissions, owner id)]}}
+    return {"orgs": {}, "apps": {}, "environments": set()}
+
+
+def _add_team_apps(access, team_rows, TeamAppEnvironment, org_of_team):
+    """Attach team-reachable apps. `team_rows` is {team_id: (permissions, owner_id)}."""
+    for team_id, app_id, app_org_id in (
+        TeamAppEnvironment.objects.filter(team_id__in=team_rows)
+        .values_list("team_id", "app_id", "app__organisation_id")
+        .distinct()
+    ):
+        if str(app_org_id) != org_of_team[team_id]:
+            continue
+        entry = access["apps"].setdefault(str(app_id), {"direct": False, "teams": []})
+        entry["teams"].append(team_rows[team_id])
+
+
+def _build_user_map(user_id):
+    OrganisationMember = apps.get_model("api", "OrganisationMember")
+    TeamMembership = apps.get_model("api", "TeamMembership")
+    TeamAppEnvironment = apps.get_model("api", "TeamAppEnvironment")
+    EnvironmentKey = apps.get_model("api", "EnvironmentKey")
+
+    # The user version is read before the memberships, so a membership
+    # change landing mid-build leaves the entry stale rather than wrongly
+    # current. Org versions are read as soon as the orgs are known.
+    user_versions = _current_versions([_user_version_key(user_id)])
+    members = list(
+        OrganisationMember.objects.filter(
+            user_id=user_id, deleted_at=None
+        ).select_related("role")
+    )
+    org_keys = [_org_version_key(m.organisation_id) for m in members]
+    org_versions = _current_versions(org_keys)
+
+    version_keys = [_user_version_key(user_id)] + org_keys
+    versions = (
+        None
+        if user_versions is None or org_versions is None
+        else {**user_versions, **org_versions}
+    )
+
+    access = _empty_map()
+    org_of_member = {}
+    for member in members:
+        org_of_member[member.id] = str(member.organisation_id)
+        access["orgs"][str(member.organisation_id)] = {
+            "member_id": str(member.id),
+            "role": role_permissions(member.role),
+        }
+
+    for member_id, app_id, app_org_id in OrganisationMember.apps.through.objects.filter(
+        organisationmember_id__in=org_of_member
+    ).values_list("organisationmember_id", "app_id", "app__organisation_id"):
+        if str(app_org_id) == org_of_member[member_id]:
+            access["apps"].setdefault(str(app_id), {"direct": False, "teams": []})[
+                "direct"
+            ] = True
+
+    team_rows = {}
+    org_of_team = {}
+    for membership in TeamMembership.objects.filter(
+        org_member_id__in=org_of_member, team__deleted_at__isnull=True
+    ).select_related("team__member_role"):
+        team = membership.team
+        team_rows[team.id] = (
+            role_permissions(team.member_role) if team.member_role else None,
+            str(team.owner_id) if team.owner_id else None,
+        )
+        org_of_team[team.id] = org_of_member[membership.org_member_id]
+    if team_rows:
+        _add_team_apps(access, team_rows, TeamAppEnvironment, org_of_team)
+
+    for member_id, env_id, env_org_id in EnvironmentKey.objects.filter(
+        user_id__in=org_of_member, deleted_at__isnull=True
+    ).values_list("user_id", "environment_id", "environment__app__organisation_id"):
+        if str(env_org_id) == org_of_member[member_id]:
+            access["environments"].add(str(env_id))
+
+    return access, version_keys, versions
+
+
+def _build_service_account_map(account_id):
+    ServiceAccount = apps.get_model("api", "ServiceAccount")
+    TeamMembership = apps.get_model("api", "TeamMembership")
+    TeamAppEnvironment = apps.get_model("api", "TeamAppEnvironment")
+    EnvironmentKey = apps.get_model("api", "EnvironmentKey")
+
+    access = _empty_map()
+    service_account = (
+        ServiceAccount.objects.filter(id=account_id, deleted_at=None)
+        .select_related("role")
+        .first()
+    )
+    if service_account is None:
+        # Not cached: there are no versions that would ever invalidate it.
+        return access, [], None
+
+    org_id = str(service_account.organisation_id)
+    version_keys = [_org_version_key(org_id)]
+    versions = _current_versions(version_keys)
+
+    access["orgs"][org_id] = {
+        "member_id": str(service_account.id),
+        "role": role_permissions(service_account.role),
+    }
+
+    for app_id in ServiceAccount.apps.through.objects.filter(
+        serviceaccount_id=service_account.id, app__organisation_id=org_id
+    ).values_list("app_id", flat=True):
+        access["apps"][str(app_id)] = {"direct": True, "teams": []}
+
+    team_rows = {}
+    for membership in TeamMembership.objects.filter(
+        service_account_id=service_account.id, team__deleted_at__isnull=True
+    ).select_related("team__service_account_role"):
+        team = membership.team
+        team_rows[team.id] = (
+            role_permissions(team.service_account_role)
+            if team.service_account_role
+            else None,
+            # Team ownership only applies to members.
+            None,
+        )
+    if team_rows:
+        _add_team_apps(
+            access, team_rows, TeamAppEnvironment, {t: org_id for t in team_rows}
+        )
+
+    access["environments"] = {
+        str(env_id)
+        for env_id in EnvironmentKey.objects.filter(
+            service_account_id=service_account.id,
+            deleted_at__isnull=True,
+            environment__app__organisation_id=org_id,
+        ).values_list("environment_id", flat=True)
+    }
+
+    return access, version_keys, versions
+
+
+_BUILDERS = {"user": _build_user_map, "sa": _build_service_account_map}
+
+
+def get_access_map(kind, principal_id):
+    """
+    The access map of a user ("user", CustomUser pk) or service account
+    ("sa"), or None when no `access_map_scope` is active.
+    """
+    request_maps = _request_maps.get()
+    if request_maps is None:
+        return None
+
+    l1_key = (kind, str(principal_id))
+    if l1_key in request_maps:
+        return request_maps[l1_key]
+
+    redis_key = _map_key(kind, principal_id)
+    try:
+        cached = cache.get(redis_key)
+    except Exception:
+        cached = None
+    if cached is not None:
+        current = _current_versions(list(cached["versions"]))
+        if current is not None and all(
+            current.get(key) == value for key, value in cached["versions"].items()
+        ):
+            request_maps[l1_key] = cached["map"]
+            return cached["map"]
+
+    access, version_keys, versions = _BUILDERS[kind](principal_id)
+
+    if versions is not None:
+        try:
+            cache.set(
+                redis_key,
+                {
+                    "versions": {key: versions.get(key) for key in version_keys},
+                    "map": access,
+                },
+                timeout=ACCESS_MAP_CACHE_TTL,
+            )
+        except Exception:
+            pass
+    request_maps[l1_key] = access
+    return access
+
+
+def access_map_allows(access, org_id, action, resource, is_app_resource=False, app_id=None):
+    """`user_has_permission` semantics evaluated against an access map."""
+    org = access["orgs"].get(str(org_id))
+    if org is None:
+        return False
+
+    if app_id is None:
+        return permissions_allow(org["role"], action, resource, is_app_resource)
+
+    entry = access["apps"].get(str(app_id))
+    if entry is None:
+        return False
+
+    if entry["direct"] and permissions_allow(
+        org["role"], action, resource, is_app_resource
+    ):
+        return True
+
+    for team_role, owner_id in entry["teams"]:
+        # Team owners keep their org role on team-accessed apps.
+        effective = (
+            org["role"]
+            if team_role is None or owner_id == org["member_id"]
+            else team_role
+        )
+        if permissions_allow(effective, action, resource, is_app_resource):
+            return True
+
+    return False
+
+
+def access_map_can_access_app(access, app_id):
+    return str(app_id) in access["apps"]
+
+
+def access_map_can_access_environment(access, env_id):
+    return str(env_id) in access["environments"]
@@ -1,9 +1,8 @@
 # permissions.py
 
-from api.models import NetworkAccessPolicy, Organisation
+from api.models import Organisation
 from api.utils.access.ip import get_client_ip
 from rest_framework.permissions import BasePermission
-from itertools import chain
 
 
 class IsIPAllowed(BasePermission):
@@ -26,35 +25,21 @@ class IsIPAllowed(BasePermission):
         service_token = request.auth.get("service_token")
 
         org = None
-        account_policies = NetworkAccessPolicy.objects.none()
+        kind = None
+        account_id = None
 
         if org_member:
-            account_policies = org_member.network_policies.all()
             org = org_member.organisation
+            kind, account_id = "member", org_member.id
         elif service_account:
-            account_policies = service_account.network_policies.all()
             org = service_account.organisation
+            kind, account_id = "service_account", service_account.id
         elif service_token:
             org = service_token.app.organisation
 
         if org is None or org.plan == Organisation.FREE_PLAN:
             return True
         else:
-            from ee.access.utils.network import is_ip_allowed
+            from ee.access.utils.network import is_ip_allowed_for_account
 
-            global_policies = (
-                (
-                    NetworkAccessPolicy.objects.filter(organisation=org, is_global=True)
-                    if org
-                    else NetworkAccessPolicy.objects.none()
-                )
-                if org.plan == Organisation.ENTERPRISE_PLAN
-                else []
-            )
-
-            all_policies = list(chain(account_policies, global_policies))
-
-            if not all_policies:
-                return True  # Allow if no policies defined
-
-            return is_ip_allowed(ip, all_policies)
+            return is_ip_allowed_for_account(ip, org, kind, account_id)
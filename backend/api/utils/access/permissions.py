@@ -1,4 +1,11 @@
-from api.utils.access.roles import default_roles
+from api.utils.access.access_map import (
+    access_map_allows,
+    access_map_can_access_app,
+    access_map_can_access_environment,
+    get_access_map,
+    permissions_allow,
+    role_permissions,
+)
 from django.apps import apps
 
 
@@ -21,6 +28,10 @@ def user_is_org_member(user_id, org_id):
 
 
 def user_can_access_app(user_id, app_id):
+    access = get_access_map("user", user_id)
+    if access is not None:
+        return access_map_can_access_app(access, app_id)
+
     OrganisationMember = apps.get_model("api", "OrganisationMember")
     App = apps.get_model("api", "App")
     TeamMembership = apps.get_model("api", "TeamMembership")
@@ -48,6 +59,10 @@ def user_can_access_app(user_id, app_id):
 def service_account_can_access_app(account_id, app_id):
     """Team-aware: an SA can access an app either as a direct member or via
     a team that has any environment of the app in its scope."""
+    access = get_access_map("sa", account_id)
+    if access is not None:
+        return access_map_can_access_app(access, app_id)
+
     ServiceAccount = apps.get_model("api", "ServiceAccount")
     App = apps.get_model("api", "App")
     TeamMembership = apps.get_model("api", "TeamMembership")
@@ -71,6 +86,10 @@ def service_account_can_access_app(account_id, app_id):
 
 
 def user_can_access_environment(user_id, env_id):
+    access = get_access_map("user", user_id)
+    if access is not None:
+        return access_map_can_access_environment(access, env_id)
+
     OrganisationMember = apps.get_model("api", "OrganisationMember")
     Environment = apps.get_model("api", "Environment")
     EnvironmentKey = apps.get_model("api", "EnvironmentKey")
@@ -88,6 +107,10 @@ def user_can_access_environment(user_id, env_id):
 
 
 def service_account_can_access_environment(account_id, env_id):
+    access = get_access_map("sa", account_id)
+    if access is not None:
+        return access_map_can_access_environment(access, env_id)
+
     Environment = apps.get_model("api", "Environment")
     EnvironmentKey = apps.get_model("api", "EnvironmentKey")
     ServiceAccount = apps.get_model("api", "ServiceAccount")
@@ -138,21 +161,9 @@ def role_has_permission(role, action, resource, is_app_resource=False):
     if not role:
         return False  # No role assigned, hence no permissions
 
-    # Check if the role is a default role
-    if role.is_default:
-        # Get permissions from the default_roles dictionary
-        role_name = role.name.capitalize()
-        permissions = default_roles.get(role_name, {})
-    else:
-        # Use the permissions stored in the role object
-        permissions = role.permissions
-
-    # Determine the correct key to check
-    permission_key = "app_permissions" if is_app_resource else "permissions"
-
-    # Check if the resource exists and if the action is permitted
-    resource_permissions = permissions.get(permission_key, {}).get(resource, [])
-    return action in resource_permissions
+    return permissions_allow(
+        role_permissions(role), action, resource, is_app_resource
+    )
 
 
 def _check_app_permission(
@@ -215,6 +226,20 @@ def user_has_permission(
     OrganisationMember = apps.get_model("api", "OrganisationMember")
 
     """Check if the user has the specified permission for a resource in an organization."""
+    if is_service_account:
+        access = get_access_map("sa", account.id)
+    else:
+        access = get_access_map("user", getattr(account, "userId", account.pk))
+    if access is not None:
+        return access_map_allows(
+            access,
+            organisation.id,
+            action,
+            resource,
+            is_app_resource,
+            app_id=app.id if app is not None else None,
+        )
+
     try:
         # Get the user's membership in the organization
         if is_service_account:
@@ -247,18 +272,7 @@ def role_has_global_access(role):
 
     """Check if a given role has global access."""
     try:
-        # Check if the role is a default role
-        if role.is_default:
-            # Get permissions from the default_roles dictionary
-            role_name = role.name.capitalize()
-            permissions = default_roles.get(role_name, {})
-        else:
-            # Use the permissions stored in the role object
-            permissions = role.permissions
-
-        permission_key = "global_access"
-
-        return permissions.get(permission_key, False)
+        return role_permissions(role).get("global_access", False)
 
     except Role.DoesNotExist:
         return False  # Role is not valid
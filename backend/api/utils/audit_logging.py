@@ -1,10 +1,15 @@
+import json
 import logging
+from datetime import datetime
 
+import django_rq
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
 from django.db.models import prefetch_related_objects
 
-from api.models import AuditEvent, SecretEvent
+from api.models import AuditEvent, Secret, SecretEvent
+from api.utils.buffers import drain_buffer, processing_key
 
 
 logger = logging.getLogger(__name__)
@@ -39,6 +44,18 @@ def log_secret_event(
     Utility function to log secret events.
     """
 
+    if event_type == SecretEvent.READ:
+        log_secret_events_bulk(
+            [secret],
+            event_type,
+            user=user,
+            service_token=service_token,
+            service_account_token=service_account_token,
+            ip_address=ip_address,
+            user_agent=user_agent,
+        )
+        return
+
     service_account = None
     if service_account_token is not None:
         service_account = service_account_token.service_account
@@ -306,6 +323,152 @@ def audit_team_cascade_sas(
         )
 
 
+# Buffered READ events waiting to be written by flush_secret_read_events.
+READ_EVENT_BUFFER_KEY = "secret-read-events"
+READ_EVENT_FLUSH_BATCH_SIZE = 1000
+
+# Fields carried by a compact event. Everything else (key, value, comment,
+# tags) is identical to the CREATE/UPDATE event that wrote the same secret
+# version and is resolved from it on display.
+_COMPACT_EVENT_FIELDS = (
+    "id",
+    "secret_id",
+    "environment_id",
+    "folder_id",
+    "path",
+    "user_id",
+    "service_token_id",
+    "service_account_id",
+    "service_account_token_id",
+    "version",
+    "type",
+    "event_type",
+    "ip_address",
+    "user_agent",
+)
+
+
+def _compact_secret_event(secret, event_type, **actor_fields):
+    return SecretEvent(
+        secret_id=secret.id,
+        environment_id=secret.environment_id,
+        folder_id=secret.folder_id,
+        path=secret.path,
+        version=secret.version,
+        type=secret.type,
+        event_type=event_type,
+        compact=True,
+        **actor_fields,
+    )
+
+
+def _buffer_secret_events(events):
+    """Queue compact events in Redis for the next flush_secret_read_events run."""
+    payload = []
+    for event in events:
+        row = {field: getattr(event, field) for field in _COMPACT_EVENT_FIELDS}
+        row["id"] = str(row["id"])
+        row["timestamp"] = event.timestamp.isoformat()
+        payload.append(json.dumps(row))
+
+    django_rq.get_connection("default").rpush(READ_EVENT_BUFFER_KEY, *payload)
+
+
+def _write_read_events(payload):
+    events = []
+    for raw in payload:
+        row = json.loads(raw)
+        row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+        events.append(SecretEvent(compact=True, **row))
+    SecretEvent.objects.bulk_create(events, ignore_conflicts=True)
+
+
+def flush_secret_read_events(batch_size=READ_EVENT_FLUSH_BATCH_SIZE):
+    """
+    Write buffered READ events to the database in batches.
+
+    Returns the number of events written. A batch leaves Redis only once it
+    is inserted (see api.utils.buffers); event ids are fixed when the event
+    is buffered, so a retried batch cannot produce duplicate rows.
+    """
+    return drain_buffer(
+        django_rq.get_connection("default"),
+        READ_EVENT_BUFFER_KEY,
+        _write_read_events,
+        batch_size,
+    )
+
+
+def oldest_buffered_read_timestamp():
+    """
+    Read time of the oldest READ event still waiting in the buffer, or None.
+
+    Log streams hold their watermark back to it: buffered events keep their
+    read time, so an event inserted after newer ones shipped would land
+    behind the stream cursors. Dead-lettered events are not counted.
+    """
+    connection = django_rq.get_connection("default")
+    # The batch being inserted was claimed from the head of the buffer.
+    for key in (processing_key(READ_EVENT_BUFFER_KEY), READ_EVENT_BUFFER_KEY):
+        raw = connection.lindex(key, 0)
+        if raw:
+            return datetime.fromisoformat(json.loads(raw)["timestamp"])
+    return None
+
+
+def hydrate_compact_secret_events(events):
+    """
+    Fill in key, value, comment and tags for compact events, in place.
+
+    Each compact event takes these from the latest CREATE/UPDATE event of the
+    same secret version, falling back to the secret itself when that is still
+    at the same version (e.g. versions written before events were recorded).
+    Runs two queries at most, regardless of how many events are passed.
+
+    Hydrated tags are set as `resolved_tags`; SecretEventType prefers them
+    over the (empty) tag relation.
+    """
+    compact = [event for event in events if getattr(event, "compact", False)]
+    if not compact:
+        return events
+
+    secret_ids = {event.secret_id for event in compact}
+    sources = {}
+    for source in (
+        SecretEvent.objects.filter(
+            secret_id__in=secret_ids,
+            version__in={event.version for event in compact},
+            event_type__in=[SecretEvent.CREATE, SecretEvent.UPDATE],
+            compact=False,
+        )
+        .order_by("timestamp")
+        .prefetch_related("tags")
+    ):
+        sources[(source.secret_id, source.version)] = source
+
+    missing = {
+        event.secret_id
+        for event in compact
+        if (event.secret_id, event.version) not in sources
+    }
+    if missing:
+        for secret in Secret.objects.filter(id__in=missing).prefetch_related("tags"):
+            sources.setdefault((secret.id, secret.version), secret)
+
+    for event in compact:
+        source = sources.get((event.secret_id, event.version))
+        if source is None:
+            event.resolved_tags = []
+            continue
+        event.key = source.key
+        event.key_digest = source.key_digest
+        event.value = source.value
+        event.comment = source.comment
+        event.resolved_tags = list(source.tags.all())
+
+    return events
+
+
 def log_secret_events_bulk(
     secrets,
     event_type,
@@ -318,6 +481,10 @@ def log_secret_events_bulk(
     """
     Bulk version of log_secret_event. Logs events for multiple secrets
     using bulk_create to reduce database round-trips.
+
+    READ events are written compact (no ciphertext copies or tag rows), and
+    are buffered in Redis instead of inserted when SECRET_READ_EVENTS_ASYNC
+    is enabled. Buffered events are returned unsaved.
     """
 
     if not secrets:
@@ -327,6 +494,30 @@ def log_secret_events_bulk(
     if service_account_token is not None:
         service_account = service_account_token.service_account
 
+    if event_type == SecretEvent.READ:
+        events = [
+            _compact_secret_event(
+                secret,
+                event_type,
+                user=user,
+                service_token=service_token,
+                service_account=service_account,
+                service_account_token=service_account_token,
+                ip_address=ip_address,
+                user_agent=user_agent,
+            )
+            for secret in secrets
+        ]
+
+        if settings.SECRET_READ_EVENTS_ASYNC:
+            try:
+                _buffer_secret_events(events)
+                return events
+            except Exception:
+                logger.exception("Failed to buffer secret read events, writing inline")
+
+        return SecretEvent.objects.bulk_create(events, batch_size=1000)
+
     prefetch_related_objects(list(secrets), "tags")
 
     events = [
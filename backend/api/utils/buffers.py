@@ -0,0 +1,116 @@
+"""Redis list buffers drained into the database by scheduled jobs.
+
+Request paths RPUSH rows onto a list (see api.utils.audit_logging and
+api.utils.kms) and `drain_buffer` writes them in batches. A batch is moved
+atomically from the buffer into a processing list and deleted from there
+only after it is written, so a worker dying mid-batch leaves the batch for
+the next run. Runs hold a lock, so the batch in the processing list always
+belongs to a finished run. A batch that fails MAX_FLUSH_ATTEMPTS times is
+moved to a dead-letter list (`<key>:dead`) instead of blocking the rows
+queued behind it; RPOPLPUSH it back onto the buffer to replay it.
+"""
+
+import logging
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+MAX_FLUSH_ATTEMPTS = 5
+
+# Longer than a single batch takes to write; extended after every batch.
+FLUSH_LOCK_TIMEOUT = 300
+
+# Move up to ARGV[1] rows from the head of KEYS[1] to the tail of KEYS[2].
+_MOVE_SCRIPT = """
+local rows = redis.call("LRANGE", KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #rows > 0 then
+    redis.call("RPUSH", KEYS[2], unpack(rows))
+    redis.call("LTRIM", KEYS[1], #rows, -1)
+end
+return rows
+"""
+
+_EXTEND_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("EXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+def processing_key(key):
+    return f"{key}:processing"
+
+
+def dead_letter_key(key):
+    return f"{key}:dead"
+
+
+def drain_buffer(connection, key, write, batch_size):
+    """
+    Write the rows buffered on the Redis list `key` in batches.
+
+    Args:
+        connection: Redis connection holding the buffer.
+        key: Buffer list key.
+        write: Called with each batch of raw rows; raises if the batch was
+            not written. Rows may be passed more than once (after a failure
+            or a crash), so writes must be idempotent.
+        batch_size: Maximum rows per batch.
+
+    Returns:
+        int: Number of rows written, 0 if another run holds the lock.
+    """
+    lock = f"{key}:lock"
+    token = str(uuid4())
+    if not connection.set(lock, token, nx=True, ex=FLUSH_LOCK_TIMEOUT):
+        return 0
+
+    processing = processing_key(key)
+    attempts = f"{key}:attempts"
+    drained = 0
+
+    try:
+        while True:
+            # A batch left by a failed or crashed run goes first.
+            payload = connection.lrange(processing, 0, -1)
+            retried = bool(payload)
+            if not retried:
+                payload = connection.eval(
+                    _MOVE_SCRIPT, 2, key, processing, batch_size
+                )
+            if not payload:
+                return drained
+
+            try:
+                write(payload)
+            except Exception:
+                if connection.incr(attempts) >= MAX_FLUSH_ATTEMPTS:
+                    connection.eval(
+                        _MOVE_SCRIPT, 2, processing, dead_letter_key(key), len(payload)
+                    )
+                    connection.delete(attempts)
+                    logger.error(
+                        "Moved %d rows of %s to %s after %d failed writes",
+                        len(payload),
+                        key,
+                        dead_letter_key(key),
+                        MAX_FLUSH_ATTEMPTS,
+                    )
+                raise
+
+            connection.delete(processing, attempts)
+            drained += len(payload)
+            connection.eval(_EXTEND_LOCK_SCRIPT, 1, lock, token, FLUSH_LOCK_TIMEOUT)
+
+            if not retried and len(payload) < batch_size:
+                return drained
+    finally:
+        connection.eval(_RELEASE_LOCK_SCRIPT, 1, lock, token)
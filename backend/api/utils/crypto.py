@@ -17,6 +17,7 @@ from nacl.bindings import (
     crypto_sign_ed25519_sk_to_curve25519,
 )
 from nacl.encoding import RawEncoder
+from functools import lru_cache
 from typing import Tuple
 from typing import List
 
@@ -24,17 +25,25 @@ PREFIX = "ph"
 VERSION = 1
 
 
+@lru_cache(maxsize=4)
+def _server_keypair_from_seed(seed):
+    seed_bytes = bytes.fromhex(seed)
+    return crypto_kx_seed_keypair(seed_bytes)
+
+
 def get_server_keypair():
     """
     Derives the server key exchange keypair.
 
+    The derivation is memoized on SERVER_SECRET, so it runs once per worker
+    (and again only if the setting changes, e.g. under override_settings).
+
     Returns:
         Tuple[bytes, bytes]: A tuple of two bytes objects representing the public and
         private keys of the keypair.
     """
     seed = getattr(settings, "SERVER_SECRET")
-    seed_bytes = bytes.fromhex(seed)
-    pk, sk = crypto_kx_seed_keypair(seed_bytes)
+    pk, sk = _server_keypair_from_seed(seed)
 
     return pk, sk
 
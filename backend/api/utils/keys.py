@@ -9,11 +9,10 @@ from django.apps import apps
 from django.db import IntegrityError, transaction
 from django.utils import timezone
 from nacl.bindings import crypto_sign_ed25519_pk_to_curve25519
-from api.utils.crypto import (
-    get_server_keypair,
-    decrypt_asymmetric,
-    encrypt_asymmetric,
-)
+from api.utils.access.access_map import invalidate_org_access_on_commit
+from api.utils.access.org_resolution import resolve_via_model
+from api.utils.crypto import encrypt_asymmetric
+from api.utils.secrets import get_environment_seed_and_salt
 
 
 def server_wrap_env_key_for_member(environment, identity_key):
@@ -23,19 +22,7 @@ def server_wrap_env_key_for_member(environment, identity_key):
 
     Requires SSE to be enabled on the app (ServerEnvironmentKey must exist).
     """
-    ServerEnvironmentKey = apps.get_model("api", "ServerEnvironmentKey")
-
-    server_env_key = ServerEnvironmentKey.objects.get(
-        environment=environment, deleted_at__isnull=True
-    )
-    server_pk, server_sk = get_server_keypair()
-
-    seed = decrypt_asymmetric(
-        server_env_key.wrapped_seed, server_sk.hex(), server_pk.hex()
-    )
-    salt = decrypt_asymmetric(
-        server_env_key.wrapped_salt, server_sk.hex(), server_pk.hex()
-    )
+    seed, salt = get_environment_seed_and_salt(environment.id)
 
     # identity_key is Ed25519; encrypt_asymmetric needs Curve25519
     kx_pubkey_hex = crypto_sign_ed25519_pk_to_curve25519(
@@ -158,15 +145,20 @@ def revoke_team_environment_keys(team, app=None, member=None, environments=None)
     # wrapped_salt populated on a soft-deleted row would leak the env
     # private key to any consumer that forgets to filter deleted_at
     # (e.g. legacy serializers exposing `fields = "__all__"`).
+    revoked = 0
     for ek_id in env_key_ids:
         if not EnvironmentKeyGrant.objects.filter(environment_key_id=ek_id).exists():
-            EnvironmentKey.objects.filter(id=ek_id).update(
+            revoked += EnvironmentKey.objects.filter(id=ek_id).update(
                 deleted_at=timezone.now(),
                 wrapped_seed="",
                 wrapped_salt="",
                 identity_key="",
             )
 
+    # .update() sends no post_save; refresh access maps explicitly.
+    if revoked:
+        invalidate_org_access_on_commit(team.organisation_id)
+
 
 def track_individual_environment_grants(environment_keys):
     """Creates an INDIVIDUAL EnvironmentKeyGrant for each freshly-created
@@ -184,6 +176,12 @@ def track_individual_environment_grants(environment_keys):
         ]
     )
 
+    # Keys are bulk-created without post_save signals; refresh access maps.
+    for env_id in {ek.environment_id for ek in environment_keys}:
+        invalidate_org_access_on_commit(
+            resolve_via_model("Environment", env_id, {})
+        )
+
 
 def revoke_individual_environment_keys(account, app=None, environments=None):
     """Symmetric to revoke_team_environment_keys, for individual access
@@ -212,15 +210,20 @@ def revoke_individual_environment_keys(account, app=None, environments=None):
     env_key_ids = list(grants.values_list("environment_key_id", flat=True))
     grants.delete()
 
+    revoked = 0
     for ek_id in env_key_ids:
         if not EnvironmentKeyGrant.objects.filter(environment_key_id=ek_id).exists():
-            EnvironmentKey.objects.filter(id=ek_id).update(
+            revoked += EnvironmentKey.objects.filter(id=ek_id).update(
                 deleted_at=timezone.now(),
                 wrapped_seed="",
                 wrapped_salt="",
                 identity_key="",
             )
 
+    # .update() sends no post_save; refresh access maps explicitly.
+    if revoked:
+        invalidate_org_access_on_commit(account.organisation_id)
+
 
 def provision_pending_team_keys(org_member):
     """
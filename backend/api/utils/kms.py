@@ -0,0 +1,163 @@
+"""Request path of the KMS endpoint (api/views/kms.py).
+
+Every client decrypt fetches its app's wrapped key share, so the endpoint
+avoids Postgres on the hot path: the app token lookup is cached, and the
+access log row is buffered in Redis and written in batches by
+`flush_kms_logs` (scheduled from api/tasks/activity.py), which also updates
+the activity rollups once per batch.
+"""
+
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime
+from uuid import uuid4
+
+import django_rq
+from django.conf import settings
+from django.core.cache import cache
+
+from api.models import App
+from api.utils.buffers import drain_buffer
+from logs.models import KMSDBLog
+from logs.rollups import buffer_rollup_increments, increment_rollups
+
+logger = logging.getLogger(__name__)
+
+# Cached app token lookups; rotating an app's keys or deleting the app drops
+# the entry (see RotateAppKeysMutation and api.signals).
+KMS_APP_CACHE_TTL = 300
+
+# Buffered KMS logs waiting to be written by flush_kms_logs.
+KMS_LOG_BUFFER_KEY = "kms-logs"
+KMS_LOG_FLUSH_BATCH_SIZE = 1000
+
+
+def _app_key_share_cache_key(app_token):
+    digest = hashlib.sha256(app_token.encode()).hexdigest()
+    return f"kms-app:{digest}"
+
+
+def get_app_key_share(app_token):
+    """
+    The wrapped key share of the app with this token.
+
+    Returns:
+        str | None: None for an unknown token.
+    """
+    cache_key = _app_key_share_cache_key(app_token)
+    try:
+        wrapped_key_share = cache.get(cache_key)
+    except Exception:
+        wrapped_key_share = None
+    if wrapped_key_share is not None:
+        return wrapped_key_share
+
+    try:
+        wrapped_key_share = App.objects.values_list(
+            "wrapped_key_share", flat=True
+        ).get(app_token=app_token)
+    except App.DoesNotExist:
+        return None
+
+    try:
+        cache.set(cache_key, wrapped_key_share, KMS_APP_CACHE_TTL)
+    except Exception:
+        pass
+    return wrapped_key_share
+
+
+def invalidate_app_key_share(app_token):
+    """Drop the cached lookup of an app token."""
+    if not app_token:
+        return
+    try:
+        cache.delete(_app_key_share_cache_key(app_token))
+    except Exception:
+        pass
+
+
+def _update_rollups(logs):
+    counts = defaultdict(int)
+    for log in logs:
+        counts[(log.app_id, log.timestamp)] += 1
+    try:
+        increment_rollups(counts)
+    except Exception:
+        # The logs are written; the backfill_kms_rollups command can recount
+        # them.
+        logger.exception("Failed to update KMS activity rollups")
+
+
+def log_kms_request(app_id, event_type, phase_node, ph_size, ip_address):
+    """
+    Record a key share fetch. Buffered in Redis when KMS_LOGS_ASYNC is
+    enabled, falling back to a direct write if the buffer is unavailable.
+    """
+    log = KMSDBLog(
+        id=str(uuid4()),
+        app_id=app_id,
+        event_type=event_type,
+        phase_node=phase_node,
+        ph_size=float(ph_size),
+        ip_address=ip_address,
+        timestamp=int(datetime.now().timestamp() * 1000),
+    )
+
+    if settings.KMS_LOGS_ASYNC:
+        row = {
+            "id": log.id,
+            "app_id": log.app_id,
+            "event_type": log.event_type,
+            "phase_node": log.phase_node,
+            "ph_size": log.ph_size,
+            "ip_address": log.ip_address,
+            "timestamp": log.timestamp,
+        }
+        try:
+            django_rq.get_connection("default").rpush(
+                KMS_LOG_BUFFER_KEY, json.dumps(row)
+            )
+            return
+        except Exception:
+            logger.warning("KMS log buffer unavailable, writing directly")
+
+    KMSDBLog.objects.bulk_create([log])
+    # Counted by the scheduled fold, keeping the contended rollup UPDATE off
+    # the request path.
+    try:
+        buffer_rollup_increments({(log.app_id, log.timestamp): 1})
+    except Exception:
+        logger.warning("KMS rollup buffer unavailable, updating directly")
+        _update_rollups([log])
+
+
+def _write_logs(payload):
+    logs = [KMSDBLog(**json.loads(raw)) for raw in payload]
+    # A retried batch may already be written; roll up each log only once.
+    existing = set(
+        KMSDBLog.objects.filter(id__in=[log.id for log in logs]).values_list(
+            "id", flat=True
+        )
+    )
+    logs = [log for log in logs if log.id not in existing]
+    KMSDBLog.objects.bulk_create(logs, ignore_conflicts=True)
+    _update_rollups(logs)
+
+
+def flush_kms_logs(batch_size=KMS_LOG_FLUSH_BATCH_SIZE):
+    """
+    Write buffered KMS logs to the database in batches.
+
+    Returns the number of logs drained from the buffer. A batch leaves Redis
+    only once it is inserted (see api.utils.buffers); log ids are fixed when
+    the log is buffered, so a retried batch cannot produce duplicate rows or
+    rollup counts.
+    """
+    return drain_buffer(
+        django_rq.get_connection("default"),
+        KMS_LOG_BUFFER_KEY,
+        _write_logs,
+        batch_size,
+    )
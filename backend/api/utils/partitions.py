@@ -0,0 +1,321 @@
+"""Monthly range partitioning of the event tables.
+
+SecretEvent and AuditEvent are append-mostly and by far the largest tables.
+Once converted (see the `partition_event_tables` command), each is
+partitioned by month on `timestamp`:
+
+- Queries bounded by time (secret logs, audit logs, log stream cursors) only
+  touch the partitions in range, and each partition's indexes stay small.
+- Retention rewrites or drops whole partitions (`rewrite_partition`) instead
+  of deleting rows, so there is no bloat or vacuum debt.
+
+Partitions are named `<table>_pYYYYMM` and created PARTITION_MONTHS_AHEAD
+months in advance by a scheduled job (see api/tasks/audit.py). Each table
+also has a DEFAULT partition, `<table>_pdefault`, so writes outside every
+monthly partition (e.g. if maintenance stops) still succeed; maintenance
+moves such rows into their month's partition. Everything here is a no-op on
+a table that has not been converted.
+
+A partitioned table's primary key must include the partition key, so the
+converted tables are keyed on (id, timestamp) in the database; ids are
+uuid4s and the models still treat `id` as the primary key.
+"""
+
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+PARTITION_MONTHS_AHEAD = 3
+
+# Tables this module manages, resolved lazily from the models.
+_EVENT_MODELS = ("SecretEvent", "AuditEvent")
+
+
+def event_tables():
+    from django.apps import apps
+
+    return [apps.get_model("api", name)._meta.db_table for name in _EVENT_MODELS]
+
+
+def month_start(value):
+    """The first instant (UTC) of the month containing `value`."""
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def default_partition_name(table):
+    return f"{table}_pdefault"
+
+
+def partition_month(table, name):
+    """The month a partition covers, from its name, or None if not ours."""
+    prefix = f"{table}_p"
+    suffix = name[len(prefix) :] if name.startswith(prefix) else ""
+    if len(suffix) != 6 or not suffix.isdigit():
+        return None
+    return datetime(int(suffix[:4]), int(suffix[4:]), 1, tzinfo=dt_timezone.utc)
+
+
+def _quote(name):
+    return connection.ops.quote_name(name)
+
+
+def is_partitioned(table):
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(table):
+    """[(name, month)] of a table's monthly partitions, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(%s)
+            """,
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = [(name, partition_month(table, name)) for name in names]
+    return sorted(
+        (partition for partition in partitions if partition[1] is not None),
+        key=lambda partition: partition[1],
+    )
+
+
+def _relation_exists(cursor, name):
+    cursor.execute("SELECT to_regclass(%s)", [name])
+    return cursor.fetchone()[0] is not None
+
+
+def create_default_partition(table, cursor=None, parent=None):
+    """
+    Create the DEFAULT partition of `table`, if missing. `parent` is as for
+    `create_partition`.
+    """
+    sql = (
+        f"CREATE TABLE IF NOT EXISTS {_quote(default_partition_name(table))} "
+        f"PARTITION OF {_quote(parent or table)} DEFAULT"
+    )
+    if cursor is not None:
+        cursor.execute(sql)
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+
+
+def create_partition(table, month, cursor=None, parent=None):
+    """
+    Create the partition of `table` for `month`, if missing. `parent` is the
+    table to attach it to when that is not `table` itself (e.g. during
+    conversion, see partition_event_tables).
+
+    Rows of that month already in the DEFAULT partition are moved into the
+    new partition, with the default detached meanwhile (Postgres won't
+    create a partition whose rows the default holds). This locks the parent
+    table for the duration of the move.
+    """
+    if cursor is None:
+        with connection.cursor() as cursor:
+            return create_partition(table, month, cursor, parent)
+
+    name = partition_name(table, month)
+    parent = parent or table
+    default = default_partition_name(table)
+    bounds = [month, add_months(month, 1)]
+
+    if _relation_exists(cursor, name):
+        return
+
+    in_default = False
+    if _relation_exists(cursor, default):
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {_quote(default)} "
+            f'WHERE "timestamp" >= %s AND "timestamp" < %s)',
+            bounds,
+        )
+        in_default = cursor.fetchone()[0]
+
+    if not in_default:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {_quote(name)} "
+            f"PARTITION OF {_quote(parent)} FOR VALUES FROM (%s) TO (%s)",
+            bounds,
+        )
+        return
+
+    with transaction.atomic():
+        cursor.execute(
+            f"ALTER TABLE {_quote(parent)} DETACH PARTITION {_quote(default)}"
+        )
+        cursor.execute(
+            f"CREATE TABLE {_quote(name)} "
+            f"PARTITION OF {_quote(parent)} FOR VALUES FROM (%s) TO (%s)",
+            bounds,
+        )
+        cursor.execute(
+            f"INSERT INTO {_quote(name)} SELECT * FROM {_quote(default)} "
+            f'WHERE "timestamp" >= %s AND "timestamp" < %s',
+            bounds,
+        )
+        moved = cursor.rowcount
+        cursor.execute(
+            f"DELETE FROM {_quote(default)} "
+            f'WHERE "timestamp" >= %s AND "timestamp" < %s',
+            bounds,
+        )
+        cursor.execute(
+            f"ALTER TABLE {_quote(parent)} ATTACH PARTITION {_quote(default)} DEFAULT"
+        )
+    logger.info("Created partition %s with %s rows from %s", name, moved, default)
+
+
+def default_partition_months(table, cursor=None):
+    """The months of the rows in `table`'s DEFAULT partition, oldest first."""
+    if cursor is None:
+        with connection.cursor() as cursor:
+            return default_partition_months(table, cursor)
+
+    default = default_partition_name(table)
+    if not _relation_exists(cursor, default):
+        return []
+    cursor.execute(
+        "SELECT DISTINCT date_trunc('month', \"timestamp\" AT TIME ZONE 'UTC') "
+        f"FROM {_quote(default)} ORDER BY 1"
+    )
+    return [
+        month.replace(tzinfo=dt_timezone.utc) for (month,) in cursor.fetchall()
+    ]
+
+
+def ensure_partitions(now=None, months_ahead=PARTITION_MONTHS_AHEAD):
+    """
+    Create the partitions of the event tables from the current month to
+    `months_ahead` months ahead, and the DEFAULT partition. Rows that landed
+    in the default are moved into partitions of their own months. Returns
+    the names of the monthly partitions ensured.
+    """
+    now = now or datetime.now(dt_timezone.utc)
+    current = month_start(now)
+    ensured = []
+
+    for table in event_tables():
+        if not is_partitioned(table):
+            continue
+        create_default_partition(table)
+        months = [add_months(current, offset) for offset in range(months_ahead + 1)]
+        for month in sorted(set(default_partition_months(table)) | set(months)):
+            create_partition(table, month)
+            ensured.append(partition_name(table, month))
+
+    return ensured
+
+
+def rewrite_partition(table, name, keep_condition, params=(), dependents=()):
+    """
+    Remove a past partition's rows except those matching `keep_condition`.
+
+    The survivors are copied into a new table, which then replaces the
+    partition. The old partition is dropped whole. The cost grows with the
+    rows kept, not the rows removed. When nothing is kept, the partition is
+    simply dropped.
+
+    The partition must no longer receive writes. Rows written meanwhile
+    are lost.
+
+    Args:
+        table (str): The partitioned table.
+        name (str): One of its monthly partitions.
+        keep_condition (str): SQL condition on the partition's rows.
+        params (Sequence): Parameters of `keep_condition`.
+        dependents (Sequence[tuple[str, str]]): (table, column) pairs that
+            reference the removed rows by id and lose them too, e.g. M2M
+            through tables.
+
+    Returns:
+        tuple[int, int]: Rows kept, rows removed.
+    """
+    month = partition_month(table, name)
+    if month is None:
+        raise ValueError(f"{name} is not a monthly partition of {table}")
+
+    keep_name = f"{name}_keep"
+    old_name = f"{name}_old"
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {_quote(name)}")
+        total = cursor.fetchone()[0]
+
+        cursor.execute(f"DROP TABLE IF EXISTS {_quote(keep_name)}")
+        # With the parent's indexes in place, ATTACH adopts them instead of
+        # building them under its lock.
+        cursor.execute(
+            f"CREATE TABLE {_quote(keep_name)} (LIKE {_quote(table)} INCLUDING ALL)"
+        )
+        cursor.execute(
+            f"INSERT INTO {_quote(keep_name)} "
+            f"SELECT * FROM {_quote(name)} WHERE {keep_condition}",
+            list(params),
+        )
+        kept = cursor.rowcount
+        # Lets ATTACH PARTITION skip its validation scan
+        cursor.execute(
+            f"ALTER TABLE {_quote(keep_name)} ADD CONSTRAINT "
+            f"{_quote(f'{keep_name}_bounds')} "
+            f'CHECK ("timestamp" >= %s AND "timestamp" < %s)',
+            [month, add_months(month, 1)],
+        )
+
+        # Outside the swap, which locks the parent table: the partition no
+        # longer receives writes, so the removed rows are known already.
+        for dependent, column in dependents:
+            cursor.execute(
+                f"DELETE FROM {_quote(dependent)} WHERE {_quote(column)} IN "
+                f"(SELECT id FROM {_quote(name)} WHERE NOT ({keep_condition}))",
+                list(params),
+            )
+
+        with transaction.atomic():
+            cursor.execute(
+                f"ALTER TABLE {_quote(table)} DETACH PARTITION {_quote(name)}"
+            )
+            cursor.execute(
+                f"ALTER TABLE {_quote(name)} RENAME TO {_quote(old_name)}"
+            )
+            if kept:
+                cursor.execute(
+                    f"ALTER TABLE {_quote(keep_name)} RENAME TO {_quote(name)}"
+                )
+                cursor.execute(
+                    f"ALTER TABLE {_quote(table)} ATTACH PARTITION {_quote(name)} "
+                    f"FOR VALUES FROM (%s) TO (%s)",
+                    [month, add_months(month, 1)],
+                )
+            else:
+                cursor.execute(f"DROP TABLE {_quote(keep_name)}")
+
+        cursor.execute(f"DROP TABLE {_quote(old_name)}")
+
+    logger.info("Rewrote partition %s: kept %s of %s rows", name, kept, total)
+    return kept, total - kept
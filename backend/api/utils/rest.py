@@ -1,5 +1,7 @@
+import hashlib
 import re
 from api.models import EnvironmentToken, ServiceAccountToken, ServiceToken, UserToken
+from django.core.cache import cache
 from django.utils import timezone
 from django.utils.html import strip_tags
 from django.core.validators import validate_email
@@ -10,6 +12,27 @@ from api.utils.access.ip import get_client_ip
 # Strip C0/C1 control characters except tab (0x09), LF (0x0a), CR (0x0d)
 _CONTROL_CHAR_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]")
 
+# Resolved bearer tokens are cached briefly; saving or deleting the token or
+# its principal drops the entry (see api.signals).
+TOKEN_AUTH_CACHE_TTL = 30
+
+# ServiceAccountToken.last_used_at is bumped at most once per interval.
+TOKEN_LAST_USED_INTERVAL = 60
+
+# Token type -> (model, related rows loaded alongside the token)
+_TOKEN_MODELS = {
+    "User": (UserToken, ("user__user", "user__organisation", "user__role")),
+    "Service": (ServiceToken, ("app__organisation", "created_by__user")),
+    "ServiceAccount": (
+        ServiceAccountToken,
+        (
+            "service_account__organisation",
+            "service_account__role",
+            "created_by__user",
+        ),
+    ),
+}
+
 # Map HTTP methods to permission actions
 METHOD_TO_ACTION = {
     "GET": "read",
@@ -94,37 +117,149 @@ def get_service_token(auth_token):
 
 
 def token_is_expired_or_deleted(auth_token):
-    token_type, token_value = _parse_auth_token(auth_token)
-    if not token_type or not token_value:
-        return True
+    return not auth_token_is_live(resolve_auth_token(auth_token))
 
-    token = None
-    if token_type == "User":
-        try:
-            token = UserToken.objects.get(token=token_value)
-        except UserToken.DoesNotExist:
-            return True
 
+def _token_auth_cache_key(token_type, token_value):
+    digest = hashlib.sha256(f"{token_type}:{token_value}".encode()).hexdigest()
+    return f"token-auth:{digest}"
+
+
+def _token_instances(token_type, token):
+    org_member = None
+    service_account = None
+    organisation = None
+    if token_type == "User":
+        org_member = token.user
+        if org_member is not None and org_member.deleted_at is None:
+            organisation = org_member.organisation
     elif token_type == "Service":
-        try:
-            token = ServiceToken.objects.get(token=token_value)
-        except ServiceToken.DoesNotExist:
-            return True
+        organisation = token.app.organisation
+    else:
+        service_account = token.service_account
+        if service_account.deleted_at is None:
+            organisation = service_account.organisation
+
+    return {
+        "token": token,
+        "org_member": org_member,
+        "service_account": service_account,
+        "organisation": organisation,
+    }
+
+
+class ResolvedAuthToken(dict):
+    """
+    A resolve_auth_token result.
+
+    Only ids and the fields auth_token_is_live checks are cached: the token
+    row holds the bearer secret, and a cached model instance could be saved
+    back over newer data. The "token", "org_member", "service_account" and
+    "organisation" instances are loaded on first access, with one primary
+    key query, unless the lookup that built the result already has them.
+    """
+
+    _INSTANCE_KEYS = ("token", "org_member", "service_account", "organisation")
+
+    def __missing__(self, key):
+        if key not in self._INSTANCE_KEYS:
+            raise KeyError(key)
+        model, related = _TOKEN_MODELS[self["token_type"]]
+        token = model.objects.select_related(*related).get(pk=self["token_id"])
+        self.update(_token_instances(self["token_type"], token))
+        return self[key]
+
+
+def resolve_auth_token(auth_token):
+    """
+    Resolve a bearer token to its token row, principal and organisation with a
+    single query.
+
+    The token's id, expiry and deletion state are cached for
+    TOKEN_AUTH_CACHE_TTL seconds under a hash of the token. Tokens can expire
+    while cached, so callers check the result with auth_token_is_live rather
+    than trusting a cache hit.
+
+    Returns:
+        ResolvedAuthToken | None: {"token_type", "token", "org_member",
+        "service_account", "organisation"}, or None for a malformed or
+        unknown token. "organisation" is None when the principal has been
+        deleted.
+    """
+    token_type, token_value = _parse_auth_token(auth_token)
+    if token_type not in _TOKEN_MODELS or not token_value:
+        return None
+
+    cache_key = _token_auth_cache_key(token_type, token_value)
+    try:
+        state = cache.get(cache_key)
+    except Exception:
+        state = None
+    if state is not None:
+        return ResolvedAuthToken(token_type=token_type, **state)
+
+    model, related = _TOKEN_MODELS[token_type]
+    try:
+        token = model.objects.select_related(*related).get(token=token_value)
+    except model.DoesNotExist:
+        return None
+
+    instances = _token_instances(token_type, token)
+    service_account = instances["service_account"]
+    state = {
+        "token_id": token.id,
+        "deleted_at": token.deleted_at,
+        "expires_at": token.expires_at,
+        "service_account_deleted_at": (
+            service_account.deleted_at if service_account is not None else None
+        ),
+    }
+    try:
+        cache.set(cache_key, state, TOKEN_AUTH_CACHE_TTL)
+    except Exception:
+        pass
+    return ResolvedAuthToken(token_type=token_type, **state, **instances)
 
-    elif token_type == "ServiceAccount":
-        try:
-            token = ServiceAccountToken.objects.get(token=token_value)
-        except ServiceAccountToken.DoesNotExist:
-            return True
 
-    if token is None:
-        return True
+def auth_token_is_live(resolved):
+    """Whether a resolve_auth_token result is a usable, unexpired token."""
+    if resolved is None:
+        return False
+
+    # Deleting a service account soft-deletes its tokens right after the
+    # account itself; don't let a stale cache entry outlive that.
+    if resolved["service_account_deleted_at"] is not None:
+        return False
 
-    return token.deleted_at is not None or (
-        token.expires_at is not None and token.expires_at < timezone.now()
+    return resolved["deleted_at"] is None and (
+        resolved["expires_at"] is None or resolved["expires_at"] >= timezone.now()
     )
 
 
+def invalidate_auth_token(token_type, token_value):
+    """Drop the cached resolution of a token."""
+    try:
+        cache.delete(_token_auth_cache_key(token_type, token_value))
+    except Exception:
+        pass
+
+
+def touch_service_account_token(token):
+    """
+    Bump ServiceAccountToken.last_used_at, at most once per
+    TOKEN_LAST_USED_INTERVAL seconds per token.
+    """
+    try:
+        due = cache.add(f"token-last-used:{token.id}", 1, TOKEN_LAST_USED_INTERVAL)
+    except Exception:
+        due = True
+
+    if due:
+        ServiceAccountToken.objects.filter(id=token.id).update(
+            last_used_at=timezone.now()
+        )
+
+
 def validate_text_field(value, field_name, max_length=None, required=True):
     """Validate and sanitize a text field from request data.
 
@@ -1,5 +1,11 @@
 import re
-from django.db import transaction
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import reduce
+from operator import or_
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.apps import apps
 import logging
 from api.utils.crypto import (
@@ -33,30 +39,117 @@ LOCAL_REF_PATTERN = re.compile(r"\$\{(?!\{)([^{}.]+?)\}")
 # is an additional guard against pathologically deep (but acyclic) chains.
 MAX_REFERENCE_DEPTH = 25
 
+# Per-worker cache of unwrapped environment key material, keyed by environment
+# ID. Unwrapping a ServerEnvironmentKey costs a DB read plus two asymmetric
+# decryptions, and hot service accounts hit the same few environments on every
+# request. Entries are bounded (LRU) and expire after a TTL so other workers
+# converge on changes; post_save / post_delete on ServerEnvironmentKey
+# invalidate the local worker immediately (see api/signals.py).
+ENV_CRYPTO_CONTEXT_CACHE_TTL = 300
+ENV_CRYPTO_CONTEXT_CACHE_MAX_SIZE = 1024
+
+_env_crypto_cache = OrderedDict()
+_env_crypto_cache_lock = threading.Lock()
+# Bumped on every invalidation so a load that raced an invalidation doesn't
+# write stale material back into the cache.
+_env_crypto_cache_generation = 0
+
 
 class SecretReferenceException(Exception):
     pass
 
 
-def get_environment_keys(environment_id):
+def _get_environment_key_material(environment_id):
     """
-    Returns a tuple of environment public and private keys.
+    Returns the unwrapped (seed, salt, pubkey, privkey) for an environment,
+    served from the per-worker cache when possible.
+
+    Raises:
+        ServerEnvironmentKey.DoesNotExist: If SSE is not enabled for the environment.
+    """
+    global _env_crypto_cache_generation
+
+    cache_key = str(environment_id)
+    now = time.monotonic()
+
+    with _env_crypto_cache_lock:
+        entry = _env_crypto_cache.get(cache_key)
+        if entry is not None:
+            expires_at, material = entry
+            if expires_at > now:
+                _env_crypto_cache.move_to_end(cache_key)
+                return material
+            del _env_crypto_cache[cache_key]
+        generation = _env_crypto_cache_generation
+
+    ServerEnvironmentKey = apps.get_model("api", "ServerEnvironmentKey")
+
+    server_env_key = ServerEnvironmentKey.objects.get(
+        environment_id=environment_id, deleted_at__isnull=True
+    )
+
+    pk, sk = get_server_keypair()
+
+    seed = decrypt_asymmetric(server_env_key.wrapped_seed, sk.hex(), pk.hex())
+    salt = decrypt_asymmetric(server_env_key.wrapped_salt, sk.hex(), pk.hex())
+    env_pubkey, env_privkey = env_keypair(seed)
+
+    material = (seed, salt, env_pubkey, env_privkey)
+
+    with _env_crypto_cache_lock:
+        if generation == _env_crypto_cache_generation:
+            _env_crypto_cache[cache_key] = (
+                now + ENV_CRYPTO_CONTEXT_CACHE_TTL,
+                material,
+            )
+            _env_crypto_cache.move_to_end(cache_key)
+            while len(_env_crypto_cache) > ENV_CRYPTO_CONTEXT_CACHE_MAX_SIZE:
+                _env_crypto_cache.popitem(last=False)
+
+    return material
+
+
+def invalidate_environment_crypto_context(environment_id=None):
+    """
+    Drops cached key material for the given environment, or for every
+    environment if no ID is given.
+    """
+    global _env_crypto_cache_generation
+
+    with _env_crypto_cache_lock:
+        _env_crypto_cache_generation += 1
+        if environment_id is None:
+            _env_crypto_cache.clear()
+        else:
+            _env_crypto_cache.pop(str(environment_id), None)
+
+
+def get_environment_seed_and_salt(environment_id):
+    """
+    Returns the unwrapped environment seed and salt.
 
     Args:
-        environment_id (str): The ID of the environment to get the keys for.
+        environment_id (str): The ID of the environment.
 
     Returns:
-        env_pubkey, env_privkey (tuple): A tuple containing the environment's public key and private key.
+        seed, salt (tuple): The environment seed and salt as hex strings.
     """
-    ServerEnvironmentKey = apps.get_model("api", "ServerEnvironmentKey")
+    seed, salt, _, _ = _get_environment_key_material(environment_id)
+    return seed, salt
 
-    server_env_key = ServerEnvironmentKey.objects.get(environment_id=environment_id)
 
-    pk, sk = get_server_keypair()
+def get_environment_keys(environment_id):
+    """
+    Returns a tuple of environment public and private keys.
 
-    env_seed = decrypt_asymmetric(server_env_key.wrapped_seed, sk.hex(), pk.hex())
+    Args:
+        environment_id (str): The ID of the environment to get the keys for.
 
-    return env_keypair(env_seed)
+    Returns:
+        env_pubkey, env_privkey (tuple): A tuple containing the environment's public key and private key.
+    """
+    _, _, env_pubkey, env_privkey = _get_environment_key_material(environment_id)
+    return env_pubkey, env_privkey
 
 
 def compute_key_digest(key, environment_id):
@@ -70,13 +163,7 @@ def compute_key_digest(key, environment_id):
     Returns:
         key_digest (sstr): The blake2b-hashed output as a hex-encoded string.
     """
-    ServerEnvironmentKey = apps.get_model("api", "ServerEnvironmentKey")
-
-    server_env_key = ServerEnvironmentKey.objects.get(environment_id=environment_id)
-
-    pk, sk = get_server_keypair()
-
-    salt = decrypt_asymmetric(server_env_key.wrapped_salt, sk.hex(), pk.hex())
+    _, salt, _, _ = _get_environment_key_material(environment_id)
 
     key_digest = blake2b_digest(key.upper(), salt)
 
@@ -87,6 +174,9 @@ def create_environment_folder_structure(complete_path, environment_id):
     """
     Correctly creates a nested folder structure based on a given the complete_path within a specified environment.
 
+    Callers writing many secrets should hold a SecretFolderResolver for the
+    request instead, so repeated and overlapping paths are only resolved once.
+
     Parameters:
     - complete_path (str): The complete path string representing the nested folder structure to create.
     - environment_id (int): The ID of the `Environment` instance where the folder structure will be created.
@@ -95,41 +185,124 @@ def create_environment_folder_structure(complete_path, environment_id):
     - SecretFolder: The last `SecretFolder` instance created or retrieved, representing the deepest
                     level in the provided path structure.
     """
-    Environment = apps.get_model("api", "Environment")
-    SecretFolder = apps.get_model("api", "SecretFolder")
+    return SecretFolderResolver(environment_id).resolve(complete_path)
 
-    # Ensure the path_segments list does not include empty segments caused by leading or trailing slashes
-    path_segments = [segment for segment in complete_path.split("/") if segment]
 
-    current_folder = None
-    # The initial current_path should correctly represent the root
-    current_path = "/"
+class SecretFolderResolver:
+    """
+    Resolves secret paths to SecretFolder rows within one environment, creating
+    any missing folders along the way.
 
-    environment = Environment.objects.get(id=environment_id)
+    Every folder on the requested paths is looked up with a single query, and
+    the missing ones are created with a single bulk insert, rather than one
+    get_or_create per path segment. Resolved folders are cached on the
+    instance, so hold one resolver per environment for the lifetime of a
+    request or job.
 
-    for i, segment in enumerate(path_segments):
-        # For each folder except the first, the path includes its parent's name
-        # For the first segment, current_path should remain "/" as its location
+    A folder named `name` whose parent lives at `path` is stored with that
+    `path` and the parent as `folder`; for "/services/api" that is
+    ("/", "services") and then ("/services", "api").
 
-        if i > 0:
-            current_path += (
-                f"/{path_segments[i-1]}"
-                if current_path != "/"
-                else path_segments[i - 1]
-            )
+    Args:
+        environment_id (str): The environment whose folder tree to resolve.
+    """
 
-        # Check if the folder already exists at the current path and with the given name
-        folder, _ = SecretFolder.objects.get_or_create(
-            name=segment,
-            environment=environment,
-            folder=current_folder,
-            path=current_path,
+    def __init__(self, environment_id):
+        self.environment_id = environment_id
+        self._folders = {}  # complete folder path -> SecretFolder
+
+    @staticmethod
+    def _chain(complete_path):
+        """(complete folder path, parent path, name) for each segment, root first."""
+        names = [segment for segment in complete_path.split("/") if segment]
+        return [
+            ("/" + "/".join(names[: i + 1]), "/" + "/".join(names[:i]), name)
+            for i, name in enumerate(names)
+        ]
+
+    def resolve(self, complete_path):
+        """Returns the deepest folder of the path, or None for the root."""
+        return self.resolve_many([complete_path])[complete_path]
+
+    def resolve_many(self, complete_paths):
+        """
+        Resolves several paths at once.
+
+        Returns:
+            dict: {complete_path: SecretFolder or None (root)} for each input.
+        """
+        wanted = {}
+        for complete_path in complete_paths:
+            for folder_path, parent_path, name in self._chain(complete_path):
+                if folder_path not in self._folders:
+                    wanted[folder_path] = (parent_path, name)
+
+        if wanted:
+            self._load(wanted)
+            missing = [folder_path for folder_path in wanted if folder_path not in self._folders]
+            if missing:
+                self._create(missing, wanted)
+
+        resolved = {}
+        for complete_path in complete_paths:
+            chain = self._chain(complete_path)
+            resolved[complete_path] = self._folders[chain[-1][0]] if chain else None
+        return resolved
+
+    def _load(self, wanted):
+        SecretFolder = apps.get_model("api", "SecretFolder")
+
+        candidates = SecretFolder.objects.filter(
+            environment_id=self.environment_id,
+            path__in={parent_path for parent_path, _ in wanted.values()},
+            name__in={name for _, name in wanted.values()},
         )
+        by_location = {
+            (folder.path, folder.name, folder.folder_id): folder for folder in candidates
+        }
+
+        # Walk root-first so each folder is matched under its resolved parent,
+        # exactly as a per-segment get_or_create(folder=parent) would.
+        for folder_path in sorted(wanted, key=lambda p: p.count("/")):
+            parent_path, name = wanted[folder_path]
+            parent = self._folders.get(parent_path) if parent_path != "/" else None
+            if parent_path != "/" and parent is None:
+                continue
+            folder = by_location.get(
+                (parent_path, name, parent.id if parent is not None else None)
+            )
+            if folder is not None:
+                self._folders[folder_path] = folder
+
+    def _create(self, missing, wanted):
+        SecretFolder = apps.get_model("api", "SecretFolder")
+
+        created = []
+        for folder_path in sorted(missing, key=lambda p: p.count("/")):
+            parent_path, name = wanted[folder_path]
+            folder = SecretFolder(
+                environment_id=self.environment_id,
+                folder=self._folders.get(parent_path) if parent_path != "/" else None,
+                path=parent_path,
+                name=name,
+            )
+            self._folders[folder_path] = folder
+            created.append(folder)
 
-        # Update the current_folder to the folder that was just created or found
-        current_folder = folder
-
-    return current_folder
+        try:
+            with transaction.atomic():
+                SecretFolder.objects.bulk_create(created)
+        except IntegrityError:
+            # A concurrent writer created some of these folders first. Fall
+            # back to resolving the missing segments one at a time.
+            for folder_path in sorted(missing, key=lambda p: p.count("/")):
+                parent_path, name = wanted[folder_path]
+                self._folders[folder_path], _ = SecretFolder.objects.get_or_create(
+                    environment_id=self.environment_id,
+                    folder=self._folders.get(parent_path) if parent_path != "/" else None,
+                    path=parent_path,
+                    name=name,
+                )
 
 
 def normalize_path_string(path):
@@ -165,6 +338,10 @@ def check_for_duplicates_blind(secrets, environment):
     Checks if a list of secrets contains any duplicates internally or in the target env + path by checking each secret's key_digest.
     Also checks key_map key_digest for DynamicSecret objects at the environment and path.
 
+    Set-based: one query covers every incoming (path, key_digest) pair, and one
+    query loads the dynamic secrets at the distinct incoming paths, regardless
+    of how many secrets are being checked.
+
     Args:
         secrets (List[Dict]): The list of encrypted secrets to check for duplicates.
         environment (Environment): The environment where the secrets are being stored.
@@ -175,55 +352,75 @@ def check_for_duplicates_blind(secrets, environment):
     Secret = apps.get_model("api", "Secret")
     DynamicSecret = apps.get_model("api", "DynamicSecret")
 
-    processed_secrets = set()  # Set to store processed secrets
+    def secret_path(secret):
+        try:
+            return normalize_path_string(secret.get("path", "/"))
+        except:
+            return "/"
 
     # --- Collect digests from input secrets ---
+    # (path, key_digest) -> IDs of the incoming secrets at that location
+    # (None for new secrets), so a secret isn't flagged against its own row.
+    processed_secrets = defaultdict(set)
+    digests_by_path = defaultdict(set)
     for secret in secrets:
         if "keyDigest" in secret:
-            try:
-                path = normalize_path_string(secret["path"])
-            except:
-                path = "/"
-            processed_secrets.add((path, secret["keyDigest"]))
+            path = secret_path(secret)
+            processed_secrets[(path, secret["keyDigest"])].add(
+                str(secret["id"]) if "id" in secret else None
+            )
+            digests_by_path[path].add(secret["keyDigest"])
 
     # --- Check static secrets in DB ---
-    for secret in secrets:
-        if "keyDigest" in secret:
-            try:
-                path = normalize_path_string(secret["path"])
-            except:
-                path = "/"
-            query_duplicates = Secret.objects.filter(
-                environment=environment,
-                path=path,
-                key_digest=secret["keyDigest"],
-                deleted_at=None,
-            )
-            if "id" in secret:
-                query_duplicates = query_duplicates.exclude(id=secret["id"])
-            if query_duplicates.exists():
+    if digests_by_path:
+        location_filter = reduce(
+            or_,
+            (
+                Q(path=path, key_digest__in=digests)
+                for path, digests in digests_by_path.items()
+            ),
+        )
+        existing = Secret.objects.filter(
+            location_filter,
+            environment=environment,
+            deleted_at=None,
+        ).values_list("id", "path", "key_digest")
+        for secret_id, path, key_digest in existing:
+            incoming_ids = processed_secrets.get((path, key_digest), ())
+            if any(
+                incoming_id is None or incoming_id != str(secret_id)
+                for incoming_id in incoming_ids
+            ):
                 return True
 
     # --- Check dynamic secrets key_map in DB ---
+    # path -> dynamic secret IDs the incoming secrets there are exempt from
+    # (None when an incoming secret has no exemption).
+    exclusions_by_path = defaultdict(set)
     for secret in secrets:
-        try:
-            path = normalize_path_string(secret.get("path", "/"))
-        except:
-            path = "/"
-        dynamic_secrets_qs = DynamicSecret.objects.filter(
-            environment=environment,
-            path=path,
-            deleted_at=None,
-        )
         exclude_id = secret.get("dynamic_secret_id")
-        if exclude_id:
-            dynamic_secrets_qs = dynamic_secrets_qs.exclude(id=exclude_id)
-        for dyn_secret in dynamic_secrets_qs:
-            key_map = dyn_secret.key_map or []
-            for entry in key_map:
-                key_digest = entry.get("key_digest")
-                if key_digest and (path, key_digest) in processed_secrets:
-                    return True
+        exclusions_by_path[secret_path(secret)].add(
+            str(exclude_id) if exclude_id else None
+        )
+
+    if not processed_secrets or not exclusions_by_path:
+        return False
+
+    dynamic_secrets = DynamicSecret.objects.filter(
+        environment=environment,
+        path__in=list(exclusions_by_path),
+        deleted_at=None,
+    ).values_list("id", "path", "key_map")
+    for dyn_secret_id, path, key_map in dynamic_secrets:
+        if not any(
+            exclude_id is None or exclude_id != str(dyn_secret_id)
+            for exclude_id in exclusions_by_path[path]
+        ):
+            continue
+        for entry in key_map or []:
+            key_digest = entry.get("key_digest")
+            if key_digest and (path, key_digest) in processed_secrets:
+                return True
 
     return False
 
@@ -253,15 +450,7 @@ def get_environment_crypto_context(environment):
     """
     Retrieves the crypto context (salt, public key, private key) for a given environment.
     """
-    ServerEnvironmentKey = apps.get_model("api", "ServerEnvironmentKey")
-    pk, sk = get_server_keypair()
-
-    server_env_key = ServerEnvironmentKey.objects.get(environment_id=environment.id)
-
-    seed = decrypt_asymmetric(server_env_key.wrapped_seed, sk.hex(), pk.hex())
-    salt = decrypt_asymmetric(server_env_key.wrapped_salt, sk.hex(), pk.hex())
-
-    env_pubkey, env_privkey = env_keypair(seed)
+    _, salt, env_pubkey, env_privkey = _get_environment_key_material(environment.id)
     return salt, env_pubkey, env_privkey
 
 
@@ -280,22 +469,37 @@ def get_or_compute_crypto_context(environment, context_cache):
     return crypto_context
 
 
-def check_environment_access(account, environment, require_resolved_references):
+def check_environment_access(
+    account, environment, require_resolved_references, access_cache=None
+):
     """
     Checks if the account has access to the environment.
     Raises SecretReferenceException if no access and require_resolved_references is True.
     Returns True if access is granted, False otherwise.
+
+    If an access_cache dict is supplied, the permission lookup for each
+    environment is done at most once and memoized in it.
     """
     ServiceAccount = apps.get_model("api", "ServiceAccount")
 
     if not account:
         return True
 
-    if isinstance(account, ServiceAccount):
+    is_service_account = isinstance(account, ServiceAccount)
+
+    if access_cache is not None and environment.id in access_cache:
+        has_access = access_cache[environment.id]
+    elif is_service_account:
         has_access = service_account_can_access_environment(account.id, environment.id)
-        error_msg = "This service account doesn't have permission to read secrets in one or more referenced environments."
     else:
         has_access = user_can_access_environment(account.userId, environment.id)
+
+    if access_cache is not None:
+        access_cache[environment.id] = has_access
+
+    if is_service_account:
+        error_msg = "This service account doesn't have permission to read secrets in one or more referenced environments."
+    else:
         error_msg = "You don't have permission to read secrets in one or more referenced environments."
 
     if not has_access:
@@ -305,6 +509,270 @@ def check_environment_access(account, environment, require_resolved_references):
     return True
 
 
+class SecretReferenceIndex:
+    """
+    In-memory index of the apps, environments and secrets referenced by a batch
+    of secrets that are being decrypted together.
+
+    `prefetch()` scans the batch's values for ${KEY}, ${env.KEY} and
+    ${app::env.KEY} references and bulk-loads everything they point at with a
+    handful of IN queries, following nested references wave by wave (up to
+    MAX_REFERENCE_DEPTH). decrypt_secret_value then resolves references against
+    the index instead of issuing per-reference queries. Lookups that were not
+    prefetched (e.g. references inside personal overrides) fall back to a
+    single query and are memoized, so the index is always safe to pass.
+
+    Resolution itself (cycle detection, depth limit, access checks, error
+    messages) is unchanged: the index only supplies the rows.
+
+    Args:
+        organisation_id (str): The organisation that owns the batch. Cross-app
+            references are resolved within this organisation.
+        account (OrganisationMember | ServiceAccount): The account reading the
+            secrets. Referenced environments it can't access are not prefetched.
+        context_cache (dict): Optional crypto context cache to share with
+            decrypt_secret_value.
+    """
+
+    # Upper bound on OR-ed lookups per query so statements stay a sane size.
+    QUERY_CHUNK_SIZE = 200
+
+    def __init__(self, organisation_id, account=None, context_cache=None):
+        self.organisation_id = str(organisation_id)
+        self.account = account
+        self.context_cache = context_cache if context_cache is not None else {}
+        self.access_cache = {}
+        self._apps = {}  # lower(app name) -> [App]
+        self._environments = {}  # (app_id, lower(env name)) -> [Environment]
+        self._secrets = {}  # (env_id, path, key_digest) -> [Secret]
+        self._plaintexts = {}  # ciphertext -> plaintext
+
+    # --- lookups used by decrypt_secret_value ---
+
+    def decrypt(self, ciphertext, env_privkey, env_pubkey):
+        """Decrypts a value, memoizing on the ciphertext."""
+        if ciphertext not in self._plaintexts:
+            self._plaintexts[ciphertext] = decrypt_asymmetric(
+                ciphertext, env_privkey, env_pubkey
+            )
+        return self._plaintexts[ciphertext]
+
+    def get_app(self, name):
+        App = apps.get_model("api", "App")
+
+        key = name.lower()
+        if key not in self._apps:
+            self._load_apps({key: name})
+        return self._single(self._apps[key], App)
+
+    def get_environment(self, app_id, name):
+        Environment = apps.get_model("api", "Environment")
+
+        key = (str(app_id), name.lower())
+        if key not in self._environments:
+            self._load_environments({key: name})
+        return self._single(self._environments[key], Environment)
+
+    def get_secret(self, environment, path, key_digest):
+        Secret = apps.get_model("api", "Secret")
+
+        key = (str(environment.id), path, key_digest)
+        if key not in self._secrets:
+            self._load_secrets({str(environment.id): environment}, [key])
+        return self._single(self._secrets[key], Secret)
+
+    @staticmethod
+    def _single(rows, Model):
+        # Mirror Model.objects.get() semantics for the indexed rows.
+        if not rows:
+            raise Model.DoesNotExist(
+                f"{Model._meta.object_name} matching query does not exist."
+            )
+        if len(rows) > 1:
+            raise Model.MultipleObjectsReturned(
+                f"get() returned more than one {Model._meta.object_name} -- it returned {len(rows)}!"
+            )
+        return rows[0]
+
+    # --- bulk loading ---
+
+    def _chunks(self, items):
+        items = list(items)
+        for i in range(0, len(items), self.QUERY_CHUNK_SIZE):
+            yield items[i : i + self.QUERY_CHUNK_SIZE]
+
+    def _load_apps(self, names):
+        """names: {lower name: name as written}"""
+        App = apps.get_model("api", "App")
+
+        for key in names:
+            self._apps.setdefault(key, [])
+
+        for chunk in self._chunks(names.values()):
+            for app in App.objects.filter(
+                reduce(or_, [Q(name__iexact=name) for name in chunk]),
+                organisation_id=self.organisation_id,
+            ):
+                rows = self._apps.setdefault(app.name.lower(), [])
+                if app not in rows:
+                    rows.append(app)
+
+    def _load_environments(self, names):
+        """names: {(app_id, lower env name): env name as written}"""
+        Environment = apps.get_model("api", "Environment")
+
+        for key in names:
+            self._environments.setdefault(key, [])
+
+        for chunk in self._chunks(names.items()):
+            query = reduce(
+                or_,
+                [Q(app_id=app_id, name__iexact=name) for (app_id, _), name in chunk],
+            )
+            for env in Environment.objects.filter(query).select_related("app"):
+                rows = self._environments.setdefault(
+                    (str(env.app_id), env.name.lower()), []
+                )
+                if env not in rows:
+                    rows.append(env)
+
+    def _load_secrets(self, environments, keys):
+        """
+        environments: {str(env_id): Environment}
+        keys: [(str(env_id), path, key_digest)]
+
+        Returns the newly loaded secrets.
+        """
+        Secret = apps.get_model("api", "Secret")
+
+        digests_by_location = defaultdict(set)
+        for env_id, path, key_digest in keys:
+            self._secrets.setdefault((env_id, path, key_digest), [])
+            digests_by_location[(env_id, path)].add(key_digest)
+
+        loaded = []
+        for chunk in self._chunks(digests_by_location.items()):
+            query = reduce(
+                or_,
+                [
+                    Q(environment_id=env_id, path=path, key_digest__in=digests)
+                    for (env_id, path), digests in chunk
+                ],
+            )
+            for secret in Secret.objects.filter(query, deleted_at=None):
+                env_id = str(secret.environment_id)
+                # Attach the already-loaded environment so resolving this
+                # secret's own references doesn't lazy-load it again.
+                secret.environment = environments[env_id]
+                rows = self._secrets.setdefault(
+                    (env_id, secret.path, secret.key_digest), []
+                )
+                rows.append(secret)
+                loaded.append(secret)
+        return loaded
+
+    def _can_prefetch(self, environment):
+        try:
+            return check_environment_access(
+                self.account, environment, False, access_cache=self.access_cache
+            )
+        except Exception:
+            return False
+
+    def prefetch(self, secrets):
+        """
+        Bulk-loads everything the given secrets (transitively) reference.
+
+        Args:
+            secrets (Iterable[Secret]): The batch about to be decrypted. Each
+                secret's environment must have an SSE crypto context.
+        """
+        ServerEnvironmentKey = apps.get_model("api", "ServerEnvironmentKey")
+
+        pending = list(secrets)
+
+        for _ in range(MAX_REFERENCE_DEPTH):
+            if not pending:
+                break
+
+            # (source env, path, key_name) for local refs, and name-based
+            # lookups for cross-env / cross-app refs.
+            local_refs = []
+            cross_env_refs = []
+            cross_app_refs = []
+            for secret in pending:
+                environment = secret.environment
+                try:
+                    _, env_pubkey, env_privkey = get_or_compute_crypto_context(
+                        environment, self.context_cache
+                    )
+                    value = self.decrypt(secret.value, env_privkey, env_pubkey)
+                except Exception:
+                    continue
+
+                for ref_app, ref_env, ref_key in CROSS_APP_ENV_PATTERN.findall(value):
+                    cross_app_refs.append((ref_app, ref_env, ref_key))
+                for ref_env, ref_key in CROSS_ENV_PATTERN.findall(value):
+                    cross_env_refs.append((str(environment.app_id), ref_env, ref_key))
+                for ref_key in LOCAL_REF_PATTERN.findall(value):
+                    local_refs.append((environment, ref_key))
+
+            # Resolve app names, then environment names, in one query each.
+            missing_apps = {
+                ref_app.lower(): ref_app
+                for ref_app, _, _ in cross_app_refs
+                if ref_app.lower() not in self._apps
+            }
+            if missing_apps:
+                self._load_apps(missing_apps)
+
+            targets = []  # (environment, ref_key)
+            env_lookups = []  # ((app_id, lower env name), ref_env, ref_key)
+            for ref_app, ref_env, ref_key in cross_app_refs:
+                app_rows = self._apps.get(ref_app.lower(), [])
+                if len(app_rows) == 1:
+                    env_lookups.append(
+                        ((str(app_rows[0].id), ref_env.lower()), ref_env, ref_key)
+                    )
+            for app_id, ref_env, ref_key in cross_env_refs:
+                env_lookups.append(((app_id, ref_env.lower()), ref_env, ref_key))
+
+            missing_envs = {
+                key: ref_env
+                for key, ref_env, _ in env_lookups
+                if key not in self._environments
+            }
+            if missing_envs:
+                self._load_environments(missing_envs)
+
+            for key, _, ref_key in env_lookups:
+                env_rows = self._environments.get(key, [])
+                if len(env_rows) == 1 and self._can_prefetch(env_rows[0]):
+                    targets.append((env_rows[0], ref_key))
+            targets.extend(local_refs)
+
+            # Compute digests with each target env's salt and load every
+            # referenced secret not already in the index.
+            environments = {}
+            secret_keys = []
+            for environment, ref_key in targets:
+                try:
+                    salt, _, _ = get_or_compute_crypto_context(
+                        environment, self.context_cache
+                    )
+                except ServerEnvironmentKey.DoesNotExist:
+                    continue
+                path, key_name = decompose_path_and_key(ref_key)
+                key = (str(environment.id), path, blake2b_digest(key_name, salt))
+                if key not in self._secrets:
+                    environments[str(environment.id)] = environment
+                    secret_keys.append(key)
+
+            pending = (
+                self._load_secrets(environments, secret_keys) if secret_keys else []
+            )
+
+
 def resolve_secret_value(
     environment,
     path,
@@ -313,6 +781,7 @@ def resolve_secret_value(
     require_resolved_references=False,
     account=None,
     context_cache=None,
+    reference_index=None,
     _visited=None,
 ):
     """
@@ -321,7 +790,8 @@ def resolve_secret_value(
     The referenced secret is decrypted via decrypt_secret_value so that any
     references nested inside it (local, cross-env or cross-app) are themselves
     resolved recursively. The _visited set is threaded through to break
-    reference cycles.
+    reference cycles. If a SecretReferenceIndex is given, the secret is looked
+    up in it rather than queried directly.
     """
     Secret = apps.get_model("api", "Secret")
 
@@ -333,12 +803,15 @@ def resolve_secret_value(
 
     key_digest = blake2b_digest(key_name, salt)
 
-    secret = Secret.objects.get(
-        environment=environment,
-        path=path,
-        key_digest=key_digest,
-        deleted_at=None,
-    )
+    if reference_index is not None:
+        secret = reference_index.get_secret(environment, path, key_digest)
+    else:
+        secret = Secret.objects.get(
+            environment=environment,
+            path=path,
+            key_digest=key_digest,
+            deleted_at=None,
+        )
 
     return decrypt_secret_value(
         secret,
@@ -346,6 +819,7 @@ def resolve_secret_value(
         account=account,
         crypto_context=crypto_context,
         context_cache=context_cache,
+        reference_index=reference_index,
         _visited=_visited,
     )
 
@@ -356,6 +830,7 @@ def decrypt_secret_value(
     account=None,
     crypto_context=None,
     context_cache=None,
+    reference_index=None,
     _visited=None,
 ):
     """
@@ -372,6 +847,7 @@ def decrypt_secret_value(
         account: (OrganisationMember | ServiceAccount): The account attempting to decrypt the secret value.
         crypto_context (tuple): Optional pre-computed (salt, pubkey, privkey) for the environment.
         context_cache (dict): Optional dictionary to cache crypto contexts for referenced environments.
+        reference_index (SecretReferenceIndex): Optional prefetched index to resolve references against.
         _visited (set): Internal — identities of secrets already on the current resolution branch, used for cycle detection.
 
     Returns:
@@ -398,6 +874,12 @@ def decrypt_secret_value(
         )
     _visited = _visited | {secret_identity}
 
+    access_cache = None
+    if reference_index is not None:
+        access_cache = reference_index.access_cache
+        if context_cache is None:
+            context_cache = reference_index.context_cache
+
     # Pre-compute current env context
     if crypto_context:
         current_env_crypto_context = crypto_context
@@ -412,7 +894,10 @@ def decrypt_secret_value(
     env_salt, env_pubkey, env_privkey = current_env_crypto_context
 
     # Decrypt secret value
-    value = decrypt_asymmetric(secret.value, env_privkey, env_pubkey)
+    if reference_index is not None:
+        value = reference_index.decrypt(secret.value, env_privkey, env_pubkey)
+    else:
+        value = decrypt_asymmetric(secret.value, env_privkey, env_pubkey)
 
     # Resolve cross-app and cross-env references
     cross_app_env_matches = re.findall(CROSS_APP_ENV_PATTERN, value)
@@ -422,16 +907,26 @@ def decrypt_secret_value(
         try:
             path, key_name = decompose_path_and_key(ref_key)
 
-            referenced_app = App.objects.get(
-                name__iexact=ref_app, organisation=secret.environment.app.organisation
-            )
-
-            referenced_environment = Environment.objects.get(
-                name__iexact=ref_env, app=referenced_app
-            )
+            if reference_index is not None:
+                referenced_app = reference_index.get_app(ref_app)
+                referenced_environment = reference_index.get_environment(
+                    referenced_app.id, ref_env
+                )
+            else:
+                referenced_app = App.objects.get(
+                    name__iexact=ref_app,
+                    organisation=secret.environment.app.organisation,
+                )
+
+                referenced_environment = Environment.objects.get(
+                    name__iexact=ref_env, app=referenced_app
+                )
 
             if not check_environment_access(
-                account, referenced_environment, require_resolved_references
+                account,
+                referenced_environment,
+                require_resolved_references,
+                access_cache=access_cache,
             ):
                 return value
 
@@ -447,6 +942,7 @@ def decrypt_secret_value(
                 require_resolved_references=require_resolved_references,
                 account=account,
                 context_cache=context_cache,
+                reference_index=reference_index,
                 _visited=_visited,
             )
 
@@ -483,12 +979,20 @@ def decrypt_secret_value(
         try:
             path, key_name = decompose_path_and_key(ref_key)
 
-            referenced_environment = Environment.objects.get(
-                name__iexact=ref_env, app=secret.environment.app
-            )
+            if reference_index is not None:
+                referenced_environment = reference_index.get_environment(
+                    secret.environment.app_id, ref_env
+                )
+            else:
+                referenced_environment = Environment.objects.get(
+                    name__iexact=ref_env, app=secret.environment.app
+                )
 
             if not check_environment_access(
-                account, referenced_environment, require_resolved_references
+                account,
+                referenced_environment,
+                require_resolved_references,
+                access_cache=access_cache,
             ):
                 return value
 
@@ -504,6 +1008,7 @@ def decrypt_secret_value(
                 require_resolved_references=require_resolved_references,
                 account=account,
                 context_cache=context_cache,
+                reference_index=reference_index,
                 _visited=_visited,
             )
 
@@ -538,6 +1043,7 @@ def decrypt_secret_value(
                 require_resolved_references=require_resolved_references,
                 account=account,
                 context_cache=context_cache,
+                reference_index=reference_index,
                 _visited=_visited,
             )
 
@@ -556,77 +1062,324 @@ def decrypt_secret_value(
     return value
 
 
-def get_referenced_environment_ids(source_env_id, name_ctx):
+def get_secret_reference_names(value):
     """
-    Returns the set of environment IDs that the secrets in source_env directly
-    reference via cross-env (${ENV.KEY}) or cross-app (${APP::ENV.KEY}) references.
-
-    Reference names are resolved to environment IDs using the pre-built name_ctx
-    maps (so the caller can build a reference graph and follow chains transitively
-    when deciding which syncs to trigger). Returns IDs as strings.
+    Returns the cross-environment references in a decrypted secret value, by name.
 
     Args:
-        source_env_id: ID of the environment whose secrets to scan.
-        name_ctx (dict): Pre-built org-wide lookups:
-            - "apps_by_name": {lower app name: app_id} (unambiguous names only)
-            - "ambiguous_apps": set of lower app names that occur more than once
-            - "envs_by_app_name": {(str(app_id), lower env name): str(env_id)}
+        value (str): The decrypted secret value.
 
     Returns:
-        set[str]: Environment IDs referenced by source_env's secrets.
+        set[tuple[str, str]]: (app_name, environment_name) pairs, lowercased.
+            app_name is "" for same-app ${ENV.KEY} references.
     """
-    Secret = apps.get_model("api", "Secret")
+    names = set()
+
+    for ref_app, ref_env, _ in CROSS_APP_ENV_PATTERN.findall(value):
+        names.add((ref_app.lower(), ref_env.lower()))
+
+    for ref_env, _ in CROSS_ENV_PATTERN.findall(value):
+        names.add(("", ref_env.lower()))
+
+    return names
+
+
+def _write_secret_references(secrets):
+    SecretReference = apps.get_model("api", "SecretReference")
     ServerEnvironmentKey = apps.get_model("api", "ServerEnvironmentKey")
-    Environment = apps.get_model("api", "Environment")
 
-    try:
-        source_env = Environment.objects.select_related("app").get(id=source_env_id)
-    except Environment.DoesNotExist:
-        return set()
+    rows = []
+    for secret in secrets:
+        if secret.deleted_at is not None:
+            continue
+
+        try:
+            _, _, env_pubkey, env_privkey = _get_environment_key_material(
+                secret.environment_id
+            )
+        except ServerEnvironmentKey.DoesNotExist:
+            continue
+
+        try:
+            value = decrypt_asymmetric(secret.value, env_privkey, env_pubkey)
+        except Exception:
+            continue
+
+        for app_name, environment_name in get_secret_reference_names(value):
+            rows.append(
+                SecretReference(
+                    secret_id=secret.id,
+                    environment_id=secret.environment_id,
+                    app_name=app_name,
+                    environment_name=environment_name,
+                )
+            )
+
+    with transaction.atomic():
+        SecretReference.objects.filter(
+            secret_id__in=[secret.id for secret in secrets]
+        ).delete()
+        if rows:
+            SecretReference.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def update_secret_references(secrets):
+    """
+    Refreshes the stored SecretReference edges for the given secrets.
+
+    Called by the secret write paths before they notify the environment, so the
+    referencing-sync detection dispatched from Environment.save() sees the new
+    graph. Only the written secrets are decrypted. Deleted secrets, and secrets
+    in environments without SSE (whose values the server can't read), simply
+    lose their edges.
+
+    Failures are logged rather than raised: the index is derived data and must
+    not fail the write that triggered it (rebuild_secret_references repairs it).
+
+    Args:
+        secrets (iterable[Secret]): Secrets that were created, updated or deleted.
+    """
+    secrets = list(secrets)
+    if not secrets:
+        return
 
     try:
-        server_env_key = ServerEnvironmentKey.objects.get(environment_id=source_env_id)
-    except ServerEnvironmentKey.DoesNotExist:
-        return set()
+        _write_secret_references(secrets)
+    except Exception:
+        logger.exception("Failed to update secret reference index")
 
-    pk, sk = get_server_keypair()
+
+def index_environment_references(environment_id, batch_size=500):
+    """
+    Indexes all of an environment's secrets, then marks the environment as
+    indexed so readers of the index stop falling back to decryption.
+
+    Unlike update_secret_references, failures are raised, leaving the
+    environment unindexed.
+
+    Returns:
+        int: The number of reference edges stored for the environment.
+    """
+    Environment = apps.get_model("api", "Environment")
+    Secret = apps.get_model("api", "Secret")
+    SecretReference = apps.get_model("api", "SecretReference")
+
+    secret_ids = list(
+        Secret.objects.filter(environment_id=environment_id, deleted_at=None)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    for start in range(0, len(secret_ids), batch_size):
+        _write_secret_references(
+            list(Secret.objects.filter(id__in=secret_ids[start : start + batch_size]))
+        )
+
+    Environment.objects.filter(id=environment_id).update(
+        secret_references_indexed=True
+    )
+    return SecretReference.objects.filter(environment_id=environment_id).count()
+
+
+def get_referenced_environment_ids(source_env_id, source_app_id, name_ctx):
+    """
+    Returns the environment IDs that an environment's secrets directly
+    reference, by decrypting them.
+
+    Only for environments whose references are not indexed yet (see
+    Environment.secret_references_indexed); everything else reads the
+    SecretReference graph.
+
+    Args:
+        source_env_id: ID of the environment whose secrets to scan.
+        source_app_id: ID of its app, for same-app ${ENV.KEY} references.
+        name_ctx (dict): Pre-built org-wide lookups, as for
+            get_environment_reference_graph.
+
+    Returns:
+        set[str]: Environment IDs referenced by the environment's secrets.
+    """
+    Secret = apps.get_model("api", "Secret")
 
     try:
-        env_seed = decrypt_asymmetric(server_env_key.wrapped_seed, sk.hex(), pk.hex())
-        env_pubkey, env_privkey = env_keypair(env_seed)
+        _, _, env_pubkey, env_privkey = _get_environment_key_material(source_env_id)
     except Exception:
         return set()
 
-    apps_by_name = name_ctx["apps_by_name"]
-    ambiguous_apps = name_ctx["ambiguous_apps"]
-    envs_by_app_name = name_ctx["envs_by_app_name"]
-    source_app_id = str(source_env.app_id)
-
     referenced = set()
-
-    for secret in Secret.objects.filter(environment_id=source_env_id, deleted_at=None):
+    for value in Secret.objects.filter(
+        environment_id=source_env_id, deleted_at=None
+    ).values_list("value", flat=True):
         try:
-            value = decrypt_asymmetric(secret.value, env_privkey, env_pubkey)
+            value = decrypt_asymmetric(value, env_privkey, env_pubkey)
         except Exception:
             continue
 
-        # Cross-app references: ${APP::ENV.KEY}
-        for ref_app, ref_env, _ in CROSS_APP_ENV_PATTERN.findall(value):
-            app_key = ref_app.lower()
-            if app_key in ambiguous_apps:
-                # Can't unambiguously resolve which app is meant — skip.
-                continue
-            app_id = apps_by_name.get(app_key)
-            if app_id is None:
-                continue
-            env_id = envs_by_app_name.get((str(app_id), ref_env.lower()))
-            if env_id:
-                referenced.add(env_id)
-
-        # Cross-env references: ${ENV.KEY} (same app)
-        for ref_env, _ in CROSS_ENV_PATTERN.findall(value):
-            env_id = envs_by_app_name.get((source_app_id, ref_env.lower()))
-            if env_id:
-                referenced.add(env_id)
+        for app_name, environment_name in get_secret_reference_names(value):
+            target_env_id = _resolve_reference_target(
+                source_app_id, app_name, environment_name, name_ctx
+            )
+            if target_env_id:
+                referenced.add(target_env_id)
 
     return referenced
+
+
+def get_environment_reference_graph(organisation, name_ctx):
+    """
+    Returns the org's environment reference graph from the stored
+    SecretReference edges, in a single query and without decrypting anything.
+
+    Reference names are resolved to environment IDs using the pre-built name_ctx
+    maps. Cross-app references to ambiguously named apps, and references to
+    apps or environments that don't exist, are dropped.
+
+    Args:
+        organisation (Organisation): The organisation whose graph to load.
+        name_ctx (dict): Pre-built org-wide lookups:
+            - "apps_by_name": {lower app name: app_id} (unambiguous names only)
+            - "ambiguous_apps": set of lower app names that occur more than once
+            - "envs_by_app_name": {(str(app_id), lower env name): str(env_id)}
+
+    Returns:
+        dict[str, set[str]]: Source environment ID -> directly referenced
+            environment IDs.
+    """
+    SecretReference = apps.get_model("api", "SecretReference")
+
+    edges = (
+        SecretReference.objects.filter(
+            environment__app__organisation=organisation,
+            secret__deleted_at=None,
+        )
+        .values_list(
+            "environment_id", "environment__app_id", "app_name", "environment_name"
+        )
+        .distinct()
+    )
+
+    graph = defaultdict(set)
+    for source_env_id, source_app_id, app_name, environment_name in edges:
+        target_env_id = _resolve_reference_target(
+            source_app_id, app_name, environment_name, name_ctx
+        )
+        if target_env_id:
+            graph[str(source_env_id)].add(target_env_id)
+
+    return dict(graph)
+
+
+def _resolve_reference_target(source_app_id, app_name, environment_name, name_ctx):
+    """
+    Resolves a stored (app_name, environment_name) edge to an environment ID,
+    or None if it doesn't resolve. Cross-app references to ambiguously named
+    apps are never resolved.
+    """
+    if app_name:
+        if app_name in name_ctx["ambiguous_apps"]:
+            # Can't unambiguously resolve which app is meant — skip.
+            return None
+        target_app_id = name_ctx["apps_by_name"].get(app_name)
+        if target_app_id is None:
+            return None
+    else:
+        target_app_id = source_app_id
+
+    return name_ctx["envs_by_app_name"].get((str(target_app_id), environment_name))
+
+
+def get_referenced_environment_versions(environment):
+    """
+    Returns the last-modified time of every environment that the given
+    environment's secrets reference, directly or transitively.
+
+    Walks the stored SecretReference graph outward from the environment, one
+    query per hop, so nothing is decrypted. An environment without references
+    (the common case) costs a single query. Used to build version tokens for
+    resolved secret values, which change whenever a referenced environment does.
+
+    Args:
+        environment (Environment): The environment whose references to follow.
+
+    Returns:
+        dict[str, datetime] | None: Referenced environment ID -> updated_at, or
+            None if the walk reaches an environment whose references are not
+            indexed yet (see Environment.secret_references_indexed), so they
+            can't be followed.
+    """
+    if not environment.secret_references_indexed:
+        return None
+
+    App = apps.get_model("api", "App")
+    Environment = apps.get_model("api", "Environment")
+    SecretReference = apps.get_model("api", "SecretReference")
+
+    source_env_id = str(environment.id)
+    name_ctx = None
+    env_versions = {}
+    unindexed = set()
+    visited = {source_env_id}
+    frontier = [source_env_id]
+
+    for _ in range(MAX_REFERENCE_DEPTH):
+        edges = list(
+            SecretReference.objects.filter(
+                environment_id__in=frontier, secret__deleted_at=None
+            )
+            .values_list("environment__app_id", "app_name", "environment_name")
+            .distinct()
+        )
+        if not edges:
+            break
+
+        if name_ctx is None:
+            # Only load the org's name maps once there is something to resolve.
+            organisation_id = environment.app.organisation_id
+            apps_by_name = {}
+            ambiguous_apps = set()
+            for app_id, app_name in App.objects.filter(
+                organisation_id=organisation_id, deleted_at=None
+            ).values_list("id", "name"):
+                key = app_name.lower()
+                if key in apps_by_name:
+                    ambiguous_apps.add(key)
+                apps_by_name[key] = app_id
+
+            envs_by_app_name = {}
+            for (
+                env_id,
+                app_id,
+                env_name,
+                updated_at,
+                indexed,
+            ) in Environment.objects.filter(
+                app__organisation_id=organisation_id, deleted_at=None
+            ).values_list(
+                "id", "app_id", "name", "updated_at", "secret_references_indexed"
+            ):
+                envs_by_app_name[(str(app_id), env_name.lower())] = str(env_id)
+                env_versions[str(env_id)] = updated_at
+                if not indexed:
+                    unindexed.add(str(env_id))
+
+            name_ctx = {
+                "apps_by_name": apps_by_name,
+                "ambiguous_apps": ambiguous_apps,
+                "envs_by_app_name": envs_by_app_name,
+            }
+
+        frontier = []
+        for source_app_id, app_name, environment_name in edges:
+            target_env_id = _resolve_reference_target(
+                source_app_id, app_name, environment_name, name_ctx
+            )
+            if target_env_id and target_env_id not in visited:
+                if target_env_id in unindexed:
+                    return None
+                visited.add(target_env_id)
+                frontier.append(target_env_id)
+
+        if not frontier:
+            break
+
+    visited.discard(source_env_id)
+    return {env_id: env_versions[env_id] for env_id in visited}
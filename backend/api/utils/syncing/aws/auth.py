@@ -1,7 +1,14 @@
-from api.utils.crypto import decrypt_asymmetric, get_server_keypair
+from api.utils.crypto import decrypt_asymmetric, encrypt_asymmetric, get_server_keypair
 import boto3
+import hashlib
+import json
+from datetime import datetime, timezone
+from django.core.cache import cache
 from backend.utils.secrets import get_secret
 
+# Assumed-role credentials are reused until this many seconds before expiry.
+ASSUMED_ROLE_EXPIRY_MARGIN = 300
+
 
 def get_client(AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, region):
     session = boto3.Session(
@@ -12,9 +19,59 @@ def get_client(AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, region):
     return session.client("secretsmanager")
 
 
+def _assumed_role_cache_key(role_arn, region, external_id):
+    digest = hashlib.sha256(
+        json.dumps([role_arn, region, external_id]).encode()
+    ).hexdigest()
+    return f"aws-assumed-role:{digest}"
+
+
+def _get_cached_role_credentials(cache_key):
+    try:
+        ciphertext = cache.get(cache_key)
+        if not ciphertext:
+            return None
+        pk, sk = get_server_keypair()
+        return json.loads(decrypt_asymmetric(ciphertext, sk.hex(), pk.hex()))
+    except Exception:
+        return None
+
+
+def _cache_role_credentials(cache_key, credentials):
+    """Cache temporary credentials, encrypted, until shortly before they expire."""
+    expiration = credentials.get("Expiration")
+    if not isinstance(expiration, datetime):
+        return
+    if expiration.tzinfo is None:
+        expiration = expiration.replace(tzinfo=timezone.utc)
+    timeout = int(
+        (expiration - datetime.now(timezone.utc)).total_seconds()
+        - ASSUMED_ROLE_EXPIRY_MARGIN
+    )
+    if timeout <= 0:
+        return
+
+    payload = json.dumps(
+        {
+            "AccessKeyId": credentials["AccessKeyId"],
+            "SecretAccessKey": credentials["SecretAccessKey"],
+            "SessionToken": credentials["SessionToken"],
+        }
+    )
+    try:
+        pk, _ = get_server_keypair()
+        cache.set(cache_key, encrypt_asymmetric(payload, pk.hex()), timeout=timeout)
+    except Exception:
+        pass
+
+
 def get_aws_sts_session(role_arn, region=None, external_id=None):
     """
     Create a boto3 session using STS assume role.
+
+    The temporary credentials are cached (encrypted with the server keypair)
+    per role, region and external ID until shortly before they expire, so
+    repeated syncs against the same role share one AssumeRole call.
     
     Args:
         role_arn (str): The ARN of the role to assume
@@ -24,35 +81,40 @@ def get_aws_sts_session(role_arn, region=None, external_id=None):
     Returns:
         boto3.Session: Session with temporary credentials
     """
-    # Check for supplied AWS integration credentials for non-AWS environments.
-    aws_access_key_id = get_secret('AWS_INTEGRATION_ACCESS_KEY_ID')
-    aws_secret_access_key = get_secret('AWS_INTEGRATION_SECRET_ACCESS_KEY')
-    
-    if aws_access_key_id and aws_secret_access_key:
-        # Use provided integration credentials
-        sts_client = boto3.client(
-            'sts',
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            region_name=region
-        )
-    else:
-        # Use instance/machine roles for when running in AWS environments.
-        sts_client = boto3.client('sts', region_name=region)
-    
-    # Build assume role parameters
-    assume_role_params = {
-        'RoleArn': role_arn,
-        'RoleSessionName': 'phase-sync-session'
-    }
-    
-    if external_id:
-        assume_role_params['ExternalId'] = external_id
-    
-    # Assume the role
-    response = sts_client.assume_role(**assume_role_params)
-    
-    credentials = response['Credentials']
+    cache_key = _assumed_role_cache_key(role_arn, region, external_id)
+    credentials = _get_cached_role_credentials(cache_key)
+
+    if credentials is None:
+        # Check for supplied AWS integration credentials for non-AWS environments.
+        aws_access_key_id = get_secret('AWS_INTEGRATION_ACCESS_KEY_ID')
+        aws_secret_access_key = get_secret('AWS_INTEGRATION_SECRET_ACCESS_KEY')
+        
+        if aws_access_key_id and aws_secret_access_key:
+            # Use provided integration credentials
+            sts_client = boto3.client(
+                'sts',
+                aws_access_key_id=aws_access_key_id,
+                aws_secret_access_key=aws_secret_access_key,
+                region_name=region
+            )
+        else:
+            # Use instance/machine roles for when running in AWS environments.
+            sts_client = boto3.client('sts', region_name=region)
+        
+        # Build assume role parameters
+        assume_role_params = {
+            'RoleArn': role_arn,
+            'RoleSessionName': 'phase-sync-session'
+        }
+        
+        if external_id:
+            assume_role_params['ExternalId'] = external_id
+        
+        # Assume the role
+        response = sts_client.assume_role(**assume_role_params)
+        
+        credentials = response['Credentials']
+        _cache_role_credentials(cache_key, credentials)
     
     # Create session with temporary credentials
     session = boto3.Session(
@@ -44,6 +44,50 @@ def list_aws_secrets(region, AWS_ACCESS_KEY_ID=None, AWS_SECRET_ACCESS_KEY=None,
         raise Exception(f"Failed to list AWS Secrets: {str(e)}")
 
 
+def _is_access_denied(error):
+    return error.response.get("Error", {}).get("Code") in (
+        "AccessDenied",
+        "AccessDeniedException",
+    )
+
+
+def _get_remote_secret(secrets_client, secret_id):
+    """
+    Fetch the current value of a secret.
+
+    Returns (exists, values): `values` is the decoded JSON object, or None
+    when the secret is missing or does not hold a JSON object. `exists` is
+    None when the credentials may not read the secret.
+    """
+    try:
+        response = secrets_client.get_secret_value(SecretId=secret_id)
+    except secrets_client.exceptions.ResourceNotFoundException:
+        return False, None
+    except ClientError as e:
+        if not _is_access_denied(e):
+            raise
+        return None, None
+
+    try:
+        values = json.loads(response.get("SecretString"))
+    except (TypeError, ValueError):
+        return True, None
+    return True, values if isinstance(values, dict) else None
+
+
+def _kms_key_matches(secrets_client, secret_id, kms_id):
+    """Whether the secret is already encrypted with `kms_id` (an ID, ARN or alias)."""
+    try:
+        current = secrets_client.describe_secret(SecretId=secret_id).get("KmsKeyId")
+    except ClientError as e:
+        if not _is_access_denied(e):
+            raise
+        return False
+    if not isinstance(current, str):
+        return False
+    return current == kms_id or current.endswith((f":{kms_id}", f"/{kms_id}"))
+
+
 def sync_aws_secrets(
     secrets,
     region,
@@ -57,6 +101,13 @@ def sync_aws_secrets(
 ):
     """
     Sync secrets to AWS Secrets Manager using either access keys or assume role.
+
+    The current remote value is fetched first, and nothing is written when it
+    already matches (including the KMS key, if one is set). Every write
+    creates a new secret version, so unchanged syncs are kept read-only.
+    Credentials without GetSecretValue or DescribeSecret permission fall back
+    to writing unconditionally.
+
     Args:
         secrets (list of tuple): List of key-value pairs to sync.
         region (str): AWS region.
@@ -85,37 +136,46 @@ def sync_aws_secrets(
         else:
             return False, {"message": "Please provide either AssumeRole parameters or access keys."}
 
+        secret_id = arn or secret_name
+        if not secret_id:
+            return False, {"message": "Please provide either a secret ARN or a name."}
+
+        exists, remote_values = _get_remote_secret(secrets_client, secret_id)
+
+        if (
+            exists
+            and remote_values == secrets_dict
+            and (not kms_id or _kms_key_matches(secrets_client, secret_id, kms_id))
+        ):
+            return True, {"message": f"Secret '{secret_id}' is already up to date."}
+
         # Format the secrets into a JSON string
         secret_string = json.dumps(secrets_dict)
+        update_args = {"SecretId": secret_id, "SecretString": secret_string}
+        if kms_id:
+            update_args["KmsKeyId"] = kms_id
 
-        # Updating or creating the secret
-        if arn:
-            update_args = {"SecretId": arn, "SecretString": secret_string}
-            if kms_id:
-                update_args["KmsKeyId"] = kms_id
+        # Updating or creating the secret. A missing ARN is left to
+        # update_secret to report, as only names can be created.
+        if exists or arn:
             secrets_client.update_secret(**update_args)
-            return True, {"message": f"Secret '{arn}' updated with provided secrets."}
-        elif secret_name:
-            try:
-                secrets_client.get_secret_value(SecretId=secret_name)
-                update_operation = True
-            except secrets_client.exceptions.ResourceNotFoundException:
-                update_operation = False
+            if arn:
+                return True, {"message": f"Secret '{arn}' updated with provided secrets."}
+            return True, {"message": f"Existing secret '{secret_name}' updated."}
 
-            if update_operation:
-                update_args = {"SecretId": secret_name, "SecretString": secret_string}
-                if kms_id:
-                    update_args["KmsKeyId"] = kms_id
+        # A name we couldn't read is updated, and only created if missing.
+        if exists is None:
+            try:
                 secrets_client.update_secret(**update_args)
                 return True, {"message": f"Existing secret '{secret_name}' updated."}
-            else:
-                create_args = {"Name": secret_name, "SecretString": secret_string}
-                if kms_id:
-                    create_args["KmsKeyId"] = kms_id
-                secrets_client.create_secret(**create_args)
-                return True, {"message": f"New secret '{secret_name}' created."}
-        else:
-            return False, {"message": "Please provide either a secret ARN or a name."}
+            except secrets_client.exceptions.ResourceNotFoundException:
+                pass
+
+        create_args = {"Name": secret_name, "SecretString": secret_string}
+        if kms_id:
+            create_args["KmsKeyId"] = kms_id
+        secrets_client.create_secret(**create_args)
+        return True, {"message": f"New secret '{secret_name}' created."}
 
     except ClientError as e:
         return False, {"message": str(e)}
@@ -2,14 +2,22 @@ import re
 import json
 import time
 import logging
+import threading
 import graphene
 from graphene import ObjectType
 from azure.core.exceptions import HttpResponseError
 
+from api.utils.syncing.planner import map_parallel
+from api.utils.syncing.rate_limits import note_rate_limit
+from api.utils.syncing.secrets import secret_value_digest
 from .auth import get_azure_client_credential, get_kv_client
 
 logger = logging.getLogger(__name__)
 
+# Concurrent Key Vault requests per individual-mode sync. Stays within the
+# SDK transport's default connection pool (10).
+AZURE_KV_SYNC_MAX_WORKERS = 8
+
 AZURE_KV_URI_PATTERN = re.compile(
     r"^https://[a-zA-Z](?!.*--)[a-zA-Z0-9-]{1,22}[a-zA-Z0-9]\.vault\."
     r"(azure\.net"            # Public cloud
@@ -42,9 +50,33 @@ class AzureKeyVaultSecretType(ObjectType):
     content_type = graphene.String()
 
 
-def _retry_on_rate_limit(func, *args, max_retries=3, **kwargs):
-    """Retry a function call with exponential backoff on 429 rate limit and 409 conflict errors."""
+class _VaultThrottle:
+    """Shared pause for the workers of one sync: a 429 on any request holds back all of them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+
+    def wait(self):
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+
+def _retry_on_rate_limit(func, *args, max_retries=3, throttle=None, **kwargs):
+    """Retry a function call with exponential backoff on 429 rate limit and 409 conflict errors.
+
+    With a `throttle`, a 429 pauses every worker sharing it rather than only
+    the caller.
+    """
     for attempt in range(max_retries + 1):
+        if throttle is not None:
+            throttle.wait()
         try:
             return func(*args, **kwargs)
         except HttpResponseError as e:
@@ -64,7 +96,13 @@ def _retry_on_rate_limit(func, *args, max_retries=3, **kwargs):
                     max_retries,
                     wait_time,
                 )
-                time.sleep(wait_time)
+                if e.status_code == 429:
+                    # Let the sync scheduler hold back other syncs on this credential.
+                    note_rate_limit(wait_time)
+                if throttle is not None and e.status_code == 429:
+                    throttle.pause(wait_time)
+                else:
+                    time.sleep(wait_time)
             else:
                 raise
 
@@ -149,17 +187,22 @@ def _http_error_hint(status_code):
 
 
 def sync_azure_kv_individual(
-    secrets, tenant_id, client_id, client_secret, vault_uri
+    secrets, tenant_id, client_id, client_secret, vault_uri, value_digests=None
 ):
     """Sync individual secrets to Azure Key Vault.
 
     Each Phase secret becomes a separate KV secret.
     Secrets not in Phase are disabled in KV.
 
+    The vault is listed once and only changed secrets are written, on a
+    bounded worker pool sharing one credential and client.
+
     Args:
         secrets: List of (key, value, comment) tuples from Phase.
         tenant_id, client_id, client_secret: Azure credentials.
         vault_uri: The vault URL (e.g. https://myvault.vault.azure.net).
+        value_digests (dict): Digests of previously synced values, updated in
+            place. Enabled secrets with a matching digest are skipped.
 
     Returns:
         tuple: (bool, dict) indicating success/failure and a message.
@@ -179,30 +222,77 @@ def sync_azure_kv_individual(
 
         credential = get_azure_client_credential(tenant_id, client_id, client_secret)
         client = get_kv_client(credential, vault_uri)
+        throttle = _VaultThrottle()
 
         # Get current state of the vault (all secrets with enabled status)
         existing_secrets = list_all_kv_secrets(client)
         deleted_secrets = set(list_deleted_kv_secrets(client))
 
-        # Sync each Phase secret
+        writes = []
         for kv_name, value in phase_secrets.items():
+            digest = secret_value_digest(vault_uri, kv_name, value)
+            if (
+                value_digests is not None
+                and existing_secrets.get(kv_name)
+                and value_digests.get(kv_name) == digest
+            ):
+                continue
+            writes.append((kv_name, value, digest))
+
+        def write(item):
+            kv_name, value, digest = item
             try:
                 if kv_name in deleted_secrets:
-                    _retry_on_rate_limit(recover_kv_secret, client, kv_name)
-                _retry_on_rate_limit(set_kv_secret, client, kv_name, value)
+                    _retry_on_rate_limit(
+                        recover_kv_secret, client, kv_name, throttle=throttle
+                    )
+                _retry_on_rate_limit(
+                    set_kv_secret, client, kv_name, value, throttle=throttle
+                )
                 # Re-enable if it was previously disabled
                 if kv_name in existing_secrets and not existing_secrets[kv_name]:
-                    _retry_on_rate_limit(enable_kv_secret, client, kv_name)
+                    _retry_on_rate_limit(
+                        enable_kv_secret, client, kv_name, throttle=throttle
+                    )
             except HttpResponseError as e:
-                logger.error("Azure KV sync error for secret: HTTP %s", e.status_code)
-                return False, {
-                    "message": f"Failed to sync secret '{kv_name}' (HTTP {e.status_code}). {_http_error_hint(e.status_code)}"
-                }
+                return kv_name, None, e
+            return kv_name, digest, None
+
+        # Sync each changed Phase secret
+        failure = None
+        for kv_name, digest, error in map_parallel(
+            write, writes, AZURE_KV_SYNC_MAX_WORKERS
+        ):
+            if error is None:
+                if value_digests is not None:
+                    value_digests[kv_name] = digest
+            elif failure is None:
+                failure = (kv_name, error)
+
+        if failure:
+            kv_name, e = failure
+            logger.error("Azure KV sync error for secret: HTTP %s", e.status_code)
+            return False, {
+                "message": f"Failed to sync secret '{kv_name}' (HTTP {e.status_code}). {_http_error_hint(e.status_code)}"
+            }
 
         # Disable KV secrets not in Phase (both enabled and disabled are tracked)
-        for kv_name, is_enabled in existing_secrets.items():
-            if kv_name not in phase_secrets and is_enabled:
-                _retry_on_rate_limit(disable_kv_secret, client, kv_name)
+        map_parallel(
+            lambda kv_name: _retry_on_rate_limit(
+                disable_kv_secret, client, kv_name, throttle=throttle
+            ),
+            [
+                kv_name
+                for kv_name, is_enabled in existing_secrets.items()
+                if kv_name not in phase_secrets and is_enabled
+            ],
+            AZURE_KV_SYNC_MAX_WORKERS,
+        )
+
+        if value_digests is not None:
+            for kv_name in list(value_digests):
+                if kv_name not in phase_secrets:
+                    del value_digests[kv_name]
 
         return True, {
             "message": f"Successfully synced {len(phase_secrets)} secrets to Azure Key Vault"
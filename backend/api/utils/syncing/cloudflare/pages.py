@@ -3,6 +3,14 @@ import requests
 from api.utils.crypto import decrypt_asymmetric, get_server_keypair
 import graphene
 from graphene import ObjectType
+from api.utils.syncing.planner import (
+    UNKNOWN,
+    dry_run_result,
+    is_dry_run,
+    plan_sync,
+    plannable,
+)
+from api.utils.syncing.rate_limits import note_rate_limit_response
 from .auth import CLOUDFLARE_API_BASE_URL, get_cloudflare_headers
 
 
@@ -62,14 +70,26 @@ def get_cf_pages_credentials(environment_sync):
 # with the local secrets.json file. It demonstrates a common pattern of
 # fetching existing data, comparing it to the desired state, and making
 # the necessary changes to reach that state.
+@plannable
 def sync_cloudflare_secrets(
-    secrets, ACCOUNT_ID, ACCESS_TOKEN, project_name, project_environment
+    secrets,
+    ACCOUNT_ID,
+    ACCESS_TOKEN,
+    project_name,
+    project_environment,
+    value_digests=None,
 ):
-    """Sync secrets to Cloudflare page."""
+    """
+    Sync secrets to Cloudflare page.
+
+    Only changed variables are sent; unchanged secret values are recognised
+    by `value_digests` (updated in place), as Cloudflare doesn't return them.
+    """
     try:
         url = f"{CLOUDFLARE_API_BASE_URL}/accounts/{ACCOUNT_ID}/pages/projects/{project_name}"
 
         response = requests.get(url, headers=get_cloudflare_headers(ACCESS_TOKEN))
+        note_rate_limit_response(response)
         if response.status_code != 200:
             return False, {
                 "response_code": response.status_code,
@@ -83,14 +103,27 @@ def sync_cloudflare_secrets(
             .get("env_vars", {})
         )
 
-        new_vars = {}
-        for key, value, _ in secrets:
-            new_vars[key] = {"type": "secret_text", "value": value}
+        # Secret values aren't returned, only plain text ones.
+        remote_vars = {
+            key: var if var and var.get("type") == "plain_text" else UNKNOWN
+            for key, var in (existing_vars or {}).items()
+        }
+        plan = plan_sync(
+            {key: {"type": "secret_text", "value": value} for key, value, _ in secrets},
+            remote_vars,
+            value_digests=value_digests,
+            digest_scope=(ACCOUNT_ID, project_name, project_environment),
+        )
+        if is_dry_run():
+            return dry_run_result(plan)
+        if not plan:
+            return True, {"message": "No changes needed. Secrets are already synchronized."}
 
-        if existing_vars is not None:
-            for existing_key in existing_vars:
-                if not any(key == existing_key for key, _, _ in secrets):
-                    new_vars[existing_key] = None
+        # env_vars are merged into the deployment config, so only changed
+        # variables are sent. Removed variables are set to None.
+        new_vars = {**plan.creates, **plan.updates}
+        for existing_key in plan.deletes:
+            new_vars[existing_key] = None
 
         payload = {
             "deployment_configs": {
@@ -105,7 +138,13 @@ def sync_cloudflare_secrets(
         update_response = requests.patch(
             url, headers=get_cloudflare_headers(ACCESS_TOKEN), json=payload
         )
+        note_rate_limit_response(update_response)
         if update_response.status_code == 200:
+            for key, var in new_vars.items():
+                if var is None:
+                    plan.record_deleted(key)
+                else:
+                    plan.record_written(key, var)
             return True, {
                 "response_code": update_response.status_code,
                 "message": "Successfully synced secrets.",
@@ -4,6 +4,19 @@ import graphene
 from graphene import ObjectType
 from .auth import CLOUDFLARE_API_BASE_URL, get_cloudflare_headers
 from api.utils.crypto import decrypt_asymmetric, get_server_keypair
+from api.utils.syncing.planner import (
+    UNKNOWN,
+    SyncOperationError,
+    apply_plan,
+    dry_run_result,
+    is_dry_run,
+    plan_sync,
+    plannable,
+)
+from api.utils.syncing.rate_limits import note_rate_limit_response
+
+# Concurrent secret writes per sync.
+CLOUDFLARE_WORKERS_SYNC_MAX_WORKERS = 4
 
 class CloudflareWorkerType(ObjectType):
     name = graphene.String()
@@ -37,13 +50,24 @@ def get_cf_workers_credentials(environment_sync):
     )
     return account_id, access_token
 
-def sync_cloudflare_worker_secrets(secrets, ACCOUNT_ID, ACCESS_TOKEN, worker_name):
-    """Sync secrets to Cloudflare worker."""
+@plannable
+def sync_cloudflare_worker_secrets(
+    secrets, ACCOUNT_ID, ACCESS_TOKEN, worker_name, value_digests=None
+):
+    """
+    Sync secrets to Cloudflare worker.
+
+    Worker secrets are write-only, so unchanged values are recognised by
+    `value_digests` (updated in place) and only changed secrets are written.
+    """
     try:
         url = f"{CLOUDFLARE_API_BASE_URL}/accounts/{ACCOUNT_ID}/workers/scripts/{worker_name}/secrets"
-        
+        session = requests.Session()
+        session.headers.update(get_cloudflare_headers(ACCESS_TOKEN))
+        session.hooks["response"].append(note_rate_limit_response)
+
         # Get existing secrets
-        response = requests.get(url, headers=get_cloudflare_headers(ACCESS_TOKEN))
+        response = session.get(url)
         if response.status_code != 200:
             return False, {
                 "response_code": response.status_code,
@@ -51,46 +75,56 @@ def sync_cloudflare_worker_secrets(secrets, ACCOUNT_ID, ACCESS_TOKEN, worker_nam
             }
 
         existing_secrets = {secret["name"]: secret for secret in response.json().get("result", [])}
-        
-        # Delete secrets not in the new set
-        for secret_name in existing_secrets:
-            if not any(key == secret_name for key, _, _ in secrets):
-                delete_response = requests.delete(
-                    f"{url}/{secret_name}",
-                    headers=get_cloudflare_headers(ACCESS_TOKEN)
-                )
-                if delete_response.status_code != 200:
-                    return False, {
-                        "response_code": delete_response.status_code,
-                        "message": f"Error deleting secret {secret_name}: {delete_response.text}"
-                    }
+
+        plan = plan_sync(
+            {key: value for key, value, _ in secrets},
+            {name: UNKNOWN for name in existing_secrets},
+            value_digests=value_digests,
+            digest_scope=(ACCOUNT_ID, worker_name),
+        )
+        if is_dry_run():
+            return dry_run_result(plan)
 
         # Update or create secrets
-        for key, value, _ in secrets:
+        def write(key, value):
             payload = {
                 "name": key,
                 "text": value,
                 "type": "secret_text"
             }
-            response = requests.put(
-                url,
-                headers=get_cloudflare_headers(ACCESS_TOKEN),
-                json=payload
-            )
+            response = session.put(url, json=payload)
             if response.status_code not in [200, 201]:
-                return False, {
-                    "response_code": response.status_code,
-                    "message": f"Error syncing secret {key}: {response.text}"
-                }
+                raise SyncOperationError(
+                    f"Error syncing secret {key}: {response.text}",
+                    response.status_code,
+                )
+
+        # Delete secrets not in the new set
+        def delete(secret_name):
+            delete_response = session.delete(f"{url}/{secret_name}")
+            if delete_response.status_code != 200:
+                raise SyncOperationError(
+                    f"Error deleting secret {secret_name}: {delete_response.text}",
+                    delete_response.status_code,
+                )
+
+        apply_plan(
+            plan,
+            write,
+            delete=delete,
+            max_workers=CLOUDFLARE_WORKERS_SYNC_MAX_WORKERS,
+        )
 
         return True, {
             "response_code": 200,
             "message": "Successfully synced secrets."
         }
 
+    except SyncOperationError as e:
+        return False, {"response_code": e.response_code, "message": str(e)}
     except requests.RequestException as e:
         return False, {"message": f"HTTP request error: {str(e)}"}
     except json.JSONDecodeError:
         return False, {"message": "Error decoding JSON response"}
     except Exception as e:
-        return False, {"message": f"An unexpected error occurred: {str(e)}"} 
\ No newline at end of file
+        return False, {"message": f"An unexpected error occurred: {str(e)}"}
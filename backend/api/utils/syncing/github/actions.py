@@ -1,5 +1,9 @@
 from api.utils.crypto import decrypt_asymmetric, get_server_keypair
+from api.utils.syncing.planner import map_parallel
+from api.utils.syncing.rate_limits import note_rate_limit
+from api.utils.syncing.secrets import secret_value_digest
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import graphene
 from graphene import ObjectType
@@ -7,12 +11,22 @@ import nacl.encoding
 import nacl.public
 import base64
 import datetime
+import threading
+import time
 from django.apps import apps
 from django.conf import settings
 from api.utils.network import validate_url_is_safe
 
 GITHUB_CLOUD_API_URL = "https://api.github.com"
 
+# Concurrent secret writes per sync. Kept small: GitHub's secondary rate
+# limits penalise bursts of concurrent content-creating requests.
+GITHUB_SYNC_MAX_WORKERS = 4
+GITHUB_MAX_RETRIES = 3
+# Upper bound on a single rate-limit back-off, in seconds.
+GITHUB_MAX_RETRY_WAIT = 60
+GITHUB_SECRET_SIZE_LIMIT = 64 * 1024
+
 
 class GitHubRepoType(ObjectType):
     name = graphene.String()
@@ -216,10 +230,191 @@ def encrypt_secret(public_key: str, secret_value: str) -> str:
     return base64.b64encode(encrypted).decode("utf-8")
 
 
-def check_rate_limit(access_token, api_host=GITHUB_CLOUD_API_URL):
+def rate_limit_delay(response):
+    """
+    Seconds GitHub asks us to wait before retrying, or None if the response
+    is not a (primary or secondary) rate-limit rejection.
+    """
+    if response.status_code not in (403, 429):
+        return None
+
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0), GITHUB_MAX_RETRY_WAIT)
+        except ValueError:
+            pass
+
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        try:
+            reset_in = float(response.headers.get("X-RateLimit-Reset")) - time.time()
+            return min(max(reset_in, 1), GITHUB_MAX_RETRY_WAIT)
+        except (TypeError, ValueError):
+            return GITHUB_MAX_RETRY_WAIT
+
+    # Secondary limits without headers: GitHub asks for at least a minute.
+    text = response.text if isinstance(response.text, str) else ""
+    if response.status_code == 429 or "rate limit" in text.lower():
+        return GITHUB_MAX_RETRY_WAIT
+
+    return None
+
+
+class GitHubClient:
+    """
+    Pooled, rate-limit aware HTTP client for a single sync run.
+
+    All requests share one keep-alive connection pool. When GitHub rejects a
+    request for rate limiting, every worker pauses until the requested time
+    and the request is retried.
+    """
+
+    def __init__(self, access_token, max_workers=GITHUB_SYNC_MAX_WORKERS):
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {
+                "Authorization": f"Bearer {access_token}",
+                "Accept": "application/vnd.github+json",
+            }
+        )
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.session.close()
+
+    def _wait_for_resume(self):
+        with self._lock:
+            delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def request(self, method, url, **kwargs):
+        for attempt in range(GITHUB_MAX_RETRIES + 1):
+            self._wait_for_resume()
+            response = getattr(self.session, method)(url, **kwargs)
+            delay = rate_limit_delay(response)
+            if delay is None:
+                return response
+            # Let the sync scheduler hold back other syncs on this credential.
+            note_rate_limit(delay)
+            if attempt == GITHUB_MAX_RETRIES:
+                return response
+            with self._lock:
+                self._resume_at = max(self._resume_at, time.monotonic() + delay)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("get", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("put", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("delete", url, **kwargs)
+
+    def map(self, fn, items):
+        """Apply `fn` to `items` on the bounded worker pool, in order."""
+        return map_parallel(fn, items, self.max_workers)
+
+
+def push_github_secrets(
+    client,
+    secrets,
+    existing_secret_names,
+    public_key,
+    secret_url,
+    product="GitHub Actions",
+    extra_fields=None,
+    value_digests=None,
+):
+    """
+    Upload changed secrets and delete remote secrets missing locally, on the
+    client's worker pool.
+
+    Args:
+        secret_url (Callable[[str], str]): Builds the URL for a secret name.
+        extra_fields (dict): Extra body fields for each upload (e.g. visibility).
+        value_digests (dict): Digests of previously pushed values, updated in
+            place. Secrets present remotely with a matching digest are skipped.
+
+    Returns:
+        dict | None: An error payload for the sync event, or None on success.
+    """
+    extra_fields = extra_fields or {}
+    key_id = public_key["key_id"]
+    local_secrets = {k: v for k, v, _ in secrets}
+
+    uploads = []
+    for key, value in local_secrets.items():
+        url = secret_url(key)
+        digest = secret_value_digest(url, key_id, extra_fields, value)
+        if (
+            value_digests is not None
+            and key in existing_secret_names
+            and value_digests.get(key) == digest
+        ):
+            continue
+
+        encrypted_value = encrypt_secret(public_key["key"], value)
+        if len(encrypted_value) > GITHUB_SECRET_SIZE_LIMIT:
+            return {
+                "message": f"Secret '{key}' is too large to sync. {product} has a limit of 64KB for secrets."
+            }
+        secret_data = {
+            "encrypted_value": encrypted_value,
+            "key_id": key_id,
+            **extra_fields,
+        }
+        uploads.append((key, url, secret_data, digest))
+
+    def upload(item):
+        key, url, secret_data, digest = item
+        return key, digest, client.put(url, json=secret_data)
+
+    error = None
+    for key, digest, response in client.map(upload, uploads):
+        if response.status_code in [201, 204]:
+            if value_digests is not None:
+                value_digests[key] = digest
+        elif error is None:
+            error = {
+                "response_code": response.status_code,
+                "message": f"Error syncing secret '{key}': {response.text}",
+            }
+    if error:
+        return error
+
+    def delete(secret_name):
+        return secret_name, client.delete(secret_url(secret_name))
+
+    stale = [name for name in existing_secret_names if name not in local_secrets]
+    for secret_name, response in client.map(delete, stale):
+        if response.status_code != 204 and error is None:
+            error = {
+                "response_code": response.status_code,
+                "message": f"Error deleting secret '{secret_name}': {response.text}",
+            }
+
+    if value_digests is not None:
+        for key in list(value_digests):
+            if key not in local_secrets:
+                del value_digests[key]
+
+    return error
+
+
+def check_rate_limit(access_token, api_host=GITHUB_CLOUD_API_URL, session=None):
     api_host = normalize_api_host(api_host)
     headers = {"Authorization": f"token {access_token}"}
-    response = requests.get(f"{api_host}/rate_limit", headers=headers)
+    response = (session or requests).get(f"{api_host}/rate_limit", headers=headers)
     rate_limit = response.json().get("resources", {}).get("core", {})
     if rate_limit.get("remaining", 1) == 0:
         print(
@@ -229,12 +424,12 @@ def check_rate_limit(access_token, api_host=GITHUB_CLOUD_API_URL):
     return True
 
 
-def get_all_secrets(repo, owner, headers, api_host=GITHUB_CLOUD_API_URL):
+def get_all_secrets(repo, owner, headers, api_host=GITHUB_CLOUD_API_URL, session=None):
     api_host = normalize_api_host(api_host)
     all_secrets = []
     page = 1
     while True:
-        response = requests.get(
+        response = (session or requests).get(
             f"{api_host}/repos/{owner}/{repo}/actions/secrets?page={page}",
             headers=headers,
         )
@@ -246,13 +441,13 @@ def get_all_secrets(repo, owner, headers, api_host=GITHUB_CLOUD_API_URL):
 
 
 def get_all_env_secrets(
-    repo, owner, environment_name, headers, api_host=GITHUB_CLOUD_API_URL
+    repo, owner, environment_name, headers, api_host=GITHUB_CLOUD_API_URL, session=None
 ):
     api_host = normalize_api_host(api_host)
     all_secrets = []
     page = 1
     while True:
-        response = requests.get(
+        response = (session or requests).get(
             f"{api_host}/repos/{owner}/{repo}/environments/{environment_name}/secrets?page={page}",
             headers=headers,
         )
@@ -270,85 +465,59 @@ def sync_github_secrets(
     owner,
     api_host=GITHUB_CLOUD_API_URL,
     environment_name=None,
+    value_digests=None,
 ):
     api_host = normalize_api_host(api_host)
 
     try:
-        if not check_rate_limit(access_token, api_host):
-            return False, {"message": "Rate limit exceeded"}
-
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Accept": "application/vnd.github+json",
-        }
-
-        if environment_name:
-            public_key_url = f"{api_host}/repos/{owner}/{repo}/environments/{environment_name}/secrets/public-key"
-        else:
-            public_key_url = (
-                f"{api_host}/repos/{owner}/{repo}/actions/secrets/public-key"
-            )
+        with GitHubClient(access_token) as client:
+            if not check_rate_limit(access_token, api_host, session=client):
+                return False, {"message": "Rate limit exceeded"}
 
-        public_key_response = requests.get(public_key_url, headers=headers)
-        if public_key_response.status_code != 200:
-            if public_key_response.status_code == 404:
-                return False, {
-                    "response_code": public_key_response.status_code,
-                    "message": "Unable to access repository. Please verify the repository exists and your access token has the required permissions (Secrets: Read and write, Environments: Read-only).",
-                }
-            return False, {
-                "response_code": public_key_response.status_code,
-                "message": f"Failed to fetch repository public key: {public_key_response.text}",
+            headers = {
+                "Authorization": f"Bearer {access_token}",
+                "Accept": "application/vnd.github+json",
             }
 
-        public_key = public_key_response.json()
-        key_id = public_key["key_id"]
-        public_key_value = public_key["key"]
-
-        local_secrets = {k: v for k, v, _ in secrets}
-        if environment_name:
-            existing_secrets = get_all_env_secrets(
-                repo, owner, environment_name, headers, api_host
-            )
-        else:
-            existing_secrets = get_all_secrets(repo, owner, headers, api_host)
-        existing_secret_names = {secret["name"] for secret in existing_secrets}
-
-        for key, value in local_secrets.items():
-            encrypted_value = encrypt_secret(public_key_value, value)
-            if len(encrypted_value) > 64 * 1024:
-                message = (
-                    f"Secret '{key}' is too large to sync. GitHub Actions has a limit of 64KB for secrets."
-                )
-                return False, {"message": message}
-
-            secret_data = {"encrypted_value": encrypted_value, "key_id": key_id}
             if environment_name:
-                secret_url = f"{api_host}/repos/{owner}/{repo}/environments/{environment_name}/secrets/{key}"
+                secrets_url = f"{api_host}/repos/{owner}/{repo}/environments/{environment_name}/secrets"
             else:
-                secret_url = f"{api_host}/repos/{owner}/{repo}/actions/secrets/{key}"
-            response = requests.put(secret_url, headers=headers, json=secret_data)
+                secrets_url = f"{api_host}/repos/{owner}/{repo}/actions/secrets"
 
-            if response.status_code not in [201, 204]:
+            public_key_response = client.get(
+                f"{secrets_url}/public-key", headers=headers
+            )
+            if public_key_response.status_code != 200:
+                if public_key_response.status_code == 404:
+                    return False, {
+                        "response_code": public_key_response.status_code,
+                        "message": "Unable to access repository. Please verify the repository exists and your access token has the required permissions (Secrets: Read and write, Environments: Read-only).",
+                    }
                 return False, {
-                    "response_code": response.status_code,
-                    "message": f"Error syncing secret '{key}': {response.text}",
+                    "response_code": public_key_response.status_code,
+                    "message": f"Failed to fetch repository public key: {public_key_response.text}",
                 }
 
-        for secret_name in existing_secret_names:
-            if secret_name not in local_secrets:
-                if environment_name:
-                    delete_url = f"{api_host}/repos/{owner}/{repo}/environments/{environment_name}/secrets/{secret_name}"
-                else:
-                    delete_url = (
-                        f"{api_host}/repos/{owner}/{repo}/actions/secrets/{secret_name}"
-                    )
-                delete_response = requests.delete(delete_url, headers=headers)
-                if delete_response.status_code != 204:
-                    return False, {
-                        "response_code": delete_response.status_code,
-                        "message": f"Error deleting secret '{secret_name}': {delete_response.text}",
-                    }
+            if environment_name:
+                existing_secrets = get_all_env_secrets(
+                    repo, owner, environment_name, headers, api_host, session=client
+                )
+            else:
+                existing_secrets = get_all_secrets(
+                    repo, owner, headers, api_host, session=client
+                )
+            existing_secret_names = {secret["name"] for secret in existing_secrets}
+
+            error = push_github_secrets(
+                client,
+                secrets,
+                existing_secret_names,
+                public_key_response.json(),
+                lambda name: f"{secrets_url}/{name}",
+                value_digests=value_digests,
+            )
+            if error:
+                return False, error
 
         return True, {"message": "Secrets synced successfully"}
 
@@ -363,12 +532,12 @@ def sync_github_secrets(
         return False, {"message": f"An unexpected error occurred: {str(e)}"}
 
 
-def get_all_org_secrets(org, headers, api_host=GITHUB_CLOUD_API_URL):
+def get_all_org_secrets(org, headers, api_host=GITHUB_CLOUD_API_URL, session=None):
     api_host = normalize_api_host(api_host)
     all_secrets = []
     page = 1
     while True:
-        response = requests.get(
+        response = (session or requests).get(
             f"{api_host}/orgs/{org}/actions/secrets?page={page}",
             headers=headers,
         )
@@ -391,71 +560,50 @@ def sync_github_org_secrets(
     org,
     api_host=GITHUB_CLOUD_API_URL,
     visibility="all",
+    value_digests=None,
 ):
     api_host = normalize_api_host(api_host)
 
     try:
-        if not check_rate_limit(access_token, api_host):
-            return False, {"message": "Rate limit exceeded"}
-
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Accept": "application/vnd.github+json",
-        }
-
-        public_key_url = f"{api_host}/orgs/{org}/actions/secrets/public-key"
+        with GitHubClient(access_token) as client:
+            if not check_rate_limit(access_token, api_host, session=client):
+                return False, {"message": "Rate limit exceeded"}
 
-        public_key_response = requests.get(public_key_url, headers=headers)
-        if public_key_response.status_code != 200:
-            if public_key_response.status_code == 404:
-                return False, {
-                    "response_code": public_key_response.status_code,
-                    "message": "Unable to access organization. Please verify the organization exists and your access token has the required permissions (admin:org scope).",
-                }
-            return False, {
-                "response_code": public_key_response.status_code,
-                "message": f"Failed to fetch organization public key: {public_key_response.text}",
+            headers = {
+                "Authorization": f"Bearer {access_token}",
+                "Accept": "application/vnd.github+json",
             }
 
-        public_key = public_key_response.json()
-        key_id = public_key["key_id"]
-        public_key_value = public_key["key"]
+            public_key_url = f"{api_host}/orgs/{org}/actions/secrets/public-key"
 
-        local_secrets = {k: v for k, v, _ in secrets}
-        existing_secrets = get_all_org_secrets(org, headers, api_host)
-        existing_secret_names = {secret["name"] for secret in existing_secrets}
-
-        for key, value in local_secrets.items():
-            encrypted_value = encrypt_secret(public_key_value, value)
-            if len(encrypted_value) > 64 * 1024:
-                message = (
-                    f"Secret '{key}' is too large to sync. GitHub Actions has a limit of 64KB for secrets."
-                )
-                return False, {"message": message}
-
-            secret_data = {
-                "encrypted_value": encrypted_value,
-                "key_id": key_id,
-                "visibility": visibility,
-            }
-            secret_url = f"{api_host}/orgs/{org}/actions/secrets/{key}"
-            response = requests.put(secret_url, headers=headers, json=secret_data)
-
-            if response.status_code not in [201, 204]:
+            public_key_response = client.get(public_key_url, headers=headers)
+            if public_key_response.status_code != 200:
+                if public_key_response.status_code == 404:
+                    return False, {
+                        "response_code": public_key_response.status_code,
+                        "message": "Unable to access organization. Please verify the organization exists and your access token has the required permissions (admin:org scope).",
+                    }
                 return False, {
-                    "response_code": response.status_code,
-                    "message": f"Error syncing secret '{key}': {response.text}",
+                    "response_code": public_key_response.status_code,
+                    "message": f"Failed to fetch organization public key: {public_key_response.text}",
                 }
 
-        for secret_name in existing_secret_names:
-            if secret_name not in local_secrets:
-                delete_url = f"{api_host}/orgs/{org}/actions/secrets/{secret_name}"
-                delete_response = requests.delete(delete_url, headers=headers)
-                if delete_response.status_code != 204:
-                    return False, {
-                        "response_code": delete_response.status_code,
-                        "message": f"Error deleting secret '{secret_name}': {delete_response.text}",
-                    }
+            existing_secrets = get_all_org_secrets(
+                org, headers, api_host, session=client
+            )
+            existing_secret_names = {secret["name"] for secret in existing_secrets}
+
+            error = push_github_secrets(
+                client,
+                secrets,
+                existing_secret_names,
+                public_key_response.json(),
+                lambda name: f"{api_host}/orgs/{org}/actions/secrets/{name}",
+                extra_fields={"visibility": visibility},
+                value_digests=value_digests,
+            )
+            if error:
+                return False, error
 
         return True, {"message": "Organization secrets synced successfully"}
 
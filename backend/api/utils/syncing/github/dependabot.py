@@ -1,19 +1,25 @@
 import json
 import requests
 
-from .actions import normalize_api_host, check_rate_limit, encrypt_secret
+from .actions import (
+    GitHubClient,
+    normalize_api_host,
+    check_rate_limit,
+    encrypt_secret,
+    push_github_secrets,
+)
 
 GITHUB_CLOUD_API_URL = "https://api.github.com"
 
 
 def get_all_dependabot_repo_secrets(
-    repo, owner, headers, api_host=GITHUB_CLOUD_API_URL
+    repo, owner, headers, api_host=GITHUB_CLOUD_API_URL, session=None
 ):
     api_host = normalize_api_host(api_host)
     all_secrets = []
     page = 1
     while True:
-        response = requests.get(
+        response = (session or requests).get(
             f"{api_host}/repos/{owner}/{repo}/dependabot/secrets?page={page}",
             headers=headers,
         )
@@ -30,12 +36,14 @@ def get_all_dependabot_repo_secrets(
     return all_secrets
 
 
-def get_all_dependabot_org_secrets(org, headers, api_host=GITHUB_CLOUD_API_URL):
+def get_all_dependabot_org_secrets(
+    org, headers, api_host=GITHUB_CLOUD_API_URL, session=None
+):
     api_host = normalize_api_host(api_host)
     all_secrets = []
     page = 1
     while True:
-        response = requests.get(
+        response = (session or requests).get(
             f"{api_host}/orgs/{org}/dependabot/secrets?page={page}",
             headers=headers,
         )
@@ -58,73 +66,52 @@ def sync_github_dependabot_secrets(
     repo,
     owner,
     api_host=GITHUB_CLOUD_API_URL,
+    value_digests=None,
 ):
     api_host = normalize_api_host(api_host)
 
     try:
-        if not check_rate_limit(access_token, api_host):
-            return False, {"message": "Rate limit exceeded"}
-
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Accept": "application/vnd.github+json",
-        }
-
-        public_key_url = (
-            f"{api_host}/repos/{owner}/{repo}/dependabot/secrets/public-key"
-        )
+        with GitHubClient(access_token) as client:
+            if not check_rate_limit(access_token, api_host, session=client):
+                return False, {"message": "Rate limit exceeded"}
 
-        public_key_response = requests.get(public_key_url, headers=headers)
-        if public_key_response.status_code != 200:
-            if public_key_response.status_code == 404:
-                return False, {
-                    "response_code": public_key_response.status_code,
-                    "message": "Unable to access repository. Please verify the repository exists and your access token has the required permissions (Dependabot secrets read/write).",
-                }
-            return False, {
-                "response_code": public_key_response.status_code,
-                "message": f"Failed to fetch repository public key: {public_key_response.text}",
+            headers = {
+                "Authorization": f"Bearer {access_token}",
+                "Accept": "application/vnd.github+json",
             }
 
-        public_key = public_key_response.json()
-        key_id = public_key["key_id"]
-        public_key_value = public_key["key"]
+            public_key_url = (
+                f"{api_host}/repos/{owner}/{repo}/dependabot/secrets/public-key"
+            )
 
-        local_secrets = {k: v for k, v, _ in secrets}
-        existing_secrets = get_all_dependabot_repo_secrets(
-            repo, owner, headers, api_host
-        )
-        existing_secret_names = {secret["name"] for secret in existing_secrets}
-
-        for key, value in local_secrets.items():
-            encrypted_value = encrypt_secret(public_key_value, value)
-            if len(encrypted_value) > 64 * 1024:
-                message = (
-                    f"Secret '{key}' is too large to sync. GitHub Dependabot has a limit of 64KB for secrets."
-                )
-                return False, {"message": message}
-
-            secret_data = {"encrypted_value": encrypted_value, "key_id": key_id}
-            secret_url = f"{api_host}/repos/{owner}/{repo}/dependabot/secrets/{key}"
-            response = requests.put(secret_url, headers=headers, json=secret_data)
-
-            if response.status_code not in [201, 204]:
+            public_key_response = client.get(public_key_url, headers=headers)
+            if public_key_response.status_code != 200:
+                if public_key_response.status_code == 404:
+                    return False, {
+                        "response_code": public_key_response.status_code,
+                        "message": "Unable to access repository. Please verify the repository exists and your access token has the required permissions (Dependabot secrets read/write).",
+                    }
                 return False, {
-                    "response_code": response.status_code,
-                    "message": f"Error syncing secret '{key}': {response.text}",
+                    "response_code": public_key_response.status_code,
+                    "message": f"Failed to fetch repository public key: {public_key_response.text}",
                 }
 
-        for secret_name in existing_secret_names:
-            if secret_name not in local_secrets:
-                delete_url = (
-                    f"{api_host}/repos/{owner}/{repo}/dependabot/secrets/{secret_name}"
-                )
-                delete_response = requests.delete(delete_url, headers=headers)
-                if delete_response.status_code != 204:
-                    return False, {
-                        "response_code": delete_response.status_code,
-                        "message": f"Error deleting secret '{secret_name}': {delete_response.text}",
-                    }
+            existing_secrets = get_all_dependabot_repo_secrets(
+                repo, owner, headers, api_host, session=client
+            )
+            existing_secret_names = {secret["name"] for secret in existing_secrets}
+
+            error = push_github_secrets(
+                client,
+                secrets,
+                existing_secret_names,
+                public_key_response.json(),
+                lambda name: f"{api_host}/repos/{owner}/{repo}/dependabot/secrets/{name}",
+                product="GitHub Dependabot",
+                value_digests=value_digests,
+            )
+            if error:
+                return False, error
 
         return True, {"message": "Dependabot secrets synced successfully"}
 
@@ -145,71 +132,51 @@ def sync_github_dependabot_org_secrets(
     org,
     api_host=GITHUB_CLOUD_API_URL,
     visibility="all",
+    value_digests=None,
 ):
     api_host = normalize_api_host(api_host)
 
     try:
-        if not check_rate_limit(access_token, api_host):
-            return False, {"message": "Rate limit exceeded"}
-
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Accept": "application/vnd.github+json",
-        }
-
-        public_key_url = f"{api_host}/orgs/{org}/dependabot/secrets/public-key"
+        with GitHubClient(access_token) as client:
+            if not check_rate_limit(access_token, api_host, session=client):
+                return False, {"message": "Rate limit exceeded"}
 
-        public_key_response = requests.get(public_key_url, headers=headers)
-        if public_key_response.status_code != 200:
-            if public_key_response.status_code == 404:
-                return False, {
-                    "response_code": public_key_response.status_code,
-                    "message": "Unable to access organization. Please verify the organization exists and your access token has the required permissions (Dependabot secrets read/write).",
-                }
-            return False, {
-                "response_code": public_key_response.status_code,
-                "message": f"Failed to fetch organization public key: {public_key_response.text}",
+            headers = {
+                "Authorization": f"Bearer {access_token}",
+                "Accept": "application/vnd.github+json",
             }
 
-        public_key = public_key_response.json()
-        key_id = public_key["key_id"]
-        public_key_value = public_key["key"]
-
-        local_secrets = {k: v for k, v, _ in secrets}
-        existing_secrets = get_all_dependabot_org_secrets(org, headers, api_host)
-        existing_secret_names = {secret["name"] for secret in existing_secrets}
-
-        for key, value in local_secrets.items():
-            encrypted_value = encrypt_secret(public_key_value, value)
-            if len(encrypted_value) > 64 * 1024:
-                message = (
-                    f"Secret '{key}' is too large to sync. GitHub Dependabot has a limit of 64KB for secrets."
-                )
-                return False, {"message": message}
-
-            secret_data = {
-                "encrypted_value": encrypted_value,
-                "key_id": key_id,
-                "visibility": visibility or "all",
-            }
-            secret_url = f"{api_host}/orgs/{org}/dependabot/secrets/{key}"
-            response = requests.put(secret_url, headers=headers, json=secret_data)
+            public_key_url = f"{api_host}/orgs/{org}/dependabot/secrets/public-key"
 
-            if response.status_code not in [201, 204]:
+            public_key_response = client.get(public_key_url, headers=headers)
+            if public_key_response.status_code != 200:
+                if public_key_response.status_code == 404:
+                    return False, {
+                        "response_code": public_key_response.status_code,
+                        "message": "Unable to access organization. Please verify the organization exists and your access token has the required permissions (Dependabot secrets read/write).",
+                    }
                 return False, {
-                    "response_code": response.status_code,
-                    "message": f"Error syncing secret '{key}': {response.text}",
+                    "response_code": public_key_response.status_code,
+                    "message": f"Failed to fetch organization public key: {public_key_response.text}",
                 }
 
-        for secret_name in existing_secret_names:
-            if secret_name not in local_secrets:
-                delete_url = f"{api_host}/orgs/{org}/dependabot/secrets/{secret_name}"
-                delete_response = requests.delete(delete_url, headers=headers)
-                if delete_response.status_code != 204:
-                    return False, {
-                        "response_code": delete_response.status_code,
-                        "message": f"Error deleting secret '{secret_name}': {delete_response.text}",
-                    }
+            existing_secrets = get_all_dependabot_org_secrets(
+                org, headers, api_host, session=client
+            )
+            existing_secret_names = {secret["name"] for secret in existing_secrets}
+
+            error = push_github_secrets(
+                client,
+                secrets,
+                existing_secret_names,
+                public_key_response.json(),
+                lambda name: f"{api_host}/orgs/{org}/dependabot/secrets/{name}",
+                product="GitHub Dependabot",
+                extra_fields={"visibility": visibility or "all"},
+                value_digests=value_digests,
+            )
+            if error:
+                return False, error
 
         return True, {"message": "Dependabot secrets synced successfully"}
 
@@ -222,4 +189,3 @@ def sync_github_dependabot_org_secrets(
 
         traceback.print_exc()
         return False, {"message": f"An unexpected error occurred: {str(e)}"}
-
@@ -6,6 +6,21 @@ from django.conf import settings
 from api.utils.network import validate_url_is_safe
 
 from api.utils.syncing.auth import get_credentials
+from api.utils.syncing.planner import (
+    SyncOperationError,
+    apply_plan,
+    dry_run_result,
+    is_dry_run,
+    plan_sync,
+    plannable,
+)
+from api.utils.syncing.rate_limits import note_rate_limit_response
+
+# Concurrent variable writes per sync.
+GITLAB_SYNC_MAX_WORKERS = 4
+
+# Variable fields a sync manages, compared to decide whether to update.
+GITLAB_VARIABLE_FIELDS = ("value", "masked", "protected", "description")
 
 
 class NamespaceType(graphene.ObjectType):
@@ -173,6 +188,7 @@ def extract_project_path(repo_url):
     return domain_match.group(1)
 
 
+@plannable
 def sync_gitlab_secrets(
     secrets,
     credential_id,
@@ -183,8 +199,8 @@ def sync_gitlab_secrets(
 ):
     """
     Sync secrets from secrets.json to the specified repository URL.
-    This function handles pagination when fetching existing secrets and synchronizes
-    the differences with secrets.json.
+    This function handles pagination when fetching existing secrets and
+    writes only the variables that differ, concurrently.
     """
 
     results = {}
@@ -201,12 +217,16 @@ def sync_gitlab_secrets(
         encoded_destination_path = urllib.parse.quote_plus(destination_path)
         base_url = f"{GITLAB_HOST}/api/v4/{'groups' if is_group else 'projects'}/{encoded_destination_path}/variables"
 
+        session = requests.Session()
+        session.headers.update(headers)
+        session.hooks["response"].append(note_rate_limit_response)
+
         # Fetch all existing GitLab secrets with pagination
         existing_secrets = {}
         page = 1
         while True:
             paginated_url = f"{base_url}?page={page}&per_page=100"
-            response = requests.get(paginated_url, headers=headers)
+            response = session.get(paginated_url)
             if response.status_code != 200:
                 raise Exception(f"Error fetching existing secrets: {response.text}")
 
@@ -217,63 +237,66 @@ def sync_gitlab_secrets(
             existing_secrets.update({var["key"]: var for var in secrets_page})
             page += 1
 
-        changes_made = False
-        # Iterate through the secrets to be synced
-        for key, value, comment in secrets:
-            secret_specific_url = f"{base_url}/{urllib.parse.quote_plus(key)}"
-            payload = {
+        desired = {
+            key: {
                 "value": value,
                 "masked": is_masked,
                 "protected": is_protected,
                 "raw": True,
                 "description": comment,
             }
-            if key in existing_secrets:
-                existing_secret = existing_secrets[key]
-                if (
-                    existing_secret["value"] != value
-                    or existing_secret["masked"] != payload["masked"]
-                    or existing_secret["protected"] != payload["protected"]
-                    or existing_secret["description"] != payload["description"]
-                ):
-                    changes_made = True
-                    update_response = requests.put(
-                        secret_specific_url, headers=headers, json=payload
-                    )
-                    if update_response.status_code not in [200, 201]:
-                        raise Exception(
-                            f"Failed to update secret {key}: {update_response.text}"
-                        )
-
-            else:
-                changes_made = True
-                create_response = requests.post(
-                    base_url, headers=headers, json={"key": key, **payload}
+            for key, value, comment in secrets
+        }
+        plan = plan_sync(
+            desired,
+            existing_secrets,
+            differs=lambda want, have: any(
+                have.get(name) != want[name] for name in GITLAB_VARIABLE_FIELDS
+            ),
+        )
+        if is_dry_run():
+            return dry_run_result(plan)
+
+        def secret_url(key):
+            return f"{base_url}/{urllib.parse.quote_plus(key)}"
+
+        def create(key, payload):
+            response = session.post(base_url, json={"key": key, **payload})
+            if response.status_code not in [200, 201]:
+                raise SyncOperationError(
+                    f"Failed to create secret {key}: {response.text}",
+                    response.status_code,
                 )
-                if create_response.status_code not in [200, 201]:
-                    raise Exception(
-                        f"Failed to create secret {key}: {create_response.text}"
-                    )
-
-        for key in existing_secrets:
-            # if the key doesn't exist in the new secrets list then it should be deleted from gitlab
-            if not any(secret[0] == key for secret in secrets):
-                changes_made = True
-                delete_specific_url = f"{base_url}/{urllib.parse.quote_plus(key)}"
-                delete_response = requests.delete(delete_specific_url, headers=headers)
-                if delete_response.status_code != 204:
-                    raise Exception(
-                        f"Failed to delete secret {key}: {delete_response.text}"
-                    )
+
+        def update(key, payload):
+            response = session.put(secret_url(key), json=payload)
+            if response.status_code not in [200, 201]:
+                raise SyncOperationError(
+                    f"Failed to update secret {key}: {response.text}",
+                    response.status_code,
+                )
+
+        def delete(key):
+            # Keys missing from the new secrets list are deleted from GitLab
+            response = session.delete(secret_url(key))
+            if response.status_code != 204:
+                raise SyncOperationError(
+                    f"Failed to delete secret {key}: {response.text}",
+                    response.status_code,
+                )
+
+        apply_plan(plan, create, update, delete, max_workers=GITLAB_SYNC_MAX_WORKERS)
 
         success = True
         results["message"] = (
             "Secrets synchronized successfully."
-            if changes_made
+            if plan
             else "No changes needed. Secrets are already synchronized."
         )
     except Exception as e:
         success = False
         results["error"] = f"An error occurred: {str(e)}"
+        if isinstance(e, SyncOperationError) and e.response_code:
+            results["response_code"] = e.response_code
 
     return success, results
@@ -3,6 +3,7 @@ import requests
 import re
 from django.conf import settings
 from api.utils.network import validate_url_is_safe
+from api.utils.syncing.planner import dry_run_result, is_dry_run, plan_sync, plannable
 
 
 def get_nomad_token_info(credential_id):
@@ -39,7 +40,12 @@ def test_nomad_creds(credential_id):
         return False
 
 
+@plannable
 def sync_nomad_secrets(secrets, credential_id, path, namespace="default"):
+    """
+    Sync secrets as the items of one Nomad variable. The variable is read
+    first and only written when its items differ.
+    """
     results = {}
 
     if not secrets or len(secrets) == 0:
@@ -77,6 +83,22 @@ def sync_nomad_secrets(secrets, credential_id, path, namespace="default"):
 
         url = f"{NOMAD_ADDR}/v1/var/{safe_path}?namespace={namespace}"
 
+        current = session.get(url)
+        if current.status_code == 404:
+            remote_items = {}
+        else:
+            current.raise_for_status()
+            remote_items = current.json().get("Items") or {}
+
+        plan = plan_sync(secrets_dict, remote_items)
+        if is_dry_run():
+            return dry_run_result(plan)
+        if not plan:
+            results["message"] = (
+                f"No changes needed. Secrets at path: {safe_path} in namespace: {namespace} are already synchronized."
+            )
+            return True, results
+
         # All secrets are included under the 'Items' field in the payload
         payload = {
             "Namespace": namespace,
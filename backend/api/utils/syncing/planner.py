@@ -0,0 +1,218 @@
+"""Shared change planning for provider syncs.
+
+A provider adapter lists what is currently on the remote side and hands it
+to `plan_sync` together with the environment's resolved secrets. The result
+is a minimal create / update / delete plan, and `apply_plan` runs only those
+operations on a worker pool sized for the provider. A sync that changed two
+keys makes two writes, not one per secret in the environment.
+
+Remote values are compared directly where the provider returns them. For
+write-only providers the remote value is `UNKNOWN`, and the plan falls back
+to `value_digests`: keyed fingerprints of what the last successful sync
+wrote (kept on EnvironmentSync.value_digests, cleared by a forced sync).
+
+Inside `dry_run_scope` (see perform_sync_dry_run), syncs decorated with
+`plannable` return their plan via `dry_run_result` instead of applying it,
+and it is recorded on the EnvironmentSyncEvent.
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from api.utils.syncing.secrets import secret_value_digest
+
+# Remote value of a key that exists but can't be read back.
+UNKNOWN = object()
+
+_dry_run = ContextVar("sync_dry_run", default=False)
+
+
+class SyncOperationError(Exception):
+    """A single create/update/delete rejected by the provider."""
+
+    def __init__(self, message, response_code=None):
+        super().__init__(message)
+        self.response_code = response_code
+
+
+@dataclass
+class SyncPlan:
+    # {key: desired value} for creates and updates; keys for deletes.
+    creates: dict = field(default_factory=dict)
+    updates: dict = field(default_factory=dict)
+    deletes: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+    # Write-only providers: fingerprints updated as operations succeed.
+    value_digests: dict = None
+    digest_scope: tuple = ()
+
+    def __bool__(self):
+        return bool(self.creates or self.updates or self.deletes)
+
+    def summary(self):
+        return (
+            f"{len(self.creates)} to create, {len(self.updates)} to update, "
+            f"{len(self.deletes)} to delete, {len(self.unchanged)} unchanged"
+        )
+
+    def to_meta(self):
+        return {
+            "create": sorted(self.creates),
+            "update": sorted(self.updates),
+            "delete": sorted(self.deletes),
+            "unchanged": len(self.unchanged),
+        }
+
+    def digest(self, key, value):
+        return secret_value_digest(*self.digest_scope, key, value)
+
+    def record_written(self, key, value):
+        if self.value_digests is not None:
+            self.value_digests[key] = self.digest(key, value)
+
+    def record_deleted(self, key):
+        if self.value_digests is not None:
+            self.value_digests.pop(key, None)
+
+
+def plan_sync(desired, remote, differs=None, value_digests=None, digest_scope=()):
+    """
+    Diff the desired state against the remote one.
+
+    Args:
+        desired (dict): {key: value to write}.
+        remote (dict): {key: current value, or UNKNOWN if not readable}.
+        differs (Callable[[desired, current], bool]): Whether a readable remote
+            value needs updating. Defaults to inequality.
+        value_digests (dict): Fingerprints of previously written values, for
+            UNKNOWN remote values. Keys no longer desired are dropped.
+        digest_scope (tuple): Identifies the destination in the fingerprints.
+
+    Returns:
+        SyncPlan
+    """
+    differs = differs or (lambda want, have: want != have)
+    plan = SyncPlan(value_digests=value_digests, digest_scope=tuple(digest_scope))
+
+    for key, value in desired.items():
+        if key not in remote:
+            plan.creates[key] = value
+            continue
+
+        current = remote[key]
+        if current is UNKNOWN:
+            changed = (
+                value_digests is None
+                or value_digests.get(key) != plan.digest(key, value)
+            )
+        else:
+            changed = differs(value, current)
+
+        if changed:
+            plan.updates[key] = value
+        else:
+            plan.unchanged.append(key)
+
+    plan.deletes = [key for key in remote if key not in desired]
+
+    if value_digests is not None:
+        for key in list(value_digests):
+            if key not in desired:
+                del value_digests[key]
+
+    return plan
+
+
+def map_parallel(fn, items, max_workers):
+    """Apply `fn` to `items` on a bounded worker pool, returning results in order."""
+    items = list(items)
+    if len(items) <= 1 or max_workers <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Each task runs in a copy of the caller's context (e.g. the sync's
+        # credential scope).
+        futures = [
+            executor.submit(contextvars.copy_context().run, fn, item)
+            for item in items
+        ]
+        return [future.result() for future in futures]
+
+
+def apply_plan(plan, create=None, update=None, delete=None, max_workers=1):
+    """
+    Run a plan's operations: `create(key, value)`, `update(key, value)`
+    (defaults to `create`) and `delete(key)`. All operations are attempted;
+    the first failure, in plan order, is then raised.
+    """
+    update = update or create
+    operations = (
+        [("create", key, value) for key, value in plan.creates.items()]
+        + [("update", key, value) for key, value in plan.updates.items()]
+        + [("delete", key, None) for key in plan.deletes]
+    )
+
+    def run(operation):
+        action, key, value = operation
+        try:
+            if action == "delete":
+                delete(key)
+            else:
+                (create if action == "create" else update)(key, value)
+        except Exception as ex:
+            return ex
+        return None
+
+    first_error = None
+    for (action, key, value), error in zip(
+        operations, map_parallel(run, operations, max_workers)
+    ):
+        if error is not None:
+            first_error = first_error or error
+        elif action == "delete":
+            plan.record_deleted(key)
+        else:
+            plan.record_written(key, value)
+
+    if first_error is not None:
+        raise first_error
+
+
+def plannable(sync_function):
+    """Mark a sync function as returning its plan when run in a dry run."""
+    sync_function.supports_dry_run = True
+    return sync_function
+
+
+@contextmanager
+def dry_run_scope():
+    token = _dry_run.set(True)
+    try:
+        yield
+    finally:
+        _dry_run.reset(token)
+
+
+def is_dry_run():
+    return _dry_run.get()
+
+
+def dry_run_result(plan):
+    """
+    The (success, data) result of a sync that only planned. `plan` is a
+    SyncPlan, or {destination: SyncPlan} for syncs with several targets.
+    """
+    if isinstance(plan, SyncPlan):
+        summary, meta = plan.summary(), plan.to_meta()
+    else:
+        summary = "; ".join(
+            f"{destination}: {destination_plan.summary()}"
+            for destination, destination_plan in plan.items()
+        )
+        meta = {
+            destination: destination_plan.to_meta()
+            for destination, destination_plan in plan.items()
+        }
+    return True, {"message": f"Dry run: {summary}", "dry_run": True, "plan": meta}
@@ -2,6 +2,7 @@ import requests
 import graphene
 
 from api.utils.syncing.auth import get_credentials
+from api.utils.syncing.rate_limits import note_rate_limit_response
 
 
 class RailwayServiceType(graphene.ObjectType):
@@ -161,6 +162,7 @@ def sync_railway_secrets(
             json={"query": mutation, "variables": variables},
             headers=headers,
         )
+        note_rate_limit_response(response)
 
         data = response.json()
 
@@ -0,0 +1,285 @@
+"""Per-credential admission control for provider sync jobs.
+
+Sync jobs that share a ProviderCredentials share the provider's rate limit,
+so admission is keyed by credential: at most `concurrency` syncs run at
+once, and sync starts draw from a token bucket. Both live in Redis and are
+checked atomically by one Lua call.
+
+The budget learns from the provider: when a sync observes a rate-limit
+response (see `note_rate_limit`), the credential is paused until the
+provider's requested time, and jobs arriving meanwhile are deferred rather
+than run into the limit. Each new pause also halves the credential's bucket
+rate, which then recovers linearly to the configured rate over
+`RATE_RECOVERY_SECONDS`.
+"""
+
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import django_rq
+
+logger = logging.getLogger(__name__)
+
+# (max concurrent syncs, sync starts per second, burst)
+PROVIDER_SYNC_LIMITS = {
+    "github": (2, 0.5, 5),
+    "vercel": (2, 0.5, 5),
+    "gitlab": (2, 0.5, 5),
+    "railway": (2, 0.5, 5),
+    "render": (2, 0.5, 5),
+    "cloudflare": (2, 0.5, 5),
+}
+DEFAULT_SYNC_LIMITS = (4, 1.0, 10)
+
+# Deferral when every slot is taken; jittered so waiting jobs spread out.
+CREDENTIAL_BUSY_RETRY = 10
+# Applied when a provider rate-limits without saying for how long.
+DEFAULT_RATE_LIMIT_PAUSE = 60
+# Upper bound on a pause taken from a provider's reset header.
+MAX_RATE_LIMIT_PAUSE = 3600
+# Floor for the learned fraction of the configured rate, and how long a
+# fully slowed-down bucket takes to climb back to the configured rate.
+MIN_RATE_SCALE = 0.1
+RATE_RECOVERY_SECONDS = 900
+
+_SLOTS_KEY = "sync-credential-slots:{}"
+_BUCKET_KEY = "sync-credential-bucket:{}"
+_PAUSE_KEY = "sync-credential-pause:{}"
+
+# Learned fraction of the configured rate, recovering since the last pause.
+# Expects `now`, `recovery` and the bucket hash in KEYS[2].
+_RATE_SCALE_LUA = """
+local scale = tonumber(redis.call("HGET", KEYS[2], "scale") or "1")
+local scaled_at = tonumber(redis.call("HGET", KEYS[2], "scaled_at") or now)
+scale = math.min(1, scale + math.max(0, now - scaled_at) / recovery)
+"""
+
+# KEYS: slots (zset of job id -> lease expiry), bucket (hash), pause (string)
+# ARGV: now, job id, lease seconds, concurrency, rate, burst, busy retry,
+#       rate recovery seconds
+# Returns "0" when admitted, else the seconds to wait as a string.
+ACQUIRE_SCRIPT = (
+    """
+local now = tonumber(ARGV[1])
+local job_id = ARGV[2]
+local lease = tonumber(ARGV[3])
+local concurrency = tonumber(ARGV[4])
+local rate = tonumber(ARGV[5])
+local burst = tonumber(ARGV[6])
+local busy_retry = tonumber(ARGV[7])
+local recovery = tonumber(ARGV[8])
+"""
+    + _RATE_SCALE_LUA
+    + """
+rate = rate * scale
+
+local paused_until = tonumber(redis.call("GET", KEYS[3]) or "0")
+if paused_until > now then
+    return tostring(paused_until - now)
+end
+
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", now)
+if redis.call("ZSCORE", KEYS[1], job_id) then
+    return "0"
+end
+if redis.call("ZCARD", KEYS[1]) >= concurrency then
+    return tostring(busy_retry)
+end
+
+local tokens = tonumber(redis.call("HGET", KEYS[2], "tokens") or burst)
+local updated = tonumber(redis.call("HGET", KEYS[2], "ts") or now)
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+if tokens < 1 then
+    redis.call("HSET", KEYS[2], "tokens", tokens, "ts", now)
+    return tostring((1 - tokens) / rate)
+end
+
+redis.call("HSET", KEYS[2], "tokens", tokens - 1, "ts", now)
+redis.call("EXPIRE", KEYS[2], math.ceil(math.max(burst / rate, recovery)) + 60)
+redis.call("ZADD", KEYS[1], now + lease, job_id)
+redis.call("EXPIRE", KEYS[1], lease)
+return "0"
+"""
+)
+
+# KEYS: pause (string), bucket (hash)
+# ARGV: now, paused until, minimum rate scale, rate recovery seconds
+# Extends the pause; a pause that starts a new rate-limit episode (rather
+# than overlapping one already in force) also halves the bucket rate.
+PAUSE_SCRIPT = (
+    """
+local now = tonumber(ARGV[1])
+local until_ts = tonumber(ARGV[2])
+local min_scale = tonumber(ARGV[3])
+local recovery = tonumber(ARGV[4])
+
+local paused_until = tonumber(redis.call("GET", KEYS[1]) or "0")
+if until_ts <= paused_until then
+    return 0
+end
+redis.call("SET", KEYS[1], until_ts, "EX", math.ceil(until_ts - now) + 1)
+if paused_until > now then
+    return 0
+end
+"""
+    + _RATE_SCALE_LUA
+    + """
+scale = math.max(min_scale, scale / 2)
+redis.call("HSET", KEYS[2], "scale", scale, "scaled_at", now)
+redis.call("EXPIRE", KEYS[2], recovery + 60)
+return 1
+"""
+)
+
+_acquire_script = None
+_pause_script = None
+
+# The credential of the sync running in this context, for note_rate_limit.
+_current_credential = ContextVar("sync_credential", default=None)
+
+
+def _connection():
+    return django_rq.get_connection("default")
+
+
+def sync_limits_for(provider):
+    return PROVIDER_SYNC_LIMITS.get(provider, DEFAULT_SYNC_LIMITS)
+
+
+def acquire_credential_slot(credential, job_id, lease):
+    """
+    Try to admit a sync job for this credential.
+
+    Returns 0 when admitted (release with `release_credential_slot`), or the
+    number of seconds to defer the job by. Admits when Redis is unavailable.
+    """
+    global _acquire_script
+
+    concurrency, rate, burst = sync_limits_for(credential.provider)
+    try:
+        connection = _connection()
+        if _acquire_script is None:
+            _acquire_script = connection.register_script(ACQUIRE_SCRIPT)
+        wait = _acquire_script(
+            keys=[
+                _SLOTS_KEY.format(credential.id),
+                _BUCKET_KEY.format(credential.id),
+                _PAUSE_KEY.format(credential.id),
+            ],
+            args=[
+                time.time(),
+                job_id,
+                lease,
+                concurrency,
+                rate,
+                burst,
+                CREDENTIAL_BUSY_RETRY,
+                RATE_RECOVERY_SECONDS,
+            ],
+            client=connection,
+        )
+    except Exception as ex:
+        logger.warning(f"Sync admission unavailable, running immediately: {ex}")
+        return 0
+
+    wait = float(wait)
+    if wait <= 0:
+        return 0
+    return wait + random.uniform(0, min(wait, CREDENTIAL_BUSY_RETRY) / 2)
+
+
+def release_credential_slot(credential_id, job_id):
+    try:
+        _connection().zrem(_SLOTS_KEY.format(credential_id), job_id)
+    except Exception:
+        pass
+
+
+def pause_credential(credential_id, seconds):
+    """
+    Hold back new syncs for this credential for `seconds`, and slow its
+    bucket down if this starts a new rate-limit episode.
+    """
+    global _pause_script
+
+    if not credential_id or seconds <= 0:
+        return
+    now = time.time()
+    try:
+        connection = _connection()
+        if _pause_script is None:
+            _pause_script = connection.register_script(PAUSE_SCRIPT)
+        _pause_script(
+            keys=[
+                _PAUSE_KEY.format(credential_id),
+                _BUCKET_KEY.format(credential_id),
+            ],
+            args=[now, now + seconds, MIN_RATE_SCALE, RATE_RECOVERY_SECONDS],
+            client=connection,
+        )
+    except Exception:
+        pass
+
+
+@contextmanager
+def credential_scope(credential_id):
+    """Attribute rate limits noted within the block to this credential."""
+    token = _current_credential.set(credential_id)
+    try:
+        yield
+    finally:
+        _current_credential.reset(token)
+
+
+def note_rate_limit(seconds=None):
+    """
+    Called by provider clients when a response says the rate limit is hit.
+    Pauses the credential of the current sync (if any) for `seconds`.
+    """
+    pause_credential(_current_credential.get(), seconds or DEFAULT_RATE_LIMIT_PAUSE)
+
+
+def _reset_seconds(value, now):
+    """Seconds until a Retry-After/reset header value: a delay, an epoch or a date."""
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        try:
+            return parsedate_to_datetime(value).timestamp() - now
+        except (TypeError, ValueError):
+            return None
+    # Reset headers carry an epoch timestamp; Retry-After carries a delay.
+    return seconds - now if seconds > 1_000_000_000 else seconds
+
+
+def note_rate_limit_response(response, *args, **kwargs):
+    """
+    Note a rate limit if `response` is a 429, pausing for the provider's
+    `Retry-After` or rate-limit reset header. Usable as a requests response
+    hook: `session.hooks["response"].append(note_rate_limit_response)`.
+    """
+    if response.status_code != 429:
+        return
+    now = time.time()
+    seconds = None
+    for header in ("Retry-After", "X-RateLimit-Reset", "RateLimit-Reset"):
+        if response.headers.get(header):
+            seconds = _reset_seconds(response.headers[header], now)
+            if seconds is not None:
+                break
+    if seconds is not None:
+        seconds = min(max(seconds, 1), MAX_RATE_LIMIT_PAUSE)
+    note_rate_limit(seconds)
+
+
+def is_rate_limited_result(sync_data):
+    """Whether a failed sync's result payload reports a provider rate limit."""
+    if not isinstance(sync_data, dict):
+        return False
+    if sync_data.get("response_code") == 429:
+        return True
+    return "rate limit" in str(sync_data.get("message", "")).lower()
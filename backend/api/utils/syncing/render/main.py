@@ -1,5 +1,6 @@
 import requests
 from api.utils.syncing.auth import get_credentials
+from api.utils.syncing.rate_limits import note_rate_limit_response
 from graphene import ObjectType, String, ID, Enum
 
 RENDER_API_BASE_URL = "https://api.render.com/v1"
@@ -139,6 +140,7 @@ def sync_render_env_group_secret_file(
         payload = {"content": content}
 
         response = requests.put(url, headers=headers, json=payload)
+        note_rate_limit_response(response)
         if response.status_code in [200, 201]:
             print("Successfully synced secret file to environment group.")
             return True, {
@@ -167,6 +169,7 @@ def sync_render_service_env_vars(secrets, credential_id, service_id):
 
         # Make the PUT request to overwrite the environment variables on Render service
         update_response = requests.put(url, headers=headers, json=payload)
+        note_rate_limit_response(update_response)
         if update_response.status_code in [200, 204]:
             print("Successfully synced environment variables.")
             return True, {
@@ -1,11 +1,16 @@
-from api.utils.crypto import (
-    decrypt_asymmetric,
-    env_keypair,
-    get_server_keypair,
-)
+import hashlib
+import hmac
+import json
+
+from api.utils.crypto import decrypt_asymmetric
 
 from django.apps import apps
-from api.utils.secrets import decrypt_secret_value
+from django.conf import settings
+from api.utils.secrets import (
+    SecretReferenceIndex,
+    decrypt_secret_value,
+    get_environment_crypto_context,
+)
 
 
 def get_environment_secrets(environment, path):
@@ -23,20 +28,8 @@ def get_environment_secrets(environment, path):
 
     Secret = apps.get_model("api", "Secret")
 
-    ServerEnvironmentKey = apps.get_model("api", "ServerEnvironmentKey")
-
-    pk, sk = get_server_keypair()
-
-    server_env_key = ServerEnvironmentKey.objects.get(environment_id=environment.id)
-
-    # Decrypt environment seed and salt
-    env_seed = decrypt_asymmetric(server_env_key.wrapped_seed, sk.hex(), pk.hex())
-    env_salt = decrypt_asymmetric(server_env_key.wrapped_salt, sk.hex(), pk.hex())
-
-    # Compute environment keypair
-    env_pubkey, env_privkey = env_keypair(env_seed)
-
-    crypto_context = (env_salt, env_pubkey, env_privkey)
+    crypto_context = get_environment_crypto_context(environment)
+    _, env_pubkey, env_privkey = crypto_context
     context_cache = {}
 
     # Get Secrets from DB
@@ -45,8 +38,14 @@ def get_environment_secrets(environment, path):
             environment=environment,
             path=path,
             deleted_at=None,
-        )
+        ).select_related("environment__app")
+    )
+
+    # Bulk-load every referenced secret before resolving values
+    reference_index = SecretReferenceIndex(
+        environment.app.organisation_id, context_cache=context_cache
     )
+    reference_index.prefetch(secrets)
 
     kv_pairs = []
 
@@ -58,6 +57,7 @@ def get_environment_secrets(environment, path):
             require_resolved_references=True,
             crypto_context=crypto_context,
             context_cache=context_cache,
+            reference_index=reference_index,
         )
         comment = (
             decrypt_asymmetric(secret.comment, env_privkey, env_pubkey)
@@ -68,3 +68,54 @@ def get_environment_secrets(environment, path):
         kv_pairs.append((key, value, comment))
 
     return kv_pairs
+
+
+def compute_sync_digest(environment_sync, secrets):
+    """
+    Fingerprint of everything a sync run would push: the resolved secrets
+    plus the sync's destination and credentials.
+
+    Keyed with SERVER_SECRET so the stored digest cannot be used to test
+    guesses of secret values.
+
+    Args:
+        environment_sync (EnvironmentSync): The sync being run.
+        secrets (List[Tuple[str, str, str]]): Output of get_environment_secrets.
+
+    Returns:
+        str: A hex HMAC-SHA256 digest.
+    """
+    authentication = environment_sync.authentication
+    payload = json.dumps(
+        {
+            "service": environment_sync.service,
+            "path": environment_sync.path,
+            "options": environment_sync.options,
+            "authentication": (
+                [str(authentication.id), authentication.credentials]
+                if authentication
+                else None
+            ),
+            "secrets": sorted(list(secret) for secret in secrets),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return _sync_hmac(payload)
+
+
+def secret_value_digest(*parts):
+    """
+    Keyed fingerprint of one pushed secret, e.g. its destination URL, the
+    request fields other than the (randomly sealed) ciphertext, and the
+    plaintext value. Lets providers that only accept sealed values skip
+    re-uploading secrets that haven't changed.
+    """
+    return _sync_hmac(json.dumps(parts, sort_keys=True, default=str))
+
+
+def _sync_hmac(payload):
+    key = hashlib.sha256(
+        f"sync-digest:{settings.SERVER_SECRET}".encode()
+    ).digest()
+    return hmac.new(key, payload.encode(), hashlib.sha256).hexdigest()
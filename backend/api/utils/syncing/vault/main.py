@@ -3,6 +3,17 @@ from hvac import Client as VaultClient, exceptions as hvac_exceptions
 import graphene
 from django.conf import settings
 from api.utils.network import validate_url_is_safe
+from api.utils.syncing.planner import (
+    UNKNOWN,
+    apply_plan,
+    dry_run_result,
+    is_dry_run,
+    plan_sync,
+    plannable,
+)
+
+# Concurrent KV writes per sync.
+VAULT_SYNC_MAX_WORKERS = 4
 
 
 class VaultMountType(graphene.ObjectType):
@@ -55,7 +66,15 @@ def test_vault_creds(credential_id):
         return False
 
 
-def sync_vault_secrets(secrets, credential_id, engine, path):
+@plannable
+def sync_vault_secrets(secrets, credential_id, engine, path, value_digests=None):
+    """
+    Sync each secret to its own KV v2 entry under `path`, deleting entries
+    that are no longer in the environment.
+
+    Vault is not read back per key, so unchanged values are recognised by
+    `value_digests` (updated in place) and only changed entries are written.
+    """
     results = {}
     success = True
 
@@ -77,19 +96,29 @@ def sync_vault_secrets(secrets, credential_id, engine, path):
 
         secrets_dict = {k: v for k, v, _ in secrets}
 
-        for key, value in secrets_dict.items():
+        plan = plan_sync(
+            secrets_dict,
+            {key: UNKNOWN for key in existing_keys},
+            value_digests=value_digests,
+            digest_scope=(engine, path),
+        )
+        if is_dry_run():
+            return dry_run_result(plan)
+
+        def write(key, value):
             secret_path = f"data/{path.lstrip('/')}/{key}"
             client.secrets.kv.v2.create_or_update_secret(
                 mount_point=engine, path=secret_path, secret={key: value}
             )
-            existing_keys.discard(key)
 
-        for key in existing_keys:
+        def delete(key):
             delete_path = f"data/{path.lstrip('/')}/{key}"
             client.secrets.kv.v2.delete_metadata_and_all_versions(
                 mount_point=engine, path=delete_path
             )
 
+        apply_plan(plan, write, delete=delete, max_workers=VAULT_SYNC_MAX_WORKERS)
+
         results["message"] = f"Secrets successfully synced to Vault path: {path}"
 
     except Exception as e:
@@ -3,11 +3,23 @@ import logging
 import time
 from graphene import ObjectType, List, ID, String
 from api.utils.syncing.auth import get_credentials
+from api.utils.syncing.planner import (
+    UNKNOWN,
+    dry_run_result,
+    is_dry_run,
+    map_parallel,
+    plan_sync,
+    plannable,
+)
+from api.utils.syncing.rate_limits import note_rate_limit
 
 logger = logging.getLogger(__name__)
 
 VERCEL_API_BASE_URL = "https://api.vercel.com"
 
+# Concurrent variable deletes per sync; creates and updates are one bulk upsert.
+VERCEL_SYNC_MAX_WORKERS = 4
+
 
 class VercelEnvironmentType(ObjectType):
     id = ID(required=True)
@@ -60,6 +72,7 @@ def vercel_request(method, url, headers, json=None, max_retries=5):
                 reset_ts = int(reset_header)
                 wait_seconds = reset_ts - int(time.time())
                 wait_seconds = max(min(wait_seconds, 300), 1)
+            note_rate_limit(wait_seconds)
 
             logger.warning(
                 f"Vercel {method} {url} rate limited (attempt {attempt + 1}/{max_retries}); "
@@ -323,11 +336,13 @@ def get_existing_env_vars(token, project_id, team_id, target_environment):
             "value": env["value"],
             "target": env["target"],
             "comment": env.get("comment"),
+            "type": env.get("type"),
         }
         for env in filtered_envs
     }
 
 
+@plannable
 def sync_vercel_secrets(
     secrets,
     credential_id,
@@ -335,11 +350,16 @@ def sync_vercel_secrets(
     team_id,
     environment="production",
     secret_type="encrypted",
+    value_digests=None,
 ):
     """
     Sync secrets to a specific Vercel project environment.
     For 'all' environments, creates separate variables for each environment to avoid cross-environment deletion issues.
 
+    Only changed variables are written. Values of non-plain variables aren't
+    returned by Vercel, so those are compared through `value_digests`
+    ({environment: {key: digest}}, updated in place).
+
     Args:
         secrets (list of tuple): List of (key, value, comment) tuples to sync
         credential_id (str): The ID of the stored credentials
@@ -347,6 +367,7 @@ def sync_vercel_secrets(
         team_id (str): The Vercel project team ID
         environment (str): Target environment (development/preview/production/all/custom-env-slug)
         secret_type (str): Type of secret (plain/encrypted/sensitive)
+        value_digests (dict, optional): Digests of previously synced values
 
     Returns:
         tuple: (bool, dict) indicating success/failure and a message
@@ -383,46 +404,87 @@ def sync_vercel_secrets(
         else:
             target_environments = [environment]
 
-        all_success = True
-        messages = []
+        desired = {
+            key: {"value": value, "comment": comment, "type": secret_type}
+            for key, value, comment in secrets
+        }
 
-        # Process each target environment separately
+        # Plan every target environment before changing any of them
+        plans = {}
+        existing_by_env = {}
         for target_env in target_environments:
-            logger.info(f"Processing environment: {target_env}")
-
             # Get existing environment variables for this specific environment
             existing_env_vars = get_existing_env_vars(
                 token, project_id, team_id, target_environment=target_env
             )
+            existing_by_env[target_env] = existing_env_vars
 
             logger.info(
                 f"Found {len(existing_env_vars)} existing variables for environment: {target_env}"
             )
 
+            remote = {
+                key: (
+                    {
+                        "value": var["value"],
+                        "comment": var.get("comment"),
+                        "type": var["type"],
+                    }
+                    if var.get("type") == "plain"
+                    else UNKNOWN
+                )
+                for key, var in existing_env_vars.items()
+            }
+            plans[target_env] = plan_sync(
+                desired,
+                remote,
+                value_digests=(
+                    value_digests.setdefault(target_env, {})
+                    if value_digests is not None
+                    else None
+                ),
+                digest_scope=(project_id, team_id, target_env),
+            )
+
+        if is_dry_run():
+            return dry_run_result(plans)
+
+        all_success = True
+        messages = []
+
+        # Process each target environment separately
+        for target_env, plan in plans.items():
+            logger.info(f"Processing environment: {target_env}")
+
+            if not plan:
+                messages.append(f"No changes to sync for environment: {target_env}")
+                continue
+
+            # Changed variables are replaced, and variables not in the source
+            # removed, before the bulk create.
+            existing_env_vars = existing_by_env[target_env]
+            map_parallel(
+                lambda key: delete_env_var(
+                    token, project_id, team_id, existing_env_vars[key]["id"]
+                ),
+                list(plan.updates) + plan.deletes,
+                VERCEL_SYNC_MAX_WORKERS,
+            )
+            for key in plan.deletes:
+                plan.record_deleted(key)
+
             # Prepare payload for this specific environment
             payload = []
-            updated_count = 0
-
-            for key, value, comment in secrets:
-                # Check if the environment variable exists and needs updating
-                if key in existing_env_vars:
-                    existing_var = existing_env_vars[key]
-                    if value != existing_var["value"] or comment != existing_var.get(
-                        "comment"
-                    ):
-                        logger.info(f"Updating variable in environment: {target_env}")
-                        delete_env_var(token, project_id, team_id, existing_var["id"])
-                        updated_count += 1
-
+            for key, target in {**plan.creates, **plan.updates}.items():
                 # Create environment variable with proper targeting for this specific environment
                 env_var = {
                     "key": key,
-                    "value": value,
+                    "value": target["value"],
                     "type": secret_type,
                 }
 
-                if comment:
-                    env_var["comment"] = comment
+                if target["comment"]:
+                    env_var["comment"] = target["comment"]
 
                 # Always create single-environment variables
                 if target_env in custom_env_map:
@@ -434,45 +496,39 @@ def sync_vercel_secrets(
 
                 payload.append(env_var)
 
-            # Handle deletion of variables not in the source for this specific environment
-            secrets_to_keep = {secret[0] for secret in secrets}
-            deleted_count = 0
-
-            for key, env_var in existing_env_vars.items():
-                if key not in secrets_to_keep:
-                    logger.info(
-                        f"Deleting unused variable from environment: {target_env}"
-                    )
-                    delete_env_var(token, project_id, team_id, env_var["id"])
-                    deleted_count += 1
+            counts = (
+                f"{len(plan.creates)} created, {len(plan.updates)} updated, "
+                f"{len(plan.deletes)} deleted, {len(plan.unchanged)} unchanged"
+            )
 
             # Bulk create environment variables for this environment
-            if payload:
-                logger.info(
-                    f"Syncing {len(payload)} variables to environment: {target_env}"
-                )
+            if not payload:
+                messages.append(f"Successfully synced to {target_env}: {counts}")
+                continue
 
-                url = f"{VERCEL_API_BASE_URL}/v10/projects/{project_id}/env?upsert=true"
-                if team_id is not None:
-                    url += f"&teamId={team_id}"
+            logger.info(
+                f"Syncing {len(payload)} variables to environment: {target_env}"
+            )
 
-                response = vercel_request(
-                    "POST", url, headers=get_vercel_headers(token), json=payload
-                )
+            url = f"{VERCEL_API_BASE_URL}/v10/projects/{project_id}/env?upsert=true"
+            if team_id is not None:
+                url += f"&teamId={team_id}"
 
-                if response.status_code not in [200, 201]:
-                    all_success = False
-                    error_msg = (
-                        f"Failed to sync secrets to {target_env}: {response.text}"
-                    )
-                    logger.error(error_msg)
-                    messages.append(error_msg)
-                else:
-                    success_msg = f"Successfully synced to {target_env}: {len(payload)} total, {updated_count} updated, {deleted_count} deleted"
-                    logger.info(success_msg)
-                    messages.append(success_msg)
+            response = vercel_request(
+                "POST", url, headers=get_vercel_headers(token), json=payload
+            )
+
+            if response.status_code not in [200, 201]:
+                all_success = False
+                error_msg = f"Failed to sync secrets to {target_env}: {response.text}"
+                logger.error(error_msg)
+                messages.append(error_msg)
             else:
-                messages.append(f"No secrets to sync for environment: {target_env}")
+                for key, target in {**plan.creates, **plan.updates}.items():
+                    plan.record_written(key, target)
+                success_msg = f"Successfully synced to {target_env}: {counts}"
+                logger.info(success_msg)
+                messages.append(success_msg)
 
         return all_success, {"message": "\n".join(messages)}
 
@@ -1,14 +1,9 @@
-from datetime import datetime
 from api.utils.access.ip import get_client_ip
+from api.utils.kms import get_app_key_share, log_kms_request
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from django.http import JsonResponse, HttpResponse
 
-from logs.models import KMSDBLog
-from api.models import (
-    App,
-)
-
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
@@ -23,19 +18,20 @@ def kms(request, app_id):
     if not app_token:
         return HttpResponse(status=404)
     try:
-        app = App.objects.get(app_token=app_token)
-        try:
-            timestamp = datetime.now().timestamp() * 1000
-            KMSDBLog.objects.create(
-                app_id=app_id,
-                event_type=event_type,
-                phase_node=phase_node,
-                ph_size=float(ph_size),
-                ip_address=ip_address,
-                timestamp=timestamp,
-            )
-        except:
-            pass
-        return JsonResponse({"wrappedKeyShare": app.wrapped_key_share})
+        wrapped_key_share = get_app_key_share(app_token)
     except:
         return HttpResponse(status=404)
+    if wrapped_key_share is None:
+        return HttpResponse(status=404)
+
+    try:
+        log_kms_request(
+            app_id=app_id,
+            event_type=event_type,
+            phase_node=phase_node,
+            ph_size=ph_size,
+            ip_address=ip_address,
+        )
+    except:
+        pass
+    return JsonResponse({"wrappedKeyShare": wrapped_key_share})
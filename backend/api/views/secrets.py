@@ -13,11 +13,14 @@ from api.serializers import (
 )
 from api.utils.secrets import (
     check_for_duplicates_blind,
-    create_environment_folder_structure,
+    SecretFolderResolver,
     normalize_path_string,
     compute_key_digest,
     get_environment_keys,
     get_environment_crypto_context,
+    SecretReferenceIndex,
+    get_referenced_environment_versions,
+    update_secret_references,
 )
 from api.utils.access.permissions import (
     user_has_permission,
@@ -29,9 +32,13 @@ from api.utils.rest import (
     METHOD_TO_ACTION,
     get_resolver_request_meta,
 )
+import hashlib
 import logging
 import json
-from api.content_negotiation import CamelCaseContentNegotiation
+from api.content_negotiation import (
+    CamelCaseContentNegotiation,
+    CamelCaseNDJSONRenderer,
+)
 from api.utils.access.middleware import IsIPAllowed
 from api.throttling import PlanBasedRateThrottle
 from ee.integrations.secrets.dynamic.exceptions import (
@@ -48,8 +55,11 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework import status
-from django.http import JsonResponse
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
 from djangorestframework_camel_case.render import (
     CamelCaseJSONRenderer,
 )
@@ -93,16 +103,139 @@ def _validate_override(override):
     return None
 
 
+def _tag_filter_state(env, tag_names):
+    """The tags a `?tags=` filter matches and their links to the environment's
+    secrets. Tag renames and tag assignments don't bump the environment."""
+    tags = list(
+        SecretTag.objects.filter(
+            organisation=env.app.organisation, name__in=tag_names.split(",")
+        )
+        .order_by("id")
+        .values_list("id", "updated_at")
+    )
+    links = (
+        Secret.tags.through.objects.filter(
+            secret__environment=env, secrettag_id__in=[tag_id for tag_id, _ in tags]
+        )
+        .order_by("secret_id", "secrettag_id")
+        .values_list("secret_id", "secrettag_id")
+    )
+    return [f"{tag_id}:{updated_at}" for tag_id, updated_at in tags] + [
+        f"{secret_id}:{tag_id}" for secret_id, tag_id in links
+    ]
+
+
+def _secrets_etag(request, env, include_dynamic_secrets):
+    """Version token for a PublicSecretsView.get response, computed without
+    touching any ciphertext. Covers everything the response depends on: the
+    environment and every environment its secrets reference (any secret or
+    dynamic secret write bumps Environment.updated_at), the caller (access
+    checks and personal overrides are per-caller), the query filters, and
+    the state of the tags filtered on.
+
+    None (no ETag) while the environment's references are not indexed."""
+    auth = request.auth
+    org_member = auth.get("org_member")
+
+    parts = [
+        "v1",
+        str(env.id),
+        str(env.updated_at),
+        str(auth.get("auth_type")),
+        str(getattr(org_member, "id", None)),
+        str(getattr(auth.get("service_account"), "id", None)),
+        str(getattr(auth.get("service_token"), "id", None)),
+        request.GET.get("key", ""),
+        normalize_path_string(request.GET["path"]) if request.GET.get("path") else "",
+        request.GET.get("tags", ""),
+        str(include_dynamic_secrets),
+    ]
+
+    referenced = get_referenced_environment_versions(env)
+    if referenced is None:
+        # References not indexed yet: changes in referenced environments
+        # can't be detected, so the response must not be cacheable.
+        return None
+    for env_id in sorted(referenced):
+        parts.append(f"{env_id}:{referenced[env_id]}")
+
+    if request.GET.get("tags"):
+        parts.extend(_tag_filter_state(env, request.GET["tags"]))
+
+    # Personal overrides are written without bumping the environment.
+    if org_member is not None:
+        overrides = PersonalSecret.objects.filter(
+            secret__environment=env, user=org_member
+        ).aggregate(count=Count("id"), last_updated=Max("updated_at"))
+        parts.append(f"{overrides['count']}:{overrides['last_updated']}")
+
+    digest = hashlib.sha256("|".join(parts).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def _etag_matches(request, etag):
+    """If-None-Match uses weak comparison, so W/ prefixes are ignored."""
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    if "*" in candidates:
+        return True
+    return any(c.removeprefix("W/") == etag for c in candidates)
+
+
+# Secrets decrypted, audit-logged and emitted per batch when streaming, and
+# rows fetched per round trip from the server-side cursor.
+_STREAM_BATCH_SIZE = 200
+
+def _requested_stream_format(request):
+    """Streaming is opt-in: `?stream=ndjson` or an `Accept: application/x-ndjson`
+    header selects NDJSON, any other truthy `?stream` value a JSON array.
+    Returns "ndjson", "json" or None (buffered response, the default)."""
+    stream = request.GET.get("stream")
+    if stream is not None and stream.lower() != "false":
+        return "ndjson" if stream.lower() == "ndjson" else "json"
+    if isinstance(getattr(request, "accepted_renderer", None), CamelCaseNDJSONRenderer):
+        return "ndjson"
+    return None
+
+
+def _encode_stream(items, stream_format):
+    """Render items one at a time with the same camel-case JSON renderer as
+    buffered responses. The status line has already been sent by the time an
+    item fails, so NDJSON streams end with an error object and JSON arrays
+    are left unterminated for the client to detect."""
+    renderer = CamelCaseJSONRenderer()
+    first = True
+    try:
+        if stream_format == "json":
+            yield b"["
+        for item in items:
+            chunk = renderer.render(item)
+            if stream_format == "ndjson":
+                yield chunk + b"\n"
+            else:
+                yield chunk if first else b"," + chunk
+            first = False
+        if stream_format == "json":
+            yield b"]"
+    except Exception as e:
+        logger.exception("Secrets stream aborted")
+        if stream_format == "ndjson":
+            detail = getattr(e, "detail", None) or "Failed to read secrets."
+            yield renderer.render({"error": str(detail)}) + b"\n"
+
+
 _SECRET_TAG_NAME_MAX_LEN = 64
 
+# Rows per INSERT/UPDATE statement on the bulk write paths.
+_BULK_WRITE_BATCH_SIZE = 500
 
-def _resolve_secret_tags(tag_names, org):
-    """Resolve tag names to SecretTag rows for the org, auto-creating any
-    that don't yet exist. Returns (tags, error_response_or_None). Without
-    auto-create, names that aren't already in the org's tag set would
-    silently disappear (no public REST endpoint exists to pre-create
-    tags)."""
-    resolved = []
+
+def _clean_tag_names(tag_names):
+    """Strip and validate requested tag names, skipping blanks and non-strings.
+    Returns (names, error_response_or_None)."""
+    names = []
     for raw in tag_names or []:
         if not isinstance(raw, str):
             continue
@@ -119,6 +252,21 @@ def _resolve_secret_tags(tag_names, org):
                 },
                 status=400,
             )
+        names.append(name)
+    return names, None
+
+
+def _resolve_secret_tags(tag_names, org):
+    """Resolve tag names to SecretTag rows for the org, auto-creating any
+    that don't yet exist. Returns (tags, error_response_or_None). Without
+    auto-create, names that aren't already in the org's tag set would
+    silently disappear (no public REST endpoint exists to pre-create
+    tags)."""
+    names, err = _clean_tag_names(tag_names)
+    if err is not None:
+        return None, err
+    resolved = []
+    for name in names:
         tag, _ = SecretTag.objects.get_or_create(
             organisation=org,
             name=name,
@@ -128,6 +276,42 @@ def _resolve_secret_tags(tag_names, org):
     return resolved, None
 
 
+def _resolve_secret_tags_bulk(tag_name_lists, org):
+    """Batch form of _resolve_secret_tags for a whole request: every name is
+    validated before anything is written, then resolved with one lookup and
+    one insert for names the org doesn't have yet. Returns
+    ({name: tag}, error_response_or_None)."""
+    wanted = set()
+    for tag_names in tag_name_lists:
+        names, err = _clean_tag_names(tag_names)
+        if err is not None:
+            return None, err
+        wanted.update(names)
+
+    if not wanted:
+        return {}, None
+
+    tags_by_name = {
+        tag.name: tag
+        for tag in SecretTag.objects.filter(organisation=org, name__in=wanted)
+    }
+    missing = [
+        SecretTag(organisation=org, name=name, color="")
+        for name in sorted(wanted - tags_by_name.keys())
+    ]
+    if missing:
+        SecretTag.objects.bulk_create(missing)
+        tags_by_name.update((tag.name, tag) for tag in missing)
+
+    return tags_by_name, None
+
+
+def _tags_for(tag_names, tags_by_name):
+    """The distinct resolved tags for one secret's requested names."""
+    names, _ = _clean_tag_names(tag_names)
+    return list({tags_by_name[name].id: tags_by_name[name] for name in names}.values())
+
+
 class E2EESecretsView(APIView):
     authentication_classes = [PhaseTokenAuthentication]
     permission_classes = [IsAuthenticated, IsIPAllowed]
@@ -368,6 +552,7 @@ class E2EESecretsView(APIView):
             return JsonResponse({"error": "Duplicate secret found"}, status=409)
 
         created_secrets = []
+        folder_resolver = SecretFolderResolver(env.id)
 
         # Defer per-secret sync triggering (trigger_sync=False); trigger once below.
         try:
@@ -396,7 +581,7 @@ class E2EESecretsView(APIView):
                 folder = None
 
                 if path != "/":
-                    folder = create_environment_folder_structure(path, env.id)
+                    folder = folder_resolver.resolve(path)
 
                 secret_data = {
                     "environment": env,
@@ -424,6 +609,7 @@ class E2EESecretsView(APIView):
                     )
         finally:
             if created_secrets:
+                update_secret_references(created_secrets)
                 env.save()
 
         log_secret_events_bulk(
@@ -454,6 +640,7 @@ class E2EESecretsView(APIView):
             return JsonResponse({"error": "Duplicate secret found"}, status=409)
 
         updated_secrets = []
+        folder_resolver = SecretFolderResolver(env.id)
 
         # Defer per-secret sync triggering (trigger_sync=False); trigger once below.
         try:
@@ -531,7 +718,7 @@ class E2EESecretsView(APIView):
                     path = normalize_path_string(secret["path"])
 
                     if path != "/":
-                        folder = create_environment_folder_structure(path, env.id)
+                        folder = folder_resolver.resolve(path)
 
                     secret_data["path"] = path
                     secret_data["folder"] = folder
@@ -559,6 +746,7 @@ class E2EESecretsView(APIView):
                     )
         finally:
             if updated_secrets:
+                update_secret_references(updated_secrets)
                 env.save()
 
         log_secret_events_bulk(
@@ -612,6 +800,7 @@ class E2EESecretsView(APIView):
                 secret.save(trigger_sync=False)
                 deleted_secrets.append(secret)
         finally:
+            update_secret_references(deleted_secrets)
             for env in affected_envs.values():
                 env.save()
 
@@ -634,6 +823,7 @@ class PublicSecretsView(APIView):
     throttle_classes = [PlanBasedRateThrottle]
     renderer_classes = [
         CamelCaseJSONRenderer,
+        CamelCaseNDJSONRenderer,
     ]
 
     def initial(self, request, *args, **kwargs):
@@ -680,6 +870,24 @@ class PublicSecretsView(APIView):
         if not env.app.sse_enabled:
             return Response({"error": "SSE is not enabled for this App"}, status=400)
 
+        include_dynamic_secrets = (
+            # treat presence (any value) of either param as True unless explicitly "false"
+            (
+                "dynamic" in request.GET
+                and request.GET.get("dynamic", "false").lower() != "false"
+            )
+            or (
+                "include_dynamic" in request.GET
+                and request.GET.get("include_dynamic", "false").lower() != "false"
+            )
+        )
+
+        # If ?lease is present, generate a lease per secret
+        include_lease = include_dynamic_secrets and (
+            "lease" in request.GET
+            and request.GET.get("lease", "false").lower() != "false"
+        )
+
         ip_address, user_agent = get_resolver_request_meta(request)
 
         secrets_filter = {"environment": env, "deleted_at": None}
@@ -713,8 +921,49 @@ class PublicSecretsView(APIView):
             # Filter secrets based on these tags
             secrets_filter["tags__in"] = tags
 
+        # Conditional GET: unchanged polls get a 304 without decrypting
+        # anything. The client still reads the values it holds, so the read
+        # is audit-logged as for a full response, from the secret rows alone.
+        # Leases are minted per request, so responses carrying them are
+        # never reusable and get no ETag.
+        etag = None
+        if not include_lease:
+            etag = _secrets_etag(request, env, include_dynamic_secrets)
+            if etag is not None and _etag_matches(request, etag):
+                log_secret_events_bulk(
+                    list(
+                        Secret.objects.filter(**secrets_filter).only(
+                            "id", "environment_id", "folder_id", "path", "version", "type"
+                        )
+                    ),
+                    SecretEvent.READ,
+                    request.auth["org_member"],
+                    request.auth["service_token"],
+                    request.auth["service_account_token"],
+                    ip_address,
+                    user_agent,
+                )
+                return Response(
+                    status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+                )
+
+        stream_format = _requested_stream_format(request)
+        if stream_format is not None:
+            return self._stream_secrets(
+                request,
+                env,
+                account,
+                secrets_filter,
+                stream_format,
+                include_dynamic_secrets,
+                include_lease,
+                etag,
+            )
+
         secrets = list(
-            Secret.objects.filter(**secrets_filter).prefetch_related('tags')
+            Secret.objects.filter(**secrets_filter)
+            .select_related("environment__app")
+            .prefetch_related("tags")
         )
 
         log_secret_events_bulk(
@@ -731,6 +980,13 @@ class PublicSecretsView(APIView):
         crypto_context = get_environment_crypto_context(env)
         context_cache = {}
 
+        # Bulk-load everything the batch references up front, rather than
+        # resolving each reference with its own queries.
+        reference_index = SecretReferenceIndex(
+            env.app.organisation_id, account=account, context_cache=context_cache
+        )
+        reference_index.prefetch(secrets)
+
         serializer = SecretSerializer(
             secrets,
             many=True,
@@ -740,140 +996,228 @@ class PublicSecretsView(APIView):
                 "sse": True,
                 "crypto_context": crypto_context,
                 "context_cache": context_cache,
+                "reference_index": reference_index,
             },
         )
 
-        include_dynamic_secrets = (
-            # treat presence (any value) of either param as True unless explicitly "false"
-            (
-                "dynamic" in request.GET
-                and request.GET.get("dynamic", "false").lower() != "false"
-            )
-            or (
-                "include_dynamic" in request.GET
-                and request.GET.get("include_dynamic", "false").lower() != "false"
+        dynamic_secrets_data = []
+        if include_dynamic_secrets:
+            dynamic_secrets_data, err = self._get_dynamic_secrets_data(
+                request, env, include_lease
             )
+            if err is not None:
+                return err
+
+        response_data = serializer.data
+
+        if include_dynamic_secrets:
+            response_data.extend(dynamic_secrets_data)
+
+        response = Response(
+            response_data,
+            status=status.HTTP_200_OK,
         )
+        if etag is not None:
+            response["ETag"] = etag
+        return response
+
+    def _stream_secrets(
+        self,
+        request,
+        env,
+        account,
+        secrets_filter,
+        stream_format,
+        include_dynamic_secrets,
+        include_lease,
+        etag,
+    ):
+        """Streaming variant of get(). Secrets are read from a server-side
+        cursor and decrypted, resolved, audit-logged and emitted one batch at a
+        time, so memory stays flat however large the environment is."""
+        ip_address, user_agent = get_resolver_request_meta(request)
 
+        # Dynamic secrets (and their leases) are settled before the first byte
+        # so lease failures can still be reported with a proper status code.
         dynamic_secrets_data = []
         if include_dynamic_secrets:
-            dynamic_secrets_filter = {
-                "environment": env,
-                "deleted_at": None,
-            }
-            try:
-                path = request.GET.get("path")
-                if path:
-                    path = normalize_path_string(path)
-                    dynamic_secrets_filter["path"] = path
-            except Exception:
-                pass
+            dynamic_secrets_data, err = self._get_dynamic_secrets_data(
+                request, env, include_lease
+            )
+            if err is not None:
+                return err
 
-            dynamic_secrets_qs = DynamicSecret.objects.filter(**dynamic_secrets_filter)
+        crypto_context = get_environment_crypto_context(env)
 
-            # If ?lease is present, generate a lease per secret
-            include_lease = (
-                "lease" in request.GET
-                and request.GET.get("lease", "false").lower() != "false"
-            )
+        queryset = (
+            Secret.objects.filter(**secrets_filter)
+            .select_related("environment__app")
+            .prefetch_related("tags")
+        )
 
-            # Get optional lease_ttl parameter for custom TTL
-            lease_ttl = request.GET.get("lease_ttl")
-            if lease_ttl:
-                try:
-                    lease_ttl = int(lease_ttl)
-                except ValueError:
-                    return Response(
-                        {"error": "lease_ttl must be a valid integer (seconds)"},
-                        status=400,
-                    )
+        def batches():
+            batch = []
+            for secret in queryset.iterator(chunk_size=_STREAM_BATCH_SIZE):
+                batch.append(secret)
+                if len(batch) == _STREAM_BATCH_SIZE:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        def items():
+            context_cache = {}
+            for batch in batches():
+                log_secret_events_bulk(
+                    batch,
+                    SecretEvent.READ,
+                    request.auth["org_member"],
+                    request.auth["service_token"],
+                    request.auth["service_account_token"],
+                    ip_address,
+                    user_agent,
+                )
 
-            service_account = None
-            if request.auth.get("service_account_token") is not None:
-                service_account = request.auth["service_account_token"].service_account
+                # A fresh index per batch keeps memoized references bounded.
+                reference_index = SecretReferenceIndex(
+                    env.app.organisation_id,
+                    account=account,
+                    context_cache=context_cache,
+                )
+                reference_index.prefetch(batch)
+
+                context = {
+                    "org_member": request.auth["org_member"],
+                    "account": account,
+                    "sse": True,
+                    "crypto_context": crypto_context,
+                    "context_cache": context_cache,
+                    "reference_index": reference_index,
+                }
+                for secret in batch:
+                    yield SecretSerializer(secret, context=context).data
+
+            yield from dynamic_secrets_data
+
+        response = StreamingHttpResponse(
+            _encode_stream(items(), stream_format),
+            content_type=(
+                CamelCaseNDJSONRenderer.media_type
+                if stream_format == "ndjson"
+                else CamelCaseJSONRenderer.media_type
+            ),
+        )
+        if etag is not None:
+            response["ETag"] = etag
+        return response
+
+    def _get_dynamic_secrets_data(self, request, env, include_lease):
+        """Serialize the environment's dynamic secrets, minting a lease per
+        secret when requested. Returns (data, None) on success or
+        (None, Response) if a lease could not be created."""
+        dynamic_secrets_filter = {
+            "environment": env,
+            "deleted_at": None,
+        }
+        try:
+            path = request.GET.get("path")
+            if path:
+                path = normalize_path_string(path)
+                dynamic_secrets_filter["path"] = path
+        except Exception:
+            pass
 
-            if include_lease:
-                leases_by_secret_id = {}
-                failed_leases = []
-                for ds in dynamic_secrets_qs:
-                    try:
-                        lease, _ = create_dynamic_secret_lease(
-                            ds,
-                            ttl=lease_ttl,
-                            organisation_member=request.auth.get("org_member"),
-                            service_account=service_account,
-                            request=request,
-                        )
-                        leases_by_secret_id[ds.id] = str(lease.id)
-                    except PlanRestrictionError as e:
-                        return Response({"error": str(e)}, status=403)
-                    except (TTLExceededError,) as e:
-                        failed_leases.append(
-                            {
-                                "secret_id": str(ds.id),
-                                "secret_name": ds.name,
-                                "error": str(e),
-                            }
-                        )
-                    except DynamicSecretError as e:
-                        failed_leases.append(
-                            {
-                                "secret_id": str(ds.id),
-                                "secret_name": ds.name,
-                                "error": str(e),
-                            }
-                        )
-                    except Exception as e:
-                        logger.exception(
-                            "Unexpected error creating lease for dynamic secret %s",
-                            ds.id,
-                        )
-                        failed_leases.append(
-                            {
-                                "secret_id": str(ds.id),
-                                "secret_name": ds.name,
-                                "error": str(e),
-                            }
-                        )
+        dynamic_secrets_qs = DynamicSecret.objects.filter(**dynamic_secrets_filter)
 
-                # If any leases failed to create, return error response
-                if failed_leases:
-                    return Response(
-                        {
-                            "error": "One or more dynamic secret leases could not be created",
-                            "failed_leases": failed_leases,
-                            "successful_leases": len(leases_by_secret_id),
-                        },
-                        status=400,
-                    )
+        # Get optional lease_ttl parameter for custom TTL
+        lease_ttl = request.GET.get("lease_ttl")
+        if lease_ttl:
+            try:
+                lease_ttl = int(lease_ttl)
+            except ValueError:
+                return None, Response(
+                    {"error": "lease_ttl must be a valid integer (seconds)"},
+                    status=400,
+                )
 
-                # Serialize each secret with its lease_id in context
-                dynamic_secrets_data = [
-                    DynamicSecretSerializer(
+        service_account = None
+        if request.auth.get("service_account_token") is not None:
+            service_account = request.auth["service_account_token"].service_account
+
+        if include_lease:
+            leases_by_secret_id = {}
+            failed_leases = []
+            for ds in dynamic_secrets_qs:
+                try:
+                    lease, _ = create_dynamic_secret_lease(
                         ds,
-                        context={
-                            "sse": True,
-                            "with_credentials": True,
-                            "lease_id": leases_by_secret_id.get(ds.id),
-                        },
-                    ).data
-                    for ds in dynamic_secrets_qs
-                ]
-            else:
-                # Serialize without lease
-                dynamic_secrets_data = DynamicSecretSerializer(
-                    dynamic_secrets_qs, many=True, context={"sse": True}
-                ).data
+                        ttl=lease_ttl,
+                        organisation_member=request.auth.get("org_member"),
+                        service_account=service_account,
+                        request=request,
+                    )
+                    leases_by_secret_id[ds.id] = str(lease.id)
+                except PlanRestrictionError as e:
+                    return None, Response({"error": str(e)}, status=403)
+                except (TTLExceededError,) as e:
+                    failed_leases.append(
+                        {
+                            "secret_id": str(ds.id),
+                            "secret_name": ds.name,
+                            "error": str(e),
+                        }
+                    )
+                except DynamicSecretError as e:
+                    failed_leases.append(
+                        {
+                            "secret_id": str(ds.id),
+                            "secret_name": ds.name,
+                            "error": str(e),
+                        }
+                    )
+                except Exception as e:
+                    logger.exception(
+                        "Unexpected error creating lease for dynamic secret %s",
+                        ds.id,
+                    )
+                    failed_leases.append(
+                        {
+                            "secret_id": str(ds.id),
+                            "secret_name": ds.name,
+                            "error": str(e),
+                        }
+                    )
 
-        response_data = serializer.data
+            # If any leases failed to create, return error response
+            if failed_leases:
+                return None, Response(
+                    {
+                        "error": "One or more dynamic secret leases could not be created",
+                        "failed_leases": failed_leases,
+                        "successful_leases": len(leases_by_secret_id),
+                    },
+                    status=400,
+                )
 
-        if include_dynamic_secrets:
-            response_data.extend(dynamic_secrets_data)
+            # Serialize each secret with its lease_id in context
+            dynamic_secrets_data = [
+                DynamicSecretSerializer(
+                    ds,
+                    context={
+                        "sse": True,
+                        "with_credentials": True,
+                        "lease_id": leases_by_secret_id.get(ds.id),
+                    },
+                ).data
+                for ds in dynamic_secrets_qs
+            ]
+        else:
+            # Serialize without lease
+            dynamic_secrets_data = DynamicSecretSerializer(
+                dynamic_secrets_qs, many=True, context={"sse": True}
+            ).data
 
-        return Response(
-            response_data,
-            status=status.HTTP_200_OK,
-        )
+        return dynamic_secrets_data, None
 
     def post(self, request, *args, **kwargs):
 
@@ -949,60 +1293,71 @@ class PublicSecretsView(APIView):
         if check_for_duplicates_blind(secrets, env):
             return JsonResponse({"error": "Duplicate secret found"}, status=409)
 
-        created_secrets = []
-
-        # Defer per-secret sync triggering (trigger_sync=False); trigger once below.
-        try:
-            for secret in secrets:
-
-                try:
-                    path = normalize_path_string(secret["path"])
-                except:
-                    path = "/"
-
-                folder = None
-
-                if path != "/":
-                    folder = create_environment_folder_structure(path, env.id)
-
-                secret_data = {
-                    "environment": env,
-                    "path": path,
-                    "folder": folder,
-                    "key": secret["key"],
-                    "key_digest": secret["keyDigest"],
-                    "value": secret["value"],
-                    "version": 1,
-                    "comment": secret["comment"],
-                    "type": secret.get("type", "secret"),
-                }
+        tags_by_name, err = _resolve_secret_tags_bulk(
+            [secret["tags"] for secret in secrets if "tags" in secret],
+            env.app.organisation,
+        )
+        if err is not None:
+            return err
 
-                secret_obj = Secret(**secret_data)
-                secret_obj.save(force_insert=True, trigger_sync=False)
+        paths = []
+        for secret in secrets:
+            try:
+                paths.append(normalize_path_string(secret["path"]))
+            except:
+                paths.append("/")
+
+        # Resolve the folder tree for the whole batch at once.
+        folders = SecretFolderResolver(env.id).resolve_many(set(paths))
+        secret_objs = []
+        for secret, path in zip(secrets, paths):
+            secret_objs.append(
+                Secret(
+                    environment=env,
+                    path=path,
+                    folder=folders[path],
+                    key=secret["key"],
+                    key_digest=secret["keyDigest"],
+                    value=secret["value"],
+                    version=1,
+                    comment=secret["comment"],
+                    type=secret.get("type", "secret"),
+                )
+            )
 
-                # Optionally set tags (auto-create unknown names so the caller
-                # doesn't silently lose them — see _resolve_secret_tags).
-                if "tags" in secret:
-                    tags, err = _resolve_secret_tags(
-                        secret["tags"],
-                        request.auth["environment"].app.organisation,
-                    )
-                    if err is not None:
-                        return err
-                    secret_obj.tags.set(tags)
+        # Single bulk write for the secrets, their tag links and overrides.
+        # Secret.save() is bypassed, so the env is notified once afterwards.
+        with transaction.atomic():
+            Secret.objects.bulk_create(secret_objs, batch_size=_BULK_WRITE_BATCH_SIZE)
+
+            tag_links = [
+                Secret.tags.through(secret_id=secret_obj.id, secrettag_id=tag.id)
+                for secret_obj, secret in zip(secret_objs, secrets)
+                if "tags" in secret
+                for tag in _tags_for(secret["tags"], tags_by_name)
+            ]
+            Secret.tags.through.objects.bulk_create(
+                tag_links, batch_size=_BULK_WRITE_BATCH_SIZE
+            )
 
-                # If the request is authenticated as a user and an override is supplied
-                if request.auth["org_member"] and "override" in secret:
-                    PersonalSecret.objects.create(
-                        secret=secret_obj,
-                        user=request.auth["org_member"],
-                        value=secret["override"]["value"],
-                    )
+            # If the request is authenticated as a user and an override is supplied
+            if request.auth["org_member"]:
+                PersonalSecret.objects.bulk_create(
+                    [
+                        PersonalSecret(
+                            secret=secret_obj,
+                            user=request.auth["org_member"],
+                            value=secret["override"]["value"],
+                        )
+                        for secret_obj, secret in zip(secret_objs, secrets)
+                        if "override" in secret
+                    ],
+                    batch_size=_BULK_WRITE_BATCH_SIZE,
+                )
 
-                created_secrets.append(secret_obj)
-        finally:
-            if created_secrets:
-                env.save()
+        created_secrets = secret_objs
+        update_secret_references(created_secrets)
+        env.save()
 
         log_secret_events_bulk(
             created_secrets,
@@ -1050,9 +1405,18 @@ class PublicSecretsView(APIView):
             )
 
         allowed_types = {c[0] for c in Secret.SECRET_TYPE_CHOICES}
+        seen_ids = set()
         for secret in secrets:
             if not isinstance(secret, dict) or "id" not in secret:
                 return JsonResponse({"error": "Secret ID not provided"}, status=400)
+            # Entries are applied to one row per id, so a repeated id would
+            # bump its version twice and silently keep only the last entry.
+            if str(secret["id"]) in seen_ids:
+                return JsonResponse(
+                    {"error": f"Duplicate secret ID in request: {secret['id']}"},
+                    status=400,
+                )
+            seen_ids.add(str(secret["id"]))
             stype = secret.get("type")
             if stype is not None and stype not in allowed_types:
                 return JsonResponse(
@@ -1074,127 +1438,202 @@ class PublicSecretsView(APIView):
         env_pubkey, _ = get_environment_keys(env.id)
 
         for secret in secrets:
-            # if a secret key is being updated, encrypt the key, compute digest, and check for duplicates
+            # if a secret key is being updated, encrypt the key and compute its digest
             if "key" in secret:
                 secret["keyDigest"] = compute_key_digest(secret["key"], env.id)
                 secret["key"] = encrypt_asymmetric(secret["key"].upper(), env_pubkey)
-
-                if check_for_duplicates_blind(secrets, env):
-                    return JsonResponse({"error": "Duplicate secret found"}, status=409)
             if "override" in secret:
                 secret["override"]["value"] = encrypt_asymmetric(
                     (secret["override"]["value"]), env_pubkey
                 )
 
-        updated_secrets = []
+        # One check over every re-keyed secret in the batch.
+        if any("key" in secret for secret in secrets) and check_for_duplicates_blind(
+            secrets, env
+        ):
+            return JsonResponse({"error": "Duplicate secret found"}, status=409)
 
-        # Defer per-secret sync triggering (trigger_sync=False); trigger once below.
-        try:
-            for secret in secrets:
+        secret_objs = {
+            str(secret_obj.id): secret_obj
+            for secret_obj in Secret.objects.filter(
+                id__in=[str(secret["id"]) for secret in secrets], environment=env
+            )
+        }
 
-                try:
-                    secret_obj = Secret.objects.get(id=secret["id"], environment=env)
-                except (Secret.DoesNotExist, ValueError):
-                    return JsonResponse(
-                        {"error": f"Secret not found: {secret['id']}"},
-                        status=404,
-                    )
+        # Validate the whole batch before writing anything.
+        for secret in secrets:
+            secret_obj = secret_objs.get(str(secret["id"]))
+            if secret_obj is None:
+                return JsonResponse(
+                    {"error": f"Secret not found: {secret['id']}"},
+                    status=404,
+                )
 
-                if secret_obj.rotating_secret_id is not None:
-                    return JsonResponse(
-                        {
-                            "error": (
-                                "Rotating secrets are managed by the Phase rotation "
-                                "engine and cannot be updated via this endpoint."
-                            )
-                        },
-                        status=400,
-                    )
+            if secret_obj.rotating_secret_id is not None:
+                return JsonResponse(
+                    {
+                        "error": (
+                            "Rotating secrets are managed by the Phase rotation "
+                            "engine and cannot be updated via this endpoint."
+                        )
+                    },
+                    status=400,
+                )
 
-                if "key" not in secret:
-                    secret["key"] = secret_obj.key
-                    secret["keyDigest"] = secret_obj.key_digest
+            # Enforce seal permanence
+            if secret_obj.type == "sealed" and secret.get("type") is not None and secret.get("type") != "sealed":
+                return JsonResponse(
+                    {"error": "Sealed secrets cannot be unsealed. Delete and recreate the secret instead."},
+                    status=400,
+                )
 
-                if "value" in secret:
-                    secret["value"] = encrypt_asymmetric(secret["value"], env_pubkey)
-                else:
-                    secret["value"] = secret_obj.value
+        tags_by_name, err = _resolve_secret_tags_bulk(
+            [secret["tags"] for secret in secrets if "tags" in secret],
+            env.app.organisation,
+        )
+        if err is not None:
+            return err
 
-                if "comment" in secret:
-                    secret["comment"] = encrypt_asymmetric(secret["comment"], env_pubkey)
-                else:
-                    secret["comment"] = secret_obj.comment
+        paths = {}
+        for secret in secrets:
+            try:
+                paths[str(secret["id"])] = normalize_path_string(secret["path"])
+            except:
+                pass
 
-                # Enforce seal permanence
-                if secret_obj.type == "sealed" and secret.get("type") is not None and secret.get("type") != "sealed":
-                    return JsonResponse(
-                        {"error": "Sealed secrets cannot be unsealed. Delete and recreate the secret instead."},
-                        status=400,
-                    )
+        # Resolve the folder tree for the whole batch at once.
+        folders = SecretFolderResolver(env.id).resolve_many(set(paths.values()))
 
-                secret_data = {
-                    "environment": env,
-                    "key": secret["key"],
-                    "key_digest": secret["keyDigest"],
-                    "value": secret["value"],
-                    "version": secret_obj.version + 1,
-                    "comment": secret["comment"],
-                }
+        now = timezone.now()
+        updated_secrets = []
+        for secret in secrets:
+            secret_obj = secret_objs[str(secret["id"])]
 
-                # For sealed secrets, preserve existing encrypted value
-                if secret_obj.type == "sealed":
-                    secret_data["value"] = secret_obj.value
+            if "key" not in secret:
+                secret["key"] = secret_obj.key
+                secret["keyDigest"] = secret_obj.key_digest
 
-                # Set type if provided
-                if "type" in secret:
-                    secret_data["type"] = secret["type"]
+            if "value" in secret:
+                secret["value"] = encrypt_asymmetric(secret["value"], env_pubkey)
+            else:
+                secret["value"] = secret_obj.value
 
-                try:
-                    folder = None
-                    path = normalize_path_string(secret["path"])
+            if "comment" in secret:
+                secret["comment"] = encrypt_asymmetric(secret["comment"], env_pubkey)
+            else:
+                secret["comment"] = secret_obj.comment
 
-                    if path != "/":
-                        folder = create_environment_folder_structure(path, env.id)
+            secret_data = {
+                "environment": env,
+                "key": secret["key"],
+                "key_digest": secret["keyDigest"],
+                "value": secret["value"],
+                "version": secret_obj.version + 1,
+                "comment": secret["comment"],
+            }
 
-                    secret_data["path"] = path
-                    secret_data["folder"] = folder
-                except:
-                    pass
+            # For sealed secrets, preserve existing encrypted value
+            if secret_obj.type == "sealed":
+                secret_data["value"] = secret_obj.value
+
+            # Set type if provided
+            if "type" in secret:
+                secret_data["type"] = secret["type"]
+
+            path = paths.get(str(secret["id"]))
+            if path is not None:
+                secret_data["path"] = path
+                secret_data["folder"] = folders[path]
+
+            for key, value in secret_data.items():
+                setattr(secret_obj, key, value)
+
+            secret_obj.updated_at = now
+            updated_secrets.append(secret_obj)
+
+        # Secret.save() is bypassed by the bulk write, so the env is notified
+        # once afterwards.
+        with transaction.atomic():
+            Secret.objects.bulk_update(
+                updated_secrets,
+                [
+                    "environment",
+                    "path",
+                    "folder",
+                    "key",
+                    "key_digest",
+                    "value",
+                    "version",
+                    "comment",
+                    "type",
+                    "updated_at",
+                ],
+                batch_size=_BULK_WRITE_BATCH_SIZE,
+            )
 
-                for key, value in secret_data.items():
-                    setattr(secret_obj, key, value)
+            # Optionally replace tags (auto-created above so the caller
+            # doesn't lose them — see _resolve_secret_tags).
+            retagged = [secret for secret in secrets if "tags" in secret]
+            if retagged:
+                Secret.tags.through.objects.filter(
+                    secret_id__in=[
+                        secret_objs[str(secret["id"])].id for secret in retagged
+                    ]
+                ).delete()
+                Secret.tags.through.objects.bulk_create(
+                    [
+                        Secret.tags.through(
+                            secret_id=secret_objs[str(secret["id"])].id,
+                            secrettag_id=tag.id,
+                        )
+                        for secret in retagged
+                        for tag in _tags_for(secret["tags"], tags_by_name)
+                    ],
+                    batch_size=_BULK_WRITE_BATCH_SIZE,
+                    ignore_conflicts=True,
+                )
 
-                # Optionally update tags (auto-create unknown names so the
-                # caller doesn't lose them — see _resolve_secret_tags).
-                if "tags" in secret:
-                    tags, err = _resolve_secret_tags(
-                        secret["tags"],
-                        request.auth["environment"].app.organisation,
+            # If the request is authenticated as a user and an override is supplied
+            org_member = request.auth["org_member"]
+            overrides = {
+                secret_objs[str(secret["id"])].id: secret["override"]
+                for secret in secrets
+                if "override" in secret
+            }
+            if org_member and overrides:
+                existing = list(
+                    PersonalSecret.objects.filter(
+                        secret_id__in=overrides.keys(), user=org_member
                     )
-                    if err is not None:
-                        return err
-                    secret_obj.tags.set(tags)
-
-                secret_obj.updated_at = timezone.now()
-
-                secret_obj.save(trigger_sync=False)
+                )
+                for personal_secret in existing:
+                    override = overrides[personal_secret.secret_id]
+                    personal_secret.value = override["value"]
+                    personal_secret.is_active = override["isActive"]
+                    personal_secret.updated_at = now
+                PersonalSecret.objects.bulk_update(
+                    existing,
+                    ["value", "is_active", "updated_at"],
+                    batch_size=_BULK_WRITE_BATCH_SIZE,
+                )
 
-                # If the request is authenticated as a user and an override is supplied
-                if request.auth["org_member"] and "override" in secret:
-                    PersonalSecret.objects.update_or_create(
-                        secret=secret_obj,
-                        user=request.auth["org_member"],
-                        defaults={
-                            "value": secret["override"]["value"],
-                            "is_active": secret["override"]["isActive"],
-                            "updated_at": timezone.now(),
-                        },
-                    )
+                existing_ids = {personal_secret.secret_id for personal_secret in existing}
+                PersonalSecret.objects.bulk_create(
+                    [
+                        PersonalSecret(
+                            secret_id=secret_id,
+                            user=org_member,
+                            value=override["value"],
+                            is_active=override["isActive"],
+                        )
+                        for secret_id, override in overrides.items()
+                        if secret_id not in existing_ids
+                    ],
+                    batch_size=_BULK_WRITE_BATCH_SIZE,
+                )
 
-                updated_secrets.append(secret_obj)
-        finally:
-            if updated_secrets:
-                env.save()
+        update_secret_references(updated_secrets)
+        env.save()
 
         log_secret_events_bulk(
             updated_secrets,
@@ -1287,6 +1726,7 @@ class PublicSecretsView(APIView):
                 deleted_secrets.append(secret)
         finally:
             if deleted_secrets:
+                update_secret_references(deleted_secrets)
                 env.save()
 
         log_secret_events_bulk(
@@ -1,9 +1,8 @@
 from graphql import GraphQLResolveInfo
 from graphql import GraphQLError
 from graphql.type import GraphQLList, GraphQLNonNull, GraphQLObjectType
-from api.models import NetworkAccessPolicy, Organisation, OrganisationMember
+from api.models import Organisation, OrganisationMember
 
-from itertools import chain
 from django.core.cache import cache
 
 from api.utils.access.ip import get_client_ip
@@ -378,10 +377,12 @@ class IPWhitelistMiddleware:
             return next(root, info, **kwargs)
 
         else:
-            from ee.access.utils.network import is_ip_allowed
+            from ee.access.utils.network import is_ip_allowed_for_account
 
             try:
-                org_member = OrganisationMember.objects.get(
+                org_member_id = OrganisationMember.objects.values_list(
+                    "id", flat=True
+                ).get(
                     organisation_id=organisation_id,
                     user_id=user.userId,
                     deleted_at__isnull=True,
@@ -391,21 +392,10 @@ class IPWhitelistMiddleware:
 
             ip = get_client_ip(request)
 
-            account_policies = org_member.network_policies.all()
-            global_policies = (
-                NetworkAccessPolicy.objects.filter(
-                    organisation_id=organisation_id, is_global=True
-                )
-                if org.plan == Organisation.ENTERPRISE_PLAN
-                else []
-            )
-
-            all_policies = list(chain(account_policies, global_policies))
-
-            if not all_policies or is_ip_allowed(ip, all_policies):
+            if is_ip_allowed_for_account(ip, org, "member", org_member_id):
                 return next(root, info, **kwargs)
 
-            raise IPRestrictedError(org_member.organisation.name)
+            raise IPRestrictedError(org.name)
 
     def get_client_ip(self, request):
         return get_client_ip(request)
@@ -20,6 +20,8 @@ from api.models import (
 )
 from backend.graphene.types import AppType, MemberType
 from api.utils.audit_logging import audit_app_cascade_envs, log_audit_event, get_actor_info_from_graphql, get_member_display_name
+from api.utils.access.access_map import invalidate_org_access
+from api.utils.kms import invalidate_app_key_share
 from api.utils.rest import get_resolver_request_meta
 from django.conf import settings
 from django.db import transaction
@@ -67,6 +69,9 @@ def _revoke_individual_keys_for_app(app, user_id=None, service_account_id=None):
     EnvironmentKey.objects.filter(
         id__in=[kid for kid in key_ids if kid not in keys_with_remaining]
     ).update(deleted_at=timezone.now())
+    # A queryset update sends no signals; refresh access maps explicitly.
+    org_id = app.organisation_id
+    transaction.on_commit(lambda: invalidate_org_access(org_id))
 
 
 class CreateAppMutation(graphene.Mutation):
@@ -179,9 +184,11 @@ class RotateAppKeysMutation(graphene.Mutation):
             if not deleted or not purged:
                 raise GraphQLError("Failed to delete app keys. Please try again.")
 
+        old_app_token = app.app_token
         app.app_token = app_token
         app.wrapped_key_share = wrapped_key_share
         app.save()
+        invalidate_app_key_share(old_app_token)
 
         return RotateAppKeysMutation(app=app)
 
@@ -2,6 +2,7 @@ import re
 from django.utils import timezone
 from django.db import transaction
 from django.db.models import Max
+from api.utils.access.access_map import invalidate_org_access
 from api.utils.rest import get_resolver_request_meta
 from api.utils.access.permissions import (
     member_can_access_org,
@@ -12,7 +13,12 @@ from api.utils.access.permissions import (
     user_is_org_member,
 )
 from api.utils.audit_logging import log_secret_event, log_secret_events_bulk, log_audit_event, get_actor_info_from_graphql, get_member_display_name
-from api.utils.secrets import create_environment_folder_structure, normalize_path_string
+from api.utils.secrets import (
+    SecretFolderResolver,
+    create_environment_folder_structure,
+    normalize_path_string,
+    update_secret_references,
+)
 from backend.quotas import can_add_environment, can_use_custom_envs
 import graphene
 from graphql import GraphQLError
@@ -554,6 +560,10 @@ class UpdateMemberEnvScopeMutation(graphene.Mutation):
                     if kid not in keys_with_remaining_grants
                 ]
             ).update(deleted_at=timezone.now())
+            # A queryset update sends no signals; refresh access maps
+            # explicitly.
+            org_id = app.organisation_id
+            transaction.on_commit(lambda: invalidate_org_access(org_id))
 
             preserved_by_env = {
                 k.environment_id: k
@@ -1089,6 +1099,8 @@ class BulkCreateSecretMutation(graphene.Mutation):
     def mutate(cls, root, info, secrets_data):
         created_secrets = []
         affected_envs = {}
+        # One folder resolver per environment, shared across the batch.
+        folder_resolvers = {}
 
         # Defer per-secret sync triggering (trigger_sync=False) and trigger once
         # per affected environment afterwards, so a bulk write fires each env's
@@ -1118,9 +1130,9 @@ class BulkCreateSecretMutation(graphene.Mutation):
 
                 folder = None
                 if path != "/":
-                    folder = create_environment_folder_structure(
-                        path, secret_data.env_id
-                    )
+                    if env.id not in folder_resolvers:
+                        folder_resolvers[env.id] = SecretFolderResolver(env.id)
+                    folder = folder_resolvers[env.id].resolve(path)
 
                 secret_obj_data = {
                     "environment_id": env.id,
@@ -1140,6 +1152,7 @@ class BulkCreateSecretMutation(graphene.Mutation):
                 created_secrets.append(secret)
                 affected_envs[env.id] = env
         finally:
+            update_secret_references(created_secrets)
             for env in affected_envs.values():
                 env.save()
 
@@ -1347,6 +1360,7 @@ class BulkEditSecretMutation(graphene.Mutation):
                 updated_secrets.append(secret)
                 affected_envs[env.id] = env
         finally:
+            update_secret_references(updated_secrets)
             for env in affected_envs.values():
                 env.save()
 
@@ -1451,6 +1465,7 @@ class BulkDeleteSecretMutation(graphene.Mutation):
                 deleted_secrets.append(secret)
                 affected_envs[env.id] = env
         finally:
+            update_secret_references(deleted_secrets)
             for env in affected_envs.values():
                 env.save()
 
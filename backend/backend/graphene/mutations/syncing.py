@@ -959,11 +959,13 @@ class ToggleSyncActive(graphene.Mutation):
 class TriggerSync(graphene.Mutation):
     class Arguments:
         sync_id = graphene.ID()
+        # Only record the planned changes on a new sync event
+        dry_run = graphene.Boolean(required=False)
 
     sync = graphene.Field(EnvironmentSyncType)
 
     @classmethod
-    def mutate(cls, root, info, sync_id):
+    def mutate(cls, root, info, sync_id, dry_run=False):
         env_sync = EnvironmentSync.objects.get(id=sync_id)
 
         if not user_can_access_environment(
@@ -971,7 +973,10 @@ class TriggerSync(graphene.Mutation):
         ):
             raise GraphQLError("You don't have access to this environment")
 
-        trigger_sync_tasks(env_sync)
+        if dry_run:
+            trigger_sync_tasks(env_sync, dry_run=True)
+        else:
+            trigger_sync_tasks(env_sync, force=True)
 
         return TriggerSync(sync=env_sync)
 
@@ -524,6 +524,14 @@ class SecretEventType(DjangoObjectType):
             return ""
         return self.value
 
+    def resolve_tags(self, info):
+        # Compact (READ) events carry no tag rows; resolvers hydrate them with
+        # the tags of the event that wrote the version.
+        resolved_tags = getattr(self, "resolved_tags", None)
+        if resolved_tags is not None:
+            return resolved_tags
+        return self.tags.all()
+
     def resolve_user(self, info):
         # use the precomputed permission flag; return None if not allowed
         if getattr(info.context, "can_view_members", False):
@@ -1128,6 +1136,8 @@ class KMSLogsResponseType(ObjectType):
 class SecretLogsResponseType(ObjectType):
     logs = graphene.List(SecretEventType)
     count = graphene.Int()
+    # Pass as `cursor` to fetch the next page; null on the last page.
+    next_cursor = graphene.String()
 
 
 class AuditEventType(DjangoObjectType):
@@ -1154,6 +1164,8 @@ class AuditEventType(DjangoObjectType):
 class AuditLogsResponseType(ObjectType):
     logs = graphene.List(AuditEventType)
     count = graphene.Int()
+    # Pass as `cursor` to fetch the next page; null on the last page.
+    next_cursor = graphene.String()
 
 
 class LockboxType(DjangoObjectType):
@@ -50,3 +50,22 @@ class HealthCheckMiddleware:
         if request.path_info == self.PATH:
             return self._view(request)
         return self.get_response(request)
+
+
+class AccessMapMiddleware:
+    """Memoize permission access maps for the lifetime of one request.
+
+    Inside the scope, ``api.utils.access.permissions`` answers repeated
+    checks from a per-principal access map (see
+    ``api.utils.access.access_map``) instead of re-querying memberships,
+    teams and keys for every app or environment a resolver touches.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from api.utils.access.access_map import access_map_scope
+
+        with access_map_scope():
+            return self.get_response(request)
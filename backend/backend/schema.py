@@ -7,7 +7,14 @@ from api.utils.syncing.railway.main import RailwayProjectType
 from api.utils.syncing.render.main import RenderEnvGroupType, RenderServiceType
 from api.models import AuditEvent
 from api.utils.syncing.azure.key_vault import AzureKeyVaultSecretType
-from api.utils.database import get_approximate_count
+from api.utils.database import (
+    decode_log_cursor,
+    encode_log_cursor,
+    get_approximate_count,
+    merge_newest,
+    older_than_cursor,
+)
+from api.utils.audit_logging import hydrate_compact_secret_events
 from ee.integrations.secrets.dynamic.graphene.mutations import (
     DeleteDynamicSecretMutation,
     LeaseDynamicSecret,
@@ -355,11 +362,16 @@ from logs.queries import get_app_log_count, get_app_log_count_range, get_app_log
 from datetime import datetime, timedelta, timezone as dt_timezone
 from django.conf import settings
 from logs.models import KMSDBLog
+from logs.rollups import (
+    DAY_MS,
+    HOUR_MS,
+    bucket_start,
+    get_activity_counts,
+    get_recent_activity_counts,
+)
 from django.utils import timezone
-from itertools import chain
 import time
 import logging
-import heapq
 from django.db.models import Q, prefetch_related_objects
 
 logger = logging.getLogger(__name__)
@@ -450,6 +462,8 @@ class Query(graphene.ObjectType):
         member_id=graphene.ID(),
         member_type=MemberType(),
         environment_id=graphene.ID(),
+        cursor=graphene.String(),
+        limit=graphene.Int(),
     )
 
     audit_logs = graphene.Field(
@@ -464,6 +478,7 @@ class Query(graphene.ObjectType):
         actor_id=graphene.ID(),
         offset=graphene.Int(),
         limit=graphene.Int(),
+        cursor=graphene.String(),
     )
 
     app_activity_chart = graphene.List(
@@ -993,10 +1008,14 @@ class Query(graphene.ObjectType):
 
         setattr(info.context, "can_view_members", can_view_members)
 
-        # return a queryset with all necessary relations preloaded to avoid N+1s
-        qs = SecretEvent.objects.filter(secret_id=secret_id).order_by("-timestamp")
+        # Preload tags and resolve compact READ events in bulk to avoid N+1s
+        events = list(
+            SecretEvent.objects.filter(secret_id=secret_id)
+            .order_by("-timestamp")
+            .prefetch_related("tags")
+        )
 
-        return qs
+        return hydrate_compact_secret_events(events)
 
     def resolve_secret_tags(root, info, org_id):
         if not user_is_org_member(info.context.user.userId, org_id):
@@ -1128,7 +1147,13 @@ class Query(graphene.ObjectType):
         actor_id=None,
         offset=0,
         limit=50,
+        cursor=None,
     ):
+        """
+        Organisation audit events, newest first. Pages are fetched with
+        `cursor` (the previous page's `next_cursor`); `offset` is still
+        accepted for older clients but costs a scan of the skipped rows.
+        """
         user = info.context.user
 
         org = Organisation.objects.get(id=organisation_id)
@@ -1173,7 +1198,7 @@ class Query(graphene.ObjectType):
         if actor_id:
             filters["actor_id"] = str(actor_id)
 
-        qs = AuditEvent.objects.filter(**filters).order_by("-timestamp")
+        qs = AuditEvent.objects.filter(**filters).order_by("-timestamp", "-id")
 
         # Scope to resources the user can actually access
         if not role_has_global_access(org_member.role):
@@ -1227,9 +1252,22 @@ class Query(graphene.ObjectType):
             )
 
         count = get_approximate_count(qs)
-        logs = qs[offset : offset + limit]
 
-        return AuditLogsResponseType(logs=logs, count=count)
+        if cursor:
+            try:
+                page_qs = qs.filter(older_than_cursor(decode_log_cursor(cursor)))
+            except ValueError:
+                raise GraphQLError("Invalid cursor")
+            logs = list(page_qs[: limit + 1])
+        else:
+            logs = list(qs[offset : offset + limit + 1])
+
+        next_cursor = None
+        if len(logs) > limit:
+            logs = logs[:limit]
+            next_cursor = encode_log_cursor(logs[-1])
+
+        return AuditLogsResponseType(logs=logs, count=count, next_cursor=next_cursor)
 
     def resolve_secret_logs(
         root,
@@ -1241,10 +1279,17 @@ class Query(graphene.ObjectType):
         member_id=None,
         member_type=None,
         environment_id=None,
+        cursor=None,
+        limit=25,
     ):
-        PAGE_SIZE = 25
+        """
+        Secret events of the app's environments the user has keys for, newest
+        first. Pages are fetched with `cursor` (the previous page's
+        `next_cursor`).
+        """
         start_time = time.time()
         user = info.context.user
+        limit = min(max(1, limit), 200)
 
         # Access checks
         if not user_can_access_app(user.userId, app_id):
@@ -1307,29 +1352,34 @@ class Query(graphene.ObjectType):
             elif member_type == MemberType.SERVICE:
                 base_filter["service_account_id"] = member_id
 
-        if len(env_ids) == 1:
+        page_filter = Q()
+        if cursor:
+            try:
+                page_filter = older_than_cursor(decode_log_cursor(cursor))
+            except ValueError:
+                raise GraphQLError("Invalid cursor")
+
+        # One extra row tells whether there is a next page
+        per_env_qs = [
+            SecretEvent.objects.filter(page_filter, environment_id=env_id, **base_filter)
+            .order_by("-timestamp", "-id")[: limit + 1]
+            for env_id in env_ids
+        ]
+        if len(per_env_qs) == 1:
             # Single environment → simple fast path
-            logs_qs = (
-                SecretEvent.objects.filter(environment_id=env_ids[0], **base_filter)
-                .order_by("-timestamp", "-id")
-                .prefetch_related("tags")[:PAGE_SIZE]
-            )
-
+            logs_qs = list(per_env_qs[0])
         else:
-            # Multiple environments — always do per-env small scans + merge
-            per_env_qs = [
-                SecretEvent.objects.filter(
-                    environment_id=env_id, **base_filter
-                ).order_by("-timestamp", "-id")[:PAGE_SIZE]
-                for env_id in env_ids
-            ]
-            combined = list(
-                chain.from_iterable(per_env_qs)
-            )  # Flatten all per-env querysets into one list of events (evaluate them)
-            logs_qs = heapq.nlargest(
-                PAGE_SIZE, combined, key=lambda e: e.timestamp
-            )  # Efficiently select the newest 25 events overall
-            prefetch_related_objects(logs_qs, "tags")
+            # Multiple environments — per-env index scans, each bounded by the
+            # page size, merged newest first
+            logs_qs = merge_newest(per_env_qs, limit + 1)
+
+        next_cursor = None
+        if len(logs_qs) > limit:
+            logs_qs = logs_qs[:limit]
+            next_cursor = encode_log_cursor(logs_qs[-1])
+
+        prefetch_related_objects(logs_qs, "tags")
+        logs_qs = hydrate_compact_secret_events(list(logs_qs))
 
         # Approximate count (on combined filter)
         count_qs = SecretEvent.objects.filter(environment_id__in=env_ids, **base_filter)
@@ -1344,7 +1394,9 @@ class Query(graphene.ObjectType):
             count,
         )
 
-        return SecretLogsResponseType(logs=logs_qs, count=count)
+        return SecretLogsResponseType(
+            logs=logs_qs, count=count, next_cursor=next_cursor
+        )
 
     def resolve_app_activity_chart(root, info, app_id, period=TimeRange.DAY):
         """
@@ -1362,75 +1414,73 @@ class Query(graphene.ObjectType):
         if not user_can_access_app(info.context.user.userId, app_id):
             raise GraphQLError("You don't have access to this app")
 
-        end_date = datetime.now()  # current time
+        app_log_id = f"phApp:v{app.app_version}:{app.identity_key}"
 
         # default values for period='day'
         # 24 hours before current time
-        start_date = end_date - timedelta(hours=24)
+        window = timedelta(hours=24)
         time_iteration = timedelta(hours=1)
 
         match period:
             case TimeRange.HOUR:
-                # 7 days before current time
-                start_date = end_date - timedelta(hours=1)
+                # 1 hour before current time
+                window = timedelta(hours=1)
                 time_iteration = timedelta(minutes=5)
             case TimeRange.WEEK:
                 # 7 days before current time
-                start_date = end_date - timedelta(days=7)
+                window = timedelta(days=7)
                 time_iteration = timedelta(days=1)
             case TimeRange.MONTH:
                 # 30 days before current time
-                start_date = end_date - timedelta(days=30)
+                window = timedelta(days=30)
                 time_iteration = timedelta(days=1)
             case TimeRange.YEAR:
                 # 365 days before current time
-                start_date = end_date - timedelta(days=365)
+                window = timedelta(days=365)
                 time_iteration = timedelta(days=5)
             case TimeRange.ALL_TIME:
                 # 365 days before current time
-                start_date = end_date - timedelta(days=365)
+                window = timedelta(days=365)
                 time_iteration = timedelta(days=7)
 
-        time_series_logs = []
+        end_unix = int(datetime.now().timestamp() * 1000)
+        step = int(time_iteration.total_seconds() * 1000)
 
-        # initialize the iterators
-        current_date = start_date
-        index = 0
-
-        # loop through each iteration in the period and calculate the number of decrypts per time_iteration
-        while current_date <= end_date:
-            # Get the start and end of the current measurement period as datetime objects
-            start_of_measurement_period = current_date.replace(second=0, microsecond=0)
-            if (current_date + time_iteration) > end_date:
-                end_of_measurement_period = end_date
-            else:
-                end_of_measurement_period = start_of_measurement_period + time_iteration
-
-            # Convert the start and end of the measurement period to unix timestamps
-            start_unix = int(start_of_measurement_period.timestamp() * 1000)
-            end_unix = int(end_of_measurement_period.timestamp() * 1000)
+        # Align buckets with the rollups they are read from: whole days for
+        # daily or longer steps, whole hours for hourly ones.
+        if step >= DAY_MS:
+            alignment = DAY_MS
+        elif step >= HOUR_MS:
+            alignment = HOUR_MS
+        else:
+            alignment = step
+        start_unix = bucket_start(
+            end_unix - int(window.total_seconds() * 1000), alignment
+        )
 
-            # Get the count of decrypts in the measurement period
-            if CLOUD_HOSTED:
-                decrypts = get_app_log_count_range(
-                    f"phApp:v{app.app_version}:{app.identity_key}", start_unix, end_unix
+        # Get the count of decrypts in each measurement period
+        if CLOUD_HOSTED:
+            counts = [
+                get_app_log_count_range(
+                    app_log_id, bucket, min(bucket + step, end_unix)
                 )
-            else:
-                decrypts = KMSDBLog.objects.filter(
-                    app_id=f"phApp:v{app.app_version}:{app.identity_key}",
-                    timestamp__lte=end_unix,
-                    timestamp__gte=start_unix,
-                ).count()
-
-            time_series_logs.append(
-                ChartDataPointType(index=str(index), date=end_unix, data=decrypts)
+                for bucket in range(start_unix, end_unix, step)
+            ]
+        elif step < HOUR_MS:
+            counts = get_recent_activity_counts(
+                app_log_id, start_unix, end_unix, step
             )
+        else:
+            counts = get_activity_counts(app_log_id, start_unix, end_unix, step)
 
-            # Increment current_date by one time iteration
-            current_date += time_iteration
-            index += 1
-
-        return time_series_logs
+        return [
+            ChartDataPointType(
+                index=str(index),
+                date=min(start_unix + (index + 1) * step, end_unix),
+                data=decrypts,
+            )
+            for index, decrypts in enumerate(counts)
+        ]
 
     resolve_stripe_checkout_details = resolve_stripe_checkout_details
     resolve_stripe_subscription_details = resolve_stripe_subscription_details
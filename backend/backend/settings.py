@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 from urllib.parse import quote as urlquote
 import logging.config
+from django.core.exceptions import ImproperlyConfigured
 from backend.utils.secrets import get_secret
 from ee.licensing.verifier import check_license
 
@@ -228,6 +229,8 @@ MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # Per-request memo for permission checks; see api.utils.access.access_map.
+    "backend.middleware.AccessMapMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -408,6 +411,30 @@ RQ_QUEUES = {
     },
 }
 
+# Buffer secret READ events in Redis and write them in batches from a
+# scheduled job, instead of inserting them on the request path.
+SECRET_READ_EVENTS_ASYNC = (
+    os.getenv("SECRET_READ_EVENTS_ASYNC", "False").lower() == "true"
+)
+SECRET_READ_EVENTS_FLUSH_INTERVAL = int(
+    os.getenv("SECRET_READ_EVENTS_FLUSH_INTERVAL", "10")
+)
+# Buffered events must reach the database well inside the log stream ship
+# watermark (SHIP_WATERMARK_SECONDS, 30s), or streams wait on every flush.
+if not 1 <= SECRET_READ_EVENTS_FLUSH_INTERVAL <= 15:
+    raise ImproperlyConfigured(
+        "SECRET_READ_EVENTS_FLUSH_INTERVAL must be between 1 and 15 seconds"
+    )
+
+# Buffer KMS endpoint logs in Redis and write them in batches from a
+# scheduled job, keeping Postgres writes off the key share fetch path.
+KMS_LOGS_ASYNC = os.getenv("KMS_LOGS_ASYNC", "False").lower() == "true"
+KMS_LOGS_FLUSH_INTERVAL = int(os.getenv("KMS_LOGS_FLUSH_INTERVAL", "10"))
+
+# Coalesce sync triggers from bursts of environment writes: one sync run and
+# one reference scan per window. 0 triggers immediately on every write.
+SYNC_DEBOUNCE_SECONDS = int(os.getenv("SYNC_DEBOUNCE_SECONDS", "5"))
+
 DYNAMODB = {
     "TABLE": os.getenv("DYNAMODB_LOGS_TABLE"),
     "INDEX": os.getenv("DYNAMODB_LOGS_TIMESTAMP_INDEX"),
@@ -1,5 +1,28 @@
+"""Network access policy matching.
+
+Policies are compiled into sorted, merged integer intervals per IP version,
+so a match is one binary search regardless of how many CIDRs an
+organisation has configured.
+
+Compiled policies are cached in-process and in Redis, keyed by a per-org
+version that every policy or attachment change bumps (see api.signals). The
+hot path costs one cache read for the version and no DB queries.
+"""
+
+from bisect import bisect_right
 from ipaddress import ip_address, ip_network
 
+from django.apps import apps
+from django.core.cache import cache
+
+NETWORK_POLICY_CACHE_TTL = 3600
+
+# Bounds the in-process cache; it is simply reset when full.
+_LOCAL_CACHE_MAX_ENTRIES = 10000
+
+# In-process: {(org_id, kind, account_id): (version, CompiledNetworkPolicy)}
+_local_policies = {}
+
 
 def ip_in_range(ip: str, cidr: str) -> bool:
     try:
@@ -8,18 +31,183 @@ def ip_in_range(ip: str, cidr: str) -> bool:
         return False
 
 
+def _parse_range(entry):
+    """(ip version, first address, last address) as ints, or None if invalid."""
+    try:
+        if "/" in entry:
+            network = ip_network(entry, strict=False)
+            return (
+                network.version,
+                int(network.network_address),
+                int(network.broadcast_address),
+            )
+        address = ip_address(entry)
+        return address.version, int(address), int(address)
+    except ValueError:
+        return None  # skip invalid IPs
+
+
+class CompiledNetworkPolicy:
+    """The union of one or more policies' allowed IPs and CIDR ranges."""
+
+    __slots__ = ("policy_count", "_ranges")
+
+    def __init__(self, policy_count, ranges):
+        self.policy_count = policy_count
+        # {ip version: (sorted range starts, matching range ends)}
+        self._ranges = ranges
+
+    @classmethod
+    def compile(cls, ip_lists):
+        """Compile the `get_ip_list()` output of each policy."""
+        intervals = {4: [], 6: []}
+        policy_count = 0
+        for ip_list in ip_lists:
+            policy_count += 1
+            for entry in ip_list:
+                parsed = _parse_range(entry)
+                if parsed:
+                    intervals[parsed[0]].append(parsed[1:])
+
+        ranges = {}
+        for version, spans in intervals.items():
+            starts, ends = [], []
+            for start, end in sorted(spans):
+                if ends and start <= ends[-1] + 1:
+                    ends[-1] = max(ends[-1], end)
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            ranges[version] = (tuple(starts), tuple(ends))
+
+        return cls(policy_count, ranges)
+
+    def __bool__(self):
+        return self.policy_count > 0
+
+    def allows(self, ip):
+        try:
+            client_ip = ip_address(ip)
+        except ValueError:
+            return False
+
+        starts, ends = self._ranges[client_ip.version]
+        value = int(client_ip)
+        index = bisect_right(starts, value) - 1
+        return index >= 0 and value <= ends[index]
+
+    def __getstate__(self):
+        return self.policy_count, self._ranges
+
+    def __setstate__(self, state):
+        self.policy_count, self._ranges = state
+
+
 def is_ip_allowed(ip, policies):
-    client_ip = ip_address(ip)
-
-    for policy in policies:
-        for allowed in policy.get_ip_list():
-            try:
-                if "/" in allowed:
-                    if client_ip in ip_network(allowed, strict=False):
-                        return True
-                elif client_ip == ip_address(allowed):
-                    return True
-            except ValueError:
-                continue  # skip invalid IPs
-
-    return False
+    return CompiledNetworkPolicy.compile(
+        policy.get_ip_list() for policy in policies
+    ).allows(ip)
+
+
+def _version_key(org_id):
+    return f"network-policy-version:{org_id}"
+
+
+def _policy_version(org_id):
+    key = _version_key(org_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_network_policies(org_id):
+    """Discard every compiled policy of this organisation, in all processes."""
+    if not org_id:
+        return
+    try:
+        cache.incr(_version_key(org_id))
+    except ValueError:
+        cache.set(_version_key(org_id), 1, timeout=None)
+    except Exception:
+        pass
+
+
+def _load_ip_lists(org_id, kind, account_id):
+    NetworkAccessPolicy = apps.get_model("api", "NetworkAccessPolicy")
+
+    if kind == "global":
+        policies = NetworkAccessPolicy.objects.filter(
+            organisation_id=org_id, is_global=True
+        )
+    elif kind == "member":
+        policies = NetworkAccessPolicy.objects.filter(members__id=account_id)
+    else:
+        policies = NetworkAccessPolicy.objects.filter(service_accounts__id=account_id)
+
+    return [
+        [ip.strip() for ip in allowed_ips.split(",") if ip.strip()]
+        for allowed_ips in policies.values_list("allowed_ips", flat=True)
+    ]
+
+
+def get_compiled_policy(org_id, kind, account_id=None):
+    """
+    The compiled policies of an organisation: its global policies
+    (kind "global") or those attached to a member ("member") or service
+    account ("service_account").
+    """
+    local_key = (str(org_id), kind, str(account_id) if account_id else None)
+
+    try:
+        version = _policy_version(org_id)
+    except Exception:
+        version = None
+    if version is None:
+        return CompiledNetworkPolicy.compile(_load_ip_lists(org_id, kind, account_id))
+
+    local = _local_policies.get(local_key)
+    if local is not None and local[0] == version:
+        return local[1]
+
+    redis_key = f"network-policy:{version}:{':'.join(str(p) for p in local_key)}"
+    try:
+        compiled = cache.get(redis_key)
+    except Exception:
+        compiled = None
+
+    if compiled is None:
+        compiled = CompiledNetworkPolicy.compile(
+            _load_ip_lists(org_id, kind, account_id)
+        )
+        try:
+            cache.set(redis_key, compiled, timeout=NETWORK_POLICY_CACHE_TTL)
+        except Exception:
+            pass
+
+    if len(_local_policies) >= _LOCAL_CACHE_MAX_ENTRIES:
+        _local_policies.clear()
+    _local_policies[local_key] = (version, compiled)
+    return compiled
+
+
+def is_ip_allowed_for_account(ip, organisation, kind=None, account_id=None):
+    """
+    Check `ip` against the policies attached to an account plus, on the
+    Enterprise plan, the organisation's global policies. Allowed when no
+    policy applies.
+    """
+    Organisation = apps.get_model("api", "Organisation")
+
+    compiled = []
+    if account_id:
+        compiled.append(get_compiled_policy(organisation.id, kind, account_id))
+    if organisation.plan == Organisation.ENTERPRISE_PLAN:
+        compiled.append(get_compiled_policy(organisation.id, "global"))
+
+    compiled = [policy for policy in compiled if policy]
+    if not compiled:
+        return True
+
+    return any(policy.allows(ip) for policy in compiled)
@@ -7,10 +7,16 @@ come from the linked ProviderCredentials record (decrypted by the engine),
 metadata (organisation/stream names) for tagging. Adapters that need their own
 token exchange (e.g. Microsoft Sentinel via Azure AD) do it inside `ship()`.
 
+Events are reshaped for the destination by `prepare_event` and encoded once
+by the chunker, so `ship()` receives a chunk of pre-encoded JSON events
+(bytes) to write into its request body, e.g. with `json_array_body`.
+
 Raise the typed errors from ..exceptions to drive engine behaviour; return a
 ShipResult on success.
 """
 
+import io
+import zlib
 from dataclasses import dataclass, field
 
 
@@ -21,6 +27,32 @@ class ShipResult:
     meta: dict = field(default_factory=dict)
 
 
+def json_array_body(events, compress=False):
+    """Build a JSON array request body from pre-encoded events.
+
+    The events are appended to the body as they are, through an incremental
+    gzip compressor when `compress` is set, so the uncompressed body is
+    never assembled.
+    """
+    body = io.BytesIO()
+    # wbits=31: a gzip container, as gzip.compress produces
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def write(data):
+        body.write(compressor.compress(data) if compressor else data)
+
+    write(b"[")
+    for index, event in enumerate(events):
+        if index:
+            write(b",")
+        write(event)
+    write(b"]")
+
+    if compressor is not None:
+        body.write(compressor.flush())
+    return body.getvalue()
+
+
 class LogStreamAdapter:
     id = None
     name = None
@@ -41,7 +73,13 @@ class LogStreamAdapter:
         """Deep link to the shipped logs in the destination's UI, or None."""
         return None
 
+    def prepare_event(self, envelope, options, context):
+        """The event shipped for an envelope; `options` are validated. Called
+        once per event, before chunking."""
+        return envelope
+
     def ship(self, chunk, credentials, options, context):
+        """Deliver a chunk: a list of encoded JSON events (bytes)."""
         raise NotImplementedError
 
     def test(self, credentials, options, context):
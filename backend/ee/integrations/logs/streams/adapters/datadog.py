@@ -11,8 +11,6 @@ logs light up native facets with zero pipeline configuration:
 - ``user.*``              -> ``usr.{id,name,email}``
 """
 
-import gzip
-import json
 import math
 import os
 import re
@@ -30,7 +28,7 @@ from ..exceptions import (
     AdapterRateLimitedError,
     AdapterTransientError,
 )
-from .base import LogStreamAdapter, ShipResult
+from .base import LogStreamAdapter, ShipResult, json_array_body
 
 REQUEST_TIMEOUT = (5, 30)  # (connect, read) seconds
 
@@ -155,7 +153,7 @@ class DatadogAdapter(LogStreamAdapter):
             )
         return f"https://http-intake.logs.{site}/api/v2/logs", site
 
-    def _to_datadog_event(self, envelope, options, context):
+    def prepare_event(self, envelope, options, context):
         event = dict(envelope)
 
         client = event.pop("client", None) or {}
@@ -197,17 +195,13 @@ class DatadogAdapter(LogStreamAdapter):
         url, site = self._intake_url(credentials)
         api_key = credentials.get("api_key") or ""
 
-        body = json.dumps(
-            [self._to_datadog_event(envelope, options, context) for envelope in chunk],
-            default=str,
-        ).encode("utf-8")
+        body = json_array_body(chunk, compress=options["gzip"])
 
         headers = {
             "DD-API-KEY": api_key,
             "Content-Type": "application/json",
         }
         if options["gzip"]:
-            body = gzip.compress(body)
             headers["Content-Encoding"] = "gzip"
 
         started = time.monotonic()
@@ -1,8 +1,11 @@
 """Split serialized envelopes into destination-sized chunks.
 
-Limits stay comfortably under Datadog's intake caps (1000 events / 5 MB per
-payload, 1 MB per event) so that adapter-added reserved fields never push a
-chunk over the wire limit.
+Each envelope is turned into its destination event and encoded to JSON
+exactly once, here; adapters write the encoded bytes straight into the
+request body (see adapters.base.json_array_body). Sizes are measured on
+those bytes, adapter-added fields included, and limits stay comfortably
+under Datadog's intake caps (1000 events / 5 MB per payload, 1 MB per
+event).
 """
 
 import json
@@ -27,36 +30,40 @@ class Chunk:
     last_cursor: dict = None
 
 
-def _envelope_size(envelope):
-    return len(json.dumps(envelope, default=str).encode("utf-8"))
+def encode_event(event):
+    """The wire bytes of one event, as they appear in a delivery body."""
+    return json.dumps(event, default=str).encode("utf-8")
 
 
-def _bound_envelope(envelope):
-    """Cap a single envelope's size; oversize payloads live in the JSON
-    metadata fields, so truncate those rather than dropping the event."""
-    size = _envelope_size(envelope)
-    if size <= EVENT_MAX_BYTES:
-        return envelope, size
+# Oversize payloads live in the JSON metadata fields, so those are truncated
+# first, one step at a time, rather than dropping the event. Each step
+# returns whether it changed the envelope.
 
+
+def _truncate_values(envelope):
     phase = envelope.get("phase", {})
+    changed = False
     for key in ("old_values", "new_values"):
         if phase.get(key) is not None:
             phase[key] = {"truncated": True}
-    size = _envelope_size(envelope)
-    if size <= EVENT_MAX_BYTES:
-        return envelope, size
+            changed = True
+    return changed
+
+
+def _truncate_metadata(envelope):
+    resource = envelope.get("phase", {}).get("resource", {})
+    if "metadata" not in resource:
+        return False
+    resource["metadata"] = {"truncated": True}
+    return True
 
-    if "metadata" in phase.get("resource", {}):
-        phase["resource"]["metadata"] = {"truncated": True}
-    size = _envelope_size(envelope)
-    if size <= EVENT_MAX_BYTES:
-        return envelope, size
 
+def _slim(envelope):
     # Last resort: strip to the identifying core. EVENT_MAX_BYTES leaves
-    # 100KB of headroom under Datadog's 1MB wire limit for adapter-added
-    # fields (message/ddtags/remaps), but that guarantee only holds if the
-    # envelope itself is genuinely bounded — a pathological event must not
-    # be allowed to permanently 413 its chunk.
+    # 100KB of headroom under Datadog's 1MB wire limit, but that guarantee
+    # only holds if the event is genuinely bounded — a pathological event
+    # must not be allowed to permanently 413 its chunk.
+    phase = envelope.get("phase", {})
     slim = {
         "schema_version": envelope.get("schema_version"),
         "event": envelope.get("event"),
@@ -70,22 +77,49 @@ def _bound_envelope(envelope):
     }
     envelope.clear()
     envelope.update(slim)
-    return envelope, _envelope_size(envelope)
+    return True
+
+
+_TRUNCATIONS = (_truncate_values, _truncate_metadata, _slim)
+
+
+def _encode_bounded(envelope, prepare):
+    """Encode an envelope's destination event, capping its size.
+
+    The event is encoded once; only an oversize one is truncated and
+    re-encoded, so the common case costs a single `json.dumps`.
+    """
+    encoded = encode_event(prepare(envelope))
+    for truncate in _TRUNCATIONS:
+        if len(encoded) <= EVENT_MAX_BYTES:
+            break
+        if truncate(envelope):
+            encoded = encode_event(prepare(envelope))
+    return encoded
 
 
-def chunk_envelopes(entries):
-    """Group entries into ordered chunks.
+def chunk_envelopes(entries, prepare=None):
+    """Group entries into ordered chunks of encoded events.
 
     `entries` is a list of dicts: {"envelope": dict, "cursor": dict,
     "timestamp": datetime} — one per event, already in (timestamp, id) order.
-    Each chunk records the timestamp range it covers and the cursor of its
-    last event, which becomes the stream cursor once the chunk is delivered.
+    `prepare` maps an envelope to the event the destination receives
+    (`LogStreamAdapter.prepare_event`); by default the envelope is shipped
+    as is.
+
+    Chunk events are the encoded bytes adapters write into the delivery
+    body, and `byte_size` is the size of that (uncompressed) body. Each
+    chunk records the timestamp range it covers and the cursor of its last
+    event, which becomes the stream cursor once the chunk is delivered.
     """
+    prepare = prepare or (lambda envelope: envelope)
     chunks = []
     current = None
 
     for entry in entries:
-        envelope, size = _bound_envelope(entry["envelope"])
+        encoded = _encode_bounded(entry["envelope"], prepare)
+        # Separated by a comma from the previous event in the body
+        size = len(encoded) + 1
 
         if current is not None and (
             len(current.events) >= CHUNK_MAX_EVENTS
@@ -95,11 +129,12 @@ def chunk_envelopes(entries):
             current = None
 
         if current is None:
-            current = Chunk()
+            # The body's enclosing brackets; the first event needs no comma.
+            current = Chunk(byte_size=1)
             current.cursor_from = entry["timestamp"]
             current.cursor_from_id = entry["cursor"].get("id", "")
 
-        current.events.append(envelope)
+        current.events.append(encoded)
         current.byte_size += size
         current.cursor_to = entry["timestamp"]
         current.cursor_to_id = entry["cursor"].get("id", "")
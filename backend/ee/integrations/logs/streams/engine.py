@@ -21,6 +21,7 @@ Delivery contract (at-least-once):
 import logging
 import time
 from datetime import timedelta
+from functools import partial
 from uuid import uuid4
 
 import django_rq
@@ -665,7 +666,10 @@ def _ship_stream(stream):
             # fetch would let the later chunks age past the ingestion floor
             # computed above. Looping back re-floors and refetches from the
             # advanced cursor instead.
-            chunks = chunk_envelopes(entries)
+            chunks = chunk_envelopes(
+                entries,
+                partial(adapter.prepare_event, options=options, context=context),
+            )
 
             # A console pause/delete/reconfiguration must take effect
             # mid-job: rq cannot stop a started job, and this row predates
@@ -880,7 +884,9 @@ def _retry_delivery_locked(delivery_event_id):
             }
             for event in events
         ]
-        chunks = chunk_envelopes(entries)
+        chunks = chunk_envelopes(
+            entries, partial(adapter.prepare_event, options=options, context=context)
+        )
 
         for chunk in chunks:
             # Same live check as the ship path: a pause/delete/
@@ -15,15 +15,19 @@ multiple events share a timestamp (ids are uuid strings, so intra-timestamp
 order is arbitrary but consistent).
 """
 
+import logging
 from datetime import timedelta
 
 from django.apps import apps
+from django.conf import settings
 from django.db.models import Q
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
 from .serializers import audit_event_to_envelope, secret_event_to_envelope
 
+logger = logging.getLogger(__name__)
+
 # Events are timestamped inside the writing transaction, so a slow
 # transaction can COMMIT an older-timestamped event after a newer one was
 # already fetched and shipped — the late event would land permanently behind
@@ -53,13 +57,15 @@ class LogSource:
             timestamp__gte=ts
         )
 
+    def _watermark(self):
+        return timezone.now() - timedelta(seconds=SHIP_WATERMARK_SECONDS)
+
     def fetch(self, organisation, cursor, limit):
         """Events strictly after `cursor` but older than the commit-safety
         watermark, oldest first."""
-        watermark = timezone.now() - timedelta(seconds=SHIP_WATERMARK_SECONDS)
         return list(
             self._queryset(organisation)
-            .filter(self._cursor_filter(cursor), timestamp__lt=watermark)
+            .filter(self._cursor_filter(cursor), timestamp__lt=self._watermark())
             .order_by("timestamp", "id")[:limit]
         )
 
@@ -142,6 +148,24 @@ class SecretEventLogSource(LogSource):
             "service_account_token",
         )
 
+    def _watermark(self):
+        watermark = super()._watermark()
+        if not settings.SECRET_READ_EVENTS_ASYNC:
+            return watermark
+
+        # Buffered READ events are inserted later with their read time; hold
+        # back to the oldest one so it can't land behind the cursor.
+        from api.utils.audit_logging import oldest_buffered_read_timestamp
+
+        try:
+            oldest = oldest_buffered_read_timestamp()
+        except Exception:
+            logger.warning("Read event buffer unavailable, using default watermark")
+            return watermark
+        if oldest is None:
+            return watermark
+        return min(watermark, oldest - timedelta(seconds=SHIP_WATERMARK_SECONDS))
+
     def serialize(self, event, organisation):
         return secret_event_to_envelope(event, organisation)
 
@@ -12,7 +12,7 @@ from django.db import transaction
 from django.utils import timezone
 from django_rq import job
 from api.utils.crypto import encrypt_asymmetric
-from api.utils.secrets import get_environment_keys
+from api.utils.secrets import get_environment_keys, update_secret_references
 from api.utils.syncing.auth import get_credentials
 
 from ee.integrations.secrets.providers.exceptions import (
@@ -72,6 +72,9 @@ def _materialise_secret_rows(rotating_secret, credential) -> None:
     SecretEvent = apps.get_model("api", "SecretEvent")
     key_map = rotating_secret.key_map or []
     encrypted_values = credential.encrypted_values or {}
+    # Rows created here go through Secret.save(), which indexes them; in-place
+    # value rotations bypass it, so their reference edges are refreshed below.
+    rotated = []
     for entry in key_map:
         if not isinstance(entry, dict):
             continue
@@ -104,6 +107,7 @@ def _materialise_secret_rows(rotating_secret, credential) -> None:
             )
             secret.value = encrypted_value
             secret.version = new_version
+            rotated.append(secret)
 
         # No actor — engine-driven. Frontend renders these as "Phase".
         SecretEvent.objects.create(
@@ -120,6 +124,8 @@ def _materialise_secret_rows(rotating_secret, credential) -> None:
             event_type=SecretEvent.CREATE if created else SecretEvent.UPDATE,
         )
 
+    update_secret_references(rotated)
+
 
 def encrypt_values_for_env(values: dict, environment) -> dict:
     env_pubkey, _ = get_environment_keys(environment.id)
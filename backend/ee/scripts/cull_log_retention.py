@@ -6,6 +6,13 @@ Cloud-only operational script: cull SecretEvent READ-log retention per plan tier
   Pro orgs    →  retain 90 days
   Enterprise  →  skipped (no automated cull)
 
+When api_secretevent is partitioned by month (see the partition_event_tables
+command), months past every culled tier's retention are rewritten first:
+the events to keep (everything but Free/Pro READs) are copied to a fresh
+partition and the old one is dropped whole. Only the remainder is purged
+row by row. Partition rewrites only run for full runs (no --plan/--org-id
+filter), as a partition holds every org's events.
+
 Usage (run from /app inside the container):
     python ee/scripts/cull_log_retention.py                  # discover only
     python ee/scripts/cull_log_retention.py --count          # discover + count rows
@@ -38,7 +45,13 @@ from django.core.management import call_command  # noqa: E402
 from django.utils import timezone  # noqa: E402
 from datetime import timedelta  # noqa: E402
 
-from api.models import Organisation, SecretEvent  # noqa: E402
+from api.models import App, Environment, Organisation, SecretEvent  # noqa: E402
+from api.utils.partitions import (  # noqa: E402
+    add_months,
+    is_partitioned,
+    list_partitions,
+    rewrite_partition,
+)
 
 
 PLAN_LABEL = {
@@ -142,6 +155,67 @@ def _rows_for_org(org, cutoff):
     )
 
 
+def expired_partitions(args):
+    """Monthly SecretEvent partitions past every culled tier's retention."""
+    if args.plan != "both" or args.org_id:
+        return []
+    table = SecretEvent._meta.db_table
+    if not is_partitioned(table):
+        return []
+    cutoff = timezone.now() - timedelta(
+        days=max(args.free_retain_days, args.pro_retain_days)
+    )
+    return [
+        name for name, month in list_partitions(table) if add_months(month, 1) <= cutoff
+    ]
+
+
+def partition_keep_condition():
+    """SQL for the events that survive a partition rewrite: all but READs of
+    Free and Pro orgs. READs without an environment belong to no org and are
+    kept, as the row by row purge never reaches them either."""
+    condition = (
+        f"event_type <> %s OR environment_id IS NULL OR environment_id IN (
+        f"SELECT env.id FROM {Environment._meta.db_table} env "
+        f"JOIN {App._meta.db_table} app ON app.id = env.app_id "
+        f"JOIN {Organisation._meta.db_table} org ON org.id = app.organisation_id "
+        f"WHERE org.plan NOT IN (%s, %s))"
+    )
+    params = [SecretEvent.READ, Organisation.FREE_PLAN, Organisation.PRO_PLAN]
+    return condition, params
+
+
+def apply_partition_retention(args):
+    partitions = expired_partitions(args)
+    if not partitions:
+        return 0
+
+    table = SecretEvent._meta.db_table
+    condition, params = partition_keep_condition()
+    removed_total = 0
+    for name in partitions:
+        start = time.monotonic()
+        kept, removed = rewrite_partition(
+            table,
+            name,
+            condition,
+            params,
+            dependents=[
+                (
+                    SecretEvent.tags.through._meta.db_table,
+                    "secretevent_id",
+                )
+            ],
+        )
+        removed_total += removed
+        print(
+            f"  Partition {name}: removed {removed:,}, kept {kept:,} "
+            f"in {time.monotonic() - start:.1f}s",
+            flush=True,
+        )
+    return removed_total
+
+
 def count_rows(org, cutoff):
     """Exact COUNT(*) — uses (environment_id, -timestamp) index; slow on big orgs."""
     return _rows_for_org(org, cutoff).count()
@@ -154,6 +228,9 @@ def estimate_rows(org, cutoff):
 
 
 def report(orgs, args):
+    partitions = expired_partitions(args)
+    if partitions:
+        print(f"Partitions to rewrite ({len(partitions)}): {', '.join(partitions)}")
     print(f"Discovery — {len(orgs)} org(s) match (plan={args.plan})")
     header = f"  {'plan':<5}  {'org_id':<36}  {'name':<30}  {'apps':>4}  retain"
     if args.count:
@@ -192,7 +269,7 @@ def report(orgs, args):
 def apply_purge(orgs, args):
     grand_start = time.monotonic()
     failures = []
-    grand_total_rows = 0
+    grand_total_rows = apply_partition_retention(args)
     for i, org in enumerate(orgs, 1):
         retain = retention_for(org, args)
         if retain is None:
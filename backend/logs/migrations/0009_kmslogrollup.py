@@ -0,0 +1,27 @@
+# Generated by Django 5.2.17 on 2026-10-18 06:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logs', '0008_alter_kmsdblog_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KMSLogRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('app_id', models.TextField()),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('bucket_start', models.BigIntegerField()),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['app_id', 'bucket_start'], name='kms_rollup_app_bucket_idx'), models.Index(fields=['granularity', 'bucket_start'], name='kms_rollup_granularity_idx')],
+                'constraints': [models.UniqueConstraint(fields=('app_id', 'granularity', 'bucket_start'), name='unique_kms_log_rollup_bucket')],
+            },
+        ),
+    ]
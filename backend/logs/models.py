@@ -25,3 +25,42 @@ class KMSDBLog(models.Model):
 
     def __str__(self):
         return self.id
+
+
+class KMSLogRollup(models.Model):
+    """
+    Pre-aggregated count of KMS logs for one app and time bucket
+    """
+    HOUR = "hour"
+    DAY = "day"
+    GRANULARITY_CHOICES = [
+        (HOUR, "Hour"),
+        (DAY, "Day"),
+    ]
+
+    app_id = models.TextField(null=False, blank=False)
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    # Unix ms, aligned to the granularity (UTC)
+    bucket_start = models.BigIntegerField(null=False, blank=False)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["app_id", "granularity", "bucket_start"],
+                name="unique_kms_log_rollup_bucket",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["app_id", "bucket_start"],
+                name="kms_rollup_app_bucket_idx",
+            ),
+            models.Index(
+                fields=["granularity", "bucket_start"],
+                name="kms_rollup_granularity_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.app_id} {self.granularity} {self.bucket_start}"
@@ -0,0 +1,255 @@
+"""Pre-aggregated KMS log counts for the app activity chart.
+
+Every KMS log increments an hourly KMSLogRollup counter for its app. Hourly
+rows are kept for HOURLY_ROLLUP_RETENTION, which covers the chart's day
+view, after which `compact_rollups` folds each app's hours into one row per
+day. The chart reads both granularities with a single range query and sums
+them into its buckets, so its cost no longer grows with the number of
+buckets or the volume of logs.
+
+Logs written directly (without KMS_LOGS_ASYNC) don't update the counters on
+the request path: their increments are added to a Redis hash with HINCRBY
+and folded in by the scheduled `fold_rollup_increments`.
+
+Counts for logs written before rollups existed are built by the
+`backfill_kms_rollups` management command.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import django_rq
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Count, ExpressionWrapper, F
+
+from logs.models import KMSDBLog, KMSLogRollup
+
+HOUR_MS = 60 * 60 * 1000
+DAY_MS = 24 * HOUR_MS
+
+HOURLY_ROLLUP_RETENTION = timedelta(days=2)
+
+# {"<hour start>:<app id>": count} waiting for fold_rollup_increments.
+ROLLUP_INCREMENTS_KEY = "kms-rollup-increments"
+
+# Read and delete the hash in one step, so increments added meanwhile are
+# left for the next fold.
+_POP_HASH_SCRIPT = """
+local fields = redis.call("HGETALL", KEYS[1])
+redis.call("DEL", KEYS[1])
+return fields
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def bucket_start(timestamp, size):
+    """Start of the `size` ms bucket containing `timestamp` (unix ms, UTC)."""
+    return int(timestamp) // size * size
+
+
+def _now_ms():
+    return int(datetime.now().timestamp() * 1000)
+
+
+def _hourly(counts):
+    hourly = defaultdict(int)
+    for (app_id, timestamp), count in counts.items():
+        hourly[(app_id, bucket_start(timestamp, HOUR_MS))] += count
+    return hourly
+
+
+def _increment(app_id, granularity, start, count):
+    rows = KMSLogRollup.objects.filter(
+        app_id=app_id, granularity=granularity, bucket_start=start
+    )
+    if rows.update(count=F("count") + count):
+        return
+    try:
+        with transaction.atomic():
+            KMSLogRollup.objects.create(
+                app_id=app_id, granularity=granularity, bucket_start=start, count=count
+            )
+    except IntegrityError:
+        # Created concurrently
+        rows.update(count=F("count") + count)
+
+
+def increment_rollups(counts):
+    """
+    Add to the hourly counters.
+
+    Args:
+        counts (dict): {(app_id, timestamp in unix ms): number of logs}. The
+            timestamps don't need to be aligned; counts falling in the same
+            hour are combined into one write.
+    """
+    for (app_id, start), count in _hourly(counts).items():
+        _increment(app_id, KMSLogRollup.HOUR, start, count)
+
+
+def buffer_rollup_increments(counts):
+    """
+    Like `increment_rollups`, but only adds the counts to a Redis hash for
+    the next `fold_rollup_increments` run.
+    """
+    pipeline = django_rq.get_connection("default").pipeline()
+    for (app_id, start), count in _hourly(counts).items():
+        pipeline.hincrby(ROLLUP_INCREMENTS_KEY, f"{start}:{app_id}", count)
+    pipeline.execute()
+
+
+def fold_rollup_increments():
+    """
+    Add the increments buffered by `buffer_rollup_increments` to the hourly
+    counters. Counters that fail to update are buffered again. Returns the
+    number of counters updated.
+    """
+    connection = django_rq.get_connection("default")
+    fields = connection.eval(_POP_HASH_SCRIPT, 1, ROLLUP_INCREMENTS_KEY)
+
+    updated = 0
+    failed = {}
+    for field, count in zip(fields[::2], fields[1::2]):
+        start, app_id = field.decode().split(":", 1)
+        try:
+            _increment(app_id, KMSLogRollup.HOUR, int(start), int(count))
+            updated += 1
+        except Exception:
+            failed[(app_id, int(start))] = int(count)
+
+    if failed:
+        logger.error("Failed to fold %d KMS rollup increments", len(failed))
+        buffer_rollup_increments(failed)
+    return updated
+
+
+def compact_rollups(now=None):
+    """
+    Fold hourly rollups older than HOURLY_ROLLUP_RETENTION into daily ones.
+
+    Only whole days are compacted. Returns the number of hourly rows removed.
+    """
+    now = now if now is not None else _now_ms()
+    cutoff = bucket_start(now - HOURLY_ROLLUP_RETENTION.total_seconds() * 1000, DAY_MS)
+
+    with transaction.atomic():
+        hours = list(
+            KMSLogRollup.objects.select_for_update()
+            .filter(granularity=KMSLogRollup.HOUR, bucket_start__lt=cutoff)
+            .values_list("id", "app_id", "bucket_start", "count")
+        )
+        if not hours:
+            return 0
+
+        daily = defaultdict(int)
+        for _, app_id, start, count in hours:
+            daily[(app_id, bucket_start(start, DAY_MS))] += count
+
+        KMSLogRollup.objects.filter(id__in=[row[0] for row in hours]).delete()
+        for (app_id, start), count in daily.items():
+            _increment(app_id, KMSLogRollup.DAY, start, count)
+
+    return len(hours)
+
+
+def get_activity_counts(app_id, start, end, step):
+    """
+    Log counts of an app in consecutive buckets, from rollups.
+
+    Args:
+        app_id (string): KMS app id
+        start (int): Start of the first bucket, unix ms. Must be aligned to
+            the hour, and to the day if `step` is a day or longer.
+        end (int): unix ms
+        step (int): Bucket size in ms, a multiple of an hour (or a day).
+
+    Returns:
+        list[int]: One count per bucket, covering `start` to `end`.
+    """
+    buckets = [0] * max(1, -(-(end - start) // step))
+    rows = KMSLogRollup.objects.filter(
+        app_id=app_id, bucket_start__gte=start, bucket_start__lt=end
+    ).values_list("bucket_start", "count")
+
+    for row_start, count in rows:
+        buckets[min((row_start - start) // step, len(buckets) - 1)] += count
+    return buckets
+
+
+def get_recent_activity_counts(app_id, start, end, step):
+    """
+    Like `get_activity_counts`, for buckets finer than an hour: counts the
+    raw logs with one grouped query. Meant for short, recent ranges.
+    """
+    buckets = [0] * max(1, -(-(end - start) // step))
+    rows = (
+        KMSDBLog.objects.filter(app_id=app_id, timestamp__gte=start, timestamp__lt=end)
+        .annotate(
+            bucket=ExpressionWrapper(
+                (F("timestamp") - start) / step, output_field=BigIntegerField()
+            )
+        )
+        .values("bucket")
+        .annotate(total=Count("id"))
+        .values_list("bucket", "total")
+    )
+
+    for bucket, count in rows:
+        buckets[min(int(bucket), len(buckets) - 1)] += count
+    return buckets
+
+
+def hourly_log_counts(app_id, before):
+    """
+    {hour start: count} of an app's raw logs before `before` (unix ms),
+    grouped in the database. Used to rebuild rollups.
+    """
+    rows = (
+        KMSDBLog.objects.filter(app_id=app_id, timestamp__lt=before)
+        .annotate(
+            hour=ExpressionWrapper(
+                F("timestamp") / HOUR_MS * HOUR_MS, output_field=BigIntegerField()
+            )
+        )
+        .values("hour")
+        .annotate(total=Count("id"))
+        .values_list("hour", "total")
+    )
+    return {int(hour): count for hour, count in rows}
+
+
+def rebuild_rollups(app_id, before, now=None):
+    """
+    Replace an app's rollups before `before` (unix ms, hour aligned) with
+    counts of its raw logs. Hours outside HOURLY_ROLLUP_RETENTION are written
+    as days, as compaction would. Returns the number of logs counted.
+    """
+    now = now if now is not None else _now_ms()
+    cutoff = bucket_start(now - HOURLY_ROLLUP_RETENTION.total_seconds() * 1000, DAY_MS)
+
+    hours = hourly_log_counts(app_id, before)
+    rows = defaultdict(int)
+    for start, count in hours.items():
+        if start < cutoff:
+            rows[(KMSLogRollup.DAY, bucket_start(start, DAY_MS))] += count
+        else:
+            rows[(KMSLogRollup.HOUR, start)] += count
+
+    with transaction.atomic():
+        KMSLogRollup.objects.filter(app_id=app_id, bucket_start__lt=before).delete()
+        KMSLogRollup.objects.bulk_create(
+            [
+                KMSLogRollup(
+                    app_id=app_id,
+                    granularity=granularity,
+                    bucket_start=start,
+                    count=count,
+                )
+                for (granularity, start), count in rows.items()
+            ],
+            batch_size=1000,
+        )
+
+    return sum(hours.values())
@@ -129,6 +129,9 @@ def test_team_granted_keys_survive_direct_scope_edit(
     #    queryset filter should have included k2 but excluded k1
     #    (k1 still has a team grant).
     soft_delete_qs.update.assert_called_once()
+    #    The update sends no signals, so access maps are refreshed
+    #    explicitly once the transaction commits.
+    mock_tx.on_commit.assert_called_once()
     # 3. For env-A (the preserved key with a team grant), the mutation
     #    used get_or_create on the EXISTING row rather than creating a
     #    duplicate EnvironmentKey row.
@@ -0,0 +1,64 @@
+"""Recurring job registration: stable ids, cancel-before-schedule."""
+
+from unittest.mock import MagicMock, patch
+
+from django.test import override_settings
+
+from api.tasks import activity, audit, scheduling
+
+_M = "api.tasks.scheduling"
+
+
+def test_schedule_recurring_cancels_prior_and_never_expires():
+    scheduler = MagicMock()
+    func = MagicMock()
+
+    with patch(f"{_M}.django_rq.get_scheduler", return_value=scheduler):
+        scheduling.schedule_recurring("some-job", func, 10)
+
+    scheduler.cancel.assert_called_once_with("some-job")
+    kwargs = scheduler.schedule.call_args.kwargs
+    assert kwargs["id"] == "some-job"
+    assert kwargs["func"] is func
+    assert kwargs["interval"] == 10
+    assert kwargs["repeat"] is None
+    assert kwargs["result_ttl"] == -1
+
+
+def test_schedule_recurring_survives_cancel_failure():
+    scheduler = MagicMock()
+    scheduler.cancel.side_effect = Exception("nothing to cancel")
+
+    with patch(f"{_M}.django_rq.get_scheduler", return_value=scheduler):
+        scheduling.schedule_recurring("some-job", MagicMock(), 10)
+
+    assert scheduler.schedule.called
+
+
+@override_settings(KMS_LOGS_ASYNC=False, SECRET_READ_EVENTS_ASYNC=True)
+def test_init_recurring_jobs_registers_enabled_jobs_only():
+    scheduler = MagicMock()
+
+    with patch(f"{_M}.django_rq.get_scheduler", return_value=scheduler):
+        scheduling.init_recurring_jobs()
+
+    scheduled = {call.kwargs["id"] for call in scheduler.schedule.call_args_list}
+    assert scheduled == {
+        audit.FLUSH_JOB_ID,
+        audit.PARTITIONS_JOB_ID,
+        activity.COMPACTION_JOB_ID,
+        activity.FOLD_JOB_ID,
+    }
+    # The disabled flush is still cancelled, so turning it off takes effect.
+    cancelled = {call.args[0] for call in scheduler.cancel.call_args_list}
+    assert activity.FLUSH_JOB_ID in cancelled
+
+
+def test_init_recurring_jobs_continues_past_a_failure():
+    scheduler = MagicMock()
+    scheduler.schedule.side_effect = [RuntimeError("redis"), None, None, None, None]
+
+    with patch(f"{_M}.django_rq.get_scheduler", return_value=scheduler):
+        scheduling.init_recurring_jobs()
+
+    assert scheduler.schedule.call_count >= 2
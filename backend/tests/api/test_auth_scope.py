@@ -44,32 +44,41 @@ def _stub_auth_scaffolding():
     """Make every code-path past the env/app resolution succeed cheaply —
     these tests only care about how that resolution behaves."""
     with patch("api.auth.get_token_type", return_value="User"), patch(
-        "api.auth.token_is_expired_or_deleted", return_value=False
-    ), patch("api.auth.user_can_access_environment", return_value=True), patch(
+        "api.auth.auth_token_is_live", return_value=True
+    ), _stub_resolved_token(), patch(
+        "api.auth.user_can_access_environment", return_value=True
+    ), patch(
         "api.auth.user_can_access_app", return_value=True
     ):
         yield
 
 
-def _stub_caller_org(org):
-    """Patch _resolve_caller_org to return a specific org."""
-    return patch("api.auth._resolve_caller_org", return_value=org)
-
-
-def _stub_user_token():
-    """The User-token branch loads the org_member + user_token rows after
-    env resolution — supply benign mocks so we don't need real DB rows."""
-    om = MagicMock()
-    om.deleted_at = None
-    om.user = MagicMock(userId=str(uuid.uuid4()))
-    om.organisation = MagicMock(id=str(uuid.uuid4()))
-    return patch("api.auth.get_org_member_from_user_token", return_value=om), patch(
-        "api.auth.UserToken"
-    ) if False else (
-        patch("api.auth.get_org_member_from_user_token", return_value=om)
+def _stub_resolved_token(organisation=None, org_member=None, token=None):
+    """Patch resolve_auth_token to return a token resolved to the given
+    organisation and principal. The User-token branch reads the org_member
+    and token rows after env resolution — default to benign mocks so we
+    don't need real DB rows."""
+    if org_member is None:
+        org_member = MagicMock(deleted_at=None)
+        org_member.user = MagicMock(userId=str(uuid.uuid4()))
+        org_member.organisation = organisation
+    return patch(
+        "api.auth.resolve_auth_token",
+        return_value={
+            "token_type": "User",
+            "token": token if token is not None else MagicMock(),
+            "org_member": org_member,
+            "service_account": None,
+            "organisation": organisation,
+        },
     )
 
 
+def _stub_caller_org(org):
+    """Resolve the token to a member of a specific org."""
+    return _stub_resolved_token(organisation=org)
+
+
 # ════════════════════════════════════════════════════════════════════
 # Cross-org existence oracle
 # ════════════════════════════════════════════════════════════════════
@@ -143,8 +152,8 @@ class TestLegacyServiceTokenScope:
             app_id=victim_app.id,
         )
 
-        with patch("api.auth.get_token_type", return_value="Service"), patch(
-            "api.auth.get_service_token", return_value=token
+        with patch("api.auth.get_token_type", return_value="Service"), _stub_resolved_token(
+            organisation=token_org, token=token
         ), patch.object(RealEnvironment, "objects") as MockEnvironmentMgr:
             env_qs = MockEnvironmentMgr.select_related.return_value
             env_qs.get.return_value = victim_env
@@ -161,8 +170,8 @@ class TestLegacyServiceTokenScope:
         env = SimpleNamespace(id="other-env", app=token.app, app_id=token.app_id)
         token.keys.filter.return_value.exists.return_value = False
 
-        with patch("api.auth.get_token_type", return_value="Service"), patch(
-            "api.auth.get_service_token", return_value=token
+        with patch("api.auth.get_token_type", return_value="Service"), _stub_resolved_token(
+            organisation=token_org, token=token
         ), patch.object(RealEnvironment, "objects") as MockEnvironmentMgr:
             env_qs = MockEnvironmentMgr.select_related.return_value
             env_qs.get.return_value = env
@@ -185,8 +194,8 @@ class TestLegacyServiceTokenScope:
         env = SimpleNamespace(id="other-env", app=other_app, app_id=other_app.id)
         token.keys.filter.return_value.exists.return_value = True
 
-        with patch("api.auth.get_token_type", return_value="Service"), patch(
-            "api.auth.get_service_token", return_value=token
+        with patch("api.auth.get_token_type", return_value="Service"), _stub_resolved_token(
+            organisation=token_org, token=token
         ), patch.object(RealEnvironment, "objects") as MockEnvironmentMgr:
             env_qs = MockEnvironmentMgr.select_related.return_value
             env_qs.get.return_value = env
@@ -206,8 +215,8 @@ class TestLegacyServiceTokenScope:
         env = SimpleNamespace(id="allowed-env", app=token.app, app_id=token.app_id)
         token.keys.filter.return_value.exists.return_value = True
 
-        with patch("api.auth.get_token_type", return_value="Service"), patch(
-            "api.auth.get_service_token", return_value=token
+        with patch("api.auth.get_token_type", return_value="Service"), _stub_resolved_token(
+            organisation=token_org, token=token
         ), patch.object(RealEnvironment, "objects") as MockEnvironmentMgr:
             env_qs = MockEnvironmentMgr.select_related.return_value
             env_qs.get.return_value = env
@@ -239,30 +248,20 @@ class TestUrlKwargsBeatHeaders:
 
         with _stub_caller_org(caller_org), patch("api.auth.apps") as MockApps, patch(
             "api.auth.Secret"
-        ) as MockSecret, patch("api.auth.get_org_member_from_user_token") as MockOm:
+        ) as MockSecret:
             App_cls = MagicMock()
             App_cls.objects.select_related.return_value.filter.return_value.get.return_value = (
                 url_app
             )
             MockApps.get_model.return_value = App_cls
 
-            om = MagicMock()
-            om.deleted_at = None
-            om.user = MagicMock(userId="user-1")
-            om.organisation = caller_org
-            MockOm.return_value = om
-
-            # Patch the UserToken lookup at the end of the User branch
-            with patch("api.models.UserToken") as MockToken:
-                MockToken.objects.get.return_value = MagicMock()
-
-                request = _build_request(
-                    method="put",
-                    path=f"/v1/apps/{url_app_id}/",
-                    headers={"Secret-Id": "some-cross-app-secret-uuid"},
-                    resolver_kwargs={"app_id": url_app_id},
-                )
-                _user, auth = PhaseTokenAuthentication().authenticate(request)
+            request = _build_request(
+                method="put",
+                path=f"/v1/apps/{url_app_id}/",
+                headers={"Secret-Id": "some-cross-app-secret-uuid"},
+                resolver_kwargs={"app_id": url_app_id},
+            )
+            _user, auth = PhaseTokenAuthentication().authenticate(request)
 
             # Secret-Id was IGNORED — no call to Secret.objects went out.
             MockSecret.objects.select_related.assert_not_called()
@@ -279,29 +278,18 @@ class TestUrlKwargsBeatHeaders:
 
         with _stub_caller_org(caller_org), patch(
             "api.auth.Environment"
-        ) as MockEnvironment, patch("api.auth.apps") as MockApps, patch(
-            "api.auth.get_org_member_from_user_token"
-        ) as MockOm:
+        ) as MockEnvironment, patch("api.auth.apps"):
             # The lookup path that should fire: _env_qs().get(id=env_id_from_url)
             MockEnvironment.objects.select_related.return_value.filter.return_value.get.return_value = (
                 url_env
             )
 
-            om = MagicMock()
-            om.deleted_at = None
-            om.user = MagicMock(userId="user-1")
-            om.organisation = caller_org
-            MockOm.return_value = om
-
-            with patch("api.models.UserToken") as MockToken:
-                MockToken.objects.get.return_value = MagicMock()
-
-                request = _build_request(
-                    method="put",
-                    path=f"/v1/environments/{url_env_id}/",
-                    headers={"Environment": "some-cross-env-uuid"},
-                    resolver_kwargs={"env_id": url_env_id},
-                )
-                _user, auth = PhaseTokenAuthentication().authenticate(request)
+            request = _build_request(
+                method="put",
+                path=f"/v1/environments/{url_env_id}/",
+                headers={"Environment": "some-cross-env-uuid"},
+                resolver_kwargs={"env_id": url_env_id},
+            )
+            _user, auth = PhaseTokenAuthentication().authenticate(request)
 
             assert auth["app"] is url_app
@@ -170,3 +170,57 @@ class TestPlanBasedRateThrottle:
         allowed = self.throttle.allow_request(request, None)
 
         assert allowed is True
+
+
+class TestPlanBasedRateThrottleRedis:
+    """The atomic sliding-window path taken when the cache is Redis."""
+
+    @pytest.fixture(autouse=True)
+    def setup_throttle(self):
+        from django.core.cache.backends.redis import RedisCache
+
+        self.factory = APIRequestFactory()
+        self.throttle = PlanBasedRateThrottle()
+        self.throttle.cache = Mock(spec=RedisCache)
+        self.throttle.cache.make_and_validate_key.side_effect = lambda key: f":1:{key}"
+        self.script = Mock()
+        self.throttle.timer = lambda: 125.0
+
+        with patch.object(
+            PlanBasedRateThrottle, "_sliding_window_script", return_value=self.script
+        ):
+            yield
+
+    def _request(self):
+        request = self.factory.get("/")
+        request.user = Mock(is_authenticated=True)
+        request.auth = {"org_member": Mock(id=123)}
+        return request
+
+    def _allow(self):
+        with patch.object(PlanBasedRateThrottle, "get_rate", return_value="10/min"):
+            return self.throttle.allow_request(self._request(), None)
+
+    def test_allowed_in_one_atomic_call(self):
+        self.script.return_value = [1, b"0"]
+
+        assert self._allow() is True
+        self.script.assert_called_once()
+        kwargs = self.script.call_args.kwargs
+        # 125s falls in the third 60s window (index 2).
+        assert kwargs["keys"] == [
+            ":1:{throttle_plan_based_user_123}:2",
+            ":1:{throttle_plan_based_user_123}:1",
+        ]
+        assert kwargs["args"] == [10, 60, 125.0, 120.0]
+
+    def test_throttled_reports_wait(self):
+        self.script.return_value = [0, b"12.5"]
+
+        assert self._allow() is False
+        assert self.throttle.wait() == 12.5
+
+    def test_redis_failure_fails_open(self):
+        self.script.side_effect = ConnectionError("down")
+
+        assert self._allow() is True
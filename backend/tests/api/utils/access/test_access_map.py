@@ -0,0 +1,111 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+
+from api.utils.access import access_map
+from api.utils.access.access_map import (
+    access_map_allows,
+    access_map_scope,
+    get_access_map,
+    invalidate_org_access,
+    invalidate_org_access_on_commit,
+)
+
+ORG = "org-1"
+ADMIN = {"permissions": {"Secrets": ["read", "update"]}, "app_permissions": {}}
+VIEWER = {"permissions": {"Secrets": ["read"]}, "app_permissions": {}}
+
+
+def _map(apps_entry=None):
+    return {
+        "orgs": {ORG: {"member_id": "member-1", "role": ADMIN}},
+        "apps": {"app-1": apps_entry} if apps_entry else {},
+        "environments": {"env-1"},
+    }
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def builder():
+    build = MagicMock(
+        side_effect=lambda principal_id: (
+            _map(),
+            [f"access-version:org:{ORG}"],
+            cache.get_many([f"access-version:org:{ORG}"]),
+        )
+    )
+    with patch.dict(access_map._BUILDERS, {"user": build}):
+        yield build
+
+
+class TestGetAccessMap:
+    def test_none_outside_scope(self, builder):
+        assert get_access_map("user", "user-1") is None
+        builder.assert_not_called()
+
+    def test_memoized_within_scope(self, builder):
+        with access_map_scope():
+            first = get_access_map("user", "user-1")
+            second = get_access_map("user", "user-1")
+        assert first is second
+        assert builder.call_count == 1
+
+    def test_cached_across_requests(self, builder):
+        with access_map_scope():
+            get_access_map("user", "user-1")
+        with access_map_scope():
+            get_access_map("user", "user-1")
+        assert builder.call_count == 1
+
+    def test_org_version_bump_rebuilds(self, builder):
+        with access_map_scope():
+            get_access_map("user", "user-1")
+        invalidate_org_access(ORG)
+        with access_map_scope():
+            get_access_map("user", "user-1")
+        assert builder.call_count == 2
+
+    def test_signal_bump_waits_for_commit(self, builder):
+        """A map rebuilt while the revoking transaction is still open must
+        not be cached under the post-revocation version."""
+        pending = []
+        with patch.object(access_map.transaction, "on_commit", pending.append):
+            invalidate_org_access_on_commit(ORG)
+            with access_map_scope():
+                get_access_map("user", "user-1")
+
+        for callback in pending:
+            callback()
+        with access_map_scope():
+            get_access_map("user", "user-1")
+        assert builder.call_count == 2
+
+
+class TestAccessMapAllows:
+    def test_org_level_permission(self):
+        access = _map()
+        assert access_map_allows(access, ORG, "update", "Secrets")
+        assert not access_map_allows(access, "other-org", "read", "Secrets")
+
+    def test_app_must_be_reachable(self):
+        assert not access_map_allows(_map(), ORG, "read", "Secrets", app_id="app-1")
+
+    def test_team_role_overrides_org_role(self):
+        access = _map({"direct": False, "teams": [(VIEWER, None)]})
+        assert access_map_allows(access, ORG, "read", "Secrets", app_id="app-1")
+        assert not access_map_allows(access, ORG, "update", "Secrets", app_id="app-1")
+
+    def test_team_owner_keeps_org_role(self):
+        access = _map({"direct": False, "teams": [(VIEWER, "member-1")]})
+        assert access_map_allows(access, ORG, "update", "Secrets", app_id="app-1")
+
+    def test_direct_access_uses_org_role(self):
+        access = _map({"direct": True, "teams": [(VIEWER, None)]})
+        assert access_map_allows(access, ORG, "update", "Secrets", app_id="app-1")
@@ -0,0 +1,88 @@
+"""Tests for draining Redis list buffers (api.utils.buffers)."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from api.utils import buffers
+
+
+def _connection(buffered, processing=()):
+    """A mock Redis connection backed by two in-memory lists."""
+    lists = {"buf": list(buffered), "buf:processing": list(processing), "buf:dead": []}
+    connection = MagicMock()
+    connection.set.return_value = True
+    connection.lrange.side_effect = lambda key, start, end: list(lists[key])
+    connection.incr.return_value = 1
+
+    def eval_(script, numkeys, *args):
+        if script != buffers._MOVE_SCRIPT:
+            return 1
+        source, target, count = args
+        rows, lists[source] = lists[source][:count], lists[source][count:]
+        lists[target].extend(rows)
+        return rows
+
+    def delete(*keys):
+        for key in keys:
+            if key in lists:
+                lists[key] = []
+
+    connection.eval.side_effect = eval_
+    connection.delete.side_effect = delete
+    return connection, lists
+
+
+def test_drain_writes_batches_and_empties_processing():
+    connection, lists = _connection(["a", "b", "c"])
+    write = MagicMock()
+
+    assert buffers.drain_buffer(connection, "buf", write, batch_size=2) == 3
+
+    assert [call.args[0] for call in write.call_args_list] == [["a", "b"], ["c"]]
+    assert lists == {"buf": [], "buf:processing": [], "buf:dead": []}
+    release = connection.eval.call_args_list[-1].args
+    assert release[0] == buffers._RELEASE_LOCK_SCRIPT
+
+
+def test_drain_retries_leftover_batch_first():
+    connection, lists = _connection(["c"], processing=["a", "b"])
+    write = MagicMock()
+
+    assert buffers.drain_buffer(connection, "buf", write, batch_size=10) == 3
+
+    assert [call.args[0] for call in write.call_args_list] == [["a", "b"], ["c"]]
+
+
+def test_failed_batch_stays_in_processing():
+    connection, lists = _connection(["a", "b"])
+    write = MagicMock(side_effect=RuntimeError("db down"))
+
+    with pytest.raises(RuntimeError):
+        buffers.drain_buffer(connection, "buf", write, batch_size=10)
+
+    assert lists["buf:processing"] == ["a", "b"]
+    assert lists["buf:dead"] == []
+
+
+def test_repeatedly_failing_batch_is_dead_lettered():
+    connection, lists = _connection(["a", "b"])
+    connection.incr.return_value = buffers.MAX_FLUSH_ATTEMPTS
+    write = MagicMock(side_effect=RuntimeError("bad row"))
+
+    with pytest.raises(RuntimeError):
+        buffers.drain_buffer(connection, "buf", write, batch_size=10)
+
+    assert lists["buf:processing"] == []
+    assert lists["buf:dead"] == ["a", "b"]
+
+
+def test_drain_skips_when_another_run_holds_the_lock():
+    connection, lists = _connection(["a"])
+    connection.set.return_value = None
+    write = MagicMock()
+
+    assert buffers.drain_buffer(connection, "buf", write, batch_size=10) == 0
+
+    write.assert_not_called()
+    assert lists["buf"] == ["a"]
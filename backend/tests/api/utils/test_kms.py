@@ -0,0 +1,154 @@
+"""Tests for the cached, buffered request path of the KMS endpoint."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+
+from api.utils import kms
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@patch("api.utils.kms.App.objects")
+def test_key_share_lookup_is_cached(mock_objects):
+    mock_objects.values_list.return_value.get.return_value = "wrapped-share"
+
+    assert kms.get_app_key_share("token-1") == "wrapped-share"
+    assert kms.get_app_key_share("token-1") == "wrapped-share"
+
+    mock_objects.values_list.return_value.get.assert_called_once_with(
+        app_token="token-1"
+    )
+
+
+@patch("api.utils.kms.App.objects")
+def test_invalidation_drops_cached_key_share(mock_objects):
+    mock_objects.values_list.return_value.get.side_effect = ["old-share", "new-share"]
+
+    assert kms.get_app_key_share("token-1") == "old-share"
+    kms.invalidate_app_key_share("token-1")
+
+    assert kms.get_app_key_share("token-1") == "new-share"
+
+
+@patch("api.utils.kms.App.objects")
+def test_unknown_token_is_not_cached(mock_objects):
+    mock_objects.values_list.return_value.get.side_effect = kms.App.DoesNotExist
+
+    assert kms.get_app_key_share("token-1") is None
+    assert kms.get_app_key_share("token-1") is None
+    assert mock_objects.values_list.return_value.get.call_count == 2
+
+
+@override_settings(KMS_LOGS_ASYNC=True)
+@patch("api.utils.kms.django_rq.get_connection")
+@patch("api.utils.kms.KMSDBLog.objects")
+def test_logs_are_buffered_when_async(mock_objects, mock_connection):
+    kms.log_kms_request("phApp:v1:abc", "decrypt", "node", "12", "1.2.3.4")
+
+    mock_objects.bulk_create.assert_not_called()
+    key, payload = mock_connection.return_value.rpush.call_args.args
+    assert key == kms.KMS_LOG_BUFFER_KEY
+    row = json.loads(payload)
+    assert row["app_id"] == "phApp:v1:abc"
+    assert row["ph_size"] == 12.0
+    assert row["id"]
+
+
+@override_settings(KMS_LOGS_ASYNC=True)
+@patch("api.utils.kms.buffer_rollup_increments")
+@patch("api.utils.kms.increment_rollups")
+@patch("api.utils.kms.django_rq.get_connection")
+@patch("api.utils.kms.KMSDBLog.objects")
+def test_logs_are_written_directly_without_buffer(
+    mock_objects, mock_connection, mock_rollups, mock_buffer_increments
+):
+    mock_connection.return_value.rpush.side_effect = ConnectionError
+
+    kms.log_kms_request("phApp:v1:abc", "decrypt", "node", "12", "1.2.3.4")
+
+    (logs,), _ = mock_objects.bulk_create.call_args
+    assert [log.app_id for log in logs] == ["phApp:v1:abc"]
+    # The rollup is counted by the scheduled fold, not on the request path.
+    ((counts,), _) = mock_buffer_increments.call_args
+    assert counts == {("phApp:v1:abc", logs[0].timestamp): 1}
+    mock_rollups.assert_not_called()
+
+
+@override_settings(KMS_LOGS_ASYNC=False)
+@patch("api.utils.kms.buffer_rollup_increments", side_effect=ConnectionError)
+@patch("api.utils.kms.increment_rollups")
+@patch("api.utils.kms.KMSDBLog.objects")
+def test_direct_write_updates_rollups_if_increment_buffer_is_down(
+    mock_objects, mock_rollups, _mock_buffer_increments
+):
+    kms.log_kms_request("phApp:v1:abc", "decrypt", "node", "12", "1.2.3.4")
+
+    mock_objects.bulk_create.assert_called_once()
+    mock_rollups.assert_called_once()
+
+
+def _buffered(id, app_id="phApp:v1:abc", timestamp=1_760_000_000_000):
+    return json.dumps(
+        {
+            "id": id,
+            "app_id": app_id,
+            "event_type": "decrypt",
+            "phase_node": "node",
+            "ph_size": 12.0,
+            "ip_address": "1.2.3.4",
+            "timestamp": timestamp,
+        }
+    )
+
+
+@patch("api.utils.kms.increment_rollups")
+@patch("api.utils.kms.KMSDBLog.objects")
+def test_flush_writes_logs_and_rollups_per_batch(mock_objects, mock_rollups):
+    mock_objects.filter.return_value.values_list.return_value = []
+
+    kms._write_logs(
+        [_buffered("log-1"), _buffered("log-2"), _buffered("log-3", "other")]
+    )
+
+    (logs,), kwargs = mock_objects.bulk_create.call_args
+    assert [log.id for log in logs] == ["log-1", "log-2", "log-3"]
+    assert kwargs == {"ignore_conflicts": True}
+    mock_rollups.assert_called_once_with(
+        {
+            ("phApp:v1:abc", 1_760_000_000_000): 2,
+            ("other", 1_760_000_000_000): 1,
+        }
+    )
+
+
+@patch("api.utils.kms.increment_rollups")
+@patch("api.utils.kms.KMSDBLog.objects")
+def test_retried_batch_rolls_up_only_new_logs(mock_objects, mock_rollups):
+    mock_objects.filter.return_value.values_list.return_value = ["log-1"]
+
+    kms._write_logs([_buffered("log-1"), _buffered("log-2")])
+
+    (logs,), _ = mock_objects.bulk_create.call_args
+    assert [log.id for log in logs] == ["log-2"]
+    mock_rollups.assert_called_once_with({("phApp:v1:abc", 1_760_000_000_000): 1})
+
+
+@patch("api.utils.kms.drain_buffer", return_value=3)
+@patch("api.utils.kms.django_rq.get_connection")
+def test_flush_drains_the_kms_log_buffer(mock_connection, mock_drain):
+    assert kms.flush_kms_logs(batch_size=10) == 3
+
+    assert mock_drain.call_args.args[1:] == (
+        kms.KMS_LOG_BUFFER_KEY,
+        kms._write_logs,
+        10,
+    )
@@ -0,0 +1,63 @@
+"""Tests for keyset pagination of audit and secret logs."""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from types import SimpleNamespace
+
+import pytest
+
+from api.utils.database import (
+    decode_log_cursor,
+    encode_log_cursor,
+    merge_newest,
+    older_than_cursor,
+)
+
+T0 = datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)
+
+
+def _event(id, seconds):
+    return SimpleNamespace(id=id, timestamp=T0 + timedelta(seconds=seconds))
+
+
+def test_cursor_round_trip():
+    cursor = decode_log_cursor(encode_log_cursor(_event("event-1", 0)))
+
+    assert cursor == {"ts": T0, "id": "event-1"}
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "eyJ0cyI6ICJ4In0="])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_log_cursor(cursor)
+
+
+def test_cursor_filter_seeks_past_ties():
+    condition = str(older_than_cursor({"ts": T0, "id": "event-1"}))
+
+    assert "timestamp__lt" in condition
+    assert "id__lt" in condition
+    # Upper bound for the index scan
+    assert "timestamp__lte" in condition
+
+
+def test_merge_takes_newest_across_lists():
+    env_a = [_event("a3", 30), _event("a2", 20), _event("a1", 10)]
+    env_b = [_event("b2", 25), _event("b1", 5)]
+    env_c = [_event("c2", 20), _event("c1", 1)]
+
+    merged = merge_newest([env_a, env_b, env_c], 4)
+
+    assert [e.id for e in merged] == ["a3", "b2", "c2", "a2"]
+
+
+def test_merge_consumes_lists_lazily():
+    consumed = []
+
+    def events(prefix, count):
+        for index in range(count, 0, -1):
+            consumed.append(f"{prefix}{index}")
+            yield _event(f"{prefix}{index}", index)
+
+    merge_newest([events("a", 100), events("b", 100)], 3)
+
+    assert len(consumed) < 10
@@ -0,0 +1,184 @@
+"""Tests for monthly partitioning of the event tables."""
+
+from datetime import datetime, timezone as dt_timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from api.utils import partitions
+from api.utils.partitions import add_months, month_start, partition_month
+
+JAN = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def test_month_arithmetic():
+    assert month_start(datetime(2026, 1, 31, 23, 59, tzinfo=dt_timezone.utc)) == JAN
+    assert add_months(JAN, 11) == datetime(2026, 12, 1, tzinfo=dt_timezone.utc)
+    assert add_months(JAN, 12) == datetime(2027, 1, 1, tzinfo=dt_timezone.utc)
+    assert add_months(JAN, -1) == datetime(2025, 12, 1, tzinfo=dt_timezone.utc)
+
+
+def test_partition_names_round_trip():
+    name = partitions.partition_name("api_secretevent", JAN)
+
+    assert name == "api_secretevent_p202601"
+    assert partition_month("api_secretevent", name) == JAN
+    assert partition_month("api_secretevent", "api_secretevent_p2026") is None
+    assert partition_month("api_secretevent", "api_auditevent_p202601") is None
+
+
+@patch("api.utils.partitions.default_partition_months", return_value=[])
+@patch("api.utils.partitions.create_default_partition")
+@patch("api.utils.partitions.create_partition")
+@patch("api.utils.partitions.is_partitioned")
+def test_ensure_partitions_skips_unconverted_tables(
+    mock_partitioned, mock_create, mock_create_default, _months
+):
+    mock_partitioned.side_effect = lambda table: table == "api_auditevent"
+
+    ensured = partitions.ensure_partitions(
+        now=datetime(2026, 11, 15, tzinfo=dt_timezone.utc), months_ahead=2
+    )
+
+    assert ensured == [
+        "api_auditevent_p202611",
+        "api_auditevent_p202612",
+        "api_auditevent_p202701",
+    ]
+    assert all(call.args[0] == "api_auditevent" for call in mock_create.mock_calls)
+    mock_create_default.assert_called_once_with("api_auditevent")
+
+
+@patch("api.utils.partitions.default_partition_months")
+@patch("api.utils.partitions.create_default_partition")
+@patch("api.utils.partitions.create_partition")
+@patch("api.utils.partitions.is_partitioned", return_value=True)
+def test_ensure_partitions_splits_default_partition(
+    _partitioned, mock_create, _create_default, mock_months
+):
+    # Maintenance stopped: rows from August sit in the default partition.
+    mock_months.side_effect = lambda table: (
+        [datetime(2026, 8, 1, tzinfo=dt_timezone.utc)]
+        if table == "api_secretevent"
+        else []
+    )
+
+    ensured = partitions.ensure_partitions(
+        now=datetime(2026, 11, 15, tzinfo=dt_timezone.utc), months_ahead=0
+    )
+
+    assert ensured == [
+        "api_secretevent_p202608",
+        "api_secretevent_p202611",
+        "api_auditevent_p202611",
+    ]
+
+
+def _split_cursor(partition_exists, default_exists, rows_in_default):
+    cursor = MagicMock()
+    cursor.fetchone.side_effect = [
+        ("partition",) if partition_exists else (None,),
+        ("default",) if default_exists else (None,),
+        (rows_in_default,),
+    ]
+    return cursor
+
+
+@patch("api.utils.partitions.transaction.atomic")
+@patch("api.utils.partitions.connection")
+def test_create_partition_moves_rows_out_of_default(mock_connection, _atomic):
+    mock_connection.ops.quote_name = lambda name: f'"{name}"'
+    cursor = _split_cursor(False, True, True)
+
+    partitions.create_partition("api_secretevent", JAN, cursor)
+
+    statements = [call.args[0] for call in cursor.execute.call_args_list][3:]
+    assert statements[0] == (
+        'ALTER TABLE "api_secretevent" DETACH PARTITION "api_secretevent_pdefault"'
+    )
+    assert statements[1].startswith('CREATE TABLE "api_secretevent_p202601"')
+    assert statements[2].startswith(
+        'INSERT INTO "api_secretevent_p202601" '
+        'SELECT * FROM "api_secretevent_pdefault"'
+    )
+    assert statements[3].startswith('DELETE FROM "api_secretevent_pdefault"')
+    assert statements[4] == (
+        'ALTER TABLE "api_secretevent" ATTACH PARTITION '
+        '"api_secretevent_pdefault" DEFAULT'
+    )
+
+
+@pytest.mark.parametrize(
+    "default_exists, rows_in_default", [(False, False), (True, False)]
+)
+@patch("api.utils.partitions.connection")
+def test_create_partition_without_rows_in_default(
+    mock_connection, default_exists, rows_in_default
+):
+    mock_connection.ops.quote_name = lambda name: f'"{name}"'
+    cursor = _split_cursor(False, default_exists, rows_in_default)
+
+    partitions.create_partition("api_secretevent", JAN, cursor)
+
+    statement = cursor.execute.call_args.args[0]
+    assert statement.startswith(
+        'CREATE TABLE IF NOT EXISTS "api_secretevent_p202601" '
+        'PARTITION OF "api_secretevent" FOR VALUES'
+    )
+    assert not any(
+        "DETACH" in call.args[0] for call in cursor.execute.call_args_list
+    )
+
+
+@patch("api.utils.partitions.connection")
+def test_create_partition_skips_existing(mock_connection):
+    cursor = _split_cursor(True, True, True)
+
+    partitions.create_partition("api_secretevent", JAN, cursor)
+
+    cursor.execute.assert_called_once_with(
+        "SELECT to_regclass(%s)", ["api_secretevent_p202601"]
+    )
+
+
+def _cursor(total, kept):
+    cursor = MagicMock()
+    cursor.fetchone.return_value = (total,)
+    type(cursor).rowcount = property(lambda self: kept)
+    return cursor
+
+
+@pytest.mark.parametrize("kept", [0, 40])
+@patch("api.utils.partitions.transaction.atomic")
+@patch("api.utils.partitions.connection")
+def test_rewrite_partition_keeps_survivors(mock_connection, _atomic, kept):
+    cursor = _cursor(total=100, kept=kept)
+    mock_connection.cursor.return_value.__enter__.return_value = cursor
+    mock_connection.ops.quote_name = lambda name: f'"{name}"'
+    locked_from = []
+    _atomic.return_value.__enter__.side_effect = lambda: locked_from.append(
+        cursor.execute.call_count
+    )
+
+    result = partitions.rewrite_partition(
+        "api_secretevent",
+        "api_secretevent_p202601",
+        "event_type <> %s",
+        ["R"],
+        dependents=[("api_secretevent_tags", "secretevent_id")],
+    )
+
+    assert result == (kept, 100 - kept)
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+    assert "INCLUDING ALL" in next(s for s in statements if "CREATE TABLE" in s)
+    # Only the swap runs in the transaction that locks the parent table.
+    outside, locked = statements[: locked_from[0]], statements[locked_from[0] :]
+    assert any(s.startswith('DELETE FROM "api_secretevent_tags"') for s in outside)
+    assert locked[0].startswith('ALTER TABLE "api_secretevent" DETACH PARTITION')
+    assert any("ATTACH PARTITION" in s for s in statements) == bool(kept)
+    assert statements[-1] == 'DROP TABLE "api_secretevent_p202601_old"'
+
+
+def test_rewrite_rejects_foreign_partitions():
+    with pytest.raises(ValueError):
+        partitions.rewrite_partition("api_secretevent", "api_auditevent_p202601", "")
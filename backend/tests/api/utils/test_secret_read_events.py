@@ -0,0 +1,144 @@
+"""Tests for compact and buffered secret READ events.
+
+READ events make up most of api_secretevent. They are written without
+copies of the key/value/comment ciphertext or tag rows, optionally buffered
+in Redis and flushed in batches, and hydrated from the CREATE/UPDATE event
+of the same secret version when displayed.
+"""
+
+import json
+from datetime import datetime, timezone as dt_timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.test import override_settings
+
+from api.models import SecretEvent
+from api.utils import audit_logging
+
+
+def _secret(id="secret-1", version=3, tags=()):
+    return SimpleNamespace(
+        id=id,
+        environment_id="env-1",
+        folder_id=None,
+        path="/",
+        key="ph:key",
+        key_digest="digest",
+        value="ph:value",
+        comment="ph:comment",
+        version=version,
+        type="secret",
+        tags=MagicMock(all=MagicMock(return_value=list(tags))),
+    )
+
+
+@override_settings(SECRET_READ_EVENTS_ASYNC=False)
+@patch("api.utils.audit_logging.SecretEvent.tags")
+@patch("api.utils.audit_logging.SecretEvent.objects")
+def test_read_events_are_written_compact(mock_objects, mock_tags):
+    mock_objects.bulk_create.side_effect = lambda events, **kw: events
+
+    events = audit_logging.log_secret_events_bulk(
+        [_secret(), _secret(id="secret-2")], SecretEvent.READ, ip_address="1.2.3.4"
+    )
+
+    mock_objects.bulk_create.assert_called_once()
+    mock_tags.through.objects.bulk_create.assert_not_called()
+    assert [e.secret_id for e in events] == ["secret-1", "secret-2"]
+    for event in events:
+        assert event.compact is True
+        assert (event.key, event.value, event.comment) == ("", "", "")
+        assert event.version == 3
+        assert event.ip_address == "1.2.3.4"
+
+
+@override_settings(SECRET_READ_EVENTS_ASYNC=True)
+@patch("api.utils.audit_logging.django_rq.get_connection")
+@patch("api.utils.audit_logging.SecretEvent.objects")
+def test_read_events_are_buffered_when_async(mock_objects, mock_connection):
+    events = audit_logging.log_secret_events_bulk([_secret()], SecretEvent.READ)
+
+    mock_objects.bulk_create.assert_not_called()
+    key, payload = mock_connection.return_value.rpush.call_args.args
+    assert key == audit_logging.READ_EVENT_BUFFER_KEY
+    row = json.loads(payload)
+    assert row["id"] == str(events[0].id)
+    assert row["secret_id"] == "secret-1"
+    assert "value" not in row
+
+
+@patch("api.utils.audit_logging.SecretEvent.objects")
+def test_flush_writes_buffered_events_with_read_time(mock_objects):
+    read_at = datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)
+    row = {
+        "id": "event-1",
+        "secret_id": "secret-1",
+        "environment_id": "env-1",
+        "version": 3,
+        "event_type": SecretEvent.READ,
+        "timestamp": read_at.isoformat(),
+    }
+    audit_logging._write_read_events([json.dumps(row)])
+
+    (events,), kwargs = mock_objects.bulk_create.call_args
+    assert kwargs == {"ignore_conflicts": True}
+    assert events[0].id == "event-1"
+    assert events[0].compact is True
+    assert events[0].timestamp == read_at
+
+
+@patch("api.utils.audit_logging.drain_buffer", return_value=4)
+@patch("api.utils.audit_logging.django_rq.get_connection")
+def test_flush_drains_the_read_event_buffer(mock_connection, mock_drain):
+    assert audit_logging.flush_secret_read_events(batch_size=10) == 4
+
+    args = mock_drain.call_args.args
+    assert args[1:] == (
+        audit_logging.READ_EVENT_BUFFER_KEY,
+        audit_logging._write_read_events,
+        10,
+    )
+
+
+@patch("api.utils.audit_logging.django_rq.get_connection")
+def test_oldest_buffered_read_timestamp_prefers_in_flight_batch(mock_connection):
+    read_at = datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)
+    rows = {
+        "secret-read-events:processing": json.dumps({"timestamp": read_at.isoformat()}),
+        "secret-read-events": json.dumps({"timestamp": "2026-01-02T03:05:00+00:00"}),
+    }
+    mock_connection.return_value.lindex.side_effect = lambda key, index: rows.get(key)
+
+    assert audit_logging.oldest_buffered_read_timestamp() == read_at
+
+    rows.clear()
+    assert audit_logging.oldest_buffered_read_timestamp() is None
+
+
+@patch("api.utils.audit_logging.Secret.objects")
+@patch("api.utils.audit_logging.SecretEvent.objects")
+def test_hydrate_compact_events_from_version_source(mock_event_objects, mock_secret_objects):
+    tag = SimpleNamespace(name="prod")
+    source = _secret(tags=[tag])
+    source.secret_id = "secret-1"
+    mock_event_objects.filter.return_value.order_by.return_value.prefetch_related.return_value = [
+        source
+    ]
+    mock_secret_objects.filter.return_value.prefetch_related.return_value = [
+        _secret(id="secret-2", version=1)
+    ]
+
+    full = SecretEvent(secret_id="secret-1", version=3, key="full")
+    hit = SecretEvent(secret_id="secret-1", version=3, compact=True)
+    fallback = SecretEvent(secret_id="secret-2", version=1, compact=True)
+    unresolved = SecretEvent(secret_id="secret-2", version=7, compact=True)
+
+    audit_logging.hydrate_compact_secret_events([full, hit, fallback, unresolved])
+
+    assert mock_event_objects.filter.call_count == 1
+    assert mock_secret_objects.filter.call_args.kwargs == {"id__in": {"secret-2"}}
+    assert (hit.key, hit.value, hit.resolved_tags) == ("ph:key", "ph:value", [tag])
+    assert fallback.value == "ph:value"
+    assert unresolved.value == "" and unresolved.resolved_tags == []
+    assert full.key == "full" and not hasattr(full, "resolved_tags")
@@ -0,0 +1,118 @@
+"""Tests for the single-lookup, cached bearer token resolution used by
+PhaseTokenAuthentication."""
+
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from api.models import ServiceAccountToken
+from api.utils import rest
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _sa_token(expires_at=None, sa_deleted_at=None):
+    service_account = SimpleNamespace(
+        id="sa-1",
+        deleted_at=sa_deleted_at,
+        organisation=SimpleNamespace(id="org-1"),
+    )
+    return SimpleNamespace(
+        id="token-1",
+        deleted_at=None,
+        expires_at=expires_at,
+        service_account=service_account,
+    )
+
+
+@patch.object(ServiceAccountToken, "objects")
+def test_token_is_resolved_with_one_query_and_cached(mock_objects):
+    token = _sa_token()
+    mock_objects.select_related.return_value.get.return_value = token
+
+    first = rest.resolve_auth_token("Bearer ServiceAccount abc")
+    second = rest.resolve_auth_token("Bearer ServiceAccount abc")
+
+    mock_objects.select_related.return_value.get.assert_called_once_with(
+        token="abc"
+    )
+    mock_objects.select_related.assert_called_once_with(
+        "service_account__organisation", "service_account__role", "created_by__user"
+    )
+    assert first["service_account"] is token.service_account
+    assert first["organisation"].id == "org-1"
+    # A cache hit answers the liveness check without touching the database.
+    assert rest.auth_token_is_live(second)
+    assert mock_objects.select_related.return_value.get.call_count == 1
+
+    rest.invalidate_auth_token("ServiceAccount", "abc")
+    rest.resolve_auth_token("Bearer ServiceAccount abc")
+    assert mock_objects.select_related.return_value.get.call_count == 2
+
+
+@patch.object(ServiceAccountToken, "objects")
+def test_cache_holds_no_secrets_or_instances(mock_objects):
+    """Only ids and scalar state are cached; instances are re-fetched by
+    primary key, so the raw token never reaches the shared cache and stale
+    rows can't be saved back."""
+    token = _sa_token()
+    token.token = "raw-secret"
+    mock_objects.select_related.return_value.get.return_value = token
+
+    rest.resolve_auth_token("Bearer ServiceAccount abc")
+    cached = cache.get(rest._token_auth_cache_key("ServiceAccount", "abc"))
+    assert cached == {
+        "token_id": "token-1",
+        "deleted_at": None,
+        "expires_at": None,
+        "service_account_deleted_at": None,
+    }
+
+    hit = rest.resolve_auth_token("Bearer ServiceAccount abc")
+    assert hit["service_account"] is token.service_account
+    mock_objects.select_related.return_value.get.assert_called_with(pk="token-1")
+
+
+def _state(token):
+    return {
+        "deleted_at": token.deleted_at,
+        "expires_at": token.expires_at,
+        "service_account_deleted_at": token.service_account.deleted_at,
+    }
+
+
+@pytest.mark.parametrize(
+    "token, live",
+    [
+        (_sa_token(), True),
+        (_sa_token(expires_at=timezone.now() - timedelta(seconds=1)), False),
+        (_sa_token(sa_deleted_at=timezone.now()), False),
+    ],
+)
+def test_auth_token_is_live(token, live):
+    assert rest.auth_token_is_live(_state(token)) is live
+
+
+def test_unknown_and_malformed_tokens_are_not_live():
+    assert rest.resolve_auth_token("Bearer Unknown abc") is None
+    assert rest.auth_token_is_live(None) is False
+
+
+@patch.object(ServiceAccountToken, "objects")
+def test_last_used_bump_is_throttled(mock_objects):
+    token = SimpleNamespace(id="token-1")
+
+    rest.touch_service_account_token(token)
+    rest.touch_service_account_token(token)
+
+    mock_objects.filter.assert_called_once_with(id="token-1")
+    assert mock_objects.filter.return_value.update.call_count == 1
@@ -6,7 +6,7 @@ from unittest.mock import Mock, MagicMock, patch
 from rest_framework.test import APIRequestFactory, force_authenticate
 from rest_framework import status
 
-from api.views.secrets import PublicSecretsView
+from api.views.secrets import PublicSecretsView, _secrets_etag, _tag_filter_state
 
 
 @pytest.fixture(autouse=True)
@@ -193,13 +193,16 @@ class TestPublicSecretsDeleteEnvScoping:
         assert candidate_call.kwargs.get("deleted_at__isnull") is True
 
 
-def _build_put_request(env, body):
+def _build_put_request(env, body, org_member=None):
     factory = APIRequestFactory()
     user = _make_user()
     request = factory.put(
         "/public/v1/secrets/", data=json.dumps(body), content_type="application/json"
     )
-    force_authenticate(request, user=user, token=_make_auth(env, user))
+    auth = _make_auth(env, user)
+    if org_member is not None:
+        auth["org_member"] = org_member
+    force_authenticate(request, user=user, token=auth)
     return request
 
 
@@ -221,6 +224,8 @@ class TestPublicSecretsPutRecordsOverridelessUpdates:
         self.app = _make_app(org=self.org, sse_enabled=True)
         self.env = _make_env(app=self.app)
 
+    @patch("api.views.secrets.update_secret_references")
+    @patch("api.views.secrets.transaction")
     @patch("api.views.secrets.SecretSerializer")
     @patch(
         "api.views.secrets.get_environment_crypto_context",
@@ -232,7 +237,7 @@ class TestPublicSecretsPutRecordsOverridelessUpdates:
     @patch("api.views.secrets.PlanBasedRateThrottle.allow_request", return_value=True)
     @patch("api.views.secrets.IsIPAllowed.has_permission", return_value=True)
     def test_put_overrideless_secret_is_recorded_logged_and_triggers_sync(
-        self, _ip, _throttle, _keys, _enc, mock_audit, _ctx, mock_serializer
+        self, _ip, _throttle, _keys, _enc, mock_audit, _ctx, mock_serializer, _tx, _refs
     ):
         secret_id = str(uuid.uuid4())
         secret_obj = Mock()
@@ -249,8 +254,8 @@ class TestPublicSecretsPutRecordsOverridelessUpdates:
         mock_serializer.return_value.data = [{"id": secret_id, "value": "v2"}]
 
         with patch(
-            "api.views.secrets.Secret.objects.get", return_value=secret_obj
-        ):
+            "api.views.secrets.Secret.objects.filter", return_value=[secret_obj]
+        ), patch("api.views.secrets.Secret.objects.bulk_update") as mock_bulk_update:
             # No "override" key — the common CLI/SDK update.
             request = _build_put_request(
                 self.env, {"secrets": [{"id": secret_id, "value": "v2"}]}
@@ -258,9 +263,398 @@ class TestPublicSecretsPutRecordsOverridelessUpdates:
             response = self.view(request)
 
         assert response.status_code == status.HTTP_200_OK
-        # Written with per-secret triggering deferred...
-        secret_obj.save.assert_called_once_with(trigger_sync=False)
+        # Written in the bulk update, bypassing per-secret save()...
+        assert mock_bulk_update.call_args.args[0] == [secret_obj]
+        assert secret_obj.version == 2
+        secret_obj.save.assert_not_called()
         # ...the env sync fired exactly once afterwards (only happens if appended)...
         self.env.save.assert_called_once()
         # ...and the update was audit-logged in a non-empty batch.
         assert secret_obj in mock_audit.call_args.args[0]
+
+    @patch("api.views.secrets.get_environment_keys")
+    @patch("api.views.secrets.PlanBasedRateThrottle.allow_request", return_value=True)
+    @patch("api.views.secrets.IsIPAllowed.has_permission", return_value=True)
+    def test_put_rejects_duplicate_ids(self, _ip, _throttle, mock_keys):
+        secret_id = str(uuid.uuid4())
+
+        with patch("api.views.secrets.Secret.objects.bulk_update") as mock_bulk_update:
+            request = _build_put_request(
+                self.env,
+                {
+                    "secrets": [
+                        {"id": secret_id, "value": "first"},
+                        {"id": secret_id, "value": "second"},
+                    ]
+                },
+            )
+            response = self.view(request)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "Duplicate secret ID" in json.loads(response.content)["error"]
+        mock_keys.assert_not_called()
+        mock_bulk_update.assert_not_called()
+
+
+# ════════════════════════════════════════════════════════════════════
+# PublicSecretsView.get — conditional GET (ETag / If-None-Match)
+# ════════════════════════════════════════════════════════════════════
+
+
+@pytest.fixture
+def etag_inputs():
+    """Stub the queries behind the ETag (referenced env versions, personal
+    overrides, filtered tags); yields the referenced-versions mock."""
+    overrides = {"count": 0, "last_updated": None}
+    with patch(
+        "api.views.secrets.PersonalSecret.objects.filter"
+    ) as mock_overrides, patch(
+        "api.views.secrets.get_referenced_environment_versions", return_value={}
+    ) as mock_versions, patch(
+        "api.views.secrets._tag_filter_state", return_value=[]
+    ):
+        mock_overrides.return_value.aggregate.return_value = overrides
+        yield mock_versions
+
+
+class TestPublicSecretsConditionalGet:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, etag_inputs):
+        self.view = PublicSecretsView.as_view()
+        self.env = _make_env(app=_make_app(sse_enabled=True))
+        self.auth = _make_auth(self.env, _make_user())
+        self.mock_versions = etag_inputs
+
+    def _etag(self, query=None):
+        request = Mock()
+        request.auth = self.auth
+        request.GET = query or {}
+        return _secrets_etag(request, self.env, False)
+
+    def _request(self, query="", **headers):
+        factory = APIRequestFactory()
+        request = factory.get(f"/public/v1/secrets/{query}", **headers)
+        force_authenticate(request, user=self.auth["org_member"].user, token=self.auth)
+        return request
+
+    @patch("api.views.secrets.log_secret_events_bulk")
+    @patch("api.views.secrets.PlanBasedRateThrottle.allow_request", return_value=True)
+    @patch("api.views.secrets.IsIPAllowed.has_permission", return_value=True)
+    @patch("api.views.secrets.get_environment_crypto_context")
+    def test_matching_etag_returns_304_without_decrypting(
+        self, mock_ctx, _ip, _throttle, mock_audit
+    ):
+        etag = self._etag()
+        rows = [Mock(id="s-1"), Mock(id="s-2")]
+        with patch("api.views.secrets.Secret.objects.filter") as mock_filter:
+            mock_filter.return_value.only.return_value = rows
+            response = self.view(self._request(HTTP_IF_NONE_MATCH=f"W/{etag}"))
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        mock_ctx.assert_not_called()
+        # The poll is still an audited read of the secrets the client holds.
+        assert mock_audit.call_args.args[0] == rows
+
+    @patch("api.views.secrets.SecretReferenceIndex")
+    @patch("api.views.secrets.get_environment_crypto_context")
+    @patch("api.views.secrets.log_secret_events_bulk")
+    @patch("api.views.secrets.PlanBasedRateThrottle.allow_request", return_value=True)
+    @patch("api.views.secrets.IsIPAllowed.has_permission", return_value=True)
+    def test_no_etag_until_references_are_indexed(
+        self, _ip, _throttle, _audit, _ctx, _index
+    ):
+        """Changes in referenced environments can't be tracked until the
+        environment's references are indexed, so no ETag is issued."""
+        self.mock_versions.return_value = None
+        assert self._etag() is None
+
+        with patch("api.views.secrets.Secret.objects.filter") as mock_filter:
+            mock_filter.return_value.select_related.return_value.prefetch_related.return_value = []
+            response = self.view(self._request(HTTP_IF_NONE_MATCH="*"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not response.has_header("ETag")
+
+    def test_etag_tracks_referenced_environments_and_filters(self):
+        base = self._etag()
+        assert self._etag() == base
+
+        self.mock_versions.return_value = {"env-b": "2026-01-01T00:00:00Z"}
+        referenced = self._etag()
+        assert referenced != base
+
+        assert self._etag({"path": "/db"}) != referenced
+        assert self._etag({"tags": "prod"}) != referenced
+
+    def test_etag_tracks_filtered_tags(self):
+        with patch("api.views.secrets._tag_filter_state") as mock_tags:
+            mock_tags.return_value = ["tag-1:2026-01-01", "s-1:tag-1"]
+            base = self._etag({"tags": "prod"})
+            mock_tags.assert_called_once_with(self.env, "prod")
+
+            # Renamed tag (updated_at bumped)
+            mock_tags.return_value = ["tag-1:2026-02-01", "s-1:tag-1"]
+            renamed = self._etag({"tags": "prod"})
+            # Tag assigned to another secret
+            mock_tags.return_value = ["tag-1:2026-01-01", "s-1:tag-1", "s-2:tag-1"]
+            reassigned = self._etag({"tags": "prod"})
+
+        assert len({base, renamed, reassigned}) == 3
+
+    @patch("api.views.secrets.Secret.tags.through.objects.filter")
+    @patch("api.views.secrets.SecretTag.objects.filter")
+    def test_tag_filter_state_lists_tags_and_links(self, mock_tags, mock_links):
+        mock_tags.return_value.order_by.return_value.values_list.return_value = [
+            ("tag-1", "2026-01-01")
+        ]
+        mock_links.return_value.order_by.return_value.values_list.return_value = [
+            ("s-1", "tag-1")
+        ]
+
+        assert _tag_filter_state(self.env, "prod,db") == [
+            "tag-1:2026-01-01",
+            "s-1:tag-1",
+        ]
+        assert mock_tags.call_args.kwargs["name__in"] == ["prod", "db"]
+        assert mock_links.call_args.kwargs == {
+            "secret__environment": self.env,
+            "secrettag_id__in": ["tag-1"],
+        }
+
+    @patch("api.views.secrets.SecretReferenceIndex")
+    @patch("api.views.secrets.DynamicSecret.objects.filter", return_value=[])
+    @patch("api.views.secrets.get_environment_crypto_context")
+    @patch("api.views.secrets.log_secret_events_bulk")
+    @patch("api.views.secrets.PlanBasedRateThrottle.allow_request", return_value=True)
+    @patch("api.views.secrets.IsIPAllowed.has_permission", return_value=True)
+    def test_lease_requests_are_never_conditional(
+        self, _ip, _throttle, _audit, _ctx, _dynamic, _index
+    ):
+        with patch("api.views.secrets.Secret.objects.filter") as mock_filter:
+            mock_filter.return_value.select_related.return_value.prefetch_related.return_value = []
+            response = self.view(
+                self._request("?dynamic=true&lease=true", HTTP_IF_NONE_MATCH="*")
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not response.has_header("ETag")
+        self.mock_versions.assert_not_called()
+
+
+# ════════════════════════════════════════════════════════════════════
+# PublicSecretsView.get — opt-in streaming (JSON array / NDJSON)
+# ════════════════════════════════════════════════════════════════════
+
+
+@patch("api.views.secrets.SecretReferenceIndex")
+@patch("api.views.secrets.get_environment_crypto_context")
+@patch("api.views.secrets.log_secret_events_bulk")
+@patch("api.views.secrets.PlanBasedRateThrottle.allow_request", return_value=True)
+@patch("api.views.secrets.IsIPAllowed.has_permission", return_value=True)
+class TestPublicSecretsStreaming:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, etag_inputs):
+        self.view = PublicSecretsView.as_view()
+        self.env = _make_env(app=_make_app(sse_enabled=True))
+        self.auth = _make_auth(self.env, _make_user())
+        self.secrets = [Mock(id=f"s-{i}") for i in range(450)]
+
+    def _get(self, query="", **headers):
+        factory = APIRequestFactory()
+        request = factory.get(f"/public/v1/secrets/{query}", **headers)
+        force_authenticate(request, user=self.auth["org_member"].user, token=self.auth)
+
+        with patch("api.views.secrets.Secret.objects.filter") as mock_filter, patch(
+            "api.views.secrets.SecretSerializer"
+        ) as mock_serializer:
+            qs = mock_filter.return_value.select_related.return_value.prefetch_related.return_value
+            qs.iterator.return_value = iter(self.secrets)
+            mock_serializer.side_effect = lambda secret, context: Mock(
+                data={"id": secret.id, "secret_key": "v"}
+            )
+            response = self.view(request)
+            body = b"".join(response.streaming_content)
+        return response, body
+
+    def test_ndjson_stream_emits_one_camelized_line_per_secret(
+        self, _ip, _throttle, mock_audit, _ctx, _index
+    ):
+        response, body = self._get("?stream=ndjson")
+
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = body.decode().splitlines()
+        assert len(lines) == len(self.secrets)
+        assert json.loads(lines[0]) == {"id": "s-0", "secretKey": "v"}
+        # Audit-logged batch by batch rather than as one list.
+        assert [len(c.args[0]) for c in mock_audit.call_args_list] == [200, 200, 50]
+
+    def test_accept_header_and_json_array_modes(
+        self, _ip, _throttle, _audit, _ctx, _index
+    ):
+        response, body = self._get(HTTP_ACCEPT="application/x-ndjson")
+        assert response["Content-Type"] == "application/x-ndjson"
+
+        response, body = self._get("?stream=true")
+        assert response["Content-Type"] == "application/json"
+        assert [item["id"] for item in json.loads(body)] == [
+            s.id for s in self.secrets
+        ]
+
+    def test_ndjson_stream_ends_with_error_line_on_failure(
+        self, _ip, _throttle, _audit, _ctx, mock_index
+    ):
+        mock_index.return_value.prefetch.side_effect = [None, RuntimeError("boom")]
+
+        response, body = self._get("?stream=ndjson")
+
+        lines = body.decode().splitlines()
+        assert len(lines) == 201
+        assert "error" in json.loads(lines[-1])
+
+
+# ════════════════════════════════════════════════════════════════════
+# PublicSecretsView.post / put — bulk write pipeline query budget
+# ════════════════════════════════════════════════════════════════════
+
+
+def _build_post_request(env, body, org_member=None):
+    factory = APIRequestFactory()
+    user = _make_user()
+    request = factory.post(
+        "/public/v1/secrets/", data=json.dumps(body), content_type="application/json"
+    )
+    auth = _make_auth(env, user)
+    if org_member is not None:
+        auth["org_member"] = org_member
+    force_authenticate(request, user=user, token=auth)
+    return request
+
+
+@pytest.fixture
+def secrets_db(request):
+    """The rest of this module mocks the ORM; these tests count the SQL
+    statements actually issued, so they need a database and are skipped
+    where none is reachable."""
+    from django.db.utils import OperationalError
+
+    try:
+        request.getfixturevalue("db")
+    except OperationalError as ex:
+        pytest.skip(f"Database unavailable: {ex}")
+
+
+@patch("api.views.secrets.SecretSerializer")
+@patch("api.views.secrets.get_environment_crypto_context")
+@patch("api.views.secrets.update_secret_references")
+@patch("api.views.secrets.log_secret_events_bulk")
+@patch("api.views.secrets.compute_key_digest", side_effect=lambda key, env_id: key)
+@patch("api.views.secrets.encrypt_asymmetric", side_effect=lambda value, pub: value)
+@patch("api.views.secrets.get_environment_keys", return_value=(b"pub", b"priv"))
+@patch("api.views.secrets.PlanBasedRateThrottle.allow_request", return_value=True)
+@patch("api.views.secrets.IsIPAllowed.has_permission", return_value=True)
+class TestPublicSecretsBulkWriteQueries:
+    """Benchmark-style guard for .env imports and bulk edits: the SQL
+    statements issued depend on the number of distinct folders and tags
+    (and on bulk batches of _BULK_WRITE_BATCH_SIZE rows), never on the
+    number of secrets."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, secrets_db):
+        from api.models import (
+            App,
+            CustomUser,
+            Environment,
+            Organisation,
+            OrganisationMember,
+        )
+
+        self.view = PublicSecretsView.as_view()
+        org = Organisation.objects.create(name="bulk-org", identity_key="org-key")
+        user = CustomUser.objects.create(username="bulk", email="bulk@example.com")
+        self.org_member = OrganisationMember.objects.create(
+            user=user, organisation=org
+        )
+        app = App.objects.create(organisation=org, name="bulk-app", sse_enabled=True)
+        self.env = Environment.objects.create(app=app, name="Development")
+
+    def _payload(self, count, prefix="KEY"):
+        return [
+            {
+                "key": f"{prefix}_{i}",
+                "value": f"value-{i}",
+                "path": ["/", "/db", "/db/replica"][i % 3],
+                "tags": ["imported", "prod"],
+                "override": {"value": "local", "isActive": True},
+            }
+            for i in range(count)
+        ]
+
+    def _post(self, secrets):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        request = _build_post_request(
+            self.env, {"secrets": secrets}, org_member=self.org_member
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.view(request)
+        assert response.status_code == status.HTTP_200_OK
+        return len(queries)
+
+    def _put(self, secrets):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        request = _build_put_request(
+            self.env, {"secrets": secrets}, org_member=self.org_member
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.view(request)
+        assert response.status_code == status.HTTP_200_OK, response.content
+        return len(queries)
+
+    def test_post_queries_do_not_scale_with_secret_count(self, *mocks):
+        from api.models import PersonalSecret, Secret
+
+        # The first import also creates the folders and tags.
+        self._post(self._payload(3, "WARM"))
+        small = self._post(self._payload(5, "SMALL"))
+        large = self._post(self._payload(50, "LARGE"))
+
+        assert small == large
+        assert Secret.objects.filter(environment=self.env).count() == 58
+        assert Secret.tags.through.objects.count() == 116
+        assert PersonalSecret.objects.count() == 58
+
+    def test_put_queries_do_not_scale_with_secret_count(self, *mocks):
+        from api.models import Secret
+
+        self._post(self._payload(50))
+        ids = list(
+            Secret.objects.filter(environment=self.env)
+            .order_by("key")
+            .values_list("id", flat=True)
+        )
+
+        def edits(secret_ids):
+            return [
+                {
+                    "id": secret_id,
+                    "value": "updated",
+                    "path": "/db",
+                    "tags": ["prod"],
+                    "override": {"value": "mine", "isActive": False},
+                }
+                for secret_id in secret_ids
+            ]
+
+        assert self._put(edits(ids[:5])) == self._put(edits(ids[5:]))
+        assert set(
+            Secret.objects.filter(environment=self.env).values_list(
+                "version", flat=True
+            )
+        ) == {2}
@@ -0,0 +1,102 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache import cache
+
+from ee.access.utils import network
+from ee.access.utils.network import (
+    CompiledNetworkPolicy,
+    get_compiled_policy,
+    invalidate_network_policies,
+    is_ip_allowed,
+    is_ip_allowed_for_account,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    cache.clear()
+    network._local_policies.clear()
+    yield
+    cache.clear()
+    network._local_policies.clear()
+
+
+class TestCompiledNetworkPolicy:
+    @pytest.mark.parametrize(
+        "ip, expected",
+        [
+            ("10.0.0.1", True),
+            ("10.0.255.255", True),
+            ("10.1.0.0", True),
+            ("10.1.0.1", False),
+            ("192.168.1.1", True),
+            ("192.168.1.2", False),
+            ("9.255.255.255", False),
+            ("2001:db8::42", True),
+            ("2001:db9::1", False),
+            ("not-an-ip", False),
+        ],
+    )
+    def test_allows(self, ip, expected):
+        policy = CompiledNetworkPolicy.compile(
+            [
+                ["10.0.0.0/16", "192.168.1.1", "bogus"],
+                ["10.1.0.0", "2001:db8::/32"],
+            ]
+        )
+        assert policy.allows(ip) is expected
+
+    def test_overlapping_ranges_merge(self):
+        policy = CompiledNetworkPolicy.compile(
+            [["10.0.0.0/8", "10.1.0.0/16", "11.0.0.0/8"]]
+        )
+        starts, ends = policy._ranges[4]
+        assert len(starts) == 1
+        assert policy.allows("11.255.255.255")
+
+    def test_policy_with_only_invalid_entries_still_counts(self):
+        policy = CompiledNetworkPolicy.compile([["bogus"]])
+        assert policy
+        assert not policy.allows("10.0.0.1")
+
+    def test_is_ip_allowed_matches_policies(self):
+        policies = [SimpleNamespace(get_ip_list=lambda: ["10.0.0.0/24"])]
+        assert is_ip_allowed("10.0.0.7", policies)
+        assert not is_ip_allowed("10.0.1.7", policies)
+
+
+class TestCompiledPolicyCache:
+    def test_compiled_once_until_invalidated(self):
+        with patch.object(
+            network, "_load_ip_lists", return_value=[["10.0.0.0/24"]]
+        ) as load:
+            get_compiled_policy("org-1", "member", "m-1")
+            get_compiled_policy("org-1", "member", "m-1")
+            assert load.call_count == 1
+
+            # A second process starts with an empty local cache but hits Redis.
+            network._local_policies.clear()
+            get_compiled_policy("org-1", "member", "m-1")
+            assert load.call_count == 1
+
+            invalidate_network_policies("org-1")
+            get_compiled_policy("org-1", "member", "m-1")
+            assert load.call_count == 2
+
+    def test_no_policies_allows_everything(self):
+        org = SimpleNamespace(id="org-1", plan="EN")
+        with patch.object(network, "_load_ip_lists", return_value=[]):
+            assert is_ip_allowed_for_account("10.0.0.1", org, "member", "m-1")
+
+    def test_global_policies_only_apply_on_enterprise(self):
+        def load(org_id, kind, account_id):
+            return [["10.0.0.0/24"]] if kind == "global" else []
+
+        with patch.object(network, "_load_ip_lists", side_effect=load):
+            enterprise = SimpleNamespace(id="org-1", plan="EN")
+            pro = SimpleNamespace(id="org-2", plan="PR")
+            assert not is_ip_allowed_for_account("10.0.1.1", enterprise, "member", "m")
+            assert is_ip_allowed_for_account("10.0.0.1", enterprise, "member", "m")
+            assert is_ip_allowed_for_account("10.0.1.1", pro, "member", "m")
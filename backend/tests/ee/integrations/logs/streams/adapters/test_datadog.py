@@ -8,7 +8,9 @@ from unittest.mock import MagicMock, patch
 import pytest
 import requests as requests_lib
 
+from ee.integrations.logs.streams.adapters.base import json_array_body
 from ee.integrations.logs.streams.adapters.datadog import DatadogAdapter
+from ee.integrations.logs.streams.chunker import encode_event
 from ee.integrations.logs.streams.exceptions import (
     AdapterAuthError,
     AdapterPermanentError,
@@ -56,6 +58,12 @@ def _adapter():
     return DatadogAdapter()
 
 
+def _encoded(adapter, options=None):
+    """ENVELOPE as the chunker hands it to ship()."""
+    options = adapter.validate_options(options)
+    return [encode_event(adapter.prepare_event(ENVELOPE, options, CONTEXT))]
+
+
 def test_intake_url_site_allowlist_and_normalisation():
     adapter = _adapter()
 
@@ -74,7 +82,9 @@ def test_ship_sends_gzipped_payload_with_reserved_fields_and_remaps():
     adapter = _adapter()
 
     with _patch_http("post", return_value=_response(202)) as mock_post:
-        result = adapter.ship([ENVELOPE], CREDS, {"tags": "env:prod"}, CONTEXT)
+        result = adapter.ship(
+            _encoded(adapter, {"tags": "env:prod"}), CREDS, {"tags": "env:prod"}, CONTEXT
+        )
 
     assert result.status_code == 202
     args, kwargs = mock_post.call_args
@@ -106,13 +116,25 @@ def test_ship_without_gzip():
     adapter = _adapter()
 
     with _patch_http("post", return_value=_response(202)) as mock_post:
-        adapter.ship([ENVELOPE], CREDS, {"gzip": False}, CONTEXT)
+        adapter.ship(_encoded(adapter, {"gzip": False}), CREDS, {"gzip": False}, CONTEXT)
 
     _, kwargs = mock_post.call_args
     assert "Content-Encoding" not in kwargs["headers"]
     json.loads(kwargs["data"])  # plain JSON body
 
 
+@pytest.mark.parametrize("compress", [True, False])
+def test_json_array_body_joins_encoded_events(compress):
+    events = [b'{"a": 1}', b'{"b": [2]}', b"{}"]
+
+    body = json_array_body(events, compress=compress)
+
+    if compress:
+        body = gzip.decompress(body)
+    assert body == b"[" + b",".join(events) + b"]"
+    assert json.loads(body) == [{"a": 1}, {"b": [2]}, {}]
+
+
 @pytest.mark.parametrize(
     "status,exc",
     [
@@ -129,7 +151,7 @@ def test_ship_maps_http_status_to_typed_errors(status, exc):
 
     with _patch_http("post", return_value=_response(status)):
         with pytest.raises(exc):
-            adapter.ship([ENVELOPE], CREDS, {}, CONTEXT)
+            adapter.ship(_encoded(adapter), CREDS, {}, CONTEXT)
 
 
 @pytest.mark.parametrize("status", [200, 301, 302, 303, 307])
@@ -142,7 +164,7 @@ def test_ship_accepts_only_202(status):
 
     with _patch_http("post", return_value=_response(status)):
         with pytest.raises(AdapterTransientError):
-            adapter.ship([ENVELOPE], CREDS, {}, CONTEXT)
+            adapter.ship(_encoded(adapter), CREDS, {}, CONTEXT)
 
 
 def test_ship_does_not_follow_redirects():
@@ -152,7 +174,7 @@ def test_ship_does_not_follow_redirects():
     adapter = _adapter()
 
     with _patch_http("post", return_value=_response(202)) as mock_post:
-        adapter.ship([ENVELOPE], CREDS, {}, CONTEXT)
+        adapter.ship(_encoded(adapter), CREDS, {}, CONTEXT)
 
     assert mock_post.call_args.kwargs["allow_redirects"] is False
 
@@ -165,7 +187,7 @@ def test_ship_rate_limited_carries_retry_after():
         return_value=_response(429, headers={"Retry-After": "30"}),
     ):
         with pytest.raises(AdapterRateLimitedError) as excinfo:
-            adapter.ship([ENVELOPE], CREDS, {}, CONTEXT)
+            adapter.ship(_encoded(adapter), CREDS, {}, CONTEXT)
 
     assert excinfo.value.retry_after == 30.0
 
@@ -175,7 +197,7 @@ def test_ship_connection_error_is_transient():
 
     with _patch_http("post", side_effect=requests_lib.ConnectionError("boom")):
         with pytest.raises(AdapterTransientError):
-            adapter.ship([ENVELOPE], CREDS, {}, CONTEXT)
+            adapter.ship(_encoded(adapter), CREDS, {}, CONTEXT)
 
 
 def test_test_validates_key_without_ingesting_data():
@@ -209,7 +231,7 @@ def test_auth_error_message_says_credentials_not_key():
 
     with _patch_http("post", return_value=_response(401)):
         with pytest.raises(AdapterAuthError) as excinfo:
-            adapter.ship([ENVELOPE], CREDS, {}, CONTEXT)
+            adapter.ship(_encoded(adapter), CREDS, {}, CONTEXT)
 
     assert "credentials" in excinfo.value.user_message
     assert "key" not in excinfo.value.user_message.lower()
@@ -281,7 +303,7 @@ def test_ship_survives_http_date_retry_after():
 
     with _patch_http("post", return_value=response):
         with pytest.raises(AdapterRateLimitedError) as exc_info:
-            adapter.ship([ENVELOPE], CREDS, {}, CONTEXT)
+            adapter.ship(_encoded(adapter), CREDS, {}, CONTEXT)
 
     assert exc_info.value.retry_after == 0.0
 
@@ -291,7 +313,7 @@ def test_ship_rate_limited_without_retry_after_header():
 
     with _patch_http("post", return_value=_response(429)):
         with pytest.raises(AdapterRateLimitedError) as exc_info:
-            adapter.ship([ENVELOPE], CREDS, {}, CONTEXT)
+            adapter.ship(_encoded(adapter), CREDS, {}, CONTEXT)
 
     assert exc_info.value.retry_after is None
 
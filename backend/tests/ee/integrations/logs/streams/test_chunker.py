@@ -1,5 +1,6 @@
 """Chunking of serialized envelopes into destination-sized batches."""
 
+import json
 from datetime import datetime, timedelta, timezone
 from unittest.mock import patch
 
@@ -53,11 +54,26 @@ def test_oversized_event_gets_json_metadata_truncated():
     with patch.object(chunker, "EVENT_MAX_BYTES", 200):
         chunks = chunk_envelopes(entries)
 
-    envelope = chunks[0].events[0]
+    envelope = json.loads(chunks[0].events[0])
     assert envelope["phase"]["old_values"] == {"truncated": True}
     assert envelope["phase"]["new_values"] == {"truncated": True}
 
 
+def test_events_are_prepared_and_encoded_once():
+    """The chunk carries the destination's bytes, and byte_size is the exact
+    size of the JSON array body built from them."""
+    with patch.object(chunker, "encode_event", wraps=chunker.encode_event) as encode:
+        chunks = chunk_envelopes(
+            _entries(3), lambda envelope: {**envelope, "ddsource": "phase"}
+        )
+
+    assert encode.call_count == 3
+    events = chunks[0].events
+    assert all(isinstance(event, bytes) for event in events)
+    assert json.loads(events[0])["ddsource"] == "phase"
+    assert chunks[0].byte_size == len(b"[" + b",".join(events) + b"]")
+
+
 def test_empty_input_returns_no_chunks():
     assert chunk_envelopes([]) == []
 
@@ -95,7 +111,7 @@ def test_pathological_envelope_is_clamped_below_event_limit():
 
     chunks = chunk_envelopes([entry])
 
-    event = chunks[0].events[0]
+    event = json.loads(chunks[0].events[0])
     assert chunks[0].byte_size <= chunker.EVENT_MAX_BYTES
     assert event["phase"]["truncated"] is True
     # The identifying core survives.
@@ -69,7 +69,7 @@ def _stream(**overrides):
 
 def _chunk():
     return Chunk(
-        events=[{"event": {"id": "e1"}}, {"event": {"id": "e2"}}],
+        events=[b'{"event": {"id": "e1"}}', b'{"event": {"id": "e2"}}'],
         byte_size=256,
         cursor_from=_TS,
         cursor_to=_TS + timedelta(seconds=5),
@@ -6,8 +6,10 @@ shipped, landing it permanently behind the cursor. `fetch` therefore only
 returns events older than SHIP_WATERMARK_SECONDS.
 """
 
+from datetime import timedelta
 from unittest.mock import MagicMock, patch
 
+from django.test import override_settings
 from django.utils import timezone
 
 from ee.integrations.logs.streams import sources as sources_mod
@@ -33,6 +35,27 @@ def test_fetch_applies_commit_watermark():
     )
 
 
+@override_settings(SECRET_READ_EVENTS_ASYNC=True)
+def test_secret_watermark_holds_back_to_oldest_buffered_read():
+    """Buffered READ events are inserted later with their read time, so the
+    watermark must stay behind the oldest one still in Redis."""
+    oldest = timezone.now() - timedelta(minutes=5)
+    source = sources_mod.SecretEventLogSource()
+
+    with patch(
+        "api.utils.audit_logging.oldest_buffered_read_timestamp",
+        return_value=oldest,
+    ):
+        watermark = source._watermark()
+    assert watermark == oldest - timedelta(seconds=sources_mod.SHIP_WATERMARK_SECONDS)
+
+    with patch(
+        "api.utils.audit_logging.oldest_buffered_read_timestamp", return_value=None
+    ):
+        age = (timezone.now() - source._watermark()).total_seconds()
+    assert age < sources_mod.SHIP_WATERMARK_SECONDS + 5
+
+
 def test_cursor_filter_carries_redundant_sargable_lower_bound():
     """The timestamp__gte bound is semantically redundant with the OR arms
     but load-bearing: Postgres derives no lower scan bound across an OR, so
@@ -0,0 +1,157 @@
+"""Tests for the KMS activity rollups behind the app activity chart."""
+
+from unittest.mock import MagicMock, call, patch
+
+from logs import rollups
+from logs.models import KMSLogRollup
+from logs.rollups import DAY_MS, HOUR_MS
+
+NOW = 1_760_000_000_000
+TODAY = NOW // DAY_MS * DAY_MS
+
+
+@patch("logs.rollups._increment")
+def test_increments_are_combined_per_hour(mock_increment):
+    hour = NOW // HOUR_MS * HOUR_MS
+
+    rollups.increment_rollups(
+        {
+            ("app-1", hour + 1): 2,
+            ("app-1", hour + 5_000): 3,
+            ("app-1", hour + HOUR_MS): 1,
+            ("app-2", hour): 4,
+        }
+    )
+
+    assert sorted(mock_increment.call_args_list) == sorted(
+        [
+            call("app-1", KMSLogRollup.HOUR, hour, 5),
+            call("app-1", KMSLogRollup.HOUR, hour + HOUR_MS, 1),
+            call("app-2", KMSLogRollup.HOUR, hour, 4),
+        ]
+    )
+
+
+@patch("logs.rollups.django_rq.get_connection")
+def test_buffered_increments_are_combined_per_hour(mock_connection):
+    hour = NOW // HOUR_MS * HOUR_MS
+
+    rollups.buffer_rollup_increments(
+        {("phApp:v1:abc", hour + 1): 1, ("phApp:v1:abc", hour + 2): 1}
+    )
+
+    pipeline = mock_connection.return_value.pipeline.return_value
+    pipeline.hincrby.assert_called_once_with(
+        rollups.ROLLUP_INCREMENTS_KEY, f"{hour}:phApp:v1:abc", 2
+    )
+    pipeline.execute.assert_called_once()
+
+
+@patch("logs.rollups.buffer_rollup_increments")
+@patch("logs.rollups._increment")
+@patch("logs.rollups.django_rq.get_connection")
+def test_fold_applies_buffered_increments(mock_connection, mock_increment, mock_buffer):
+    hour = NOW // HOUR_MS * HOUR_MS
+    mock_connection.return_value.eval.return_value = [
+        f"{hour}:phApp:v1:abc".encode(),
+        b"5",
+        f"{hour}:phApp:v1:def".encode(),
+        b"2",
+    ]
+    mock_increment.side_effect = [None, RuntimeError("db down")]
+
+    assert rollups.fold_rollup_increments() == 1
+
+    assert mock_increment.call_args_list[0] == call(
+        "phApp:v1:abc", KMSLogRollup.HOUR, hour, 5
+    )
+    # The failed counter is buffered again for the next fold.
+    mock_buffer.assert_called_once_with({("phApp:v1:def", hour): 2})
+
+
+@patch("logs.rollups.transaction.atomic")
+@patch("logs.rollups.KMSLogRollup.objects")
+def test_increment_creates_missing_bucket(mock_objects, _atomic):
+    mock_objects.filter.return_value.update.return_value = 0
+
+    rollups._increment("app-1", KMSLogRollup.HOUR, TODAY, 3)
+
+    mock_objects.create.assert_called_once_with(
+        app_id="app-1", granularity=KMSLogRollup.HOUR, bucket_start=TODAY, count=3
+    )
+
+
+@patch("logs.rollups._increment")
+@patch("logs.rollups.KMSLogRollup.objects")
+def test_compaction_folds_old_hours_into_days(mock_objects, mock_increment):
+    three_days_ago = TODAY - 3 * DAY_MS
+    mock_objects.select_for_update.return_value.filter.return_value.values_list.return_value = [
+        (1, "app-1", three_days_ago, 2),
+        (2, "app-1", three_days_ago + 5 * HOUR_MS, 3),
+        (3, "app-1", three_days_ago + DAY_MS, 1),
+        (4, "app-2", three_days_ago, 7),
+    ]
+
+    with patch("logs.rollups.transaction.atomic"):
+        removed = rollups.compact_rollups(now=NOW)
+
+    assert removed == 4
+    # Only whole days outside the retention window are compacted
+    cutoff = mock_objects.select_for_update.return_value.filter.call_args.kwargs[
+        "bucket_start__lt"
+    ]
+    assert cutoff == TODAY - 2 * DAY_MS
+    mock_objects.filter.assert_called_once_with(id__in=[1, 2, 3, 4])
+    assert sorted(mock_increment.call_args_list) == sorted(
+        [
+            call("app-1", KMSLogRollup.DAY, three_days_ago, 5),
+            call("app-1", KMSLogRollup.DAY, three_days_ago + DAY_MS, 1),
+            call("app-2", KMSLogRollup.DAY, three_days_ago, 7),
+        ]
+    )
+
+
+@patch("logs.rollups.KMSLogRollup.objects")
+def test_activity_counts_sum_both_granularities(mock_objects):
+    start = TODAY - 10 * DAY_MS
+    mock_objects.filter.return_value.values_list.return_value = [
+        (start, 4),  # daily
+        (start + 6 * DAY_MS, 1),  # daily, second bucket
+        (TODAY + HOUR_MS, 2),  # hourly, last (partial) bucket
+        (TODAY + 2 * HOUR_MS, 3),
+    ]
+
+    counts = rollups.get_activity_counts("app-1", start, NOW, 5 * DAY_MS)
+
+    mock_objects.filter.assert_called_once_with(
+        app_id="app-1", bucket_start__gte=start, bucket_start__lt=NOW
+    )
+    assert counts == [4, 1, 5]
+
+
+@patch("logs.rollups.KMSLogRollup.objects")
+def test_rebuild_replaces_rollups_before_cutoff(mock_objects):
+    before = NOW // HOUR_MS * HOUR_MS
+    hours = {
+        TODAY - 10 * DAY_MS: 3,
+        TODAY - 10 * DAY_MS + HOUR_MS: 2,
+        before - HOUR_MS: 6,
+    }
+
+    with patch("logs.rollups.hourly_log_counts", return_value=hours), patch(
+        "logs.rollups.transaction.atomic"
+    ):
+        counted = rollups.rebuild_rollups("app-1", before, now=NOW)
+
+    assert counted == 11
+    mock_objects.filter.assert_called_once_with(
+        app_id="app-1", bucket_start__lt=before
+    )
+    mock_objects.filter.return_value.delete.assert_called_once()
+    created = mock_objects.bulk_create.call_args.args[0]
+    assert sorted((r.granularity, r.bucket_start, r.count) for r in created) == sorted(
+        [
+            (KMSLogRollup.DAY, TODAY - 10 * DAY_MS, 5),
+            (KMSLogRollup.HOUR, before - HOUR_MS, 6),
+        ]
+    )
@@ -1,5 +1,6 @@
 from unittest.mock import patch, MagicMock
 from api.tasks.syncing import (
+    backfill_secret_references,
     trigger_syncs_for_referencing_envs,
     detect_and_trigger_referencing_syncs,
 )
@@ -8,16 +9,16 @@ from api.tasks.syncing import (
 # --- Environment.save() dispatch wiring ---
 
 
-@patch("api.models.detect_and_trigger_referencing_syncs")
+@patch("api.models.schedule_referencing_sync_scan")
 @patch("api.models.transaction")
-@patch("api.models.trigger_sync_tasks")
+@patch("api.models.schedule_sync_tasks")
 @patch("api.models.EnvironmentSync")
 @patch("django.db.models.Model.save")
-def test_environment_save_triggers_own_syncs_sync_and_referencing_on_commit(
-    mock_super_save, mock_env_sync, mock_trigger, mock_txn, mock_detect
+def test_environment_save_schedules_own_syncs_and_referencing_scan_on_commit(
+    mock_super_save, mock_env_sync, mock_schedule, mock_txn, mock_scan
 ):
-    """Environment.save() triggers its own active syncs synchronously, and
-    dispatches the referencing-env detection via transaction.on_commit (so the
+    """Environment.save() schedules its own active syncs (debounced), and
+    schedules the referencing-env scan via transaction.on_commit (so the
     worker can't race an open transaction) — not inline."""
     from api.models import Environment
 
@@ -29,14 +30,96 @@ def test_environment_save_triggers_own_syncs_sync_and_referencing_on_commit(
     env.save()
 
     mock_super_save.assert_called_once()
-    # Own syncs: triggered synchronously, inline.
-    mock_trigger.assert_called_once_with(own_sync)
-    # Referencing detection: deferred to on_commit, NOT dispatched inline.
-    mock_detect.delay.assert_not_called()
+    mock_schedule.assert_called_once_with(own_sync)
+    # Referencing scan: deferred to on_commit, NOT scheduled inline.
+    mock_scan.assert_not_called()
     mock_txn.on_commit.assert_called_once()
-    # The registered callback enqueues the job with the env id (passed by value).
+    # The registered callback schedules the scan with the env id (by value).
     mock_txn.on_commit.call_args.args[0]()
-    mock_detect.delay.assert_called_once_with("env-xyz")
+    mock_scan.assert_called_once_with("env-xyz")
+
+
+# --- Debounced triggers ---
+
+
+@patch("api.tasks.syncing.trigger_sync_tasks")
+@patch("api.tasks.syncing._debounce_scheduler")
+@patch("api.tasks.syncing.django_rq.get_connection")
+@patch("api.tasks.syncing.apps.get_model")
+def test_schedule_sync_tasks_coalesces_within_window(
+    mock_get_model, mock_connection, mock_scheduler, mock_trigger, settings
+):
+    from api.tasks.syncing import run_debounced_sync, schedule_sync_tasks
+
+    settings.SYNC_DEBOUNCE_SECONDS = 5
+    markers = set()
+    connection = mock_connection.return_value
+    connection.set.side_effect = lambda key, *a, **kw: (
+        key not in markers and not markers.add(key)
+    )
+    connection.delete.side_effect = lambda key: markers.discard(key)
+
+    env_sync = MagicMock(id="sync-1")
+    for _ in range(50):
+        schedule_sync_tasks(env_sync)
+
+    mock_trigger.assert_not_called()
+    mock_scheduler.return_value.enqueue_in.assert_called_once()
+    delay, func, sync_id = mock_scheduler.return_value.enqueue_in.call_args.args
+    assert delay.total_seconds() == 5
+    assert func is run_debounced_sync and sync_id == "sync-1"
+
+    # The scheduled run clears the marker and triggers with fresh state.
+    fresh_sync = MagicMock()
+    mock_get_model.return_value.objects.filter.return_value.first.return_value = (
+        fresh_sync
+    )
+    run_debounced_sync("sync-1")
+    mock_trigger.assert_called_once_with(fresh_sync)
+
+    schedule_sync_tasks(env_sync)
+    assert mock_scheduler.return_value.enqueue_in.call_count == 2
+
+
+@patch("api.tasks.syncing.trigger_sync_tasks")
+@patch("api.tasks.syncing._debounce_scheduler")
+def test_schedule_sync_tasks_without_debounce_triggers_immediately(
+    mock_scheduler, mock_trigger, settings
+):
+    from api.tasks.syncing import schedule_sync_tasks
+
+    settings.SYNC_DEBOUNCE_SECONDS = 0
+    env_sync = MagicMock()
+    schedule_sync_tasks(env_sync)
+
+    mock_trigger.assert_called_once_with(env_sync)
+    mock_scheduler.assert_not_called()
+
+
+@patch("api.tasks.syncing.trigger_syncs_for_referencing_envs")
+@patch("api.tasks.syncing.django_rq.get_connection")
+@patch("api.tasks.syncing.apps.get_model")
+def test_debounced_reference_scan_shares_triggered_syncs(
+    mock_get_model, mock_connection, mock_trigger
+):
+    from api.tasks.syncing import run_debounced_reference_scan
+
+    mock_connection.return_value.pipeline.return_value.execute.return_value = [
+        {b"env-a", b"env-b"},
+        1,
+    ]
+    envs = [MagicMock(), MagicMock()]
+    mock_get_model.return_value.objects.filter.return_value.select_related.return_value = (
+        envs
+    )
+
+    run_debounced_reference_scan("org-1")
+
+    env_ids = mock_get_model.return_value.objects.filter.call_args.kwargs["id__in"]
+    assert sorted(env_ids) == ["env-a", "env-b"]
+    assert mock_trigger.call_count == 2
+    shared = [call.kwargs["triggered"] for call in mock_trigger.call_args_list]
+    assert shared[0] is shared[1]
 
 
 # --- detect_and_trigger_referencing_syncs (async wrapper) tests ---
@@ -75,10 +158,10 @@ def test_detect_and_trigger_missing_env_is_noop(mock_get_model, mock_trigger):
 
 # --- trigger_syncs_for_referencing_envs tests ---
 #
-# Reference resolution is stubbed via get_referenced_environment_ids so these
-# tests exercise the graph-traversal / triggering logic directly. The stub maps
-# an environment id to the set of environment ids it directly references; the
-# function under test follows those edges (transitively) to the changed env.
+# The stored reference graph is stubbed via get_environment_reference_graph so
+# these tests exercise the graph-traversal / triggering logic directly. The stub
+# maps an environment id to the set of environment ids it directly references;
+# the function under test follows those edges (transitively) to the changed env.
 
 
 def _make_changed_env():
@@ -98,9 +181,10 @@ def _sync(env_id):
     return s
 
 
-def _mock_models(candidate_syncs):
+def _mock_models(candidate_syncs, environments=()):
     """get_model side_effect: EnvironmentSync yields the given candidate syncs;
-    App/Environment lookups are empty (name resolution is stubbed elsewhere)."""
+    App lookups are empty and Environment lookups yield `environments` (name
+    resolution is stubbed elsewhere)."""
     MockEnvironmentSync = MagicMock()
     MockEnvironmentSync.objects.filter.return_value.exclude.return_value.select_related.return_value = (
         candidate_syncs
@@ -108,7 +192,7 @@ def _mock_models(candidate_syncs):
     MockApp = MagicMock()
     MockApp.objects.filter.return_value = []
     MockEnvironment = MagicMock()
-    MockEnvironment.objects.filter.return_value = []
+    MockEnvironment.objects.filter.return_value = list(environments)
 
     def get_model_side_effect(app_label, model_name):
         if model_name == "EnvironmentSync":
@@ -124,8 +208,8 @@ def _mock_models(candidate_syncs):
 
 def _patch_refs(graph):
     return patch(
-        "api.utils.secrets.get_referenced_environment_ids",
-        side_effect=lambda env_id, name_ctx: graph.get(env_id, set()),
+        "api.utils.secrets.get_environment_reference_graph",
+        return_value=graph,
     )
 
 
@@ -220,3 +304,218 @@ def test_trigger_syncs_only_matching_envs_triggered(mock_get_model, mock_trigger
         trigger_syncs_for_referencing_envs(changed_env)
 
     mock_trigger_sync.assert_called_once_with(sync_with_ref)
+
+
+@patch("api.tasks.syncing.trigger_sync_tasks")
+@patch("api.tasks.syncing.apps.get_model")
+def test_trigger_syncs_scans_unindexed_envs_by_decrypting(
+    mock_get_model, mock_trigger_sync
+):
+    """Environments that predate the reference index aren't in the stored
+    graph yet; their references are read from the secrets instead."""
+    changed_env = _make_changed_env()
+    sync_b = _sync("env-B")
+    env_b = MagicMock(id="env-B", app_id="app-b", secret_references_indexed=False)
+    env_b.name = "prod"
+    mock_get_model.side_effect = _mock_models([sync_b], environments=[env_b])
+
+    with _patch_refs({}), patch(
+        "api.utils.secrets.get_referenced_environment_ids",
+        return_value={"changed-env-id"},
+    ) as mock_scan:
+        trigger_syncs_for_referencing_envs(changed_env)
+
+    mock_trigger_sync.assert_called_once_with(sync_b)
+    assert mock_scan.call_args.args[:2] == ("env-B", "app-b")
+
+
+@patch("api.tasks.syncing.backfill_secret_references.delay")
+@patch("api.utils.secrets.index_environment_references")
+@patch("api.tasks.syncing.apps.get_model")
+def test_backfill_secret_references_batches_until_done(
+    mock_get_model, mock_index, mock_delay
+):
+    env_ids = mock_get_model.return_value.objects.filter.return_value.order_by.return_value.values_list
+    env_ids.return_value.__getitem__.return_value = ["env-1", "env-2"]
+
+    backfill_secret_references(batch_size=2)
+
+    assert [c.args[0] for c in mock_index.call_args_list] == ["env-1", "env-2"]
+    # A full batch: more environments may be left, so the job continues.
+    mock_delay.assert_called_once_with(2)
+
+    mock_delay.reset_mock()
+    env_ids.return_value.__getitem__.return_value = ["env-3"]
+    backfill_secret_references(batch_size=2)
+    mock_delay.assert_not_called()
+
+
+# --- handle_sync_event no-op skip ---
+
+
+def _env_sync(digest=None):
+    env_sync = MagicMock()
+    env_sync.service = "github_actions"
+    env_sync.path = "/"
+    env_sync.options = {"repo_name": "repo", "owner": "phase"}
+    env_sync.authentication.id = "cred-1"
+    env_sync.authentication.credentials = {"access_token": "encrypted"}
+    env_sync.last_synced_digest = digest
+    return env_sync
+
+
+SECRETS = [("KEY", "value", ""), ("OTHER", "x", "comment")]
+
+
+def test_sync_digest_is_order_independent_and_covers_target():
+    from api.utils.syncing.secrets import compute_sync_digest
+
+    env_sync = _env_sync()
+    digest = compute_sync_digest(env_sync, SECRETS)
+    assert digest == compute_sync_digest(env_sync, list(reversed(SECRETS)))
+    assert digest != compute_sync_digest(env_sync, [("KEY", "changed", "")])
+
+    env_sync.options = {"repo_name": "other", "owner": "phase"}
+    assert digest != compute_sync_digest(env_sync, SECRETS)
+
+
+@patch("api.tasks.syncing.get_environment_secrets", return_value=SECRETS)
+@patch("api.tasks.syncing.apps.get_model")
+def _run_sync(env_sync, sync_function, mock_get_model, mock_secrets):
+    from api.tasks.syncing import handle_sync_event
+
+    handle_sync_event(env_sync, sync_function)
+    return mock_get_model.return_value
+
+
+def test_handle_sync_event_pushes_and_records_digest():
+    from api.utils.syncing.secrets import compute_sync_digest
+
+    env_sync = _env_sync()
+    sync_function = MagicMock(return_value=(True, {}))
+
+    _run_sync(env_sync, sync_function)
+
+    sync_function.assert_called_once_with(SECRETS)
+    assert env_sync.last_synced_digest == compute_sync_digest(env_sync, SECRETS)
+
+
+def test_handle_sync_event_skips_unchanged_secrets():
+    from api.utils.syncing.secrets import compute_sync_digest
+
+    env_sync = _env_sync()
+    env_sync.last_synced_digest = compute_sync_digest(env_sync, SECRETS)
+    sync_function = MagicMock(return_value=(True, {}))
+
+    _run_sync(env_sync, sync_function)
+
+    sync_function.assert_not_called()
+
+
+def test_handle_sync_event_failure_clears_digest():
+    env_sync = _env_sync(digest="stale")
+    sync_function = MagicMock(return_value=(False, {"message": "boom"}))
+
+    _run_sync(env_sync, sync_function)
+
+    sync_function.assert_called_once()
+    assert env_sync.last_synced_digest is None
+
+
+@patch("api.tasks.syncing.trigger_sync_tasks")
+@patch("api.tasks.syncing.apps.get_model")
+def test_trigger_syncs_skips_already_triggered(mock_get_model, mock_trigger_sync):
+    """Syncs already triggered earlier in a batched scan are not re-triggered."""
+    changed_env = _make_changed_env()
+    candidate_sync = _sync("candidate-env-id")
+    candidate_sync.id = "sync-1"
+    mock_get_model.side_effect = _mock_models([candidate_sync])
+
+    with _patch_refs({"candidate-env-id": {"changed-env-id"}}):
+        trigger_syncs_for_referencing_envs(changed_env, triggered={"sync-1"})
+
+    mock_trigger_sync.assert_not_called()
+
+
+# --- Per-credential admission ---
+
+
+@patch("api.tasks.syncing._defer_sync_job", return_value=True)
+@patch("api.tasks.syncing.acquire_credential_slot", return_value=30)
+@patch("api.tasks.syncing.get_current_job")
+def test_handle_sync_event_defers_when_credential_busy(
+    mock_job, mock_acquire, mock_defer
+):
+    env_sync = _env_sync()
+    sync_function = MagicMock(return_value=(True, {}))
+
+    EnvironmentSync = _run_sync(env_sync, sync_function)
+
+    sync_function.assert_not_called()
+    mock_defer.assert_called_once_with(env_sync, 30)
+    assert env_sync.status == EnvironmentSync.QUEUED
+
+
+@patch("api.tasks.syncing.release_credential_slot")
+@patch("api.tasks.syncing.pause_credential")
+@patch("api.tasks.syncing._defer_sync_job", return_value=True)
+@patch("api.tasks.syncing.acquire_credential_slot", return_value=0)
+@patch("api.tasks.syncing.get_current_job")
+def test_handle_sync_event_requeues_rate_limited_run(
+    mock_job, mock_acquire, mock_defer, mock_pause, mock_release
+):
+    env_sync = _env_sync()
+    sync_function = MagicMock(
+        return_value=(False, {"response_code": 429, "message": "Too many requests"})
+    )
+
+    EnvironmentSync = _run_sync(env_sync, sync_function)
+
+    sync_function.assert_called_once()
+    mock_pause.assert_called_once()
+    mock_defer.assert_called_once()
+    assert env_sync.status == EnvironmentSync.QUEUED
+    mock_release.assert_called_once_with(
+        env_sync.authentication_id, mock_job.return_value.id
+    )
+
+
+# --- Dry runs ---
+
+
+@patch("api.tasks.syncing.get_current_job")
+def test_handle_sync_event_dry_run_records_plan_only(mock_job):
+    from api.utils.syncing.planner import dry_run_scope, plannable
+
+    env_sync = _env_sync()
+    sync_function = plannable(
+        MagicMock(return_value=(True, {"dry_run": True, "plan": {"create": ["KEY"]}}))
+    )
+
+    with dry_run_scope():
+        EnvironmentSync = _run_sync(env_sync, sync_function)
+
+    sync_function.assert_called_once_with(SECRETS)
+    event = EnvironmentSync.objects.filter.return_value.first.return_value
+    EnvironmentSync.objects.filter.assert_called_with(id=mock_job.return_value.id)
+    assert event.meta["plan"] == {"create": ["KEY"]}
+    assert event.status == EnvironmentSync.COMPLETED
+    # The sync itself is untouched
+    env_sync.save.assert_not_called()
+    assert env_sync.last_synced_digest is None
+
+
+@patch("api.tasks.syncing.get_current_job")
+def test_handle_sync_event_dry_run_skips_unplanned_integrations(mock_job):
+    from api.utils.syncing.planner import dry_run_scope
+
+    env_sync = _env_sync()
+    sync_function = MagicMock(spec=lambda secrets: None)
+
+    with dry_run_scope():
+        EnvironmentSync = _run_sync(env_sync, sync_function)
+
+    sync_function.assert_not_called()
+    event = EnvironmentSync.objects.filter.return_value.first.return_value
+    assert event.status == EnvironmentSync.FAILED
+    assert "not supported" in event.meta["message"]
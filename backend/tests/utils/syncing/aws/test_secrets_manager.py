@@ -200,7 +200,7 @@ class TestSecretsManager(unittest.TestCase):
             SecretId=mock_arn, SecretString=expected_secret_string, KmsKeyId=mock_kms_id
         )
         mock_sm_client.create_secret.assert_not_called()
-        mock_sm_client.get_secret_value.assert_not_called()
+        mock_sm_client.get_secret_value.assert_called_once_with(SecretId=mock_arn)
 
     @patch("api.utils.syncing.aws.secrets_manager.get_client")
     def test_sync_aws_secrets_with_access_keys_create_by_name_success(
@@ -432,5 +432,121 @@ class TestSecretsManager(unittest.TestCase):
         mock_json_dumps.assert_called_once_with({"key1": "value1"})
 
 
+    @patch("api.utils.syncing.aws.secrets_manager.get_client")
+    def test_sync_aws_secrets_skips_unchanged_secret(self, mock_get_client):
+        mock_sm_client = MagicMock()
+        mock_get_client.return_value = mock_sm_client
+        mock_sm_client.get_secret_value.return_value = {
+            "SecretString": json.dumps({"key2": "value2", "key1": "value1"})
+        }
+        mock_sm_client.describe_secret.return_value = {
+            "KmsKeyId": "arn:aws:kms:us-east-1:123456789012:alias/myKmsCMKKey"
+        }
+
+        success, result = sync_aws_secrets(
+            secrets=[("key1", "value1", None), ("key2", "value2", None)],
+            region="us-east-1",
+            secret_name="MySecret",
+            arn=None,
+            kms_id="alias/myKmsCMKKey",
+            AWS_ACCESS_KEY_ID="key_id",
+            AWS_SECRET_ACCESS_KEY="secret_key",
+        )
+
+        self.assertTrue(success)
+        self.assertEqual(result, {"message": "Secret 'MySecret' is already up to date."})
+        mock_sm_client.update_secret.assert_not_called()
+        mock_sm_client.create_secret.assert_not_called()
+
+    @patch("api.utils.syncing.aws.secrets_manager.get_client")
+    def test_sync_aws_secrets_updates_on_kms_key_change(self, mock_get_client):
+        mock_sm_client = MagicMock()
+        mock_get_client.return_value = mock_sm_client
+        mock_sm_client.get_secret_value.return_value = {
+            "SecretString": json.dumps({"key1": "value1"})
+        }
+        mock_sm_client.describe_secret.return_value = {"KmsKeyId": "alias/old"}
+
+        success, _ = sync_aws_secrets(
+            secrets=[("key1", "value1", None)],
+            region="us-east-1",
+            secret_name=None,
+            arn="arn_of_secret",
+            kms_id="alias/new",
+            AWS_ACCESS_KEY_ID="key_id",
+            AWS_SECRET_ACCESS_KEY="secret_key",
+        )
+
+        self.assertTrue(success)
+        mock_sm_client.update_secret.assert_called_once_with(
+            SecretId="arn_of_secret",
+            SecretString=json.dumps({"key1": "value1"}),
+            KmsKeyId="alias/new",
+        )
+    def _access_denied_client(self):
+        class ResourceNotFoundException(ClientError):
+            pass
+
+        mock_sm_client = MagicMock()
+        mock_sm_client.exceptions.ResourceNotFoundException = (
+            ResourceNotFoundException
+        )
+        denied = {"Error": {"Code": "AccessDeniedException", "Message": "Denied"}}
+        mock_sm_client.get_secret_value.side_effect = ClientError(
+            denied, "GetSecretValue"
+        )
+        mock_sm_client.describe_secret.side_effect = ClientError(
+            denied, "DescribeSecret"
+        )
+        return mock_sm_client
+
+    @patch("api.utils.syncing.aws.secrets_manager.get_client")
+    def test_sync_aws_secrets_writes_when_read_is_denied(self, mock_get_client):
+        mock_sm_client = self._access_denied_client()
+        mock_get_client.return_value = mock_sm_client
+
+        success, result = sync_aws_secrets(
+            secrets=[("key1", "value1", None)],
+            region="us-east-1",
+            secret_name=None,
+            arn="arn_of_secret",
+            kms_id="alias/new",
+            AWS_ACCESS_KEY_ID="key_id",
+            AWS_SECRET_ACCESS_KEY="secret_key",
+        )
+
+        self.assertTrue(success, result)
+        mock_sm_client.update_secret.assert_called_once_with(
+            SecretId="arn_of_secret",
+            SecretString=json.dumps({"key1": "value1"}),
+            KmsKeyId="alias/new",
+        )
+
+    @patch("api.utils.syncing.aws.secrets_manager.get_client")
+    def test_sync_aws_secrets_creates_unreadable_missing_name(self, mock_get_client):
+        mock_sm_client = self._access_denied_client()
+        mock_sm_client.update_secret.side_effect = (
+            mock_sm_client.exceptions.ResourceNotFoundException(
+                {"Error": {"Code": "ResourceNotFoundException"}}, "UpdateSecret"
+            )
+        )
+        mock_get_client.return_value = mock_sm_client
+
+        success, result = sync_aws_secrets(
+            secrets=[("key1", "value1", None)],
+            region="us-east-1",
+            secret_name="MySecret",
+            arn=None,
+            AWS_ACCESS_KEY_ID="key_id",
+            AWS_SECRET_ACCESS_KEY="secret_key",
+        )
+
+        self.assertTrue(success, result)
+        self.assertEqual(result, {"message": "New secret 'MySecret' created."})
+        mock_sm_client.create_secret.assert_called_once_with(
+            Name="MySecret", SecretString=json.dumps({"key1": "value1"})
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -7,6 +7,7 @@ from azure.core.exceptions import HttpResponseError
 from api.utils.syncing.azure.key_vault import (
     _transform_secret_name,
     _retry_on_rate_limit,
+    _VaultThrottle,
     list_kv_secrets,
     list_all_kv_secrets,
     list_deleted_kv_secrets,
@@ -407,7 +408,12 @@ class TestSyncAzureKvIndividual(unittest.TestCase):
 
         error = HttpResponseError(message="bad request")
         error.status_code = 400
-        mock_set.side_effect = [None, error]  # first succeeds, second fails
+        # Writes run concurrently, so fail by name rather than call order
+        def set_secret(client, name, value):
+            if name == "BAD-KEY":
+                raise error
+
+        mock_set.side_effect = set_secret
 
         secrets = [("GOOD_KEY", "val1", ""), ("BAD_KEY", "val2", "")]
         success, result = sync_azure_kv_individual(
@@ -454,6 +460,94 @@ class TestSyncAzureKvIndividual(unittest.TestCase):
         self.assertNotIn("something broke internally", result["message"])
 
 
+    @patch("api.utils.syncing.azure.key_vault.get_kv_client")
+    @patch("api.utils.syncing.azure.key_vault.get_azure_client_credential")
+    @patch("api.utils.syncing.azure.key_vault.list_all_kv_secrets")
+    @patch("api.utils.syncing.azure.key_vault.list_deleted_kv_secrets")
+    @patch("api.utils.syncing.azure.key_vault.set_kv_secret")
+    @patch("api.utils.syncing.azure.key_vault.time.sleep")
+    def test_skips_unchanged_secrets_with_value_digests(
+        self,
+        mock_sleep,
+        mock_set,
+        mock_list_deleted,
+        mock_list_all,
+        mock_get_cred,
+        mock_get_client,
+    ):
+        mock_list_all.return_value = {}
+        mock_list_deleted.return_value = []
+        vault_uri = "https://myvault.vault.azure.net"
+        secrets = [("DB_HOST", "localhost", ""), ("DB_PORT", "5432", "")]
+        value_digests = {}
+
+        sync_azure_kv_individual(
+            secrets, "tid", "cid", "csecret", vault_uri, value_digests=value_digests
+        )
+        self.assertEqual(set(value_digests), {"DB-HOST", "DB-PORT"})
+        self.assertEqual(mock_set.call_count, 2)
+
+        # Second run: both present and enabled, only DB_PORT changed
+        mock_set.reset_mock()
+        mock_list_all.return_value = {"DB-HOST": True, "DB-PORT": True, "OLD": False}
+        success, _ = sync_azure_kv_individual(
+            [("DB_HOST", "localhost", ""), ("DB_PORT", "6543", "")],
+            "tid",
+            "cid",
+            "csecret",
+            vault_uri,
+            value_digests=value_digests,
+        )
+
+        self.assertTrue(success)
+        mock_set.assert_called_once()
+        self.assertEqual(mock_set.call_args[0][1:], ("DB-PORT", "6543"))
+
+    @patch("api.utils.syncing.azure.key_vault.get_kv_client")
+    @patch("api.utils.syncing.azure.key_vault.get_azure_client_credential")
+    @patch("api.utils.syncing.azure.key_vault.list_all_kv_secrets")
+    @patch("api.utils.syncing.azure.key_vault.list_deleted_kv_secrets")
+    @patch("api.utils.syncing.azure.key_vault.set_kv_secret")
+    def test_rewrites_disabled_secret_despite_matching_digest(
+        self, mock_set, mock_list_deleted, mock_list_all, mock_get_cred, mock_get_client
+    ):
+        mock_list_deleted.return_value = []
+        value_digests = {}
+        vault_uri = "https://myvault.vault.azure.net"
+
+        mock_list_all.return_value = {}
+        sync_azure_kv_individual(
+            [("KEY", "val", "")], "tid", "cid", "csecret", vault_uri, value_digests
+        )
+        mock_list_all.return_value = {"KEY": False}
+        sync_azure_kv_individual(
+            [("KEY", "val", "")], "tid", "cid", "csecret", vault_uri, value_digests
+        )
+
+        self.assertEqual(mock_set.call_count, 2)
+
+
+class TestVaultThrottle(unittest.TestCase):
+
+    @patch("api.utils.syncing.azure.key_vault.note_rate_limit")
+    @patch("api.utils.syncing.azure.key_vault.time.sleep")
+    def test_429_pauses_shared_throttle(self, mock_sleep, mock_note_rate_limit):
+        error = HttpResponseError(message="throttled")
+        error.status_code = 429
+        error.response = MagicMock()
+        error.response.headers = {"Retry-After": "7"}
+        func = MagicMock(side_effect=[error, "ok"])
+        throttle = _VaultThrottle()
+
+        result = _retry_on_rate_limit(func, throttle=throttle)
+
+        self.assertEqual(result, "ok")
+        mock_note_rate_limit.assert_called_once_with(7)
+        # The retry waits on the throttle, which other workers also honour
+        mock_sleep.assert_called_once()
+        self.assertAlmostEqual(mock_sleep.call_args[0][0], 7, delta=1)
+
+
 class TestSyncAzureKvBlob(unittest.TestCase):
 
     @patch("api.utils.syncing.azure.key_vault.get_kv_client")
@@ -1,9 +1,11 @@
 from api.utils.syncing.github.actions import (
+    GitHubClient,
     check_rate_limit,
     encrypt_secret,
     get_all_secrets,
     sync_github_secrets,
     list_repos,
+    rate_limit_delay,
 )
 import base64
 import pytest
@@ -86,8 +88,8 @@ def test_check_rate_limit_denies_when_exceeded(mock_get):
 @patch(
     "api.utils.syncing.github.actions.encrypt_secret", return_value=MOCK_ENCRYPTED_VALUE
 )
-@patch("api.utils.syncing.github.actions.requests.put")
-@patch("api.utils.syncing.github.actions.requests.get")
+@patch("api.utils.syncing.github.actions.requests.Session.put")
+@patch("api.utils.syncing.github.actions.requests.Session.get")
 def test_sync_github_secrets_success(mock_get, mock_put, mock_encrypt, mock_existing):
     # Mock public key request
     mock_get.side_effect = get_mocked_response
@@ -107,8 +109,8 @@ def test_sync_github_secrets_success(mock_get, mock_put, mock_encrypt, mock_exis
     "api.utils.syncing.github.actions.encrypt_secret",
     return_value="A" * (64 * 1024 + 1),
 )  # too large
-@patch("api.utils.syncing.github.actions.requests.put")
-@patch("api.utils.syncing.github.actions.requests.get")
+@patch("api.utils.syncing.github.actions.requests.Session.put")
+@patch("api.utils.syncing.github.actions.requests.Session.get")
 def test_sync_skips_oversized_secret(mock_get, mock_put, mock_encrypt, mock_existing):
     mock_get.side_effect = get_mocked_response
     secrets = [("HUGE_SECRET", "value", None)]
@@ -127,9 +129,9 @@ def test_sync_skips_oversized_secret(mock_get, mock_put, mock_encrypt, mock_exis
 @patch(
     "api.utils.syncing.github.actions.encrypt_secret", return_value=MOCK_ENCRYPTED_VALUE
 )
-@patch("api.utils.syncing.github.actions.requests.delete")
-@patch("api.utils.syncing.github.actions.requests.put")
-@patch("api.utils.syncing.github.actions.requests.get")
+@patch("api.utils.syncing.github.actions.requests.Session.delete")
+@patch("api.utils.syncing.github.actions.requests.Session.put")
+@patch("api.utils.syncing.github.actions.requests.Session.get")
 def test_sync_deletes_missing_secrets(
     mock_get, mock_put, mock_delete, mock_encrypt, mock_existing
 ):
@@ -151,8 +153,8 @@ def test_sync_deletes_missing_secrets(
 @patch(
     "api.utils.syncing.github.actions.encrypt_secret", return_value=MOCK_ENCRYPTED_VALUE
 )
-@patch("api.utils.syncing.github.actions.requests.put")
-@patch("api.utils.syncing.github.actions.requests.get")
+@patch("api.utils.syncing.github.actions.requests.Session.put")
+@patch("api.utils.syncing.github.actions.requests.Session.get")
 def test_sync_github_secrets_fails_on_put_error(
     mock_get, mock_put, mock_encrypt, mock_existing
 ):
@@ -272,3 +274,70 @@ def test_list_repos_handles_pagination_for_1000_repos(
     mock_decrypt_asymmetric.assert_called_once()
     mock_get_server_keypair.assert_called_once()
     mock_apps_get_model.return_value.objects.get.assert_called_once_with(id="dummy_cred_id")
+
+
+@patch("api.utils.syncing.github.actions.validate_url_is_safe")
+@patch("api.utils.syncing.github.actions.get_all_secrets")
+@patch(
+    "api.utils.syncing.github.actions.encrypt_secret", return_value=MOCK_ENCRYPTED_VALUE
+)
+@patch("api.utils.syncing.github.actions.requests.Session.put")
+@patch("api.utils.syncing.github.actions.requests.Session.get")
+def test_sync_skips_unchanged_secrets(
+    mock_get, mock_put, mock_encrypt, mock_existing, _mock_validate
+):
+    """Values pushed before (same digest, still present remotely) are not re-uploaded."""
+    mock_get.side_effect = get_mocked_response
+    mock_put.return_value.status_code = 201
+    mock_existing.return_value = []
+    value_digests = {}
+
+    secrets = [("A", "1", None), ("B", "2", None)]
+    success, _ = sync_github_secrets(
+        secrets, MOCK_ACCESS_TOKEN, MOCK_REPO, MOCK_OWNER, value_digests=value_digests
+    )
+    assert success
+    assert mock_put.call_count == 2
+    assert set(value_digests) == {"A", "B"}
+
+    mock_put.reset_mock()
+    mock_existing.return_value = [{"name": "A"}, {"name": "B"}]
+    secrets = [("A", "1", None), ("B", "changed", None)]
+    success, _ = sync_github_secrets(
+        secrets, MOCK_ACCESS_TOKEN, MOCK_REPO, MOCK_OWNER, value_digests=value_digests
+    )
+    assert success
+    mock_put.assert_called_once()
+    assert mock_put.call_args.args[0].endswith("/actions/secrets/B")
+
+
+def _response(status_code, headers=None, text=""):
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.text = text
+    return response
+
+
+def test_rate_limit_delay():
+    assert rate_limit_delay(_response(201)) is None
+    assert rate_limit_delay(_response(403, text="Resource not accessible")) is None
+    assert rate_limit_delay(_response(403, {"Retry-After": "7"})) == 7
+    assert rate_limit_delay(_response(429)) == 60
+    assert (
+        rate_limit_delay(_response(403, text="You have exceeded a secondary rate limit"))
+        == 60
+    )
+
+
+@patch("api.utils.syncing.github.actions.time.sleep")
+@patch("api.utils.syncing.github.actions.requests.Session.put")
+def test_client_honours_retry_after(mock_put, mock_sleep):
+    mock_put.side_effect = [_response(429, {"Retry-After": "2"}), _response(201)]
+
+    with GitHubClient(MOCK_ACCESS_TOKEN) as client:
+        response = client.put("https://api.github.com/x", json={})
+
+    assert response.status_code == 201
+    assert mock_put.call_count == 2
+    assert 0 < mock_sleep.call_args.args[0] <= 2
@@ -43,10 +43,10 @@ def get_mocked_response(url, *args, **kwargs):
 
 @patch("api.utils.syncing.github.dependabot.get_all_dependabot_repo_secrets", return_value=[])
 @patch(
-    "api.utils.syncing.github.dependabot.encrypt_secret", return_value=MOCK_ENCRYPTED_VALUE
+    "api.utils.syncing.github.actions.encrypt_secret", return_value=MOCK_ENCRYPTED_VALUE
 )
-@patch("api.utils.syncing.github.dependabot.requests.put")
-@patch("api.utils.syncing.github.dependabot.requests.get")
+@patch("api.utils.syncing.github.dependabot.requests.Session.put")
+@patch("api.utils.syncing.github.dependabot.requests.Session.get")
 def test_sync_dependabot_secrets_success(mock_get, mock_put, mock_encrypt, mock_existing):
     mock_get.side_effect = get_mocked_response
     mock_put.return_value.status_code = 201
@@ -62,11 +62,11 @@ def test_sync_dependabot_secrets_success(mock_get, mock_put, mock_encrypt, mock_
 
 @patch("api.utils.syncing.github.dependabot.get_all_dependabot_repo_secrets", return_value=[])
 @patch(
-    "api.utils.syncing.github.dependabot.encrypt_secret",
+    "api.utils.syncing.github.actions.encrypt_secret",
     return_value="A" * (64 * 1024 + 1),
 )  # too large
-@patch("api.utils.syncing.github.dependabot.requests.put")
-@patch("api.utils.syncing.github.dependabot.requests.get")
+@patch("api.utils.syncing.github.dependabot.requests.Session.put")
+@patch("api.utils.syncing.github.dependabot.requests.Session.get")
 def test_sync_dependabot_oversized_secret(mock_get, mock_put, mock_encrypt, mock_existing):
     mock_get.side_effect = get_mocked_response
     secrets = [("HUGE_SECRET", "value", None)]
@@ -83,11 +83,11 @@ def test_sync_dependabot_oversized_secret(mock_get, mock_put, mock_encrypt, mock
     return_value=[{"name": "OLD_SECRET"}],
 )
 @patch(
-    "api.utils.syncing.github.dependabot.encrypt_secret", return_value=MOCK_ENCRYPTED_VALUE
+    "api.utils.syncing.github.actions.encrypt_secret", return_value=MOCK_ENCRYPTED_VALUE
 )
-@patch("api.utils.syncing.github.dependabot.requests.delete")
-@patch("api.utils.syncing.github.dependabot.requests.put")
-@patch("api.utils.syncing.github.dependabot.requests.get")
+@patch("api.utils.syncing.github.dependabot.requests.Session.delete")
+@patch("api.utils.syncing.github.dependabot.requests.Session.put")
+@patch("api.utils.syncing.github.dependabot.requests.Session.get")
 def test_sync_dependabot_deletes_missing_secrets(
     mock_get, mock_put, mock_delete, mock_encrypt, mock_existing
 ):
@@ -106,10 +106,10 @@ def test_sync_dependabot_deletes_missing_secrets(
 
 @patch("api.utils.syncing.github.dependabot.get_all_dependabot_repo_secrets", return_value=[])
 @patch(
-    "api.utils.syncing.github.dependabot.encrypt_secret", return_value=MOCK_ENCRYPTED_VALUE
+    "api.utils.syncing.github.actions.encrypt_secret", return_value=MOCK_ENCRYPTED_VALUE
 )
-@patch("api.utils.syncing.github.dependabot.requests.put")
-@patch("api.utils.syncing.github.dependabot.requests.get")
+@patch("api.utils.syncing.github.dependabot.requests.Session.put")
+@patch("api.utils.syncing.github.dependabot.requests.Session.get")
 def test_sync_dependabot_secrets_fails_on_put_error(
     mock_get, mock_put, mock_encrypt, mock_existing
 ):
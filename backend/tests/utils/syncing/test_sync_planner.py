@@ -0,0 +1,187 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from api.utils.syncing.gitlab.main import sync_gitlab_secrets
+from api.utils.syncing.rate_limits import note_rate_limit_response
+from api.utils.syncing.planner import (
+    UNKNOWN,
+    SyncOperationError,
+    apply_plan,
+    dry_run_result,
+    dry_run_scope,
+    plan_sync,
+)
+
+
+class TestPlanSync:
+    def test_readable_remote_values(self):
+        plan = plan_sync(
+            {"A": "1", "B": "2", "C": "3"},
+            {"A": "1", "B": "old", "D": "4"},
+        )
+
+        assert plan.creates == {"C": "3"}
+        assert plan.updates == {"B": "2"}
+        assert plan.deletes == ["D"]
+        assert plan.unchanged == ["A"]
+
+    def test_unknown_values_without_digests_are_updated(self):
+        plan = plan_sync({"A": "1"}, {"A": UNKNOWN})
+
+        assert plan.updates == {"A": "1"}
+
+    def test_unknown_values_use_digests(self):
+        value_digests = {}
+        plan = plan_sync({"A": "1", "B": "2"}, {}, value_digests=value_digests)
+        apply_plan(plan, create=lambda key, value: None)
+
+        plan = plan_sync(
+            {"A": "1", "B": "changed"},
+            {"A": UNKNOWN, "B": UNKNOWN},
+            value_digests=value_digests,
+        )
+
+        assert plan.unchanged == ["A"]
+        assert plan.updates == {"B": "changed"}
+
+    def test_digests_are_scoped_to_the_destination(self):
+        value_digests = {}
+        plan = plan_sync(
+            {"A": "1"}, {}, value_digests=value_digests, digest_scope=("path-1",)
+        )
+        apply_plan(plan, create=lambda key, value: None)
+
+        plan = plan_sync(
+            {"A": "1"},
+            {"A": UNKNOWN},
+            value_digests=value_digests,
+            digest_scope=("path-2",),
+        )
+
+        assert plan.updates == {"A": "1"}
+
+    def test_drops_digests_of_removed_keys(self):
+        value_digests = {"GONE": "digest"}
+        plan_sync({"A": "1"}, {}, value_digests=value_digests)
+
+        assert "GONE" not in value_digests
+
+
+class TestApplyPlan:
+    def test_runs_only_planned_operations(self):
+        plan = plan_sync({"A": "1", "B": "2"}, {"A": "1", "C": "3"})
+        create, delete = MagicMock(), MagicMock()
+
+        apply_plan(plan, create=create, delete=delete, max_workers=4)
+
+        create.assert_called_once_with("B", "2")
+        delete.assert_called_once_with("C")
+
+    def test_attempts_all_then_raises_first_failure(self):
+        value_digests = {}
+        plan = plan_sync(
+            {"A": "1", "B": "2", "C": "3"}, {}, value_digests=value_digests
+        )
+
+        def create(key, value):
+            if key != "A":
+                raise SyncOperationError(f"Failed {key}", 422)
+
+        with pytest.raises(SyncOperationError, match="Failed B"):
+            apply_plan(plan, create=create, max_workers=4)
+
+        # Only the successful write is remembered
+        assert set(value_digests) == {"A"}
+
+
+def test_dry_run_result_records_plan():
+    plan = plan_sync({"A": "1", "B": "2"}, {"A": "0", "C": "3"})
+
+    success, data = dry_run_result(plan)
+
+    assert success and data["dry_run"]
+    assert data["plan"] == {
+        "create": ["B"],
+        "update": ["A"],
+        "delete": ["C"],
+        "unchanged": 0,
+    }
+
+
+class TestGitLabPlannedSync:
+    def _response(self, status_code, payload=None):
+        response = MagicMock(status_code=status_code)
+        response.json.return_value = payload
+        return response
+
+    def _session(self, remote):
+        session = MagicMock()
+        session.get.side_effect = [
+            self._response(200, remote),
+            self._response(200, []),
+        ]
+        session.post.return_value = self._response(201)
+        session.put.return_value = self._response(200)
+        session.delete.return_value = self._response(204)
+        return session
+
+    def _variable(self, key, value):
+        return {
+            "key": key,
+            "value": value,
+            "masked": False,
+            "protected": False,
+            "description": "",
+        }
+
+    @patch("api.utils.syncing.gitlab.main.get_gitlab_credentials")
+    @patch("api.utils.syncing.gitlab.main.requests.Session")
+    def test_writes_only_changed_variables(self, mock_session, mock_credentials):
+        mock_credentials.return_value = ("https://gitlab.com", "token")
+        session = self._session(
+            [
+                self._variable("SAME", "1"),
+                self._variable("CHANGED", "old"),
+                self._variable("REMOVED", "x"),
+            ]
+        )
+        mock_session.return_value = session
+
+        success, results = sync_gitlab_secrets(
+            [("SAME", "1", ""), ("CHANGED", "new", ""), ("ADDED", "2", "")],
+            "credential-id",
+            "group/project",
+        )
+
+        assert success, results
+        session.post.assert_called_once()
+        assert session.post.call_args.kwargs["json"]["key"] == "ADDED"
+        session.put.assert_called_once()
+        assert session.put.call_args.args[0].endswith("/variables/CHANGED")
+        session.delete.assert_called_once()
+        assert session.delete.call_args.args[0].endswith("/variables/REMOVED")
+        # 429s on any request pause the credential for the reset header.
+        session.hooks["response"].append.assert_called_once_with(
+            note_rate_limit_response
+        )
+
+    @patch("api.utils.syncing.gitlab.main.get_gitlab_credentials")
+    @patch("api.utils.syncing.gitlab.main.requests.Session")
+    def test_dry_run_returns_plan_without_writing(
+        self, mock_session, mock_credentials
+    ):
+        mock_credentials.return_value = ("https://gitlab.com", "token")
+        session = self._session([self._variable("REMOVED", "x")])
+        mock_session.return_value = session
+
+        with dry_run_scope():
+            success, results = sync_gitlab_secrets(
+                [("ADDED", "2", "")], "credential-id", "group/project"
+            )
+
+        assert success
+        assert results["plan"]["create"] == ["ADDED"]
+        assert results["plan"]["delete"] == ["REMOVED"]
+        session.post.assert_not_called()
+        session.delete.assert_not_called()
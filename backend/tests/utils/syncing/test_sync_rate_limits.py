@@ -0,0 +1,114 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from api.utils.syncing import rate_limits
+from api.utils.syncing.rate_limits import (
+    acquire_credential_slot,
+    credential_scope,
+    is_rate_limited_result,
+    note_rate_limit,
+    note_rate_limit_response,
+)
+
+
+@pytest.fixture
+def connection():
+    with patch.object(rate_limits, "_connection") as mock_connection, patch.object(
+        rate_limits, "_acquire_script", None
+    ), patch.object(rate_limits, "_pause_script", None):
+        yield mock_connection.return_value
+
+
+def test_acquire_admits(connection):
+    connection.register_script.return_value.return_value = b"0"
+    credential = SimpleNamespace(id="cred-1", provider="github")
+
+    assert acquire_credential_slot(credential, "job-1", 3600) == 0
+
+    kwargs = connection.register_script.return_value.call_args.kwargs
+    assert kwargs["keys"][0] == "sync-credential-slots:cred-1"
+    # GitHub limits: 2 concurrent syncs, 0.5 starts/s, burst of 5.
+    assert kwargs["args"][3:6] == [2, 0.5, 5]
+
+
+def test_acquire_returns_jittered_wait(connection):
+    connection.register_script.return_value.return_value = b"30"
+    credential = SimpleNamespace(id="cred-1", provider="vercel")
+
+    wait = acquire_credential_slot(credential, "job-1", 3600)
+    assert 30 <= wait <= 35
+
+
+def test_acquire_admits_when_redis_unavailable(connection):
+    connection.register_script.side_effect = ConnectionError("down")
+    credential = SimpleNamespace(id="cred-1", provider="github")
+
+    assert acquire_credential_slot(credential, "job-1", 3600) == 0
+
+
+def test_note_rate_limit_pauses_current_credential(connection):
+    script = connection.register_script.return_value
+
+    note_rate_limit(20)
+    script.assert_not_called()
+
+    with patch.object(rate_limits.time, "time", return_value=1000.0):
+        with credential_scope("cred-1"):
+            note_rate_limit(20)
+    connection.register_script.assert_called_once_with(rate_limits.PAUSE_SCRIPT)
+    kwargs = script.call_args.kwargs
+    assert kwargs["keys"] == [
+        "sync-credential-pause:cred-1",
+        "sync-credential-bucket:cred-1",
+    ]
+    assert kwargs["args"][:2] == [1000.0, 1020.0]
+
+
+def _response(status, headers=None):
+    return SimpleNamespace(status_code=status, headers=headers or {})
+
+
+NOW = 1_700_000_000.0
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"Retry-After": "30"}, 30),
+        ({"X-RateLimit-Reset": str(int(NOW) + 45)}, 45),
+        ({"RateLimit-Reset": str(int(NOW) + 86400)}, 3600),
+        ({"Retry-After": "Tue, 14 Nov 2023 22:13:40 GMT"}, 20),
+        ({"Retry-After": "soon"}, None),
+        ({}, None),
+    ],
+)
+def test_note_rate_limit_response_reads_reset_headers(headers, expected):
+    with patch.object(rate_limits, "note_rate_limit") as mock_note, patch.object(
+        rate_limits.time, "time", return_value=NOW
+    ):
+        note_rate_limit_response(_response(429, headers))
+
+    mock_note.assert_called_once_with(expected)
+
+
+def test_note_rate_limit_response_ignores_other_statuses():
+    with patch.object(rate_limits, "note_rate_limit") as mock_note:
+        note_rate_limit_response(_response(200, {"Retry-After": "30"}))
+        note_rate_limit_response(_response(503, {"Retry-After": "30"}))
+
+    mock_note.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "sync_data, expected",
+    [
+        ({"response_code": 429, "message": "Too many requests"}, True),
+        ({"message": "API rate limit exceeded for installation"}, True),
+        ({"response_code": 422, "message": "Invalid"}, False),
+        (None, False),
+    ],
+)
+def test_is_rate_limited_result(sync_data, expected):
+    assert is_rate_limited_result(sync_data) is expected
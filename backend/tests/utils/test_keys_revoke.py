@@ -11,8 +11,9 @@ from unittest.mock import MagicMock, patch
 _M = "api.utils.keys"
 
 
+@patch(f"{_M}.invalidate_org_access_on_commit")
 @patch(f"{_M}.apps.get_model")
-def test_soft_delete_blanks_wrapping_material(mock_get_model):
+def test_soft_delete_blanks_wrapping_material(mock_get_model, mock_invalidate):
     """When the last grant is removed, the EnvironmentKey row is
     soft-deleted AND its wrapped_seed/wrapped_salt/identity_key are
     cleared so the row carries no useful crypto material."""
@@ -35,6 +36,7 @@ def test_soft_delete_blanks_wrapping_material(mock_get_model):
     ]
 
     update_target = MagicMock()
+    update_target.update.return_value = 1
     MockEnvKey.objects.filter.return_value = update_target
 
     team = MagicMock()
@@ -48,10 +50,15 @@ def test_soft_delete_blanks_wrapping_material(mock_get_model):
     assert update_kwargs["wrapped_salt"] == ""
     assert update_kwargs["identity_key"] == ""
     assert update_kwargs["deleted_at"] is not None
+    # .update() sends no signal, so access maps are invalidated explicitly.
+    mock_invalidate.assert_called_once_with(team.organisation_id)
 
 
+@patch(f"{_M}.invalidate_org_access_on_commit")
 @patch(f"{_M}.apps.get_model")
-def test_soft_delete_skipped_when_remaining_grants_exist(mock_get_model):
+def test_soft_delete_skipped_when_remaining_grants_exist(
+    mock_get_model, mock_invalidate
+):
     """If another grant still references the EnvironmentKey, no
     soft-delete or wipe runs — only the orphan path mutates the row."""
     from api.utils.keys import revoke_team_environment_keys
@@ -74,3 +81,32 @@ def test_soft_delete_skipped_when_remaining_grants_exist(mock_get_model):
     revoke_team_environment_keys(MagicMock())
 
     MockEnvKey.objects.filter.assert_not_called()
+    mock_invalidate.assert_not_called()
+
+
+@patch(f"{_M}.invalidate_org_access_on_commit")
+@patch(f"{_M}.apps.get_model")
+def test_individual_revoke_invalidates_access(mock_get_model, mock_invalidate):
+    from api.utils.keys import revoke_individual_environment_keys
+
+    MockEnvKey = MagicMock(name="EnvironmentKey")
+    MockGrant = MagicMock(name="EnvironmentKeyGrant")
+    MockMember = type("OrganisationMember", (), {})
+    mock_get_model.side_effect = lambda _a, name: {
+        "EnvironmentKey": MockEnvKey,
+        "EnvironmentKeyGrant": MockGrant,
+        "OrganisationMember": MockMember,
+    }[name]
+
+    grants_qs = MagicMock()
+    grants_qs.values_list.return_value = ["ek-1"]
+    MockGrant.objects.filter.side_effect = [
+        grants_qs,
+        MagicMock(exists=MagicMock(return_value=False)),
+    ]
+    MockEnvKey.objects.filter.return_value.update.return_value = 1
+
+    account = MagicMock()
+    revoke_individual_environment_keys(account)
+
+    mock_invalidate.assert_called_once_with(account.organisation_id)
@@ -1,14 +1,30 @@
 import os
+import uuid
 import pytest
 from pathlib import Path
 import logging
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock, ANY
+from django.test import override_settings
 from backend.utils.secrets import get_secret
+from api.utils import secrets as secrets_utils
+from api.utils.crypto import get_server_keypair, _server_keypair_from_seed
 from api.utils.secrets import (
     normalize_path_string,
     decompose_path_and_key,
     decrypt_secret_value,
+    check_for_duplicates_blind,
+    get_environment_reference_graph,
     get_referenced_environment_ids,
+    get_referenced_environment_versions,
+    get_secret_reference_names,
+    update_secret_references,
+    SecretFolderResolver,
+    get_environment_keys,
+    get_environment_crypto_context,
+    compute_key_digest,
+    invalidate_environment_crypto_context,
+    SecretReferenceException,
     CROSS_APP_ENV_PATTERN,
     CROSS_ENV_PATTERN,
     LOCAL_REF_PATTERN,
@@ -290,6 +306,7 @@ def test_decrypt_secret_value_with_cross_env_ref(
         require_resolved_references=False,
         account=None,
         context_cache=None,
+        reference_index=None,
         _visited=ANY,
     )
 
@@ -337,6 +354,7 @@ def test_decrypt_secret_value_with_cross_env_ref_in_folder(
         require_resolved_references=False,
         account=None,
         context_cache=None,
+        reference_index=None,
         _visited=ANY,
     )
 
@@ -539,171 +557,630 @@ def test_decrypt_secret_value_breaks_reference_cycle(
     assert result == "${A}"
 
 
-# --- get_referenced_environment_ids tests ---
+# --- secret reference index tests ---
 
 
-def _refs_models(source_app_id="app-1", server_key_exists=True):
-    """get_model side_effect for get_referenced_environment_ids with a single
-    secret in the source env. Reference text is supplied via decrypt_asymmetric
-    mocking in each test."""
-    mock_env = MagicMock()
-    mock_env.app_id = source_app_id
+def test_get_secret_reference_names_cross_env():
+    """${ENV.KEY} yields a same-app (empty app name) edge, lowercased."""
+    assert get_secret_reference_names("url=${Staging.DB_HOST}") == {("", "staging")}
+
+
+def test_get_secret_reference_names_cross_app():
+    """${APP::ENV.KEY} yields the app and env names."""
+    assert get_secret_reference_names("${Backend::production.API_KEY}") == {
+        ("backend", "production")
+    }
+
+
+def test_get_secret_reference_names_no_match():
+    """Plain values and local ${KEY} references produce no edges."""
+    assert get_secret_reference_names("just a plain value ${LOCAL}") == set()
 
-    MockEnvironment = MagicMock()
-    MockEnvironment.objects.select_related.return_value.get.return_value = mock_env
-    MockEnvironment.DoesNotExist = Exception
+
+def test_get_secret_reference_names_ignores_railway_syntax():
+    """${{...}} Railway-style syntax is not treated as a reference."""
+    assert get_secret_reference_names("url=${{staging.DB_HOST}}") == set()
+
+
+def _reference_models(server_key_exists=True, edges=()):
+    MockSecretReference = MagicMock()
+    MockSecretReference.side_effect = lambda **kwargs: kwargs
+    MockSecretReference.objects.filter.return_value.values_list.return_value.distinct.return_value = list(
+        edges
+    )
 
     MockServerEnvKey = MagicMock()
     MockServerEnvKey.DoesNotExist = type("DoesNotExist", (Exception,), {})
     if server_key_exists:
-        mock_server_env_key = MagicMock()
-        mock_server_env_key.wrapped_seed = "wrapped_seed"
-        MockServerEnvKey.objects.get.return_value = mock_server_env_key
+        MockServerEnvKey.objects.get.return_value = MagicMock()
     else:
         MockServerEnvKey.objects.get.side_effect = MockServerEnvKey.DoesNotExist()
 
-    mock_secret = MagicMock()
-    mock_secret.value = "encrypted"
-    MockSecret = MagicMock()
-    MockSecret.objects.filter.return_value = [mock_secret]
+    models = {
+        "SecretReference": MockSecretReference,
+        "ServerEnvironmentKey": MockServerEnvKey,
+    }
+    return models, lambda app_label, model_name: models.get(model_name, MagicMock())
 
-    def get_model_side_effect(app_label, model_name):
-        if model_name == "Secret":
-            return MockSecret
-        if model_name == "ServerEnvironmentKey":
-            return MockServerEnvKey
-        if model_name == "Environment":
-            return MockEnvironment
-        return MagicMock()
 
-    return get_model_side_effect
+def _stored_secret(id, value="encrypted", deleted=False):
+    secret = MagicMock()
+    secret.id = id
+    secret.environment_id = "env-1"
+    secret.value = value
+    secret.deleted_at = "now" if deleted else None
+    return secret
 
 
+@patch("api.utils.secrets.transaction")
 @patch("api.utils.secrets.apps.get_model")
 @patch("api.utils.secrets.decrypt_asymmetric")
 @patch("api.utils.secrets.env_keypair")
 @patch("api.utils.secrets.get_server_keypair")
-def test_get_referenced_environment_ids_cross_env(
-    mock_server_kp, mock_env_kp, mock_decrypt, mock_get_model
+def test_update_secret_references_replaces_edges(
+    mock_server_kp, mock_env_kp, mock_decrypt, mock_get_model, mock_transaction
 ):
-    """${ENV.KEY} resolves to the target env id within the same app."""
+    """Edges for the written secrets are replaced; deleted secrets lose theirs."""
+    invalidate_environment_crypto_context()
     mock_server_kp.return_value = (b"pk", b"sk")
     mock_env_kp.return_value = (b"env_pub", b"env_priv")
-    mock_get_model.side_effect = _refs_models(source_app_id="app-1")
-    mock_decrypt.side_effect = ["env_seed", "url=${staging.DB_HOST}"]
+    models, mock_get_model.side_effect = _reference_models()
+    mock_decrypt.side_effect = [
+        "seed",
+        "salt",
+        "${staging.A}-${backend::prod.B}",
+    ]
 
-    name_ctx = {
-        "apps_by_name": {},
-        "ambiguous_apps": set(),
-        "envs_by_app_name": {("app-1", "staging"): "env-staging-id"},
-    }
+    live = _stored_secret("s-1")
+    deleted = _stored_secret("s-2", deleted=True)
+    update_secret_references([live, deleted])
 
-    assert get_referenced_environment_ids("env-1", name_ctx) == {"env-staging-id"}
+    SecretReference = models["SecretReference"]
+    SecretReference.objects.filter.assert_called_once_with(
+        secret_id__in=["s-1", "s-2"]
+    )
+    SecretReference.objects.filter.return_value.delete.assert_called_once()
+    rows = SecretReference.objects.bulk_create.call_args.args[0]
+    assert {(r["secret_id"], r["app_name"], r["environment_name"]) for r in rows} == {
+        ("s-1", "", "staging"),
+        ("s-1", "backend", "prod"),
+    }
+    invalidate_environment_crypto_context()
 
 
+@patch("api.utils.secrets.transaction")
 @patch("api.utils.secrets.apps.get_model")
 @patch("api.utils.secrets.decrypt_asymmetric")
-@patch("api.utils.secrets.env_keypair")
 @patch("api.utils.secrets.get_server_keypair")
-def test_get_referenced_environment_ids_cross_app(
-    mock_server_kp, mock_env_kp, mock_decrypt, mock_get_model
+def test_update_secret_references_no_sse(
+    mock_server_kp, mock_decrypt, mock_get_model, mock_transaction
 ):
-    """${APP::ENV.KEY} resolves the app name then the env id."""
-    mock_server_kp.return_value = (b"pk", b"sk")
-    mock_env_kp.return_value = (b"env_pub", b"env_priv")
-    mock_get_model.side_effect = _refs_models(source_app_id="app-2")
-    mock_decrypt.side_effect = ["env_seed", "${backend::production.API_KEY}"]
+    """No ServerEnvironmentKey (SSE disabled) => stale edges cleared, nothing decrypted."""
+    invalidate_environment_crypto_context()
+    models, mock_get_model.side_effect = _reference_models(server_key_exists=False)
+
+    update_secret_references([_stored_secret("s-1")])
+
+    SecretReference = models["SecretReference"]
+    SecretReference.objects.filter.return_value.delete.assert_called_once()
+    SecretReference.objects.bulk_create.assert_not_called()
+    mock_decrypt.assert_not_called()
+
+
+@patch("api.utils.secrets.apps.get_model")
+def test_environment_reference_graph_resolves_names(mock_get_model):
+    """Stored names resolve to env ids; ambiguous apps and unknown names drop."""
+    edges = [
+        ("env-1", "app-1", "", "staging"),
+        ("env-2", "app-2", "backend", "production"),
+        ("env-2", "app-2", "shared", "production"),
+        ("env-3", "app-2", "", "missing"),
+    ]
+    _, mock_get_model.side_effect = _reference_models(edges=edges)
 
     name_ctx = {
-        "apps_by_name": {"backend": "app-1"},
-        "ambiguous_apps": set(),
-        "envs_by_app_name": {("app-1", "production"): "env-prod-id"},
+        "apps_by_name": {"backend": "app-1", "shared": "app-3"},
+        "ambiguous_apps": {"shared"},
+        "envs_by_app_name": {
+            ("app-1", "staging"): "env-staging-id",
+            ("app-1", "production"): "env-prod-id",
+            ("app-3", "production"): "env-shared-prod-id",
+        },
     }
 
-    assert get_referenced_environment_ids("env-2", name_ctx) == {"env-prod-id"}
+    assert get_environment_reference_graph(MagicMock(), name_ctx) == {
+        "env-1": {"env-staging-id"},
+        "env-2": {"env-prod-id"},
+    }
 
 
-@patch("api.utils.secrets.apps.get_model")
 @patch("api.utils.secrets.decrypt_asymmetric")
-@patch("api.utils.secrets.env_keypair")
-@patch("api.utils.secrets.get_server_keypair")
-def test_get_referenced_environment_ids_no_match(
-    mock_server_kp, mock_env_kp, mock_decrypt, mock_get_model
+@patch("api.utils.secrets._get_environment_key_material")
+@patch("api.utils.secrets.apps.get_model")
+def test_referenced_environment_ids_decrypts_unindexed_env(
+    mock_get_model, mock_key_material, mock_decrypt
 ):
-    """A plain value references nothing."""
-    mock_server_kp.return_value = (b"pk", b"sk")
-    mock_env_kp.return_value = (b"env_pub", b"env_priv")
-    mock_get_model.side_effect = _refs_models(source_app_id="app-1")
-    mock_decrypt.side_effect = ["env_seed", "just a plain value"]
-
+    """The fallback for environments not in the index yet reads references
+    from the decrypted values, resolving them like the stored graph."""
+    mock_key_material.return_value = ("seed", "salt", "pub", "priv")
+    mock_get_model.return_value.objects.filter.return_value.values_list.return_value = [
+        "c1",
+        "c2",
+    ]
+    mock_decrypt.side_effect = ["${staging.A}", "${shared::prod.B} ${missing.C}"]
     name_ctx = {
-        "apps_by_name": {},
-        "ambiguous_apps": set(),
+        "apps_by_name": {"shared": "app-3"},
+        "ambiguous_apps": {"shared"},
         "envs_by_app_name": {("app-1", "staging"): "env-staging-id"},
     }
 
-    assert get_referenced_environment_ids("env-1", name_ctx) == set()
+    assert get_referenced_environment_ids("env-1", "app-1", name_ctx) == {
+        "env-staging-id"
+    }
 
 
 @patch("api.utils.secrets.apps.get_model")
-@patch("api.utils.secrets.decrypt_asymmetric")
-@patch("api.utils.secrets.env_keypair")
-@patch("api.utils.secrets.get_server_keypair")
-def test_get_referenced_environment_ids_ambiguous_app_skipped(
-    mock_server_kp, mock_env_kp, mock_decrypt, mock_get_model
-):
-    """A cross-app reference to an ambiguously-named app is not resolved."""
-    mock_server_kp.return_value = (b"pk", b"sk")
-    mock_env_kp.return_value = (b"env_pub", b"env_priv")
-    mock_get_model.side_effect = _refs_models(source_app_id="app-2")
-    mock_decrypt.side_effect = ["env_seed", "${backend::production.API_KEY}"]
+def test_referenced_environment_versions_none_until_indexed(mock_get_model):
+    """References that aren't indexed can't be followed: the environment, or
+    any environment the walk reaches, being unindexed gives no versions."""
+    env = MagicMock(id="env-1", secret_references_indexed=False)
+    assert get_referenced_environment_versions(env) is None
+    mock_get_model.assert_not_called()
 
-    name_ctx = {
-        "apps_by_name": {"backend": "app-1"},
-        "ambiguous_apps": {"backend"},
-        "envs_by_app_name": {("app-1", "production"): "env-prod-id"},
+    models, _ = _reference_models(edges=[("app-1", "", "staging")])
+    models["App"] = MagicMock()
+    models["App"].objects.filter.return_value.values_list.return_value = []
+    models["Environment"] = MagicMock()
+    env_rows = models["Environment"].objects.filter.return_value.values_list
+    mock_get_model.side_effect = lambda app_label, model_name: models[model_name]
+
+    env.secret_references_indexed = True
+    env_rows.return_value = [("env-2", "app-1", "staging", "t2", True)]
+    assert get_referenced_environment_versions(env) == {"env-2": "t2"}
+
+    env_rows.return_value = [("env-2", "app-1", "staging", "t2", False)]
+    assert get_referenced_environment_versions(env) is None
+
+
+# --- environment crypto context cache ---
+
+
+@pytest.fixture
+def crypto_cache_models():
+    """Patches the ServerEnvironmentKey lookup and unwrap primitives so the
+    per-worker crypto context cache can be exercised without a DB."""
+    invalidate_environment_crypto_context()
+
+    MockServerEnvKey = MagicMock()
+    MockServerEnvKey.objects.get.return_value = MagicMock(
+        wrapped_seed="wrapped_seed", wrapped_salt="wrapped_salt"
+    )
+
+    with patch(
+        "api.utils.secrets.apps.get_model", return_value=MockServerEnvKey
+    ), patch(
+        "api.utils.secrets.decrypt_asymmetric",
+        side_effect=lambda ct, *a: {"wrapped_seed": "seed", "wrapped_salt": "salt"}[ct],
+    ), patch(
+        "api.utils.secrets.env_keypair", return_value=("env_pub", "env_priv")
+    ), patch(
+        "api.utils.secrets.get_server_keypair", return_value=(b"pk", b"sk")
+    ):
+        yield MockServerEnvKey
+
+    invalidate_environment_crypto_context()
+
+
+def test_crypto_context_is_unwrapped_once_per_environment(crypto_cache_models):
+    """Keys, digests and full contexts for the same env share one unwrap."""
+    env = MagicMock()
+    env.id = "env-1"
+
+    assert get_environment_keys("env-1") == ("env_pub", "env_priv")
+    assert get_environment_crypto_context(env) == ("salt", "env_pub", "env_priv")
+    compute_key_digest("KEY", "env-1")
+
+    crypto_cache_models.objects.get.assert_called_once_with(
+        environment_id="env-1", deleted_at__isnull=True
+    )
+
+
+def test_crypto_context_invalidation_forces_reload(crypto_cache_models):
+    get_environment_keys("env-1")
+    get_environment_keys("env-2")
+
+    invalidate_environment_crypto_context("env-1")
+    get_environment_keys("env-1")
+    get_environment_keys("env-2")
+
+    assert crypto_cache_models.objects.get.call_count == 3
+
+
+def test_crypto_context_expires_after_ttl(crypto_cache_models):
+    with patch.object(secrets_utils, "ENV_CRYPTO_CONTEXT_CACHE_TTL", -1):
+        get_environment_keys("env-1")
+        get_environment_keys("env-1")
+
+    assert crypto_cache_models.objects.get.call_count == 2
+
+
+def test_crypto_context_cache_is_bounded(crypto_cache_models):
+    with patch.object(secrets_utils, "ENV_CRYPTO_CONTEXT_CACHE_MAX_SIZE", 2):
+        get_environment_keys("env-1")
+        get_environment_keys("env-2")
+        get_environment_keys("env-3")  # evicts env-1 (least recently used)
+        get_environment_keys("env-3")
+        get_environment_keys("env-1")
+
+    assert crypto_cache_models.objects.get.call_count == 4
+    assert len(secrets_utils._env_crypto_cache) == 2
+
+
+def test_crypto_context_missing_server_key_is_not_cached(crypto_cache_models):
+    crypto_cache_models.DoesNotExist = type("DoesNotExist", (Exception,), {})
+    crypto_cache_models.objects.get.side_effect = crypto_cache_models.DoesNotExist()
+
+    for _ in range(2):
+        with pytest.raises(crypto_cache_models.DoesNotExist):
+            get_environment_keys("env-1")
+
+    assert crypto_cache_models.objects.get.call_count == 2
+
+
+def test_server_keypair_is_memoized():
+    _server_keypair_from_seed.cache_clear()
+
+    with override_settings(SERVER_SECRET="ab" * 32):
+        first = get_server_keypair()
+        second = get_server_keypair()
+    with override_settings(SERVER_SECRET="cd" * 32):
+        rotated = get_server_keypair()
+
+    assert first == second
+    assert rotated != first
+    assert _server_keypair_from_seed.cache_info().hits == 1
+
+
+# --- SecretReferenceIndex ---
+
+
+def _location_lookups(query):
+    """Flatten the OR-ed Q(environment_id=, path=, key_digest__in=) lookups
+    SecretReferenceIndex builds into (env_id, path, digest) tuples."""
+    children = query.children
+    if all(isinstance(child, tuple) for child in children):
+        children = [query]
+    for child in children:
+        lookup = dict(child.children)
+        for digest in lookup["key_digest__in"]:
+            yield lookup["environment_id"], lookup["path"], digest
+
+
+def _index_models():
+    """Mock App / Environment / Secret models for SecretReferenceIndex tests.
+
+    env-1 (app-1, "development") holds the batch; env-2 (app-1, "staging")
+    and env-3 (app-2 "backend", "production") are referenced."""
+
+    def make_model(name):
+        Model = MagicMock()
+        Model.DoesNotExist = type("DoesNotExist", (Exception,), {})
+        Model.MultipleObjectsReturned = type(
+            "MultipleObjectsReturned", (Exception,), {}
+        )
+        Model._meta.object_name = name
+        return Model
+
+    def make_env(env_id, app_id, name):
+        env = MagicMock()
+        env.id = env_id
+        env.app_id = app_id
+        env.name = name
+        env.app.id = app_id
+        return env
+
+    def make_secret(env, digest, ciphertext):
+        s = MagicMock()
+        s.id = f"{env.id}:{digest}"
+        s.environment = env
+        s.environment_id = env.id
+        s.path = "/"
+        s.key_digest = digest
+        s.value = ciphertext
+        return s
+
+    dev = make_env("env-1", "app-1", "development")
+    staging = make_env("env-2", "app-1", "staging")
+    prod = make_env("env-3", "app-2", "production")
+
+    backend_app = MagicMock()
+    backend_app.id = "app-2"
+    backend_app.name = "backend"
+
+    db_rows = [
+        make_secret(staging, "DB_URL", "ct:DBURL"),
+        make_secret(staging, "HOST", "ct:HOST"),
+        make_secret(dev, "LOCAL", "ct:LOCAL"),
+        make_secret(prod, "API_KEY", "ct:APIKEY"),
+    ]
+
+    App = make_model("App")
+    App.objects.filter.return_value = [backend_app]
+    Environment = make_model("Environment")
+    Environment.objects.filter.return_value.select_related.return_value = [
+        staging,
+        prod,
+    ]
+    Secret = make_model("Secret")
+
+    def filter_secrets(query, **kwargs):
+        wanted = set(_location_lookups(query))
+        return [
+            s for s in db_rows if (s.environment_id, s.path, s.key_digest) in wanted
+        ]
+
+    Secret.objects.filter.side_effect = filter_secrets
+
+    models = {
+        "App": App,
+        "Environment": Environment,
+        "Secret": Secret,
+        "ServerEnvironmentKey": make_model("ServerEnvironmentKey"),
+        "ServiceAccount": make_model("ServiceAccount"),
     }
 
-    assert get_referenced_environment_ids("env-2", name_ctx) == set()
+    return models, dev, make_secret
 
 
+@patch("api.utils.secrets.blake2b_digest")
+@patch("api.utils.secrets.get_or_compute_crypto_context")
 @patch("api.utils.secrets.apps.get_model")
 @patch("api.utils.secrets.decrypt_asymmetric")
-@patch("api.utils.secrets.env_keypair")
-@patch("api.utils.secrets.get_server_keypair")
-def test_get_referenced_environment_ids_no_sse(
-    mock_server_kp, mock_env_kp, mock_decrypt, mock_get_model
+@patch("api.utils.secrets.get_environment_crypto_context")
+def test_reference_index_resolves_batch_with_bulk_queries(
+    mock_get_context,
+    mock_decrypt,
+    mock_get_model,
+    mock_get_or_compute,
+    mock_digest,
 ):
-    """No ServerEnvironmentKey (SSE disabled) => no references discoverable."""
-    mock_server_kp.return_value = (b"pk", b"sk")
-    mock_get_model.side_effect = _refs_models(server_key_exists=False)
+    """Every reference in the batch (local, cross-env, cross-app and nested)
+    is served from one bulk load per model, with no per-reference queries."""
+    from api.utils.secrets import SecretReferenceIndex
 
-    name_ctx = {
-        "apps_by_name": {},
-        "ambiguous_apps": set(),
-        "envs_by_app_name": {("app-1", "staging"): "env-staging-id"},
+    crypto_context = ("salt", "pub", "priv")
+    mock_get_context.return_value = crypto_context
+    mock_get_or_compute.return_value = crypto_context
+    mock_digest.side_effect = lambda key_name, salt: key_name
+
+    models, dev, make_secret = _index_models()
+    mock_get_model.side_effect = lambda app_label, name: models[name]
+
+    decrypt_map = {
+        "ct:A": "${staging.DB_URL}",
+        "ct:B": "${backend::production.API_KEY}|${LOCAL}",
+        "ct:C": "plain",
+        "ct:DBURL": "postgres://${HOST}:5432",
+        "ct:HOST": "db",
+        "ct:LOCAL": "local",
+        "ct:APIKEY": "key",
     }
+    mock_decrypt.side_effect = lambda ct, *a: decrypt_map[ct]
+
+    batch = [
+        make_secret(dev, "A", "ct:A"),
+        make_secret(dev, "B", "ct:B"),
+        make_secret(dev, "C", "ct:C"),
+    ]
+
+    index = SecretReferenceIndex("org-1")
+    index.prefetch(batch)
+
+    values = [
+        decrypt_secret_value(s, crypto_context=crypto_context, reference_index=index)
+        for s in batch
+    ]
 
-    assert get_referenced_environment_ids("env-1", name_ctx) == set()
+    assert values == ["postgres://db:5432", "key|local", "plain"]
+    assert models["App"].objects.filter.call_count == 1
+    assert models["Environment"].objects.filter.call_count == 1
+    # Two waves: the batch's direct references, then HOST nested in DB_URL
+    assert models["Secret"].objects.filter.call_count == 2
+    models["Secret"].objects.get.assert_not_called()
+    models["Environment"].objects.get.assert_not_called()
+    models["App"].objects.get.assert_not_called()
+    # Each ciphertext is decrypted exactly once across prefetch and resolution
+    decrypted = [c.args[0] for c in mock_decrypt.call_args_list]
+    assert len(decrypted) == len(set(decrypted))
 
 
+@patch("api.utils.secrets.blake2b_digest")
+@patch("api.utils.secrets.get_or_compute_crypto_context")
 @patch("api.utils.secrets.apps.get_model")
 @patch("api.utils.secrets.decrypt_asymmetric")
-@patch("api.utils.secrets.env_keypair")
-@patch("api.utils.secrets.get_server_keypair")
-def test_get_referenced_environment_ids_ignores_railway_syntax(
-    mock_server_kp, mock_env_kp, mock_decrypt, mock_get_model
+@patch("api.utils.secrets.get_environment_crypto_context")
+def test_reference_index_preserves_missing_and_cycle_semantics(
+    mock_get_context,
+    mock_decrypt,
+    mock_get_model,
+    mock_get_or_compute,
+    mock_digest,
 ):
-    """${{...}} Railway-style syntax is not treated as a reference."""
-    mock_server_kp.return_value = (b"pk", b"sk")
-    mock_env_kp.return_value = (b"env_pub", b"env_priv")
-    mock_get_model.side_effect = _refs_models(source_app_id="app-1")
-    mock_decrypt.side_effect = ["env_seed", "url=${{staging.DB_HOST}}"]
+    """Missing references and cycles behave exactly as without the index."""
+    from api.utils.secrets import SecretReferenceIndex
 
-    name_ctx = {
-        "apps_by_name": {},
-        "ambiguous_apps": set(),
-        "envs_by_app_name": {("app-1", "staging"): "env-staging-id"},
-    }
+    crypto_context = ("salt", "pub", "priv")
+    mock_get_context.return_value = crypto_context
+    mock_get_or_compute.return_value = crypto_context
+    mock_digest.side_effect = lambda key_name, salt: key_name
 
-    assert get_referenced_environment_ids("env-1", name_ctx) == set()
+    models, dev, make_secret = _index_models()
+    mock_get_model.side_effect = lambda app_label, name: models[name]
+
+    a = make_secret(dev, "A", "ct:A")
+    b = make_secret(dev, "B", "ct:B")
+    missing = make_secret(dev, "M", "ct:M")
+    decrypt_map = {"ct:A": "${B}", "ct:B": "${A}", "ct:M": "${NOPE}"}
+    mock_decrypt.side_effect = lambda ct, *a: decrypt_map[ct]
+
+    db_secrets = {"A": a, "B": b}
+    models["Secret"].objects.filter.side_effect = lambda query, **kw: [
+        db_secrets[digest]
+        for _, _, digest in _location_lookups(query)
+        if digest in db_secrets
+    ]
+
+    index = SecretReferenceIndex("org-1")
+    index.prefetch([a, missing])
+
+    assert decrypt_secret_value(a, reference_index=index) == "${A}"
+    assert decrypt_secret_value(missing, reference_index=index) == "${NOPE}"
+
+    with pytest.raises(SecretReferenceException):
+        decrypt_secret_value(
+            missing, require_resolved_references=True, reference_index=index
+        )
+    models["Secret"].objects.get.assert_not_called()
+
+
+@patch("api.utils.secrets.apps.get_model")
+def test_reference_index_get_secret_with_uuid_environment_id(mock_get_model):
+    """Environments loaded from the database have UUID ids, while the index
+    keys them by string."""
+    from uuid import uuid4
+
+    from api.utils.secrets import SecretReferenceIndex
+
+    models, _, make_secret = _index_models()
+    mock_get_model.side_effect = lambda app_label, name: models[name]
+
+    env_id = uuid4()
+    environment = MagicMock()
+    environment.id = env_id
+    secret = make_secret(environment, "DB_URL", "ct:DBURL")
+    # Secret.environment_id is a UUID too, but the index compares strings.
+    secret.environment_id = env_id
+    models["Secret"].objects.filter.side_effect = lambda query, **kw: [secret]
+
+    index = SecretReferenceIndex("org-1")
+
+    assert index.get_secret(environment, "/", "DB_URL") is secret
+    assert secret.environment is environment
+
+
+# --- check_for_duplicates_blind ---
+
+
+def _duplicate_models(static_rows=(), dynamic_rows=()):
+    MockSecret = MagicMock()
+    MockSecret.objects.filter.return_value.values_list.return_value = list(static_rows)
+    MockDynamicSecret = MagicMock()
+    MockDynamicSecret.objects.filter.return_value.values_list.return_value = list(
+        dynamic_rows
+    )
+    models = {"Secret": MockSecret, "DynamicSecret": MockDynamicSecret}
+    return models, lambda app_label, model_name: models[model_name]
+
+
+@patch("api.utils.secrets.apps.get_model")
+def test_check_for_duplicates_blind_single_query_for_batch(mock_get_model):
+    """Every incoming secret is checked by one static and one dynamic query."""
+    models, mock_get_model.side_effect = _duplicate_models(
+        static_rows=[("existing", "/db", "d-501")]
+    )
+    secrets = [
+        {"path": ["/", "db"][i % 2], "keyDigest": f"d-{i}"} for i in range(1000)
+    ]
+
+    assert check_for_duplicates_blind(secrets, MagicMock()) is True
+    assert models["Secret"].objects.filter.call_count == 1
+
+
+@patch("api.utils.secrets.apps.get_model")
+def test_check_for_duplicates_blind_ignores_own_row(mock_get_model):
+    """An update isn't a duplicate of the row it is updating."""
+    _, mock_get_model.side_effect = _duplicate_models(
+        static_rows=[("secret-1", "/", "digest")]
+    )
+    secrets = [{"id": "secret-1", "path": "/", "keyDigest": "digest"}]
+
+    assert check_for_duplicates_blind(secrets, MagicMock()) is False
+
+
+@patch("api.utils.secrets.apps.get_model")
+def test_check_for_duplicates_blind_dynamic_key_map(mock_get_model):
+    """Dynamic-secret key_map digests collide, except with the excluded secret."""
+    dynamic_rows = [("dyn-1", "/aws", [{"key_digest": "digest"}])]
+    models, mock_get_model.side_effect = _duplicate_models(dynamic_rows=dynamic_rows)
+
+    secrets = [{"path": "/aws", "keyDigest": "digest"}]
+    assert check_for_duplicates_blind(secrets, MagicMock()) is True
+    models["DynamicSecret"].objects.filter.assert_called_once()
+
+    secrets = [{"path": "/aws", "keyDigest": "digest", "dynamic_secret_id": "dyn-1"}]
+    assert check_for_duplicates_blind(secrets, MagicMock()) is False
+
+
+# --- SecretFolderResolver ---
+
+
+def _folder(environment_id, path, name, folder=None):
+    return SimpleNamespace(
+        id=str(uuid.uuid4()),
+        environment_id=environment_id,
+        path=path,
+        name=name,
+        folder=folder,
+        folder_id=folder.id if folder is not None else None,
+    )
+
+
+def _folder_models(existing=()):
+    MockSecretFolder = MagicMock(side_effect=lambda **kw: _folder(**kw))
+    MockSecretFolder.objects.filter.return_value = list(existing)
+    return MockSecretFolder, lambda app_label, model_name: MockSecretFolder
+
+
+@patch("api.utils.secrets.transaction")
+@patch("api.utils.secrets.apps.get_model")
+def test_folder_resolver_creates_deep_path_in_one_insert(mock_get_model, _):
+    """A deep path costs one lookup and one bulk insert, with parents linked."""
+    MockSecretFolder, mock_get_model.side_effect = _folder_models()
+
+    resolver = SecretFolderResolver("env-1")
+    folder = resolver.resolve("/a/b/c/d")
+
+    assert MockSecretFolder.objects.filter.call_count == 1
+    MockSecretFolder.objects.bulk_create.assert_called_once()
+    created = MockSecretFolder.objects.bulk_create.call_args[0][0]
+    assert [(f.path, f.name) for f in created] == [
+        ("/", "a"),
+        ("/a", "b"),
+        ("/a/b", "c"),
+        ("/a/b/c", "d"),
+    ]
+    assert folder is created[-1]
+    assert folder.folder is created[-2]
+    assert created[0].folder is None
+
+    # Repeated and overlapping paths are served from the resolver's cache.
+    assert resolver.resolve("/a/b/c/d") is folder
+    assert resolver.resolve_many(["/a/b", "/"]) == {"/a/b": created[1], "/": None}
+    assert MockSecretFolder.objects.filter.call_count == 1
+
+
+@patch("api.utils.secrets.transaction")
+@patch("api.utils.secrets.apps.get_model")
+def test_folder_resolver_reuses_existing_folders(mock_get_model, _):
+    """Existing folders are matched under their parent; only the tail is created."""
+    root = _folder("env-1", "/", "a")
+    child = _folder("env-1", "/a", "b", folder=root)
+    stray = _folder("env-1", "/a", "b", folder=_folder("env-1", "/", "other"))
+    MockSecretFolder, mock_get_model.side_effect = _folder_models([stray, root, child])
+
+    folders = SecretFolderResolver("env-1").resolve_many(["/a/b", "/a/b/c"])
+
+    assert folders["/a/b"] is child
+    created = MockSecretFolder.objects.bulk_create.call_args[0][0]
+    assert [(f.path, f.name, f.folder) for f in created] == [("/a/b", "c", child)]
+    assert folders["/a/b/c"] is created[0]